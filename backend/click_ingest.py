@@ -0,0 +1,158 @@
+"""
+Write-behind click ingestion for Influiv
+Buffers redirect click documents in a bounded in-process queue and writes them
+to MongoDB in batches so /api/redirect/{token} never waits on an insert
+"""
+
+import asyncio
+import time
+from typing import Any, Dict, List, Optional
+from pymongo.errors import BulkWriteError, PyMongoError
+import logging
+
+logger = logging.getLogger(__name__)
+
+DUPLICATE_KEY_ERROR = 11000
+
+
+class ClickIngestor:
+    """Bounded queue of click documents flushed with insert_many(ordered=False)"""
+
+    def __init__(
+        self,
+        collection,
+        max_queue_size: int = 10000,
+        batch_size: int = 500,
+        flush_interval: float = 1.0
+    ):
+        self.collection = collection
+        self.max_queue_size = max_queue_size
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+        self._queue: Optional[asyncio.Queue] = None
+        self._task: Optional[asyncio.Task] = None
+        self._pending: List[Dict[str, Any]] = []
+
+        # Metrics
+        self.enqueued = 0
+        self.dropped = 0
+        self.inserted = 0
+        self.failed = 0
+        self.batches = 0
+        self.last_flush_at: Optional[float] = None
+        self.last_flush_duration: Optional[float] = None
+
+    def start(self):
+        """Start the background flusher (call from the app startup event)"""
+        if self._task and not self._task.done():
+            return
+        if self._queue is None:
+            self._queue = asyncio.Queue(maxsize=self.max_queue_size)
+        self._task = asyncio.create_task(self._run())
+        logger.info(
+            f"Click ingestion started (queue={self.max_queue_size}, batch={self.batch_size}, "
+            f"interval={self.flush_interval}s)"
+        )
+
+    async def stop(self):
+        """Stop the flusher and write out everything still buffered"""
+        if self._task:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+
+        remaining = self._pending
+        self._pending = []
+        while self._queue is not None and not self._queue.empty():
+            remaining.append(self._queue.get_nowait())
+
+        for i in range(0, len(remaining), self.batch_size):
+            await self._flush(remaining[i:i + self.batch_size])
+
+        logger.info(f"Click ingestion stopped, flushed {len(remaining)} buffered clicks")
+
+    def record(self, click_doc: Dict[str, Any]) -> bool:
+        """
+        Enqueue a click without blocking.
+        Returns False (and counts an overflow) when the queue is full.
+        """
+        if self._queue is None:
+            self._queue = asyncio.Queue(maxsize=self.max_queue_size)
+        try:
+            self._queue.put_nowait(click_doc)
+        except asyncio.QueueFull:
+            self.dropped += 1
+            if self.dropped % 1000 == 1:
+                logger.warning(f"Click queue full, dropped {self.dropped} clicks so far")
+            return False
+        self.enqueued += 1
+        return True
+
+    async def _run(self):
+        loop = asyncio.get_running_loop()
+        while True:
+            self._pending.append(await self._queue.get())
+            deadline = loop.time() + self.flush_interval
+
+            while len(self._pending) < self.batch_size:
+                try:
+                    self._pending.append(self._queue.get_nowait())
+                    continue
+                except asyncio.QueueEmpty:
+                    pass
+                timeout = deadline - loop.time()
+                if timeout <= 0:
+                    break
+                try:
+                    self._pending.append(await asyncio.wait_for(self._queue.get(), timeout))
+                except asyncio.TimeoutError:
+                    break
+
+            try:
+                await self._flush(self._pending)
+            except Exception as e:
+                # Keep draining the queue; an unexpected error must not end ingestion
+                self.failed += len(self._pending)
+                logger.error(f"Click flush failed, lost {len(self._pending)} clicks: {str(e)}")
+            finally:
+                self._pending = []
+
+    async def _flush(self, batch: List[Dict[str, Any]]):
+        if not batch:
+            return
+        started = time.perf_counter()
+        try:
+            result = await self.collection.insert_many(batch, ordered=False)
+            self.inserted += len(result.inserted_ids)
+        except BulkWriteError as e:
+            inserted = e.details.get("nInserted", 0)
+            errors = e.details.get("writeErrors", [])
+            # Duplicates mean a batch was retried after a partial write; those clicks are already stored
+            real_errors = [err for err in errors if err.get("code") != DUPLICATE_KEY_ERROR]
+            self.inserted += inserted
+            self.failed += len(real_errors)
+            if real_errors:
+                logger.error(f"Click flush wrote {inserted}/{len(batch)} clicks: {real_errors[0].get('errmsg')}")
+        except PyMongoError as e:
+            self.failed += len(batch)
+            logger.error(f"Click flush failed, lost {len(batch)} clicks: {str(e)}")
+        finally:
+            self.batches += 1
+            self.last_flush_at = time.time()
+            self.last_flush_duration = time.perf_counter() - started
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "queue_depth": self._queue.qsize() if self._queue else 0,
+            "max_queue_size": self.max_queue_size,
+            "enqueued": self.enqueued,
+            "inserted": self.inserted,
+            "dropped": self.dropped,
+            "failed": self.failed,
+            "batches": self.batches,
+            "last_flush_at": self.last_flush_at,
+            "last_flush_duration_ms": round(self.last_flush_duration * 1000, 2) if self.last_flush_duration is not None else None
+        }
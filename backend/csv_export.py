@@ -0,0 +1,76 @@
+"""
+Streaming CSV export for Influiv
+Turns async row iterators (e.g. Motor cursors) into encoded, optionally gzipped
+chunks for StreamingResponse so exports use constant memory regardless of size
+"""
+
+from typing import AsyncIterable, AsyncIterator, Dict, Any, List, Optional
+from fastapi import Request
+from fastapi.responses import StreamingResponse
+import csv
+import io
+import zlib
+
+# Flush the CSV buffer to the client once it grows past this many bytes
+CSV_CHUNK_SIZE = 64 * 1024
+
+# Cursor batch size used by export endpoints
+CSV_CURSOR_BATCH_SIZE = 1000
+
+
+async def iter_csv(
+    rows: AsyncIterable[Dict[str, Any]],
+    fieldnames: List[str],
+    chunk_size: int = CSV_CHUNK_SIZE
+) -> AsyncIterator[bytes]:
+    """Yield UTF-8 encoded CSV chunks (header first) from an async iterable of dicts"""
+    buffer = io.StringIO()
+    writer = csv.DictWriter(buffer, fieldnames=fieldnames, extrasaction="ignore")
+    writer.writeheader()
+
+    async for row in rows:
+        writer.writerow(row)
+        if buffer.tell() >= chunk_size:
+            yield buffer.getvalue().encode()
+            buffer.seek(0)
+            buffer.truncate(0)
+
+    if buffer.tell():
+        yield buffer.getvalue().encode()
+
+
+async def gzip_chunks(chunks: AsyncIterable[bytes], level: int = 6) -> AsyncIterator[bytes]:
+    """Compress a byte stream on the fly into a single gzip member"""
+    compressor = zlib.compressobj(level, zlib.DEFLATED, 31)  # wbits=31 -> gzip container
+    async for chunk in chunks:
+        compressed = compressor.compress(chunk)
+        if compressed:
+            yield compressed
+    yield compressor.flush()
+
+
+def accepts_gzip(request: Optional[Request]) -> bool:
+    if request is None:
+        return False
+    accept_encoding = request.headers.get("accept-encoding", "")
+    return any(part.split(";")[0].strip() == "gzip" for part in accept_encoding.split(","))
+
+
+def csv_streaming_response(
+    rows: AsyncIterable[Dict[str, Any]],
+    fieldnames: List[str],
+    filename: str,
+    request: Optional[Request] = None
+) -> StreamingResponse:
+    """
+    Build a StreamingResponse for a CSV download.
+    Compresses with gzip when the client advertises support for it.
+    """
+    body = iter_csv(rows, fieldnames)
+    headers = {"Content-Disposition": f"attachment; filename={filename}", "Vary": "Accept-Encoding"}
+
+    if accepts_gzip(request):
+        body = gzip_chunks(body)
+        headers["Content-Encoding"] = "gzip"
+
+    return StreamingResponse(body, media_type="text/csv", headers=headers)
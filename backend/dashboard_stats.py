@@ -0,0 +1,116 @@
+"""
+Cached admin dashboard counters for Influiv
+Recomputes the /admin/dashboard figures on an interval in the background so
+requests read a snapshot instead of counting collections on every page load
+"""
+
+import asyncio
+import time
+from datetime import datetime, timezone
+from typing import Any, Dict, Optional
+import logging
+
+logger = logging.getLogger(__name__)
+
+
+class DashboardStats:
+    """Periodically refreshed snapshot of platform-wide counters"""
+
+    def __init__(self, db, refresh_interval: float = 60.0):
+        self.db = db
+        self.refresh_interval = refresh_interval
+        self._snapshot: Optional[Dict[str, Any]] = None
+        self._lock = asyncio.Lock()
+        self._task: Optional[asyncio.Task] = None
+
+        # Metrics
+        self.refreshes = 0
+        self.failures = 0
+        self.last_refresh_duration: Optional[float] = None
+
+    async def compute(self) -> Dict[str, Any]:
+        """
+        Count everything the dashboard shows.
+        Unfiltered totals (campaigns, clicks) use collection metadata via
+        estimated_document_count; the filtered counts stay exact and are index-backed.
+        """
+        total_users, pending_users, total_campaigns, total_clicks, pending_purchase_proofs = await asyncio.gather(
+            self.db.users.count_documents({"deleted_at": None}),
+            self.db.users.count_documents({"status": "pending", "deleted_at": None}),
+            self.db.campaigns.estimated_document_count(),
+            self.db.amazon_click_logs.estimated_document_count(),
+            self.db.purchase_proofs.count_documents({"status": "pending"})
+        )
+        return {
+            "total_users": total_users,
+            "pending_users": pending_users,
+            "total_campaigns": total_campaigns,
+            "total_clicks": total_clicks,
+            "pending_purchase_proofs": pending_purchase_proofs,
+            "computed_at": datetime.now(timezone.utc).isoformat()
+        }
+
+    async def refresh(self) -> Dict[str, Any]:
+        """Recompute the snapshot; concurrent callers share a single computation"""
+        previous = self._snapshot
+        async with self._lock:
+            if self._snapshot is not previous:
+                # Another caller refreshed while we waited for the lock
+                return self._snapshot
+            started = time.perf_counter()
+            try:
+                self._snapshot = await self.compute()
+            except Exception:
+                self.failures += 1
+                raise
+            self.refreshes += 1
+            self.last_refresh_duration = time.perf_counter() - started
+            return self._snapshot
+
+    def _is_stale(self) -> bool:
+        # Twice the interval: the background loop should have refreshed it by now
+        computed_at = datetime.fromisoformat(self._snapshot["computed_at"])
+        return (datetime.now(timezone.utc) - computed_at).total_seconds() > self.refresh_interval * 2
+
+    async def get(self, force: bool = False) -> Dict[str, Any]:
+        """
+        Cached counters with their `computed_at` timestamp.
+        Computed inline on first use, when forced, or when the refresher has stalled.
+        """
+        if force or self._snapshot is None or self._is_stale():
+            return dict(await self.refresh())
+        return dict(self._snapshot)
+
+    def start(self):
+        """Start the background refresher (call from the app startup event)"""
+        if self._task and not self._task.done():
+            return
+        self._task = asyncio.create_task(self._run())
+        logger.info(f"Dashboard stats refresher started (interval={self.refresh_interval}s)")
+
+    async def stop(self):
+        if self._task:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+
+    async def _run(self):
+        while True:
+            try:
+                await self.refresh()
+            except Exception as e:
+                logger.error(f"Dashboard stats refresh failed: {str(e)}")
+            await asyncio.sleep(self.refresh_interval)
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "refresh_interval": self.refresh_interval,
+            "refreshes": self.refreshes,
+            "failures": self.failures,
+            "last_refresh_duration": self.last_refresh_duration,
+            "computed_at": self._snapshot["computed_at"] if self._snapshot else None,
+            "running": bool(self._task and not self._task.done())
+        }
@@ -0,0 +1,119 @@
+"""
+Request-scoped batching loader for Influiv
+Coalesces `load(collection, id)` calls issued in the same event-loop tick into
+one `$in` query per collection, and memoizes results for the rest of the
+request, so per-row enrichment loops don't turn into N+1 queries
+"""
+
+import asyncio
+from typing import Any, Dict, Iterable, List, Optional, Set, Tuple
+import logging
+
+logger = logging.getLogger(__name__)
+
+# (collection, key field, requested fields) - loads sharing this are batched together
+BatchKey = Tuple[str, str, Optional[Tuple[str, ...]]]
+
+
+class DataLoader:
+    """
+    Usage inside a handler:
+        campaigns = await loader.load_many("campaigns", [a["campaign_id"] for a in assignments])
+    or, for concurrent per-row work, `await asyncio.gather(*(loader.load(...) for ...))`.
+    Loads awaited one at a time in a plain loop are still memoized, but not batched.
+    """
+
+    def __init__(self, db):
+        self.db = db
+        self._memo: Dict[Tuple[BatchKey, Any], asyncio.Future] = {}
+        self._pending: Dict[BatchKey, Dict[Any, asyncio.Future]] = {}
+        self._dispatch_scheduled = False
+        self._tasks: Set[asyncio.Task] = set()
+
+        # Metrics
+        self.loads = 0
+        self.hits = 0
+        self.batches = 0
+
+    async def load(
+        self,
+        collection: str,
+        value: Any,
+        key: str = "id",
+        fields: Optional[Iterable[str]] = None
+    ) -> Optional[Dict[str, Any]]:
+        """
+        The document whose `key` equals `value` (like find_one), or None.
+        `fields` limits the projection; `_id` is never returned.
+        Each caller gets its own shallow copy, so enriching it doesn't leak into the memo.
+        """
+        if value is None:
+            return None
+        batch_key: BatchKey = (collection, key, tuple(sorted(fields)) if fields else None)
+        self.loads += 1
+
+        future = self._memo.get((batch_key, value))
+        if future is None:
+            loop = asyncio.get_running_loop()
+            future = loop.create_future()
+            self._memo[(batch_key, value)] = future
+            self._pending.setdefault(batch_key, {})[value] = future
+            if not self._dispatch_scheduled:
+                # Runs after every task already queued for this tick has had a chance to load
+                self._dispatch_scheduled = True
+                loop.call_soon(self._dispatch)
+        else:
+            self.hits += 1
+
+        doc = await future
+        return dict(doc) if doc is not None else None
+
+    async def load_many(
+        self,
+        collection: str,
+        values: Iterable[Any],
+        key: str = "id",
+        fields: Optional[Iterable[str]] = None
+    ) -> List[Optional[Dict[str, Any]]]:
+        fields = tuple(fields) if fields else None
+        return list(await asyncio.gather(*(self.load(collection, value, key, fields) for value in values)))
+
+    def _dispatch(self):
+        self._dispatch_scheduled = False
+        pending, self._pending = self._pending, {}
+        for batch_key, futures in pending.items():
+            task = asyncio.ensure_future(self._fetch(batch_key, futures))
+            self._tasks.add(task)
+            task.add_done_callback(self._tasks.discard)
+
+    async def _fetch(self, batch_key: BatchKey, futures: Dict[Any, asyncio.Future]):
+        collection, key, fields = batch_key
+        projection: Dict[str, int] = {"_id": 0}
+        if fields:
+            projection.update({field: 1 for field in fields})
+            projection[key] = 1
+
+        try:
+            docs = await self.db[collection].find({key: {"$in": list(futures)}}, projection).to_list(None)
+        except Exception as e:
+            logger.error(f"DataLoader batch on {collection}.{key} failed: {str(e)}")
+            for value, future in futures.items():
+                # Forget the failure so a later load in this request can retry
+                self._memo.pop((batch_key, value), None)
+                if not future.done():
+                    future.set_exception(e)
+            return
+        self.batches += 1
+
+        strip_key = bool(fields) and key not in fields
+        found: Dict[Any, Dict[str, Any]] = {}
+        for doc in docs:
+            value = doc.get(key)
+            if value not in found:
+                found[value] = {k: v for k, v in doc.items() if k != key} if strip_key else doc
+        for value, future in futures.items():
+            if not future.done():
+                future.set_result(found.get(value))
+
+    def stats(self) -> Dict[str, Any]:
+        return {"loads": self.loads, "hits": self.hits, "batches": self.batches}
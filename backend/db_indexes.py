@@ -0,0 +1,210 @@
+"""
+MongoDB index registry for Influiv
+Declares every index the API relies on and applies them idempotently at startup
+"""
+
+from typing import Dict, List, Any
+from pymongo import IndexModel, ASCENDING, DESCENDING
+from pymongo.errors import OperationFailure
+import logging
+
+logger = logging.getLogger(__name__)
+
+
+def _unique_id() -> IndexModel:
+    return IndexModel([("id", ASCENDING)], unique=True)
+
+
+def _unique_if_string(field: str) -> IndexModel:
+    """Unique index that ignores documents where the field is unset/null"""
+    return IndexModel(
+        [(field, ASCENDING)],
+        unique=True,
+        partialFilterExpression={field: {"$type": "string"}}
+    )
+
+
+# Collection name -> indexes the handlers in server.py depend on
+INDEX_REGISTRY: Dict[str, List[IndexModel]] = {
+    "users": [
+        _unique_id(),
+        IndexModel([("email", ASCENDING), ("deleted_at", ASCENDING)]),
+        IndexModel([("role", ASCENDING), ("deleted_at", ASCENDING)]),
+        IndexModel([("deleted_at", ASCENDING), ("status", ASCENDING)]),
+    ],
+    "brands": [
+        _unique_id(),
+        IndexModel([("user_id", ASCENDING)], unique=True),
+        IndexModel([("created_at", ASCENDING), ("id", ASCENDING)]),
+    ],
+    "influencers": [
+        _unique_id(),
+        IndexModel([("user_id", ASCENDING)], unique=True),
+        IndexModel([("created_at", ASCENDING), ("id", ASCENDING)]),
+        _unique_if_string("public_profile_slug"),
+    ],
+    "influencer_platforms": [
+        _unique_id(),
+        IndexModel([("influencer_id", ASCENDING), ("platform", ASCENDING)]),
+    ],
+    "campaigns": [
+        _unique_id(),
+        _unique_if_string("landing_page_slug"),
+        # Trailing id: keyset pagination sorts on (created_at, id)
+        IndexModel([("brand_id", ASCENDING), ("created_at", DESCENDING), ("id", DESCENDING)]),
+        IndexModel([("status", ASCENDING), ("created_at", DESCENDING), ("id", DESCENDING)]),
+        IndexModel([("created_at", DESCENDING), ("id", DESCENDING)]),
+    ],
+    "applications": [
+        _unique_id(),
+        IndexModel([("campaign_id", ASCENDING), ("status", ASCENDING)]),
+        IndexModel([("campaign_id", ASCENDING), ("influencer_id", ASCENDING)]),
+        IndexModel([("campaign_id", ASCENDING), ("created_at", DESCENDING), ("id", DESCENDING)]),
+        IndexModel([("influencer_id", ASCENDING), ("created_at", DESCENDING)]),
+    ],
+    "assignments": [
+        _unique_id(),
+        IndexModel([("redirect_token", ASCENDING)], unique=True),
+        IndexModel([("campaign_id", ASCENDING), ("status", ASCENDING)]),
+        IndexModel([("influencer_id", ASCENDING), ("status", ASCENDING)]),
+    ],
+    "purchase_proofs": [
+        _unique_id(),
+        IndexModel([("assignment_id", ASCENDING), ("status", ASCENDING)]),
+        IndexModel([("status", ASCENDING)]),
+    ],
+    "post_submissions": [
+        _unique_id(),
+        IndexModel([("assignment_id", ASCENDING), ("is_addon", ASCENDING)]),
+    ],
+    "product_reviews": [
+        _unique_id(),
+        IndexModel([("assignment_id", ASCENDING)]),
+    ],
+    "amazon_click_logs": [
+        _unique_id(),
+        IndexModel([("assignment_id", ASCENDING), ("clicked_at", DESCENDING)]),
+    ],
+    "click_logs": [
+        IndexModel([("assignment_id", ASCENDING)]),
+    ],
+    "payouts": [
+        _unique_id(),
+        IndexModel([("influencer_id", ASCENDING), ("status", ASCENDING), ("created_at", DESCENDING)]),
+        IndexModel([("brand_id", ASCENDING), ("status", ASCENDING), ("created_at", DESCENDING)]),
+        IndexModel([("influencer_id", ASCENDING), ("created_at", DESCENDING), ("id", DESCENDING)]),
+        IndexModel([("brand_id", ASCENDING), ("created_at", DESCENDING), ("id", DESCENDING)]),
+        IndexModel([("created_at", DESCENDING), ("id", DESCENDING)]),
+        IndexModel([("assignment_id", ASCENDING), ("payout_type", ASCENDING)]),
+        IndexModel([("campaign_id", ASCENDING)]),
+    ],
+    "payment_details": [
+        _unique_id(),
+        IndexModel([("influencer_id", ASCENDING)], unique=True),
+    ],
+    "audit_logs": [
+        _unique_id(),
+        IndexModel([("entity_type", ASCENDING), ("entity_id", ASCENDING)]),
+        IndexModel([("user_id", ASCENDING), ("created_at", DESCENDING)]),
+    ],
+    "password_resets": [
+        IndexModel([("token", ASCENDING), ("used", ASCENDING)]),
+        IndexModel([("user_id", ASCENDING)], unique=True),
+    ],
+    "email_outbox": [
+        _unique_id(),
+        IndexModel([("status", ASCENDING), ("next_attempt_at", ASCENDING)]),
+        IndexModel([("status", ASCENDING), ("locked_until", ASCENDING)]),
+        # Set when a message finishes (sent/skipped/failed); Mongo deletes it at that time
+        IndexModel([("expires_at", ASCENDING)], expireAfterSeconds=0),
+    ],
+    "stats_rollups": [
+        _unique_id(),
+        IndexModel([("scope", ASCENDING), ("brand_id", ASCENDING)]),
+    ],
+    "email_settings": [
+        _unique_id(),
+    ],
+    "landing_content": [
+        _unique_id(),
+    ],
+    "upload_files": [
+        IndexModel([("filename", ASCENDING)], unique=True),
+        IndexModel([("created_at", ASCENDING)]),
+    ],
+    "upload_blobs": [
+        IndexModel([("sha256", ASCENDING)], unique=True),
+        IndexModel([("refcount", ASCENDING)]),
+    ],
+}
+
+
+async def ensure_indexes(db) -> Dict[str, Any]:
+    """
+    Create every registered index. Safe to run on every startup: existing
+    indexes are left alone and a failure on one index (e.g. duplicate data
+    blocking a unique index) is logged without stopping the others.
+    """
+    created = 0
+    failed = []
+
+    for collection_name, indexes in INDEX_REGISTRY.items():
+        collection = db[collection_name]
+        for index in indexes:
+            try:
+                await collection.create_indexes([index])
+                created += 1
+            except OperationFailure as e:
+                name = index.document["name"]
+                logger.warning(f"Could not create index {collection_name}.{name}: {str(e)}")
+                failed.append({"collection": collection_name, "index": name, "error": str(e)})
+
+    logger.info(f"Index bootstrap complete: {created} ensured, {len(failed)} failed")
+    return {"ensured": created, "failed": failed}
+
+
+async def index_report(db) -> Dict[str, Any]:
+    """
+    Compare live indexes against the registry.
+    Reports registered indexes that are missing, indexes that exist but are not
+    registered, and indexes with zero accesses since the server last restarted
+    (according to $indexStats).
+    """
+    collections = []
+
+    for collection_name, indexes in INDEX_REGISTRY.items():
+        collection = db[collection_name]
+        expected = {index.document["name"] for index in indexes}
+
+        existing = set()
+        async for index in collection.list_indexes():
+            existing.add(index["name"])
+
+        usage = {}
+        try:
+            async for stat in collection.aggregate([{"$indexStats": {}}]):
+                usage[stat["name"]] = {
+                    "ops": stat.get("accesses", {}).get("ops", 0),
+                    "since": stat.get("accesses", {}).get("since")
+                }
+        except OperationFailure as e:
+            logger.warning(f"$indexStats unavailable for {collection_name}: {str(e)}")
+
+        unused = sorted(
+            name for name, stats in usage.items()
+            if name != "_id_" and stats["ops"] == 0
+        )
+
+        collections.append({
+            "collection": collection_name,
+            "missing": sorted(expected - existing),
+            "unregistered": sorted(existing - expected - {"_id_"}),
+            "unused": unused,
+            "usage": usage
+        })
+
+    return {
+        "collections": collections,
+        "total_missing": sum(len(c["missing"]) for c in collections),
+        "total_unused": sum(len(c["unused"]) for c in collections)
+    }
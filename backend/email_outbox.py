@@ -0,0 +1,268 @@
+"""
+Durable email outbox for Influiv
+Endpoints enqueue notification emails into the `email_outbox` collection; a
+worker claims batches, delivers them through EmailService's SMTP pool and
+retries failures with exponential backoff. Finished messages (sent, skipped,
+failed) expire via a TTL index on `expires_at` after the retention period, and
+sent ones drop their template data (e.g. password reset links) right away.
+
+The worker runs inside the API process by default. To run it separately:
+    cd /app/backend && python -m email_outbox
+"""
+
+import asyncio
+import os
+import uuid
+from datetime import datetime, timezone, timedelta
+from typing import Any, Dict, List, Optional
+from pymongo import ReturnDocument
+import logging
+
+logger = logging.getLogger(__name__)
+
+
+class OutboxStatus:
+    PENDING = "pending"
+    SENDING = "sending"
+    SENT = "sent"
+    FAILED = "failed"
+    SKIPPED = "skipped"
+
+
+class EmailOutbox:
+    """Mongo-backed queue of outgoing emails with a claim/send/retry worker"""
+
+    def __init__(
+        self,
+        db,
+        email_service,
+        batch_size: int = 20,
+        poll_interval: float = 2.0,
+        max_attempts: int = 6,
+        base_backoff: float = 30.0,
+        max_backoff: float = 3600.0,
+        lease_seconds: float = 300.0,
+        retention: timedelta = timedelta(days=7)
+    ):
+        self.db = db
+        self.email_service = email_service
+        self.batch_size = batch_size
+        self.poll_interval = poll_interval
+        self.max_attempts = max_attempts
+        self.base_backoff = base_backoff
+        self.max_backoff = max_backoff
+        self.lease_seconds = lease_seconds
+        self.retention = retention
+        self.worker_id = f"{os.uname().nodename}-{os.getpid()}-{uuid.uuid4().hex[:6]}"
+        self._task: Optional[asyncio.Task] = None
+        self._wakeup = asyncio.Event()
+
+    async def enqueue(self, to_email: str, template_name: str, template_data: Dict[str, Any]) -> str:
+        now = datetime.now(timezone.utc).isoformat()
+        doc = {
+            "id": str(uuid.uuid4()),
+            "to_email": to_email,
+            "template_name": template_name,
+            "template_data": template_data,
+            "status": OutboxStatus.PENDING,
+            "attempts": 0,
+            "next_attempt_at": now,
+            "locked_until": None,
+            "locked_by": None,
+            "last_error": None,
+            "sent_at": None,
+            "created_at": now,
+            "updated_at": now
+        }
+        await self.db.email_outbox.insert_one(doc)
+        self._wakeup.set()
+        return doc["id"]
+
+    def backoff_seconds(self, attempts: int) -> float:
+        return min(self.base_backoff * (2 ** max(attempts - 1, 0)), self.max_backoff)
+
+    async def claim_batch(self) -> List[Dict[str, Any]]:
+        """
+        Atomically claim up to batch_size due messages.
+        Messages stuck in `sending` past their lease (worker crashed) are reclaimed.
+        """
+        claimed = []
+        for _ in range(self.batch_size):
+            now = datetime.now(timezone.utc)
+            doc = await self.db.email_outbox.find_one_and_update(
+                {"$or": [
+                    {"status": OutboxStatus.PENDING, "next_attempt_at": {"$lte": now.isoformat()}},
+                    {"status": OutboxStatus.SENDING, "locked_until": {"$lte": now.isoformat()}}
+                ]},
+                {
+                    "$set": {
+                        "status": OutboxStatus.SENDING,
+                        "locked_by": self.worker_id,
+                        "locked_until": (now + timedelta(seconds=self.lease_seconds)).isoformat(),
+                        "updated_at": now.isoformat()
+                    },
+                    "$inc": {"attempts": 1}
+                },
+                projection={"_id": 0},
+                sort=[("next_attempt_at", 1)],
+                return_document=ReturnDocument.AFTER
+            )
+            if doc is None:
+                break
+            claimed.append(doc)
+        return claimed
+
+    async def _finish(self, doc: Dict[str, Any], update: Dict[str, Any]):
+        now = datetime.now(timezone.utc)
+        update["locked_by"] = None
+        update["locked_until"] = None
+        update["updated_at"] = now.isoformat()
+        operations: Dict[str, Any] = {"$set": update}
+        if update["status"] != OutboxStatus.PENDING:
+            # BSON date for the TTL index; admin retry clears it
+            update["expires_at"] = now + self.retention
+        if update["status"] == OutboxStatus.SENT:
+            # Nothing left to retry, so don't keep tokens and personal data around
+            operations["$unset"] = {"template_data": ""}
+        await self.db.email_outbox.update_one(
+            {"id": doc["id"], "locked_by": self.worker_id},
+            operations
+        )
+
+    async def process(self, doc: Dict[str, Any]) -> str:
+        # Imported lazily so this module can be used without loading the templates
+        from email_service import EmailNotConfigured, EmailTemplateNotFound
+        from email_render import InvalidEmailHeader
+
+        try:
+            await self.email_service.deliver(doc["to_email"], doc["template_name"], doc["template_data"])
+        except EmailNotConfigured:
+            logger.warning(f"SMTP not configured, skipping outbox email {doc['id']}")
+            await self._finish(doc, {"status": OutboxStatus.SKIPPED, "last_error": "SMTP not configured"})
+            return OutboxStatus.SKIPPED
+        except (EmailTemplateNotFound, InvalidEmailHeader) as e:
+            # Retrying can't fix these
+            await self._finish(doc, {"status": OutboxStatus.FAILED, "last_error": str(e)})
+            return OutboxStatus.FAILED
+        except Exception as e:
+            if doc["attempts"] >= self.max_attempts:
+                logger.error(f"Giving up on outbox email {doc['id']} after {doc['attempts']} attempts: {str(e)}")
+                await self._finish(doc, {"status": OutboxStatus.FAILED, "last_error": str(e)})
+                return OutboxStatus.FAILED
+
+            retry_at = datetime.now(timezone.utc) + timedelta(seconds=self.backoff_seconds(doc["attempts"]))
+            logger.warning(f"Outbox email {doc['id']} failed (attempt {doc['attempts']}), retrying at {retry_at.isoformat()}: {str(e)}")
+            await self._finish(doc, {
+                "status": OutboxStatus.PENDING,
+                "next_attempt_at": retry_at.isoformat(),
+                "last_error": str(e)
+            })
+            return OutboxStatus.PENDING
+
+        await self._finish(doc, {
+            "status": OutboxStatus.SENT,
+            "sent_at": datetime.now(timezone.utc).isoformat(),
+            "last_error": None
+        })
+        return OutboxStatus.SENT
+
+    async def run_once(self) -> int:
+        """Claim and process one batch. Returns the number of messages handled."""
+        batch = await self.claim_batch()
+        if batch:
+            await asyncio.gather(*(self.process(doc) for doc in batch))
+        return len(batch)
+
+    async def run_forever(self):
+        logger.info(f"Email outbox worker {self.worker_id} started")
+        while True:
+            try:
+                handled = await self.run_once()
+            except Exception as e:
+                logger.error(f"Email outbox worker error: {str(e)}")
+                handled = 0
+
+            if handled < self.batch_size:
+                self._wakeup.clear()
+                try:
+                    await asyncio.wait_for(self._wakeup.wait(), timeout=self.poll_interval)
+                except asyncio.TimeoutError:
+                    pass
+
+    def start(self):
+        """Run the worker as a background task of the current event loop"""
+        if self._task and not self._task.done():
+            return
+        self._task = asyncio.create_task(self.run_forever())
+
+    async def stop(self):
+        if self._task:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+
+    async def stats(self) -> Dict[str, Any]:
+        counts = {}
+        async for row in self.db.email_outbox.aggregate([{"$group": {"_id": "$status", "count": {"$sum": 1}}}]):
+            counts[row["_id"]] = row["count"]
+
+        oldest_pending = await self.db.email_outbox.find_one(
+            {"status": OutboxStatus.PENDING},
+            {"_id": 0, "created_at": 1},
+            sort=[("next_attempt_at", 1)]
+        )
+        recent_failures = await self.db.email_outbox.find(
+            {"status": OutboxStatus.FAILED},
+            {"_id": 0, "id": 1, "to_email": 1, "template_name": 1, "attempts": 1, "last_error": 1, "updated_at": 1}
+        ).sort("updated_at", -1).limit(20).to_list(20)
+
+        return {
+            "counts": counts,
+            "oldest_pending_created_at": oldest_pending["created_at"] if oldest_pending else None,
+            "recent_failures": recent_failures,
+            "worker_running": bool(self._task and not self._task.done())
+        }
+
+
+async def _main():
+    from pathlib import Path
+    from dotenv import load_dotenv
+    from motor.motor_asyncio import AsyncIOMotorClient
+    from email_service import EmailService
+
+    load_dotenv(Path(__file__).parent / '.env')
+    logging.basicConfig(
+        level=logging.INFO,
+        format='%(asctime)s - %(name)s - %(levelname)s - %(message)s'
+    )
+
+    client = AsyncIOMotorClient(os.environ['MONGO_URL'])
+    db = client[os.environ['DB_NAME']]
+    email_service = EmailService(
+        db,
+        max_connections=int(os.environ.get('SMTP_POOL_MAX_CONNECTIONS', '4')),
+        settings_ttl=float(os.environ.get('EMAIL_SETTINGS_CACHE_TTL_SECONDS', '60'))
+    )
+    outbox = EmailOutbox(
+        db,
+        email_service,
+        batch_size=int(os.environ.get('EMAIL_OUTBOX_BATCH_SIZE', '20')),
+        poll_interval=float(os.environ.get('EMAIL_OUTBOX_POLL_SECONDS', '2.0')),
+        max_attempts=int(os.environ.get('EMAIL_OUTBOX_MAX_ATTEMPTS', '6')),
+        retention=timedelta(days=float(os.environ.get('EMAIL_OUTBOX_RETENTION_DAYS', '7')))
+    )
+    try:
+        await outbox.run_forever()
+    finally:
+        await email_service.close()
+        client.close()
+
+
+if __name__ == "__main__":
+    try:
+        asyncio.run(_main())
+    except KeyboardInterrupt:
+        pass
@@ -0,0 +1,205 @@
+"""
+Precompiled email rendering for Influiv
+Templates are parsed once at import into static segments + placeholders, a
+plain-text alternative is derived from each HTML body, and messages are
+assembled with a small MIME writer instead of the email package's generator.
+Header values never contain line breaks: subjects have them collapsed, and any
+other header carrying one raises InvalidEmailHeader, so template data can't add headers.
+"""
+
+import base64
+import uuid
+from email.header import Header
+from email.utils import formataddr
+from html.parser import HTMLParser
+from string import Formatter
+from typing import Any, Dict, List, NamedTuple, Optional, Tuple
+import logging
+
+from cache import TTLCache
+
+logger = logging.getLogger(__name__)
+
+
+class InvalidEmailHeader(ValueError):
+    """A header value contains CR/LF; writing it would start a new header"""
+
+
+class CompiledTemplate:
+    """A str.format-style template split into (literal, field) segments"""
+
+    __slots__ = ("segments", "fields")
+
+    def __init__(self, source: str):
+        self.segments: List[Tuple[str, Optional[str]]] = []
+        self.fields: List[str] = []
+        for literal, field, format_spec, conversion in Formatter().parse(source):
+            if field is not None:
+                if format_spec or conversion or not field.isidentifier():
+                    raise ValueError(f"Unsupported placeholder {{{field}}}: only plain {{name}} fields are compiled")
+                if field not in self.fields:
+                    self.fields.append(field)
+            self.segments.append((literal, field))
+
+    def render(self, data: Dict[str, Any]) -> str:
+        """Equivalent to source.format(**data); raises KeyError for a missing field"""
+        parts = []
+        for literal, field in self.segments:
+            parts.append(literal)
+            if field is not None:
+                parts.append(str(data[field]))
+        return "".join(parts)
+
+
+class _TextExtractor(HTMLParser):
+    BLOCK_TAGS = {"div", "p", "h1", "h2", "h3", "h4", "ul", "ol", "table", "tr"}
+
+    def __init__(self):
+        super().__init__(convert_charrefs=True)
+        self.lines: List[str] = []
+        self.current: List[str] = []
+        self.lists: List[List[Any]] = []
+        self.href: Optional[str] = None
+        self.link_text: List[str] = []
+
+    def _break(self):
+        line = " ".join("".join(self.current).split())
+        if line or (self.lines and self.lines[-1]):
+            self.lines.append(line)
+        self.current = []
+
+    def handle_starttag(self, tag, attrs):
+        if tag in self.BLOCK_TAGS or tag == "br":
+            self._break()
+        if tag in ("ul", "ol"):
+            self.lists.append([tag, 0])
+        elif tag == "li":
+            self._break()
+            if self.lists and self.lists[-1][0] == "ol":
+                self.lists[-1][1] += 1
+                self.current.append(f"{self.lists[-1][1]}. ")
+            else:
+                self.current.append("- ")
+        elif tag == "a":
+            self.href = dict(attrs).get("href")
+            self.link_text = []
+
+    def handle_endtag(self, tag):
+        if tag == "a":
+            text = " ".join("".join(self.link_text).split())
+            if self.href and self.href != text:
+                self.current.append(f" ({self.href})" if text else self.href)
+            self.href = None
+        elif tag in ("ul", "ol") and self.lists:
+            self.lists.pop()
+        if tag in self.BLOCK_TAGS or tag == "li":
+            self._break()
+
+    def handle_data(self, data):
+        self.current.append(data)
+        if self.href is not None:
+            self.link_text.append(data)
+
+    def text(self) -> str:
+        self._break()
+        return "\n".join(self.lines).strip() + "\n"
+
+
+def html_to_text(html: str) -> str:
+    """Readable plain-text version of an HTML email body (links become 'text (url)')"""
+    parser = _TextExtractor()
+    parser.feed(html)
+    parser.close()
+    return parser.text()
+
+
+def _body_part(content_type: str, body: str) -> str:
+    encoded = base64.encodebytes(body.encode("utf-8")).decode("ascii")
+    return (
+        f'Content-Type: {content_type}; charset="utf-8"\n'
+        "MIME-Version: 1.0\n"
+        "Content-Transfer-Encoding: base64\n\n"
+        f"{encoded}"
+    )
+
+
+def _single_line(name: str, value: str) -> str:
+    if "\r" in value or "\n" in value:
+        raise InvalidEmailHeader(f"{name} header contains a line break: {value!r}")
+    return value
+
+
+def _header(name: str, value: str) -> str:
+    _single_line(name, value)
+    if value.isascii():
+        return value
+    return Header(value, "utf-8").encode()
+
+
+class RenderedEmail(NamedTuple):
+    subject: str
+    html: str
+    text: str
+    boundary: str
+    mime_body: str
+
+    def to_message(self, from_name: str, from_email: str, to_email: str) -> str:
+        """Full RFC 5322 message: per-recipient headers + the shared, pre-encoded body"""
+        return (
+            f'Content-Type: multipart/alternative; boundary="{self.boundary}"\n'
+            "MIME-Version: 1.0\n"
+            f"Subject: {_header('Subject', self.subject)}\n"
+            f"From: {formataddr((_single_line('From', from_name), _single_line('From', from_email)))}\n"
+            f"To: {_single_line('To', to_email)}\n\n"
+            f"{self.mime_body}"
+        )
+
+
+class CompiledEmailTemplate:
+    def __init__(self, subject: str, html: str):
+        self.subject = CompiledTemplate(subject)
+        self.html = CompiledTemplate(html)
+        self.text = CompiledTemplate(html_to_text(html))
+        self.fields = tuple(dict.fromkeys(self.subject.fields + self.html.fields))
+
+    def render(self, data: Dict[str, Any]) -> RenderedEmail:
+        # Template data (e.g. a campaign title) may span lines; a subject can't
+        subject = " ".join(self.subject.render(data).split())
+        html = self.html.render(data)
+        text = self.text.render(data)
+        boundary = f"==============={uuid.uuid4().hex}=="
+        mime_body = (
+            f"--{boundary}\n{_body_part('text/plain', text)}"
+            f"--{boundary}\n{_body_part('text/html', html)}"
+            f"--{boundary}--\n"
+        )
+        return RenderedEmail(subject, html, text, boundary, mime_body)
+
+
+class EmailRenderer:
+    """
+    Compiles every template once and caches rendered+encoded bodies, so a fan-out
+    of the same notification (e.g. every admin on a new registration) renders once.
+    """
+
+    def __init__(self, templates: Dict[str, Dict[str, str]], cache_size: int = 256, cache_ttl: float = 300.0):
+        self.templates = {
+            name: CompiledEmailTemplate(template["subject"], template["html"])
+            for name, template in templates.items()
+        }
+        self._cache = TTLCache(maxsize=cache_size, ttl=cache_ttl)
+
+    def __contains__(self, template_name: str) -> bool:
+        return template_name in self.templates
+
+    def render(self, template_name: str, data: Dict[str, Any]) -> RenderedEmail:
+        template = self.templates[template_name]
+        key = (template_name, tuple(str(data[field]) for field in template.fields))
+        rendered = self._cache.get(key)
+        if rendered is None:
+            rendered = template.render(data)
+            self._cache.set(key, rendered)
+        return rendered
+
+    def stats(self) -> Dict[str, Any]:
+        return self._cache.stats()
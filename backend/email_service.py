@@ -3,14 +3,15 @@ Email Service for Influiv
 Sends notifications via SMTP configured in admin settings
 """
 
-import smtplib
-import ssl
 import os
-from email.mime.text import MIMEText
-from email.mime.multipart import MIMEMultipart
+from collections import Counter
 from typing import Optional, Dict, Any
 import logging
 
+from smtp_pool import SMTPPool
+from cache import TTLCache
+from email_render import EmailRenderer
+
 logger = logging.getLogger(__name__)
 
 # Brand colors
@@ -569,24 +570,137 @@ EMAIL_TEMPLATES = {
     }
 }
 
+# Compiled once at import; also caches rendered bodies for repeated sends
+email_renderer = EmailRenderer(EMAIL_TEMPLATES)
+
 
 def get_app_url() -> str:
     """Get the application URL - always returns production domain"""
     return APP_URL
 
 
+class EmailNotConfigured(Exception):
+    """SMTP settings are missing, so email is disabled"""
+
+
+class EmailTemplateNotFound(Exception):
+    """The requested template name does not exist"""
+
+
 class EmailService:
     """Service for sending emails via SMTP"""
     
-    def __init__(self, db):
+    def __init__(self, db, max_connections: int = 4, settings_ttl: float = 60.0):
         self.db = db
+        self.max_connections = max_connections
+        self._pool: Optional[SMTPPool] = None
+        # Other processes (e.g. a standalone outbox worker) pick up edits within settings_ttl
+        self._settings_cache = TTLCache(maxsize=1, ttl=settings_ttl)
+        # Set to an EmailOutbox to make send_email durable/queued
+        self.outbox = None
+        
+        # Metrics
+        self.delivered = 0
+        self.delivery_failures: Counter = Counter()  # exception class name -> count
+    
+    async def get_pool(self, settings: Dict[str, Any]) -> SMTPPool:
+        """Get the connection pool for the current settings, replacing it if they changed"""
+        key = (settings["smtp_host"], int(settings.get("smtp_port", 587)), settings["smtp_user"], settings["smtp_password"])
+        if self._pool is None or self._pool.config_key != key:
+            old_pool = self._pool
+            self._pool = SMTPPool(*key, max_connections=self.max_connections)
+            if old_pool is not None:
+                await old_pool.close()
+        return self._pool
+    
+    async def close(self):
+        if self._pool is not None:
+            await self._pool.close()
+            self._pool = None
+    
+    def pool_stats(self) -> Optional[Dict[str, Any]]:
+        return self._pool.stats() if self._pool else None
     
     async def get_smtp_settings(self) -> Optional[Dict[str, Any]]:
-        """Get SMTP settings from database"""
+        """Get SMTP settings, from the in-process cache when fresh, else from the database"""
+        cached = self._settings_cache.get("default")
+        if cached is not None:
+            # {} caches "not configured" so unconfigured installs don't hit Mongo per email either
+            return cached or None
+        
         settings = await self.db.email_settings.find_one({"id": "default"}, {"_id": 0})
         if not settings or not settings.get("smtp_host"):
-            return None
-        return settings
+            settings = {}
+        self._settings_cache.set("default", settings)
+        return settings or None
+    
+    def invalidate_settings(self):
+        """Drop cached SMTP settings - call after email_settings is written"""
+        self._settings_cache.invalidate("default")
+    
+    def settings_cache_stats(self) -> Dict[str, Any]:
+        return self._settings_cache.stats()
+    
+    def delivery_stats(self) -> Dict[str, Any]:
+        return {"delivered": self.delivered, "failed": dict(self.delivery_failures)}
+    
+    async def deliver(
+        self,
+        to_email: str,
+        template_name: str,
+        template_data: Dict[str, Any]
+    ):
+        """Render and send an email right now. Raises on any failure."""
+        try:
+            await self._deliver(to_email, template_name, template_data)
+        except Exception as e:
+            self.delivery_failures[type(e).__name__] += 1
+            raise
+        self.delivered += 1
+    
+    async def _deliver(
+        self,
+        to_email: str,
+        template_name: str,
+        template_data: Dict[str, Any]
+    ):
+        settings = await self.get_smtp_settings()
+        if not settings:
+            raise EmailNotConfigured("SMTP not configured")
+        
+        if template_name not in email_renderer:
+            raise EmailTemplateNotFound(f"Email template not found: {template_name}")
+        
+        # Render HTML + plain-text alternative from the precompiled template
+        rendered = email_renderer.render(template_name, template_data)
+        message = rendered.to_message(
+            settings.get("from_name", "Influiv"),
+            settings.get("from_email", settings["smtp_user"]),
+            to_email
+        )
+        
+        # Send email over a pooled connection
+        pool = await self.get_pool(settings)
+        await pool.send(settings["smtp_user"], [to_email], message)
+        
+        logger.info(f"Email sent successfully to {to_email}: {template_name}")
+    
+    async def send_now(
+        self,
+        to_email: str,
+        template_name: str,
+        template_data: Dict[str, Any]
+    ) -> bool:
+        """Send immediately, bypassing the outbox. Returns False instead of raising."""
+        try:
+            await self.deliver(to_email, template_name, template_data)
+            return True
+        except EmailNotConfigured:
+            logger.warning("SMTP not configured, skipping email")
+            return False
+        except Exception as e:
+            logger.error(f"Failed to send email to {to_email}: {str(e)}")
+            return False
     
     async def send_email(
         self,
@@ -595,58 +709,15 @@ class EmailService:
         template_data: Dict[str, Any],
         app_url: str = ""
     ) -> bool:
-        """Send an email using a template"""
+        """Send an email using a template (queued in the outbox when one is attached)"""
+        if self.outbox is None:
+            return await self.send_now(to_email, template_name, template_data)
+        
         try:
-            settings = await self.get_smtp_settings()
-            if not settings:
-                logger.warning("SMTP not configured, skipping email")
-                return False
-            
-            template = EMAIL_TEMPLATES.get(template_name)
-            if not template:
-                logger.error(f"Email template not found: {template_name}")
-                return False
-            
-            # Format subject and body with template data
-            subject = template["subject"].format(**template_data)
-            html_body = template["html"].format(**template_data)
-            
-            # Create message
-            msg = MIMEMultipart("alternative")
-            msg["Subject"] = subject
-            msg["From"] = f"{settings.get('from_name', 'Influiv')} <{settings.get('from_email', settings['smtp_user'])}>"
-            msg["To"] = to_email
-            
-            # Attach HTML content
-            html_part = MIMEText(html_body, "html")
-            msg.attach(html_part)
-            
-            # Send email
-            smtp_host = settings["smtp_host"]
-            smtp_port = settings.get("smtp_port", 587)
-            smtp_user = settings["smtp_user"]
-            smtp_password = settings["smtp_password"]
-            
-            # Use appropriate connection based on port
-            if smtp_port == 465:
-                # SSL
-                context = ssl.create_default_context()
-                with smtplib.SMTP_SSL(smtp_host, smtp_port, context=context) as server:
-                    server.login(smtp_user, smtp_password)
-                    server.sendmail(smtp_user, to_email, msg.as_string())
-            else:
-                # TLS or no encryption
-                with smtplib.SMTP(smtp_host, smtp_port) as server:
-                    if smtp_port == 587:
-                        server.starttls()
-                    server.login(smtp_user, smtp_password)
-                    server.sendmail(smtp_user, to_email, msg.as_string())
-            
-            logger.info(f"Email sent successfully to {to_email}: {template_name}")
+            await self.outbox.enqueue(to_email, template_name, template_data)
             return True
-            
         except Exception as e:
-            logger.error(f"Failed to send email to {to_email}: {str(e)}")
+            logger.error(f"Failed to enqueue email to {to_email}: {str(e)}")
             return False
     
     async def send_influencer_welcome(self, email: str, name: str, app_url: str = ""):
@@ -0,0 +1,175 @@
+"""
+Conditional and byte-range file responses for Influiv
+Adds what Starlette's FileResponse lacks for serving uploads: If-None-Match /
+If-Modified-Since revalidation (304), single-range Range requests (206/416,
+honouring If-Range) so video players can seek, and caller-supplied ETag and
+Cache-Control headers.
+"""
+
+import os
+from email.utils import formatdate, parsedate_to_datetime
+from pathlib import Path
+from typing import Dict, Mapping, Optional, Tuple
+import aiofiles
+from fastapi.responses import FileResponse, Response, StreamingResponse
+import logging
+
+logger = logging.getLogger(__name__)
+
+STREAM_CHUNK_SIZE = 64 * 1024
+
+CONTENT_TYPES = {
+    '.jpg': 'image/jpeg',
+    '.jpeg': 'image/jpeg',
+    '.png': 'image/png',
+    '.gif': 'image/gif',
+    '.webp': 'image/webp',
+    '.svg': 'image/svg+xml',
+    '.mp4': 'video/mp4',
+    '.mov': 'video/quicktime',
+    '.avi': 'video/x-msvideo',
+    '.webm': 'video/webm',
+    '.mkv': 'video/x-matroska',
+    '.pdf': 'application/pdf',
+    '.doc': 'application/msword',
+    '.docx': 'application/vnd.openxmlformats-officedocument.wordprocessingml.document',
+    '.txt': 'text/plain',
+    '.zip': 'application/zip',
+    '.tar': 'application/x-tar',
+    '.gz': 'application/gzip'
+}
+
+
+class RangeNotSatisfiable(Exception):
+    """The Range header doesn't overlap the file"""
+
+
+def content_type_for(path: Path) -> str:
+    return CONTENT_TYPES.get(path.suffix.lower(), 'application/octet-stream')
+
+
+def _opaque(tag: str) -> str:
+    """ETag without the weak prefix, for weak comparison"""
+    tag = tag.strip()
+    return tag[2:] if tag.startswith("W/") else tag
+
+
+def etag_matches(header: str, etag: str) -> bool:
+    """If-None-Match semantics: weak comparison against a comma-separated list or `*`"""
+    if header.strip() == "*":
+        return True
+    return _opaque(etag) in {_opaque(candidate) for candidate in header.split(",")}
+
+
+def _not_modified_since(header: str, mtime: float) -> bool:
+    try:
+        since = parsedate_to_datetime(header)
+    except (TypeError, ValueError):
+        return False
+    # HTTP dates have one-second resolution
+    return since is not None and int(mtime) <= since.timestamp()
+
+
+def is_not_modified(headers: Mapping[str, str], etag: str, mtime: float) -> bool:
+    """Whether a GET can be answered with 304 (If-None-Match wins over If-Modified-Since)"""
+    if_none_match = headers.get("if-none-match")
+    if if_none_match is not None:
+        return etag_matches(if_none_match, etag)
+    if_modified_since = headers.get("if-modified-since")
+    if if_modified_since is not None:
+        return _not_modified_since(if_modified_since, mtime)
+    return False
+
+
+def parse_range(header: str, size: int) -> Optional[Tuple[int, int]]:
+    """
+    Inclusive (start, end) for a single `bytes=` range, or None to serve the
+    whole file (unsupported unit, multiple ranges, or a malformed header).
+    Raises RangeNotSatisfiable when the range starts past the end of the file.
+    """
+    unit, _, spec = header.partition("=")
+    if unit.strip().lower() != "bytes" or "," in spec:
+        return None
+    first, dash, last = spec.strip().partition("-")
+    if not dash:
+        return None
+    try:
+        if not first:
+            # Suffix range: the last N bytes
+            length = int(last)
+            if length <= 0:
+                raise RangeNotSatisfiable()
+            return max(0, size - length), size - 1
+        start = int(first)
+        end = int(last) if last else None
+    except ValueError:
+        return None
+    if end is not None and start > end:
+        return None
+    if start >= size:
+        raise RangeNotSatisfiable()
+    return start, size - 1 if end is None else min(end, size - 1)
+
+
+def _if_range_allows(headers: Mapping[str, str], etag: str, last_modified: str) -> bool:
+    """If-Range needs a strong ETag match or an exact Last-Modified match; otherwise send everything"""
+    if_range = headers.get("if-range")
+    if if_range is None:
+        return True
+    if_range = if_range.strip()
+    if if_range.startswith('"') or if_range.startswith("W/"):
+        return not etag.startswith("W/") and if_range == etag
+    return if_range == last_modified
+
+
+async def _read_range(path: Path, start: int, end: int):
+    async with aiofiles.open(path, 'rb') as f:
+        await f.seek(start)
+        remaining = end - start + 1
+        while remaining > 0:
+            chunk = await f.read(min(STREAM_CHUNK_SIZE, remaining))
+            if not chunk:
+                break
+            remaining -= len(chunk)
+            yield chunk
+
+
+def file_response(
+    request_headers: Mapping[str, str],
+    method: str,
+    path: Path,
+    etag: str,
+    cache_control: str,
+    filename: Optional[str] = None,
+    stat_result: Optional[os.stat_result] = None
+) -> Response:
+    """200 (whole file), 206 (byte range), 304 (unchanged) or 416 (bad range) for `path`"""
+    stat_result = stat_result or path.stat()
+    size = stat_result.st_size
+    last_modified = formatdate(stat_result.st_mtime, usegmt=True)
+    headers: Dict[str, str] = {
+        "etag": etag,
+        "last-modified": last_modified,
+        "cache-control": cache_control,
+        "accept-ranges": "bytes",
+    }
+    media_type = content_type_for(path)
+
+    if is_not_modified(request_headers, etag, stat_result.st_mtime):
+        return Response(status_code=304, headers=headers)
+
+    range_header = request_headers.get("range")
+    if range_header and _if_range_allows(request_headers, etag, last_modified):
+        try:
+            byte_range = parse_range(range_header, size)
+        except RangeNotSatisfiable:
+            return Response(status_code=416, headers={**headers, "content-range": f"bytes */{size}"})
+        if byte_range is not None:
+            start, end = byte_range
+            headers["content-range"] = f"bytes {start}-{end}/{size}"
+            headers["content-length"] = str(end - start + 1)
+            if method == "HEAD":
+                return Response(status_code=206, headers=headers, media_type=media_type)
+            return StreamingResponse(_read_range(path, start, end), status_code=206, headers=headers, media_type=media_type)
+
+    return FileResponse(path, headers=headers, media_type=media_type, filename=filename, stat_result=stat_result)
@@ -0,0 +1,251 @@
+"""
+Responsive image variants for Influiv
+After an image upload, renders downscaled WebP copies (160/480/1280px wide by
+default) in a process pool, so listing pages can fetch /files/{filename}?w=480
+instead of the full-size original. Variants are keyed by the upload's content
+hash, so deduplicated uploads share them and GC removes them with the blob.
+`python -m image_variants backfill` renders variants for images uploaded earlier.
+"""
+
+import argparse
+import asyncio
+import math
+import multiprocessing
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import Path
+from typing import Any, Dict, Iterable, Optional, Set, Tuple
+import logging
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_WIDTHS = (160, 480, 1280)
+WEBP_QUALITY = 80
+# SVG is already resolution independent
+IMAGE_EXTENSIONS = frozenset({'.jpg', '.jpeg', '.png', '.gif', '.webp'})
+# Written after every variant, so its presence means rendering finished
+RENDERED_MARKER = ".rendered"
+EXIF_ORIENTATION = 0x0112
+
+
+def render_variants(source: str, target_dir: str, widths: Tuple[int, ...], quality: int = WEBP_QUALITY) -> Dict[str, Any]:
+    """
+    Runs in a worker process: write `<width>.webp` into `target_dir` for every
+    width narrower than the source as displayed, i.e. after EXIF rotation (never
+    upscales). Returns that displayed size and the widths written.
+    """
+    from PIL import Image, ImageOps
+
+    target = Path(target_dir)
+    target.mkdir(parents=True, exist_ok=True)
+    with Image.open(source) as image:
+        raw_width, raw_height = image.size
+        # EXIF orientations 5-8 rotate by 90 degrees, so the displayed width is the stored height
+        rotated = image.getexif().get(EXIF_ORIENTATION, 1) in (5, 6, 7, 8)
+        width, height = (raw_height, raw_width) if rotated else (raw_width, raw_height)
+        written = []
+        targets = [w for w in sorted(widths) if w < width]
+        if targets:
+            # Let JPEG decode at reduced scale when the largest variant allows it
+            scale = targets[-1] / width
+            image.draft("RGB", (max(1, math.ceil(raw_width * scale)), max(1, math.ceil(raw_height * scale))))
+            image = ImageOps.exif_transpose(image)
+            if image.mode not in ("RGB", "RGBA"):
+                image = image.convert("RGBA" if "transparency" in image.info or image.mode in ("LA", "PA") else "RGB")
+            # The draft may have decoded at a reduced size
+            source_width, source_height = image.size
+            for variant_width in targets:
+                variant_height = max(1, round(source_height * variant_width / source_width))
+                resized = image.resize((variant_width, variant_height), Image.LANCZOS, reducing_gap=3.0)
+                temp = target / f".{variant_width}.webp.part"
+                resized.save(temp, "WEBP", quality=quality, method=4)
+                os.replace(temp, target / f"{variant_width}.webp")
+                written.append(variant_width)
+    (target / RENDERED_MARKER).touch()
+    return {"width": width, "height": height, "variants": written}
+
+
+def is_image(filename: str) -> bool:
+    return Path(filename).suffix.lower() in IMAGE_EXTENSIONS
+
+
+class ImageVariantPipeline:
+    """
+    Schedules variant rendering for uploaded images on a process pool.
+    At most `max_pending` images wait for a worker; beyond that submissions are
+    dropped (the originals still serve, and backfill can catch up).
+    """
+
+    def __init__(self, db, blob_store, widths: Iterable[int] = DEFAULT_WIDTHS, max_workers: int = 2, max_pending: int = 200):
+        self.db = db
+        self.blob_store = blob_store
+        self.widths = tuple(sorted(widths))
+        self.max_workers = max_workers
+        self.max_pending = max_pending
+        self._executor: Optional[ProcessPoolExecutor] = None
+        self._semaphore: Optional[asyncio.Semaphore] = None
+        self._tasks: Set[asyncio.Task] = set()
+        self._in_progress: Set[str] = set()
+
+        # Metrics
+        self.submitted = 0
+        self.rendered = 0
+        self.skipped = 0
+        self.dropped = 0
+        self.failed = 0
+        self.total_seconds = 0.0
+
+    def start(self):
+        if self._executor is None:
+            # spawn, not fork: the parent has Motor/executor threads that mustn't be forked
+            self._executor = ProcessPoolExecutor(
+                max_workers=self.max_workers,
+                mp_context=multiprocessing.get_context("spawn")
+            )
+            logger.info(f"Image variant pipeline started ({self.max_workers} workers, widths {self.widths})")
+
+    async def stop(self):
+        for task in list(self._tasks):
+            task.cancel()
+        if self._tasks:
+            await asyncio.gather(*self._tasks, return_exceptions=True)
+        if self._executor is not None:
+            self._executor.shutdown(wait=False, cancel_futures=True)
+            self._executor = None
+
+    def submit(self, sha256: str, filename: str) -> bool:
+        """Queue rendering for an uploaded image; False if not an image or the queue is full"""
+        if not is_image(filename) or sha256 in self._in_progress:
+            return False
+        if len(self._in_progress) >= self.max_pending:
+            self.dropped += 1
+            logger.warning(f"Image variant queue full, not rendering {filename}")
+            return False
+        self.submitted += 1
+        self._in_progress.add(sha256)
+        task = asyncio.create_task(self._render(sha256, filename))
+        self._tasks.add(task)
+        task.add_done_callback(self._tasks.discard)
+        return True
+
+    async def _render(self, sha256: str, filename: str):
+        try:
+            blob = await self.db.upload_blobs.find_one({"sha256": sha256}, {"_id": 0, "variants": 1})
+            if blob is not None and "variants" in blob:
+                # Same content was uploaded (and rendered) before
+                self.skipped += 1
+                return
+
+            if self._semaphore is None:
+                self._semaphore = asyncio.Semaphore(self.max_workers)
+            async with self._semaphore:
+                self.start()
+                started = time.perf_counter()
+                loop = asyncio.get_running_loop()
+                result = await loop.run_in_executor(
+                    self._executor,
+                    render_variants,
+                    str(self.blob_store.blob_path(sha256)),
+                    str(self.blob_store.variants_dir(sha256)),
+                    self.widths
+                )
+                self.total_seconds += time.perf_counter() - started
+
+            await self.db.upload_blobs.update_one({"sha256": sha256}, {"$set": {
+                "variants": result["variants"],
+                "image_width": result["width"],
+                "image_height": result["height"]
+            }})
+            self.rendered += 1
+        except asyncio.CancelledError:
+            raise
+        except Exception as e:
+            self.failed += 1
+            logger.error(f"Rendering image variants for {filename} failed: {str(e)}")
+        finally:
+            self._in_progress.discard(sha256)
+
+    def variant_path(self, sha256: str, width: int) -> Path:
+        return self.blob_store.variants_dir(sha256) / f"{width}.webp"
+
+    def is_rendered(self, sha256: str) -> bool:
+        """Whether rendering has finished for this content (possibly writing nothing, for small images)"""
+        return (self.blob_store.variants_dir(sha256) / RENDERED_MARKER).is_file()
+
+    def best_variant(self, sha256: str, requested_width: int) -> Optional[Tuple[int, Path]]:
+        """
+        The narrowest rendered variant at least `requested_width` wide, or None to
+        serve the original (nothing rendered yet, or the original isn't wider).
+        """
+        for width in self.widths:
+            if width >= requested_width:
+                path = self.variant_path(sha256, width)
+                if path.is_file():
+                    return width, path
+        return None
+
+    async def backfill(self, limit: Optional[int] = None) -> Dict[str, int]:
+        """Render variants for indexed images that don't have them yet"""
+        queued = 0
+        cursor = self.db.upload_files.find({}, {"_id": 0, "filename": 1, "sha256": 1})
+        async for doc in cursor:
+            if limit is not None and queued >= limit:
+                break
+            if not is_image(doc["filename"]):
+                continue
+            blob = await self.db.upload_blobs.find_one({"sha256": doc["sha256"]}, {"_id": 0, "variants": 1})
+            if blob is None or "variants" in blob:
+                continue
+            while len(self._in_progress) >= self.max_pending:
+                await asyncio.sleep(0.1)
+            if self.submit(doc["sha256"], doc["filename"]):
+                queued += 1
+        if self._tasks:
+            await asyncio.gather(*self._tasks, return_exceptions=True)
+        return {"queued": queued, "rendered": self.rendered, "failed": self.failed}
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "widths": list(self.widths),
+            "workers": self.max_workers,
+            "pending": len(self._in_progress),
+            "submitted": self.submitted,
+            "rendered": self.rendered,
+            "skipped": self.skipped,
+            "dropped": self.dropped,
+            "failed": self.failed,
+            "avg_render_ms": round(self.total_seconds / self.rendered * 1000, 2) if self.rendered else None
+        }
+
+
+async def _main():
+    from dotenv import load_dotenv
+    from motor.motor_asyncio import AsyncIOMotorClient
+    from upload_blobs import UploadBlobStore
+
+    parser = argparse.ArgumentParser(description="Render responsive WebP variants for uploaded images")
+    parser.add_argument("command", choices=["backfill"])
+    parser.add_argument("--uploads-dir", default="/app/backend/uploads")
+    parser.add_argument("--workers", type=int, default=os.cpu_count() or 2)
+    parser.add_argument("--limit", type=int, help="render at most this many images")
+    args = parser.parse_args()
+
+    load_dotenv(Path(__file__).parent / '.env')
+    logging.basicConfig(
+        level=logging.INFO,
+        format='%(asctime)s - %(name)s - %(levelname)s - %(message)s'
+    )
+
+    client = AsyncIOMotorClient(os.environ['MONGO_URL'])
+    db = client[os.environ['DB_NAME']]
+    pipeline = ImageVariantPipeline(db, UploadBlobStore(db, Path(args.uploads_dir)), max_workers=args.workers)
+    try:
+        print(await pipeline.backfill(args.limit))
+    finally:
+        await pipeline.stop()
+        client.close()
+
+
+if __name__ == "__main__":
+    asyncio.run(_main())
@@ -0,0 +1,268 @@
+"""
+Prometheus metrics for Influiv
+Counters, gauges and histograms rendered in the Prometheus text exposition
+format (0.0.4) by GET /metrics, without the prometheus_client dependency.
+Services that already keep their own counters (click ingestion, email, query
+counting) are exported through collectors read at scrape time, so the hot
+paths don't pay for a second set of counters.
+"""
+
+import asyncio
+import math
+import time
+from bisect import bisect_left
+from typing import Any, Callable, Dict, Iterable, List, Optional, Sequence, Tuple
+import logging
+
+logger = logging.getLogger(__name__)
+
+CONTENT_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+
+DEFAULT_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+# (labels, value) pairs of one metric family
+Samples = List[Tuple[Dict[str, str], float]]
+# A collector returns (name, type, help, samples) families at scrape time
+Family = Tuple[str, str, str, Samples]
+
+
+def _escape(value: str, quotes: bool = True) -> str:
+    # HELP text escapes backslash and newline; label values also escape quotes
+    value = value.replace("\\", "\\\\").replace("\n", "\\n")
+    return value.replace('"', '\\"') if quotes else value
+
+
+def _format_labels(labels: Dict[str, str]) -> str:
+    if not labels:
+        return ""
+    return "{" + ",".join(f'{key}="{_escape(str(value))}"' for key, value in labels.items()) + "}"
+
+
+def _format_value(value: float) -> str:
+    if value == math.inf:
+        return "+Inf"
+    if value == -math.inf:
+        return "-Inf"
+    if isinstance(value, int) or float(value).is_integer():
+        return str(int(value))
+    return repr(float(value))
+
+
+class _Metric:
+    kind = ""
+
+    def __init__(self, name: str, help: str, labelnames: Sequence[str] = ()):
+        self.name = name
+        self.help = help
+        self.labelnames = tuple(labelnames)
+
+    def _key(self, labels: Dict[str, str]) -> Tuple[str, ...]:
+        if set(labels) != set(self.labelnames):
+            raise ValueError(f"{self.name} expects labels {self.labelnames}, got {tuple(labels)}")
+        return tuple(str(labels[name]) for name in self.labelnames)
+
+    def _labels(self, key: Tuple[str, ...]) -> Dict[str, str]:
+        return dict(zip(self.labelnames, key))
+
+    def samples(self) -> List[Tuple[str, Dict[str, str], float]]:
+        raise NotImplementedError
+
+
+class Counter(_Metric):
+    kind = "counter"
+
+    def __init__(self, name: str, help: str, labelnames: Sequence[str] = ()):
+        super().__init__(name, help, labelnames)
+        self._values: Dict[Tuple[str, ...], float] = {}
+
+    def inc(self, amount: float = 1, **labels):
+        key = self._key(labels)
+        self._values[key] = self._values.get(key, 0) + amount
+
+    def value(self, **labels) -> float:
+        return self._values.get(self._key(labels), 0)
+
+    def samples(self):
+        return [(self.name, self._labels(key), value) for key, value in self._values.items()]
+
+
+class Gauge(_Metric):
+    kind = "gauge"
+
+    def __init__(self, name: str, help: str, labelnames: Sequence[str] = ()):
+        super().__init__(name, help, labelnames)
+        self._values: Dict[Tuple[str, ...], float] = {}
+
+    def set(self, value: float, **labels):
+        self._values[self._key(labels)] = value
+
+    def inc(self, amount: float = 1, **labels):
+        key = self._key(labels)
+        self._values[key] = self._values.get(key, 0) + amount
+
+    def dec(self, amount: float = 1, **labels):
+        self.inc(-amount, **labels)
+
+    def value(self, **labels) -> float:
+        return self._values.get(self._key(labels), 0)
+
+    def samples(self):
+        return [(self.name, self._labels(key), value) for key, value in self._values.items()]
+
+
+class Histogram(_Metric):
+    kind = "histogram"
+
+    def __init__(self, name: str, help: str, labelnames: Sequence[str] = (), buckets: Sequence[float] = DEFAULT_BUCKETS):
+        super().__init__(name, help, labelnames)
+        self.buckets = tuple(sorted(buckets))
+        # key -> [per-bucket counts (+Inf last), sum, count]
+        self._values: Dict[Tuple[str, ...], list] = {}
+
+    def observe(self, value: float, **labels):
+        key = self._key(labels)
+        entry = self._values.get(key)
+        if entry is None:
+            entry = self._values[key] = [[0] * (len(self.buckets) + 1), 0.0, 0]
+        # `le` buckets are inclusive upper bounds
+        entry[0][bisect_left(self.buckets, value)] += 1
+        entry[1] += value
+        entry[2] += 1
+
+    def count(self, **labels) -> int:
+        entry = self._values.get(self._key(labels))
+        return entry[2] if entry else 0
+
+    def samples(self):
+        rows = []
+        for key, (counts, total, count) in self._values.items():
+            labels = self._labels(key)
+            cumulative = 0
+            for bound, bucket_count in zip(self.buckets + (math.inf,), counts):
+                cumulative += bucket_count
+                rows.append((f"{self.name}_bucket", {**labels, "le": _format_value(bound)}, cumulative))
+            rows.append((f"{self.name}_sum", labels, total))
+            rows.append((f"{self.name}_count", labels, count))
+        return rows
+
+
+class MetricsRegistry:
+    """Owns the process's metrics and renders them for a scrape"""
+
+    def __init__(self):
+        self._metrics: Dict[str, _Metric] = {}
+        self._collectors: List[Callable[[], Iterable[Family]]] = []
+
+    def _register(self, metric: _Metric) -> _Metric:
+        if metric.name in self._metrics:
+            raise ValueError(f"Metric {metric.name} already registered")
+        self._metrics[metric.name] = metric
+        return metric
+
+    def counter(self, name: str, help: str, labelnames: Sequence[str] = ()) -> Counter:
+        return self._register(Counter(name, help, labelnames))
+
+    def gauge(self, name: str, help: str, labelnames: Sequence[str] = ()) -> Gauge:
+        return self._register(Gauge(name, help, labelnames))
+
+    def histogram(
+        self,
+        name: str,
+        help: str,
+        labelnames: Sequence[str] = (),
+        buckets: Sequence[float] = DEFAULT_BUCKETS
+    ) -> Histogram:
+        return self._register(Histogram(name, help, labelnames, buckets))
+
+    def register_collector(self, collector: Callable[[], Iterable[Family]]):
+        """`collector()` is called on every scrape and returns (name, type, help, samples) families"""
+        self._collectors.append(collector)
+
+    def render(self) -> str:
+        lines: List[str] = []
+
+        def family(name: str, kind: str, help: str, samples):
+            lines.append(f"# HELP {name} {_escape(help, quotes=False)}")
+            lines.append(f"# TYPE {name} {kind}")
+            for sample_name, labels, value in samples:
+                lines.append(f"{sample_name}{_format_labels(labels)} {_format_value(value)}")
+
+        for metric in self._metrics.values():
+            family(metric.name, metric.kind, metric.help, metric.samples())
+
+        for collector in self._collectors:
+            try:
+                families = list(collector())
+            except Exception as e:
+                # One broken collector shouldn't take the whole scrape down
+                logger.error(f"Metrics collector {getattr(collector, '__name__', collector)} failed: {str(e)}")
+                continue
+            for name, kind, help, samples in families:
+                family(name, kind, help, [(name, labels, value) for labels, value in samples])
+
+        return "\n".join(lines) + "\n"
+
+
+class EventLoopLagMonitor:
+    """
+    Sleeps `interval` seconds in a loop and records how late it wakes up.
+    Sustained lag means something is blocking the event loop (CPU-bound work,
+    sync I/O) and every in-flight request is waiting on it.
+    """
+
+    def __init__(self, histogram: Histogram, gauge: Gauge, interval: float = 0.5):
+        self.histogram = histogram
+        self.gauge = gauge
+        self.interval = interval
+        self._task: Optional[asyncio.Task] = None
+
+    def start(self):
+        if self._task and not self._task.done():
+            return
+        self._task = asyncio.create_task(self._run())
+
+    async def stop(self):
+        if self._task:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+
+    async def _run(self):
+        while True:
+            started = time.perf_counter()
+            await asyncio.sleep(self.interval)
+            lag = max(0.0, time.perf_counter() - started - self.interval)
+            self.histogram.observe(lag)
+            self.gauge.set(lag)
+
+
+def stats_collector(
+    prefix: str,
+    stats: Callable[[], Dict[str, Any]],
+    counters: Dict[str, str],
+    gauges: Optional[Dict[str, str]] = None
+) -> Callable[[], List[Family]]:
+    """
+    Collector exporting numeric fields of an existing `stats()` dict:
+    `counters`/`gauges` map stats keys to help text; counters get a `_total` suffix
+    (a `total` key becomes `{prefix}_total`).
+    """
+    gauges = gauges or {}
+
+    def collect() -> List[Family]:
+        values = stats()
+        families: List[Family] = []
+        for key, help in counters.items():
+            if values.get(key) is not None:
+                name = f"{prefix}_total" if key == "total" else f"{prefix}_{key}_total"
+                families.append((name, "counter", help, [({}, values[key])]))
+        for key, help in gauges.items():
+            if values.get(key) is not None:
+                families.append((f"{prefix}_{key}", "gauge", help, [({}, values[key])]))
+        return families
+
+    collect.__name__ = f"{prefix}_collector"
+    return collect
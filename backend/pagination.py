@@ -0,0 +1,69 @@
+"""
+Keyset (cursor) pagination helpers for Influiv
+Listings sorted newest-first by (created_at, id) can be walked with an opaque
+cursor instead of page numbers, so every page costs one index range scan no
+matter how deep the client scrolls
+"""
+
+import base64
+import json
+from typing import Any, Dict, List, Optional, Tuple
+
+from pymongo import DESCENDING
+
+# Sort used by every keyset listing; `id` breaks ties between equal timestamps
+KEYSET_SORT = [("created_at", DESCENDING), ("id", DESCENDING)]
+
+
+class InvalidCursor(ValueError):
+    pass
+
+
+def encode_cursor(doc: Dict[str, Any]) -> str:
+    """Opaque cursor pointing just past `doc` in KEYSET_SORT order"""
+    raw = json.dumps([doc["created_at"], doc["id"]], separators=(",", ":")).encode("utf-8")
+    return base64.urlsafe_b64encode(raw).decode("ascii").rstrip("=")
+
+
+def decode_cursor(cursor: str) -> Tuple[str, str]:
+    try:
+        raw = base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4))
+        created_at, doc_id = json.loads(raw)
+    except (ValueError, TypeError) as e:
+        raise InvalidCursor("Invalid cursor") from e
+    if not isinstance(created_at, str) or not isinstance(doc_id, str):
+        raise InvalidCursor("Invalid cursor")
+    return created_at, doc_id
+
+
+def keyset_query(query: Dict[str, Any], cursor: Optional[str]) -> Dict[str, Any]:
+    """`query` restricted to documents that sort after the cursor"""
+    if not cursor:
+        return query
+    created_at, doc_id = decode_cursor(cursor)
+    after = {"$or": [
+        {"created_at": {"$lt": created_at}},
+        {"created_at": created_at, "id": {"$lt": doc_id}}
+    ]}
+    return {"$and": [query, after]} if query else after
+
+
+async def keyset_page(
+    collection,
+    query: Dict[str, Any],
+    cursor: Optional[str],
+    limit: int,
+    projection: Optional[Dict[str, Any]] = None
+) -> Tuple[List[Dict[str, Any]], Optional[str]]:
+    """
+    One page of `collection` matching `query`, newest first.
+    Returns (docs, next_cursor); next_cursor is None on the last page.
+    Raises InvalidCursor for a malformed cursor.
+    """
+    projection = projection if projection is not None else {"_id": 0}
+    docs = await collection.find(keyset_query(query, cursor), projection).sort(KEYSET_SORT).limit(limit + 1).to_list(limit + 1)
+    # Fetching one extra row tells us whether another page exists without a count
+    if len(docs) > limit:
+        docs = docs[:limit]
+        return docs, encode_cursor(docs[-1])
+    return docs, None
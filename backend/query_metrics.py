@@ -0,0 +1,205 @@
+"""
+Per-request MongoDB query metrics for Influiv
+A pymongo CommandListener attributes every command to the request that issued
+it, recording count, total DB time and the slowest command, so N+1 patterns and
+slow queries show up in Server-Timing headers, logs and /admin/query-stats.
+Attribution goes through a ContextVar, which Motor copies into the executor
+threads where pymongo runs (and fires listener events).
+"""
+
+import threading
+from collections import Counter
+from contextvars import ContextVar, Token
+from typing import Any, Dict, List, Optional, Tuple
+from pymongo import monitoring
+import logging
+
+logger = logging.getLogger(__name__)
+
+# Handshake/auth/session housekeeping, not issued by handler code
+IGNORED_COMMANDS = frozenset({
+    "hello", "ismaster", "isMaster", "ping", "buildInfo", "buildinfo",
+    "saslStart", "saslContinue", "authenticate", "endSessions", "killCursors",
+})
+
+_current: ContextVar[Optional["RequestQueries"]] = ContextVar("request_queries", default=None)
+
+
+class RequestQueries:
+    """Commands issued while handling one request"""
+
+    def __init__(self):
+        self.count = 0
+        self.failed = 0
+        self.db_micros = 0
+        self.slowest: Optional[Tuple[str, int]] = None
+        self.by_command: Counter = Counter()
+        # (connection, request_id) -> "collection.command" for commands still running
+        self._inflight: Dict[Tuple[Any, int], str] = {}
+        # Listener callbacks run on Motor's executor threads
+        self._lock = threading.Lock()
+
+    def started(self, command_name: str, collection: str, operation_key: Tuple[Any, int]):
+        label = f"{collection}.{command_name}"
+        with self._lock:
+            self.count += 1
+            self.by_command[label] += 1
+            self._inflight[operation_key] = label
+
+    def finished(self, operation_key: Tuple[Any, int], duration_micros: int, failed: bool = False):
+        with self._lock:
+            label = self._inflight.pop(operation_key, None)
+            if label is None:
+                return
+            self.db_micros += duration_micros
+            if failed:
+                self.failed += 1
+            if self.slowest is None or duration_micros > self.slowest[1]:
+                self.slowest = (label, duration_micros)
+
+    @property
+    def db_ms(self) -> float:
+        return self.db_micros / 1000
+
+    def top(self, n: int = 5) -> Dict[str, int]:
+        with self._lock:
+            return dict(self.by_command.most_common(n))
+
+    def server_timing(self, total_ms: Optional[float] = None) -> str:
+        """Server-Timing header value (shown in browser devtools)"""
+        parts = [f'db;dur={self.db_ms:.1f};desc="{self.count} queries"']
+        if self.slowest:
+            parts.append(f'db-slowest;dur={self.slowest[1] / 1000:.1f};desc="{self.slowest[0]}"')
+        if total_ms is not None:
+            parts.append(f"app;dur={total_ms:.1f}")
+        return ", ".join(parts)
+
+    def summary(self) -> Dict[str, Any]:
+        return {
+            "db_queries": self.count,
+            "db_failed": self.failed,
+            "db_ms": round(self.db_ms, 2),
+            "db_slowest": self.slowest[0] if self.slowest else None,
+            "db_slowest_ms": round(self.slowest[1] / 1000, 2) if self.slowest else None,
+            "db_top": self.top(3),
+        }
+
+
+def begin_request() -> Token:
+    """Start recording for the current context; pass the token to end_request"""
+    return _current.set(RequestQueries())
+
+
+def end_request(token: Token):
+    _current.reset(token)
+
+
+def current_queries() -> Optional[RequestQueries]:
+    return _current.get()
+
+
+def _collection_of(event) -> str:
+    target = event.command.get(event.command_name)
+    if isinstance(target, str):
+        return target
+    # getMore carries the cursor id under the command name and the collection separately
+    return str(event.command.get("collection", ""))
+
+
+def _operation_key(event) -> Tuple[Any, int]:
+    return (event.connection_id, event.request_id)
+
+
+class QueryCounter(monitoring.CommandListener):
+    """Records started/finished commands against the active request, if any"""
+
+    def __init__(self):
+        self.total = 0
+        self.outside_requests = 0
+        self._lock = threading.Lock()
+
+    def started(self, event):
+        if event.command_name in IGNORED_COMMANDS:
+            return
+        with self._lock:
+            self.total += 1
+        queries = _current.get()
+        if queries is None:
+            with self._lock:
+                self.outside_requests += 1
+            return
+        queries.started(event.command_name, _collection_of(event), _operation_key(event))
+
+    def succeeded(self, event):
+        queries = _current.get()
+        if queries is not None:
+            queries.finished(_operation_key(event), event.duration_micros)
+
+    def failed(self, event):
+        queries = _current.get()
+        if queries is not None:
+            queries.finished(_operation_key(event), event.duration_micros, failed=True)
+
+    def stats(self) -> Dict[str, Any]:
+        return {"total": self.total, "outside_requests": self.outside_requests}
+
+
+class QueryBudget:
+    """Per-request limits on query count and DB time; 0 disables a limit"""
+
+    def __init__(self, max_queries: int = 50, max_db_ms: float = 0):
+        self.max_queries = max_queries
+        self.max_db_ms = max_db_ms
+
+    def exceeded(self, queries: RequestQueries) -> List[str]:
+        """Names of the limits this request went over"""
+        over = []
+        if self.max_queries and queries.count > self.max_queries:
+            over.append("queries")
+        if self.max_db_ms and queries.db_ms > self.max_db_ms:
+            over.append("db_ms")
+        return over
+
+
+class RouteQueryStats:
+    """Process-wide query totals per route, to spot handlers that regress"""
+
+    def __init__(self, max_routes: int = 500):
+        self.max_routes = max_routes
+        self._routes: Dict[str, Dict[str, Any]] = {}
+
+    def record(self, route: str, queries: RequestQueries, over_budget: bool):
+        entry = self._routes.get(route)
+        if entry is None:
+            if len(self._routes) >= self.max_routes:
+                return
+            entry = self._routes[route] = {
+                "requests": 0, "queries": 0, "db_ms": 0.0, "max_queries": 0, "max_db_ms": 0.0, "over_budget": 0
+            }
+        entry["requests"] += 1
+        entry["queries"] += queries.count
+        entry["db_ms"] += queries.db_ms
+        entry["max_queries"] = max(entry["max_queries"], queries.count)
+        entry["max_db_ms"] = max(entry["max_db_ms"], queries.db_ms)
+        if over_budget:
+            entry["over_budget"] += 1
+
+    def stats(self, limit: int = 50) -> List[Dict[str, Any]]:
+        """Routes ordered by average queries per request"""
+        rows = [
+            {
+                "route": route,
+                "requests": entry["requests"],
+                "avg_queries": round(entry["queries"] / entry["requests"], 2),
+                "avg_db_ms": round(entry["db_ms"] / entry["requests"], 2),
+                "max_queries": entry["max_queries"],
+                "max_db_ms": round(entry["max_db_ms"], 2),
+                "over_budget": entry["over_budget"],
+            }
+            for route, entry in self._routes.items()
+        ]
+        rows.sort(key=lambda row: row["avg_queries"], reverse=True)
+        return rows[:limit]
+
+    def reset(self):
+        self._routes.clear()
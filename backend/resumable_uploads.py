@@ -0,0 +1,406 @@
+"""
+Resumable chunked uploads for Influiv
+Large files (portfolio videos) are sent as a session: create it with the total
+size, PUT each chunk at its byte offset along with the chunk's SHA-256, then
+complete it. A dropped connection only costs the chunk in flight - the client
+asks for the current offset and carries on. Session state and partial data
+live under uploads/.resumable/ so they survive restarts; the whole-file hash
+is carried forward chunk by chunk, so completing moves the data into the blob
+store without reading it again.
+"""
+
+import asyncio
+import hashlib
+import json
+import os
+import re
+import shutil
+import uuid
+from datetime import datetime, timezone, timedelta
+from pathlib import Path
+from typing import Any, AsyncIterator, Dict, Optional, Tuple
+import aiofiles
+import logging
+
+from upload_storage import UploadTooLarge, PARTIAL_SUFFIX, UPLOAD_CHUNK_SIZE
+
+logger = logging.getLogger(__name__)
+
+RESUMABLE_DIR_NAME = ".resumable"
+DEFAULT_CHUNK_SIZE = 8 * 1024 * 1024
+# Sessions untouched for this long are removed along with their data
+DEFAULT_SESSION_TTL = timedelta(hours=24)
+EXPIRE_INTERVAL_SECONDS = 3600
+
+UPLOAD_ID_PATTERN = re.compile(r"[0-9a-f]{32}")
+SHA256_PATTERN = re.compile(r"[0-9a-f]{64}")
+
+
+class ResumableUploadError(Exception):
+    """A request the session can't accept; `status_code` is the HTTP status to answer with"""
+    status_code = 400
+
+
+class UploadSessionNotFound(ResumableUploadError):
+    status_code = 404
+
+    def __init__(self):
+        super().__init__("Upload not found or expired")
+
+
+class OffsetMismatch(ResumableUploadError):
+    """The chunk doesn't start where the stored data ends; `offset` is where it does"""
+    status_code = 409
+
+    def __init__(self, offset: int):
+        super().__init__(f"Upload is at offset {offset}")
+        self.offset = offset
+
+
+class ChecksumMismatch(ResumableUploadError):
+    status_code = 422
+
+
+class ChunkTooLarge(ResumableUploadError):
+    status_code = 413
+
+
+class UploadIncomplete(ResumableUploadError):
+    status_code = 409
+
+
+class InsufficientStorage(ResumableUploadError):
+    status_code = 507
+
+    def __init__(self):
+        super().__init__("Not enough disk space for this upload")
+
+
+def _now() -> datetime:
+    return datetime.now(timezone.utc)
+
+
+def _hash_prefix(path: Path, length: int):
+    """SHA-256 state over the first `length` bytes of `path`"""
+    digest = hashlib.sha256()
+    remaining = length
+    with open(path, 'rb') as f:
+        while remaining > 0:
+            chunk = f.read(min(UPLOAD_CHUNK_SIZE, remaining))
+            if not chunk:
+                break
+            digest.update(chunk)
+            remaining -= len(chunk)
+    return digest
+
+
+class ResumableUploads:
+    """
+    Upload sessions stored as `<id>.json` (state) and `<id>.part` (data received so far).
+    Chunks for one session are serialized per process; the running file hash is
+    kept in memory and rebuilt from the data on disk after a restart (or when
+    another worker took the previous chunk).
+    """
+
+    def __init__(
+        self,
+        uploads_dir: Path,
+        blob_store,
+        max_bytes: int,
+        chunk_size: int = DEFAULT_CHUNK_SIZE,
+        ttl: timedelta = DEFAULT_SESSION_TTL
+    ):
+        self.directory = uploads_dir / RESUMABLE_DIR_NAME
+        self.blob_store = blob_store
+        self.max_bytes = max_bytes
+        self.chunk_size = chunk_size
+        self.ttl = ttl
+        self._hashers: Dict[str, Tuple[int, Any]] = {}
+        self._locks: Dict[str, asyncio.Lock] = {}
+        self._task: Optional[asyncio.Task] = None
+
+        # Metrics
+        self.created = 0
+        self.completed = 0
+        self.aborted = 0
+        self.expired = 0
+        self.chunks = 0
+        self.chunk_bytes = 0
+        self.checksum_failures = 0
+        self.rehashed = 0
+
+    def _state_path(self, upload_id: str) -> Path:
+        return self.directory / f"{upload_id}.json"
+
+    def _data_path(self, upload_id: str) -> Path:
+        return self.directory / f"{upload_id}{PARTIAL_SUFFIX}"
+
+    def _lock(self, upload_id: str) -> asyncio.Lock:
+        return self._locks.setdefault(upload_id, asyncio.Lock())
+
+    def _session_lock(self, upload_id: str, user_id: str) -> asyncio.Lock:
+        """
+        Lock for an existing session of `user_id`. Unknown or foreign ids raise
+        before a lock is created, so bogus requests can't fill `_locks`; callers
+        load the state again once they hold the lock.
+        """
+        self._load(upload_id, user_id)
+        return self._lock(upload_id)
+
+    def _load(self, upload_id: str, user_id: str) -> Dict[str, Any]:
+        if not UPLOAD_ID_PATTERN.fullmatch(upload_id):
+            raise UploadSessionNotFound()
+        try:
+            state = json.loads(self._state_path(upload_id).read_text())
+        except (FileNotFoundError, ValueError):
+            raise UploadSessionNotFound()
+        # Other users' sessions don't exist as far as the caller is concerned
+        if state["user_id"] != user_id:
+            raise UploadSessionNotFound()
+        return state
+
+    def _save(self, state: Dict[str, Any]):
+        path = self._state_path(state["id"])
+        temp = path.with_name(f".{path.name}.tmp")
+        temp.write_text(json.dumps(state))
+        os.replace(temp, path)
+
+    def _remove(self, upload_id: str):
+        self._state_path(upload_id).unlink(missing_ok=True)
+        self._data_path(upload_id).unlink(missing_ok=True)
+        self._hashers.pop(upload_id, None)
+        self._locks.pop(upload_id, None)
+
+    def describe(self, state: Dict[str, Any]) -> Dict[str, Any]:
+        """Session fields returned to the client"""
+        updated_at = datetime.fromisoformat(state["updated_at"])
+        return {
+            "upload_id": state["id"],
+            "filename": state["filename"],
+            "size": state["size"],
+            "offset": state["offset"],
+            "chunk_size": self.chunk_size,
+            "expires_at": (updated_at + self.ttl).isoformat()
+        }
+
+    async def create(self, user_id: str, filename: str, size: int, sha256: Optional[str] = None) -> Dict[str, Any]:
+        """
+        Start a session for a `size`-byte file. `sha256`, when given, is checked
+        against the assembled file on completion.
+        """
+        if size > self.max_bytes:
+            raise UploadTooLarge(self.max_bytes)
+        self.directory.mkdir(parents=True, exist_ok=True)
+        if shutil.disk_usage(self.directory).free < size:
+            raise InsufficientStorage()
+
+        now = _now().isoformat()
+        state = {
+            "id": uuid.uuid4().hex,
+            "user_id": user_id,
+            "filename": filename,
+            "extension": Path(filename).suffix.lower(),
+            "size": size,
+            "sha256": sha256,
+            "offset": 0,
+            "created_at": now,
+            "updated_at": now
+        }
+        self._data_path(state["id"]).touch()
+        self._save(state)
+        self.created += 1
+        return state
+
+    async def status(self, upload_id: str, user_id: str) -> Dict[str, Any]:
+        return self._load(upload_id, user_id)
+
+    async def _file_hasher(self, state: Dict[str, Any]):
+        cached = self._hashers.get(state["id"])
+        if cached is not None and cached[0] == state["offset"]:
+            return cached[1]
+        if state["offset"] == 0:
+            return hashlib.sha256()
+        # Restarted, or the previous chunk went to another worker
+        self.rehashed += 1
+        return await asyncio.to_thread(_hash_prefix, self._data_path(state["id"]), state["offset"])
+
+    async def write_chunk(
+        self,
+        upload_id: str,
+        user_id: str,
+        offset: int,
+        chunk_sha256: str,
+        body: AsyncIterator[bytes]
+    ) -> Dict[str, Any]:
+        """
+        Append a chunk streamed from `body` at `offset`, which must be the current
+        end of the data. The chunk is only kept if it hashes to `chunk_sha256`;
+        otherwise (or if the client disconnects) the data is cut back to `offset`.
+        """
+        async with self._session_lock(upload_id, user_id):
+            state = self._load(upload_id, user_id)
+            if offset != state["offset"]:
+                raise OffsetMismatch(state["offset"])
+            limit = min(self.chunk_size, state["size"] - offset)
+
+            file_digest = (await self._file_hasher(state)).copy()
+            chunk_digest = hashlib.sha256()
+            written = 0
+            data_path = self._data_path(upload_id)
+            async with aiofiles.open(data_path, 'r+b') as f:
+                try:
+                    # Drop anything past the offset from a chunk that died mid-write
+                    await f.truncate(offset)
+                    await f.seek(offset)
+                    async for piece in body:
+                        written += len(piece)
+                        if written > limit:
+                            raise ChunkTooLarge(
+                                f"Chunk exceeds {limit} bytes (chunk size {self.chunk_size}, {state['size'] - offset} bytes left)"
+                            )
+                        chunk_digest.update(piece)
+                        file_digest.update(piece)
+                        await f.write(piece)
+                    if written == 0:
+                        raise ResumableUploadError("Empty chunk")
+                    if chunk_digest.hexdigest() != chunk_sha256:
+                        self.checksum_failures += 1
+                        raise ChecksumMismatch("Chunk checksum mismatch")
+                    await f.flush()
+                    # Data must be durable before the state claims it
+                    await asyncio.to_thread(os.fsync, f.fileno())
+                except BaseException:
+                    await f.truncate(offset)
+                    raise
+
+            state["offset"] = offset + written
+            state["updated_at"] = _now().isoformat()
+            self._save(state)
+            self._hashers[upload_id] = (state["offset"], file_digest)
+            self.chunks += 1
+            self.chunk_bytes += written
+            return state
+
+    async def complete(self, upload_id: str, user_id: str):
+        """
+        Publish a fully received session through the blob store under a new
+        "<uuid4><ext>" filename. Returns (state, StoredUpload).
+        """
+        async with self._session_lock(upload_id, user_id):
+            state = self._load(upload_id, user_id)
+            if state["offset"] != state["size"]:
+                raise UploadIncomplete(f"Upload has {state['offset']} of {state['size']} bytes")
+            sha256 = (await self._file_hasher(state)).hexdigest()
+            if state["sha256"] and state["sha256"] != sha256:
+                # Every chunk matched, so the client's whole-file hash was wrong; nothing to resume
+                self.checksum_failures += 1
+                self._remove(upload_id)
+                raise ChecksumMismatch("File checksum mismatch")
+
+            filename = f"{uuid.uuid4()}{state['extension']}"
+            stored = await self.blob_store.store_staged(
+                self._data_path(upload_id), sha256, state["size"], filename, uploaded_by=user_id
+            )
+            self._remove(upload_id)
+            self.completed += 1
+            return state, stored
+
+    async def abort(self, upload_id: str, user_id: str):
+        async with self._session_lock(upload_id, user_id):
+            self._load(upload_id, user_id)
+            self._remove(upload_id)
+            self.aborted += 1
+
+    def _is_stale(self, upload_id: str, cutoff: datetime) -> bool:
+        path = self._state_path(upload_id)
+        try:
+            state = json.loads(path.read_text())
+            return datetime.fromisoformat(state["updated_at"]) < cutoff
+        except FileNotFoundError:
+            return False
+        except (ValueError, KeyError):
+            logger.warning(f"Removing unreadable upload session {path.name}")
+            return True
+
+    def _remove_orphaned_data(self, cutoff: datetime) -> int:
+        """Data files whose state was never saved (crash inside create), once older than the TTL"""
+        removed = 0
+        for path in self.directory.glob(f"*{PARTIAL_SUFFIX}"):
+            upload_id = path.name[:-len(PARTIAL_SUFFIX)]
+            if not UPLOAD_ID_PATTERN.fullmatch(upload_id) or self._state_path(upload_id).exists():
+                continue
+            try:
+                if datetime.fromtimestamp(path.stat().st_mtime, timezone.utc) >= cutoff:
+                    continue
+                path.unlink()
+            except FileNotFoundError:
+                continue
+            removed += 1
+        if removed:
+            logger.info(f"Removed {removed} resumable upload data files without a session")
+        return removed
+
+    async def expire(self) -> int:
+        """Remove sessions idle for longer than the TTL; returns how many"""
+        if not self.directory.is_dir():
+            return 0
+        cutoff = _now() - self.ttl
+        self._remove_orphaned_data(cutoff)
+        removed = 0
+        for path in list(self.directory.glob("*.json")):
+            upload_id = path.stem
+            lock = self._locks.get(upload_id)
+            # A chunk is being written, so the session is in use
+            if lock is not None and lock.locked():
+                continue
+            # Checked under the lock so a chunk can't land between the check and the removal
+            async with self._lock(upload_id):
+                if self._is_stale(upload_id, cutoff):
+                    self._remove(upload_id)
+                    removed += 1
+                elif lock is None:
+                    # Only created for this check; chunk requests create their own
+                    self._locks.pop(upload_id, None)
+        self.expired += removed
+        if removed:
+            logger.info(f"Expired {removed} resumable upload sessions")
+        return removed
+
+    def start(self):
+        """Start the background expiry loop (call from the app startup event)"""
+        if self._task and not self._task.done():
+            return
+        self._task = asyncio.create_task(self._run())
+
+    async def stop(self):
+        if self._task:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+
+    async def _run(self):
+        while True:
+            try:
+                await self.expire()
+            except Exception as e:
+                logger.error(f"Expiring resumable uploads failed: {str(e)}")
+            await asyncio.sleep(EXPIRE_INTERVAL_SECONDS)
+
+    def stats(self) -> Dict[str, Any]:
+        active = sum(1 for _ in self.directory.glob("*.json")) if self.directory.is_dir() else 0
+        return {
+            "active": active,
+            "created": self.created,
+            "completed": self.completed,
+            "aborted": self.aborted,
+            "expired": self.expired,
+            "chunks": self.chunks,
+            "chunk_bytes": self.chunk_bytes,
+            "checksum_failures": self.checksum_failures,
+            "rehashed": self.rehashed,
+            "chunk_size": self.chunk_size,
+            "max_bytes": self.max_bytes
+        }
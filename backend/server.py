@@ -1,5 +1,5 @@
-from fastapi import FastAPI, APIRouter, HTTPException, Depends, Response, Request, status, Query, UploadFile, File
-from fastapi.responses import RedirectResponse, StreamingResponse, FileResponse
+from fastapi import FastAPI, APIRouter, HTTPException, Depends, Response, Request, status, Query, UploadFile, File, Header
+from fastapi.responses import RedirectResponse, StreamingResponse
 from fastapi.staticfiles import StaticFiles
 from starlette.middleware.cors import CORSMiddleware
 from motor.motor_asyncio import AsyncIOMotorClient
@@ -14,30 +14,237 @@ import os
 import logging
 import uuid
 import hashlib
-import io
-import csv
 from enum import Enum
 import re
 import aiofiles
 import asyncio
+import json
+import time
+import hmac
 
 ROOT_DIR = Path(__file__).parent
 load_dotenv(ROOT_DIR / '.env')
 
-# MongoDB connection
+# MongoDB connection, with per-request query metrics
+from query_metrics import QueryCounter, QueryBudget, RouteQueryStats, begin_request, end_request, current_queries
+query_counter = QueryCounter()
 mongo_url = os.environ['MONGO_URL']
-client = AsyncIOMotorClient(mongo_url)
+client = AsyncIOMotorClient(mongo_url, event_listeners=[query_counter])
 db = client[os.environ['DB_NAME']]
+query_budget = QueryBudget(
+    max_queries=int(os.environ.get('QUERY_BUDGET_COUNT', '50')),
+    max_db_ms=float(os.environ.get('QUERY_BUDGET_DB_MS', '0'))
+)
+route_query_stats = RouteQueryStats()
+# "budget" logs only requests over budget, "all" logs every API request, "off" disables the log lines
+REQUEST_METRICS_LOG = os.environ.get('REQUEST_METRICS_LOG', 'budget')
+
+# Request-scoped batching loader for per-row lookups
+from dataloader import DataLoader
 
 # Import email service
-from email_service import EmailService
-email_service = EmailService(db)
+from email_service import EmailService, email_renderer
+email_service = EmailService(
+    db,
+    max_connections=int(os.environ.get('SMTP_POOL_MAX_CONNECTIONS', '4')),
+    settings_ttl=float(os.environ.get('EMAIL_SETTINGS_CACHE_TTL_SECONDS', '60'))
+)
+
+# Durable email outbox - send_* calls enqueue, a worker delivers
+from email_outbox import EmailOutbox, OutboxStatus
+email_outbox = EmailOutbox(
+    db,
+    email_service,
+    batch_size=int(os.environ.get('EMAIL_OUTBOX_BATCH_SIZE', '20')),
+    poll_interval=float(os.environ.get('EMAIL_OUTBOX_POLL_SECONDS', '2.0')),
+    max_attempts=int(os.environ.get('EMAIL_OUTBOX_MAX_ATTEMPTS', '6')),
+    retention=timedelta(days=float(os.environ.get('EMAIL_OUTBOX_RETENTION_DAYS', '7')))
+)
+email_service.outbox = email_outbox
+EMAIL_OUTBOX_IN_PROCESS = os.environ.get('EMAIL_OUTBOX_IN_PROCESS', 'true').lower() == 'true'
+
+# Import index registry
+from db_indexes import ensure_indexes, index_report
+
+# Import keyset pagination helpers
+from pagination import keyset_page, InvalidCursor
+
+# Import streaming CSV export helpers
+from csv_export import csv_streaming_response, CSV_CURSOR_BATCH_SIZE
+
+# Import write-behind click ingestion
+from click_ingest import ClickIngestor
+click_ingestor = ClickIngestor(
+    db.amazon_click_logs,
+    max_queue_size=int(os.environ.get('CLICK_QUEUE_MAX_SIZE', '10000')),
+    batch_size=int(os.environ.get('CLICK_FLUSH_BATCH_SIZE', '500')),
+    flush_interval=float(os.environ.get('CLICK_FLUSH_INTERVAL_SECONDS', '1.0'))
+)
+
+# Redirect token -> {"assignment_id", "campaign_id", "url"} cache
+from cache import TTLCache
+redirect_cache = TTLCache(
+    maxsize=int(os.environ.get('REDIRECT_CACHE_MAX_SIZE', '50000')),
+    ttl=float(os.environ.get('REDIRECT_CACHE_TTL_SECONDS', '600'))
+)
+
+# User id -> {"user", "brand_id", "influencer_id"} cache for authentication
+principal_cache = TTLCache(
+    maxsize=int(os.environ.get('PRINCIPAL_CACHE_MAX_SIZE', '10000')),
+    ttl=float(os.environ.get('PRINCIPAL_CACHE_TTL_SECONDS', '30'))
+)
+
+# Materialized per-brand/per-influencer counters, bumped at the write points below
+from stats_rollups import StatsRollups, RollupScope
+stats_rollups = StatsRollups(db)
+
+# Background-refreshed /admin/dashboard counters
+from dashboard_stats import DashboardStats
+dashboard_stats = DashboardStats(
+    db,
+    refresh_interval=float(os.environ.get('DASHBOARD_REFRESH_SECONDS', '60'))
+)
+
+# Chunked upload writer and request body limit
+from upload_storage import remove_partial_uploads, BodySizeLimit, UploadTooLarge
+UPLOADS_DIR = Path("/app/backend/uploads")
+MAX_UPLOAD_BYTES = int(os.environ.get('MAX_UPLOAD_MB', '50')) * 1024 * 1024
+# Multipart framing and form fields on top of the file itself
+UPLOAD_BODY_OVERHEAD_BYTES = 1024 * 1024
+
+# Content-addressed upload storage (identical files share one blob on disk)
+from upload_blobs import UploadBlobStore, BLOB_DIR_NAME, UPLOAD_FILENAME_PATTERN
+upload_blobs = UploadBlobStore(db, UPLOADS_DIR)
+
+# Resumable chunked uploads for large files (create -> PUT chunks -> complete)
+from resumable_uploads import ResumableUploads, ResumableUploadError, OffsetMismatch, SHA256_PATTERN
+RESUMABLE_CHUNK_BYTES = int(os.environ.get('RESUMABLE_CHUNK_MB', '8')) * 1024 * 1024
+resumable_uploads = ResumableUploads(
+    UPLOADS_DIR,
+    upload_blobs,
+    max_bytes=int(os.environ.get('MAX_RESUMABLE_UPLOAD_MB', '2048')) * 1024 * 1024,
+    chunk_size=RESUMABLE_CHUNK_BYTES,
+    ttl=timedelta(hours=float(os.environ.get('RESUMABLE_UPLOAD_TTL_HOURS', '24')))
+)
+
+# /files/{filename} with ETag/304 and Range/206 support
+from file_serving import file_response
+FILE_CACHE_CONTROL_IMMUTABLE = "public, max-age=31536000, immutable"
+# Filename -> content hash ("" when not indexed); uploads never change, so entries only expire to bound memory
+upload_hash_cache = TTLCache(
+    maxsize=int(os.environ.get('UPLOAD_HASH_CACHE_MAX_SIZE', '10000')),
+    ttl=86400
+)
+
+# Downscaled WebP copies of uploaded images, served via /files/{filename}?w=
+from image_variants import ImageVariantPipeline, is_image
+image_variants = ImageVariantPipeline(
+    db,
+    upload_blobs,
+    widths=[int(w) for w in os.environ.get('IMAGE_VARIANT_WIDTHS', '160,480,1280').split(',')],
+    max_workers=int(os.environ.get('IMAGE_VARIANT_WORKERS', '2')),
+    max_pending=int(os.environ.get('IMAGE_VARIANT_MAX_PENDING', '200'))
+)
+
+# Prometheus metrics, served at GET /metrics
+from metrics import MetricsRegistry, EventLoopLagMonitor, stats_collector, CONTENT_TYPE as METRICS_CONTENT_TYPE
+metrics = MetricsRegistry()
+http_requests_in_flight = metrics.gauge(
+    "influiv_http_requests_in_flight", "HTTP requests currently being handled", ["method"]
+)
+http_request_duration = metrics.histogram(
+    "influiv_http_request_duration_seconds", "HTTP request latency by route template", ["method", "route", "status"]
+)
+upload_bytes = metrics.counter("influiv_upload_bytes_total", "Bytes received by /upload")
+upload_deduplicated_bytes = metrics.counter(
+    "influiv_upload_deduplicated_bytes_total", "Uploaded bytes not written because the content was already stored"
+)
+uploads = metrics.counter("influiv_uploads_total", "/upload requests by outcome", ["outcome"])
+event_loop_lag = EventLoopLagMonitor(
+    metrics.histogram(
+        "influiv_event_loop_lag_seconds", "How late the event loop ran a timer",
+        buckets=(0.001, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5)
+    ),
+    metrics.gauge("influiv_event_loop_lag_last_seconds", "Most recent event loop lag sample"),
+    interval=float(os.environ.get('EVENT_LOOP_LAG_INTERVAL_SECONDS', '0.5'))
+)
+# METRICS_TOKEN, when set, must be sent as a bearer token by the scraper
+METRICS_TOKEN = os.environ.get('METRICS_TOKEN', '')
+metrics.register_collector(stats_collector(
+    "influiv_redirect_clicks", click_ingestor.stats,
+    counters={
+        "enqueued": "Redirect clicks queued for writing",
+        "inserted": "Redirect clicks written to MongoDB",
+        "dropped": "Redirect clicks dropped because the queue was full",
+        "failed": "Redirect clicks lost to write errors",
+        "batches": "Click flushes"
+    },
+    gauges={"queue_depth": "Clicks waiting to be written"}
+))
+metrics.register_collector(stats_collector(
+    "influiv_mongo_commands", query_counter.stats,
+    counters={
+        "total": "MongoDB commands issued",
+        "outside_requests": "MongoDB commands issued by background tasks"
+    }
+))
+metrics.register_collector(stats_collector(
+    "influiv_resumable_uploads", resumable_uploads.stats,
+    counters={
+        "created": "Resumable upload sessions started",
+        "completed": "Resumable upload sessions published",
+        "expired": "Resumable upload sessions removed after going idle",
+        "chunks": "Chunks accepted",
+        "chunk_bytes": "Bytes accepted in chunks",
+        "checksum_failures": "Chunks or files rejected for a checksum mismatch"
+    },
+    gauges={"active": "Resumable upload sessions in progress"}
+))
+metrics.register_collector(stats_collector(
+    "influiv_image_variants", image_variants.stats,
+    counters={
+        "rendered": "Images resized into WebP variants",
+        "skipped": "Image uploads whose content already had variants",
+        "dropped": "Image uploads not resized because the queue was full",
+        "failed": "Image variant renders that raised"
+    },
+    gauges={"pending": "Images waiting for or being resized"}
+))
+
+def _email_metrics():
+    # Deliveries are counted by the process that sends them: with EMAIL_OUTBOX_IN_PROCESS off,
+    # `python -m email_outbox` does the sending and these counters stay at 0 here
+    stats = email_service.delivery_stats()
+    return [
+        (
+            "influiv_email_outbox_in_process", "gauge",
+            "1 if this process runs the email outbox worker; email counters only cover this process",
+            [({}, 1 if EMAIL_OUTBOX_IN_PROCESS else 0)]
+        ),
+        (
+            "influiv_emails_sent_total", "counter",
+            "Emails accepted by the SMTP server (sent from this process only)", [({}, stats["delivered"])]
+        ),
+        (
+            "influiv_email_failures_total", "counter",
+            "Email deliveries that raised, by exception type (sent from this process only)",
+            [({"error": error}, count) for error, count in stats["failed"].items()]
+        )
+    ]
+
+metrics.register_collector(_email_metrics)
 
 # Get app URL for email links
 APP_URL = os.environ.get('APP_URL', 'https://influ-pages.preview.emergentagent.com')
 
 # Security
 pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto")
+from password_hasher import PasswordHasher, PasswordHasherBusy
+password_hasher = PasswordHasher(
+    pwd_context,
+    max_workers=int(os.environ.get('PASSWORD_HASH_WORKERS', '4')),
+    max_pending=int(os.environ.get('PASSWORD_HASH_MAX_PENDING', '100'))
+)
 SECRET_KEY = os.environ.get('JWT_SECRET', 'your-secret-key-change-in-production')
 ALGORITHM = "HS256"
 ACCESS_TOKEN_EXPIRE_MINUTES = 60 * 24 * 7  # 7 days
@@ -259,14 +466,6 @@ class PurchaseProof(BaseModel):
     created_at: datetime = Field(default_factory=lambda: datetime.now(timezone.utc))
     updated_at: datetime = Field(default_factory=lambda: datetime.now(timezone.utc))
 
-class ClickLog(BaseModel):
-    model_config = ConfigDict(extra="ignore")
-    id: str = Field(default_factory=lambda: str(uuid.uuid4()))
-    assignment_id: str
-    ip_hash: str
-    user_agent: Optional[str] = None
-    clicked_at: datetime = Field(default_factory=lambda: datetime.now(timezone.utc))
-
 class Payout(BaseModel):
     model_config = ConfigDict(extra="ignore")
     id: str = Field(default_factory=lambda: str(uuid.uuid4()))
@@ -313,6 +512,11 @@ class Transaction(BaseModel):
     transaction_date: datetime = Field(default_factory=lambda: datetime.now(timezone.utc))
     created_at: datetime = Field(default_factory=lambda: datetime.now(timezone.utc))
 
+class ResumableUploadCreate(BaseModel):
+    filename: str = Field(..., min_length=1, max_length=255)
+    size: int = Field(..., gt=0)
+    sha256: Optional[str] = Field(None, pattern=SHA256_PATTERN.pattern)  # of the whole file, checked on completion
+
 
 # Create app
 app = FastAPI()
@@ -350,6 +554,9 @@ async def startup_event():
                 pass
             
             logger.info(f"✓ Uploads directory ready: {dir_path.absolute()}")
+            remove_partial_uploads(dir_path)
+            if (dir_path / BLOB_DIR_NAME).is_dir():
+                remove_partial_uploads(dir_path / BLOB_DIR_NAME)
             uploads_ready = True
             break
             
@@ -361,14 +568,48 @@ async def startup_event():
         logger.error("❌ CRITICAL: No writable uploads directory found! File uploads will fail.")
         logger.error("Please ensure /app/backend/uploads directory exists with write permissions.")
     
+    # Ensure MongoDB indexes exist (idempotent)
+    try:
+        await ensure_indexes(db)
+    except Exception as e:
+        logger.error(f"Index bootstrap failed: {str(e)}")
+    
+    # Build stats rollups on first deploy without holding up startup
+    asyncio.create_task(stats_rollups.ensure_built())
+    
+    # Start background click writer
+    click_ingestor.start()
+    
+    # Start dashboard counter refresher
+    dashboard_stats.start()
+    
+    # Start event loop lag sampling for /metrics
+    event_loop_lag.start()
+    
+    # Start image variant worker pool
+    image_variants.start()
+    
+    # Start expiry of abandoned resumable uploads
+    resumable_uploads.start()
+    
+    # Start email outbox worker (disable to run `python -m email_outbox` separately)
+    if EMAIL_OUTBOX_IN_PROCESS:
+        email_outbox.start()
+    
     logger.info("Application startup complete")
 
 # Helper functions
-def hash_password(password: str) -> str:
-    return pwd_context.hash(password)
+async def hash_password(password: str) -> str:
+    try:
+        return await password_hasher.hash(password)
+    except PasswordHasherBusy:
+        raise HTTPException(status_code=503, detail="Server busy, please try again")
 
-def verify_password(plain_password: str, hashed_password: str) -> bool:
-    return pwd_context.verify(plain_password, hashed_password)
+async def verify_password(plain_password: str, hashed_password: str) -> bool:
+    try:
+        return await password_hasher.verify(plain_password, hashed_password)
+    except PasswordHasherBusy:
+        raise HTTPException(status_code=503, detail="Server busy, please try again")
 
 def validate_password_strength(password: str) -> tuple[bool, str]:
     """
@@ -401,7 +642,42 @@ def create_access_token(data: dict):
 def hash_ip(ip: str) -> str:
     return hashlib.sha256(f"{ip}{IP_HASH_SALT}".encode()).hexdigest()
 
-async def get_current_user(request: Request):
+def invalidate_redirect_cache(campaign_id: Optional[str] = None, assignment_id: Optional[str] = None):
+    """Drop cached redirect targets. Call whenever a campaign or assignment changes its Amazon URL or token."""
+    if campaign_id:
+        redirect_cache.invalidate_where(lambda token, entry: entry["campaign_id"] == campaign_id)
+    if assignment_id:
+        redirect_cache.invalidate_where(lambda token, entry: entry["assignment_id"] == assignment_id)
+
+def invalidate_principal(user_id: str):
+    """Drop a cached principal. Call whenever a user's role, status or deletion changes."""
+    principal_cache.invalidate(user_id)
+
+async def load_principal(user_id: str) -> Optional[dict]:
+    """User document plus its brand/influencer profile id, served from principal_cache when fresh"""
+    principal = principal_cache.get(user_id)
+    if principal is None:
+        user = await db.users.find_one({"id": user_id, "deleted_at": None}, {"_id": 0})
+        if user is None:
+            return None
+        
+        principal = {"user": user, "brand_id": None, "influencer_id": None}
+        if user["role"] == UserRole.BRAND.value:
+            brand = await db.brands.find_one({"user_id": user_id}, {"_id": 0, "id": 1})
+            principal["brand_id"] = brand["id"] if brand else None
+        elif user["role"] == UserRole.INFLUENCER.value:
+            influencer = await db.influencers.find_one({"user_id": user_id}, {"_id": 0, "id": 1})
+            principal["influencer_id"] = influencer["id"] if influencer else None
+        
+        # Don't pin a missing profile in the cache - it may be created moments later
+        if user["role"] == UserRole.ADMIN.value or principal["brand_id"] or principal["influencer_id"]:
+            principal_cache.set(user_id, principal)
+    
+    # Handlers get their own copy of the user so they can't mutate the cached one
+    return {**principal, "user": dict(principal["user"])}
+
+async def get_current_principal(request: Request) -> dict:
+    """Authenticated user + profile ids, resolved once per request"""
     token = request.cookies.get("access_token")
     if not token:
         raise HTTPException(status_code=401, detail="Not authenticated")
@@ -410,13 +686,24 @@ async def get_current_user(request: Request):
         user_id: str = payload.get("sub")
         if user_id is None:
             raise HTTPException(status_code=401, detail="Invalid token")
-        user = await db.users.find_one({"id": user_id, "deleted_at": None})
-        if user is None:
+        principal = await load_principal(user_id)
+        if principal is None:
             raise HTTPException(status_code=401, detail="User not found")
-        return user
+        request.state.principal = principal
+        return principal
     except JWTError:
         raise HTTPException(status_code=401, detail="Invalid token")
 
+async def get_current_user(principal: dict = Depends(get_current_principal)):
+    return principal["user"]
+
+def get_loader(request: Request) -> DataLoader:
+    """DataLoader shared by everything handling this request"""
+    loader = getattr(request.state, "loader", None)
+    if loader is None:
+        loader = request.state.loader = DataLoader(db)
+    return loader
+
 def require_role(allowed_roles: List[UserRole]):
     async def role_checker(user: dict = Depends(get_current_user)):
         if user["role"] not in [r.value for r in allowed_roles]:
@@ -436,6 +723,33 @@ async def log_audit(user_id: str, action: str, entity_type: str, entity_id: str,
     }
     await db.audit_logs.insert_one(audit_log)
 
+CURSOR_QUERY = Query(None, description="Keyset pagination: pass an empty value for the first page, then next_cursor")
+INCLUDE_TOTAL_QUERY = Query(False, description="Cursor mode only: also count matching documents")
+
+async def _keyset_listing(collection, query: Dict[str, Any], cursor: str, page_size: int, include_total: bool):
+    """
+    Cursor-mode page for a listing: (docs, next_cursor, total).
+    total is only computed when asked for, estimated from collection metadata when unfiltered.
+    """
+    try:
+        docs, next_cursor = await keyset_page(collection, query, cursor, page_size)
+    except InvalidCursor:
+        raise HTTPException(status_code=400, detail="Invalid cursor")
+    total = None
+    if include_total:
+        total = await collection.count_documents(query) if query else await collection.estimated_document_count()
+    return docs, next_cursor, total
+
+async def _find_by_ids(collection, ids, projection: Dict[str, Any]) -> Dict[str, dict]:
+    """One $in query for a set of ids, returned as id -> document"""
+    ids = [i for i in ids if i]
+    if not ids:
+        return {}
+    return {doc["id"]: doc for doc in await collection.find({"id": {"$in": ids}}, projection).to_list(None)}
+
+def _cursor_response(data: List[dict], page_size: int, next_cursor: Optional[str], total: Optional[int], **extra) -> Dict[str, Any]:
+    return {"data": data, "page_size": page_size, "next_cursor": next_cursor, "total": total, **extra}
+
 # Auth Routes
 @api_router.post("/auth/register")
 async def register(user_data: UserRegister, response: Response):
@@ -452,7 +766,7 @@ async def register(user_data: UserRegister, response: Response):
     # Create user
     user = User(
         email=user_data.email,
-        password_hash=hash_password(user_data.password),
+        password_hash=await hash_password(user_data.password),
         role=user_data.role,
         status=UserStatus.ACTIVE if user_data.role == UserRole.ADMIN else UserStatus.PENDING
     )
@@ -489,24 +803,24 @@ async def register(user_data: UserRegister, response: Response):
     # Send welcome email and notify admins
     user_name = user_data.email.split('@')[0]
     if user_data.role == UserRole.INFLUENCER:
-        asyncio.create_task(email_service.send_influencer_welcome(user_data.email, user_name, APP_URL))
+        await email_service.send_influencer_welcome(user_data.email, user_name, APP_URL)
     elif user_data.role == UserRole.BRAND:
-        asyncio.create_task(email_service.send_brand_welcome(user_data.email, user_name, APP_URL))
+        await email_service.send_brand_welcome(user_data.email, user_name, APP_URL)
     
     # Notify admins of new registration
     admins = await db.users.find({"role": "admin", "deleted_at": None}).to_list(100)
     for admin in admins:
-        asyncio.create_task(email_service.send_admin_new_user(
+        await email_service.send_admin_new_user(
             admin["email"], user_name, user_data.email, user_data.role.value,
             datetime.now(timezone.utc).strftime("%Y-%m-%d %H:%M UTC"), APP_URL
-        ))
+        )
     
     return {"message": "Registration successful", "user": {"id": user.id, "email": user.email, "role": user.role}}
 
 @api_router.post("/auth/login")
 async def login(credentials: UserLogin, response: Response):
     user = await db.users.find_one({"email": credentials.email, "deleted_at": None})
-    if not user or not verify_password(credentials.password, user["password_hash"]):
+    if not user or not await verify_password(credentials.password, user["password_hash"]):
         raise HTTPException(status_code=401, detail="Invalid credentials")
     
     if user["status"] == UserStatus.SUSPENDED:
@@ -564,9 +878,9 @@ async def forgot_password(data: Dict[str, Any]):
     reset_url = f"{APP_URL}/reset-password?token={reset_token}"
     user_name = email.split('@')[0]
     
-    asyncio.create_task(email_service.send_password_reset(
+    await email_service.send_password_reset(
         email, user_name, reset_url, APP_URL
-    ))
+    )
     
     return {"message": "If an account with that email exists, a password reset link has been sent."}
 
@@ -613,7 +927,7 @@ async def reset_password(data: Dict[str, Any]):
         raise HTTPException(status_code=400, detail="User not found")
     
     # Update password
-    hashed_password = pwd_context.hash(new_password)
+    hashed_password = await hash_password(new_password)
     await db.users.update_one(
         {"id": user["id"]},
         {"$set": {
@@ -621,6 +935,7 @@ async def reset_password(data: Dict[str, Any]):
             "updated_at": datetime.now(timezone.utc).isoformat()
         }}
     )
+    invalidate_principal(user["id"])
     
     # Mark token as used
     await db.password_resets.update_one(
@@ -630,9 +945,9 @@ async def reset_password(data: Dict[str, Any]):
     
     # Send confirmation email
     user_name = user["email"].split('@')[0]
-    asyncio.create_task(email_service.send_password_reset_success(
+    await email_service.send_password_reset_success(
         user["email"], user_name, APP_URL
-    ))
+    )
     
     return {"message": "Password has been reset successfully"}
 
@@ -678,22 +993,23 @@ async def get_me(user: dict = Depends(get_current_user)):
 @api_router.post("/influencer/platforms")
 async def add_influencer_platform(
     platform_data: Dict[str, Any],
-    user: dict = Depends(require_role([UserRole.INFLUENCER]))
+    user: dict = Depends(require_role([UserRole.INFLUENCER])),
+    principal: dict = Depends(get_current_principal)
 ):
-    influencer = await db.influencers.find_one({"user_id": user["id"]})
-    if not influencer:
+    influencer_id = principal["influencer_id"]
+    if not influencer_id:
         raise HTTPException(status_code=404, detail="Influencer profile not found")
     
     # Check if platform already exists
     existing = await db.influencer_platforms.find_one({
-        "influencer_id": influencer["id"],
+        "influencer_id": influencer_id,
         "platform": platform_data["platform"]
     })
     if existing:
         raise HTTPException(status_code=400, detail="Platform already added")
     
     platform = InfluencerPlatform(
-        influencer_id=influencer["id"],
+        influencer_id=influencer_id,
         platform=SocialPlatform(platform_data["platform"]),
         username=platform_data["username"],
         profile_url=platform_data["profile_url"],
@@ -708,10 +1024,10 @@ async def add_influencer_platform(
     await db.influencer_platforms.insert_one(platform_doc)
     
     # Check if profile is complete (at least one platform)
-    platforms_count = await db.influencer_platforms.count_documents({"influencer_id": influencer["id"]})
+    platforms_count = await db.influencer_platforms.count_documents({"influencer_id": influencer_id})
     if platforms_count >= 1:
         await db.influencers.update_one(
-            {"id": influencer["id"]},
+            {"id": influencer_id},
             {"$set": {"profile_completed": True, "updated_at": datetime.now(timezone.utc).isoformat()}}
         )
     
@@ -720,26 +1036,27 @@ async def add_influencer_platform(
     return {"id": platform.id, "message": "Platform added"}
 
 @api_router.get("/influencer/platforms")
-async def get_influencer_platforms(user: dict = Depends(require_role([UserRole.INFLUENCER]))):
-    influencer = await db.influencers.find_one({"user_id": user["id"]})
-    if not influencer:
+async def get_influencer_platforms(user: dict = Depends(require_role([UserRole.INFLUENCER])), principal: dict = Depends(get_current_principal)):
+    influencer_id = principal["influencer_id"]
+    if not influencer_id:
         raise HTTPException(status_code=404, detail="Influencer profile not found")
     
-    platforms = await db.influencer_platforms.find({"influencer_id": influencer["id"]}, {"_id": 0}).to_list(10)
+    platforms = await db.influencer_platforms.find({"influencer_id": influencer_id}, {"_id": 0}).to_list(10)
     return {"data": platforms}
 
 @api_router.put("/influencer/platforms/{platform_id}")
 async def update_influencer_platform(
     platform_id: str,
     platform_data: Dict[str, Any],
-    user: dict = Depends(require_role([UserRole.INFLUENCER]))
+    user: dict = Depends(require_role([UserRole.INFLUENCER])),
+    principal: dict = Depends(get_current_principal)
 ):
     platform = await db.influencer_platforms.find_one({"id": platform_id})
     if not platform:
         raise HTTPException(status_code=404, detail="Platform not found")
     
-    influencer = await db.influencers.find_one({"user_id": user["id"]})
-    if platform["influencer_id"] != influencer["id"]:
+    influencer_id = principal["influencer_id"]
+    if platform["influencer_id"] != influencer_id:
         raise HTTPException(status_code=403, detail="Not authorized")
     
     update_data = {
@@ -762,14 +1079,15 @@ async def update_influencer_platform(
 @api_router.delete("/influencer/platforms/{platform_id}")
 async def delete_influencer_platform(
     platform_id: str,
-    user: dict = Depends(require_role([UserRole.INFLUENCER]))
+    user: dict = Depends(require_role([UserRole.INFLUENCER])),
+    principal: dict = Depends(get_current_principal)
 ):
     platform = await db.influencer_platforms.find_one({"id": platform_id})
     if not platform:
         raise HTTPException(status_code=404, detail="Platform not found")
     
-    influencer = await db.influencers.find_one({"user_id": user["id"]})
-    if platform["influencer_id"] != influencer["id"]:
+    influencer_id = principal["influencer_id"]
+    if platform["influencer_id"] != influencer_id:
         raise HTTPException(status_code=403, detail="Not authorized")
     
     await db.influencer_platforms.delete_one({"id": platform_id})
@@ -853,9 +1171,9 @@ async def get_public_influencer_profile(slug: str):
 
 # Campaigns
 @api_router.post("/campaigns")
-async def create_campaign(campaign_data: Dict[str, Any], user: dict = Depends(require_role([UserRole.BRAND]))):
-    brand = await db.brands.find_one({"user_id": user["id"]})
-    if not brand:
+async def create_campaign(campaign_data: Dict[str, Any], user: dict = Depends(require_role([UserRole.BRAND])), principal: dict = Depends(get_current_principal)):
+    brand_id = principal["brand_id"]
+    if not brand_id:
         raise HTTPException(status_code=404, detail="Brand profile not found")
     
     # Parse dates for validation
@@ -873,7 +1191,7 @@ async def create_campaign(campaign_data: Dict[str, Any], user: dict = Depends(re
         raise HTTPException(status_code=400, detail="Post start date cannot be earlier than purchase start date")
     
     campaign = Campaign(
-        brand_id=brand["id"],
+        brand_id=brand_id,
         title=campaign_data["title"],
         description=campaign_data["description"],
         amazon_attribution_url=campaign_data["amazon_attribution_url"],
@@ -895,6 +1213,7 @@ async def create_campaign(campaign_data: Dict[str, Any], user: dict = Depends(re
     doc['updated_at'] = doc['updated_at'].isoformat()
     
     await db.campaigns.insert_one(doc)
+    await stats_rollups.campaign_created(brand_id)
     await log_audit(user["id"], "create", "campaign", campaign.id)
     
     return {"id": campaign.id, "message": "Campaign created"}
@@ -904,22 +1223,27 @@ async def list_campaigns(
     page: int = Query(1, ge=1),
     page_size: int = Query(20, ge=1, le=100),
     status: Optional[str] = None,
-    user: dict = Depends(get_current_user)
+    cursor: Optional[str] = CURSOR_QUERY,
+    include_total: bool = INCLUDE_TOTAL_QUERY,
+    user: dict = Depends(get_current_user),
+    principal: dict = Depends(get_current_principal)
 ):
     skip = (page - 1) * page_size
     query = {}
     
     if user["role"] == "brand":
-        brand = await db.brands.find_one({"user_id": user["id"]})
-        if not brand:
+        brand_id = principal["brand_id"]
+        if not brand_id:
             # If brand profile doesn't exist, return empty list
+            if cursor is not None:
+                return _cursor_response([], page_size, None, 0 if include_total else None)
             return {
                 "data": [],
                 "page": page,
                 "page_size": page_size,
                 "total": 0
             }
-        query["brand_id"] = brand["id"]
+        query["brand_id"] = brand_id
     elif user["role"] == "influencer":
         # Influencers should see both published and live campaigns
         query["status"] = {"$in": [CampaignStatus.PUBLISHED.value, CampaignStatus.LIVE.value]}
@@ -939,6 +1263,10 @@ async def list_campaigns(
             else:
                 query["status"] = status
     
+    if cursor is not None:
+        campaigns, next_cursor, total = await _keyset_listing(db.campaigns, query, cursor, page_size, include_total)
+        return _cursor_response(campaigns, page_size, next_cursor, total)
+    
     campaigns = await db.campaigns.find(query, {"_id": 0}).skip(skip).limit(page_size).to_list(page_size)
     total = await db.campaigns.count_documents(query)
     
@@ -957,13 +1285,13 @@ async def get_campaign(campaign_id: str, user: dict = Depends(get_current_user))
     return campaign
 
 @api_router.put("/campaigns/{campaign_id}/publish")
-async def publish_campaign(campaign_id: str, user: dict = Depends(require_role([UserRole.BRAND]))):
+async def publish_campaign(campaign_id: str, user: dict = Depends(require_role([UserRole.BRAND])), principal: dict = Depends(get_current_principal)):
     campaign = await db.campaigns.find_one({"id": campaign_id})
     if not campaign:
         raise HTTPException(status_code=404, detail="Campaign not found")
     
-    brand = await db.brands.find_one({"user_id": user["id"]})
-    if campaign["brand_id"] != brand["id"]:
+    brand_id = principal["brand_id"]
+    if campaign["brand_id"] != brand_id:
         raise HTTPException(status_code=403, detail="Not authorized")
     
     await db.campaigns.update_one(
@@ -978,15 +1306,16 @@ async def publish_campaign(campaign_id: str, user: dict = Depends(require_role([
 async def update_campaign_dates(
     campaign_id: str,
     dates_data: Dict[str, Any],
-    user: dict = Depends(require_role([UserRole.BRAND]))
+    user: dict = Depends(require_role([UserRole.BRAND])),
+    principal: dict = Depends(get_current_principal)
 ):
     """Update campaign dates (purchase window, post window) - allows extending published campaigns"""
     campaign = await db.campaigns.find_one({"id": campaign_id})
     if not campaign:
         raise HTTPException(status_code=404, detail="Campaign not found")
     
-    brand = await db.brands.find_one({"user_id": user["id"]})
-    if campaign["brand_id"] != brand["id"]:
+    brand_id = principal["brand_id"]
+    if campaign["brand_id"] != brand_id:
         raise HTTPException(status_code=403, detail="Not authorized")
     
     # Parse dates for validation
@@ -1020,6 +1349,8 @@ async def update_campaign_dates(
         {"$set": update_data}
     )
     
+    invalidate_redirect_cache(campaign_id=campaign_id)
+    
     await log_audit(user["id"], "update_dates", "campaign", campaign_id, update_data)
     return {"message": "Campaign dates updated successfully"}
 
@@ -1027,7 +1358,8 @@ async def update_campaign_dates(
 async def delete_campaign(
     campaign_id: str,
     force: bool = Query(False, description="Force delete (admin only) - deletes even with active assignments"),
-    user: dict = Depends(require_role([UserRole.BRAND, UserRole.ADMIN]))
+    user: dict = Depends(require_role([UserRole.BRAND, UserRole.ADMIN])),
+    principal: dict = Depends(get_current_principal)
 ):
     """Delete a campaign and all associated data"""
     campaign = await db.campaigns.find_one({"id": campaign_id})
@@ -1036,8 +1368,8 @@ async def delete_campaign(
     
     # Check authorization (brands can only delete their own campaigns)
     if user["role"] == UserRole.BRAND.value:
-        brand = await db.brands.find_one({"user_id": user["id"]})
-        if campaign["brand_id"] != brand["id"]:
+        brand_id = principal["brand_id"]
+        if campaign["brand_id"] != brand_id:
             raise HTTPException(status_code=403, detail="Not authorized to delete this campaign")
         # Brands cannot force delete
         if force:
@@ -1056,6 +1388,10 @@ async def delete_campaign(
                 detail="Cannot delete campaign with active assignments. Please complete or cancel all assignments first."
             )
     
+    # Influencers whose rollups include this campaign, recomputed after the delete
+    influencer_ids = set(await db.applications.find({"campaign_id": campaign_id}).distinct("influencer_id"))
+    influencer_ids.update(await db.assignments.find({"campaign_id": campaign_id}).distinct("influencer_id"))
+    
     # Delete all associated data
     # Get all assignments for this campaign to delete their purchase proofs
     assignment_ids = await db.assignments.find({"campaign_id": campaign_id}).distinct("id")
@@ -1067,6 +1403,8 @@ async def delete_campaign(
     await db.applications.delete_many({"campaign_id": campaign_id})
     await db.assignments.delete_many({"campaign_id": campaign_id})
     await db.campaigns.delete_one({"id": campaign_id})
+    invalidate_redirect_cache(campaign_id=campaign_id)
+    await stats_rollups.campaign_deleted(campaign["brand_id"], influencer_ids)
     
     await log_audit(user["id"], "delete", "campaign", campaign_id, {"force": force})
     
@@ -1080,7 +1418,10 @@ async def admin_list_campaigns(
     page_size: int = Query(50, ge=1, le=100),
     status: Optional[str] = None,
     brand_id: Optional[str] = None,
-    user: dict = Depends(require_role([UserRole.ADMIN]))
+    cursor: Optional[str] = CURSOR_QUERY,
+    include_total: bool = INCLUDE_TOTAL_QUERY,
+    user: dict = Depends(require_role([UserRole.ADMIN])),
+    loader: DataLoader = Depends(get_loader)
 ):
     """Admin endpoint to list all campaigns with brand info"""
     skip = (page - 1) * page_size
@@ -1091,32 +1432,48 @@ async def admin_list_campaigns(
     if brand_id:
         query["brand_id"] = brand_id
     
-    campaigns = await db.campaigns.find(query, {"_id": 0}).sort("created_at", -1).skip(skip).limit(page_size).to_list(page_size)
-    total = await db.campaigns.count_documents(query)
+    next_cursor = None
+    if cursor is not None:
+        campaigns, next_cursor, total = await _keyset_listing(db.campaigns, query, cursor, page_size, include_total)
+    else:
+        campaigns = await db.campaigns.find(query, {"_id": 0}).sort("created_at", -1).skip(skip).limit(page_size).to_list(page_size)
+        total = await db.campaigns.count_documents(query)
     
     # Enrich campaigns with brand info and statistics
+    campaign_ids = [c["id"] for c in campaigns]
+    brands, application_counts, assignment_counts = await asyncio.gather(
+        loader.load_many("brands", [c["brand_id"] for c in campaigns]),
+        db.applications.aggregate([
+            {"$match": {"campaign_id": {"$in": campaign_ids}}},
+            {"$group": {"_id": "$campaign_id", "count": {"$sum": 1}}}
+        ]).to_list(None),
+        db.assignments.aggregate([
+            {"$match": {"campaign_id": {"$in": campaign_ids}}},
+            {"$group": {
+                "_id": "$campaign_id",
+                "count": {"$sum": 1},
+                "active": {"$sum": {"$cond": [{"$in": ["$status", ["completed", "cancelled"]]}, 0, 1]}}
+            }}
+        ]).to_list(None)
+    )
+    applications_by_campaign = {row["_id"]: row["count"] for row in application_counts}
+    assignments_by_campaign = {row["_id"]: row for row in assignment_counts}
+    
     enriched_campaigns = []
-    for campaign in campaigns:
-        brand = await db.brands.find_one({"id": campaign["brand_id"]}, {"_id": 0})
-        
-        # Get statistics
-        applications_count = await db.applications.count_documents({"campaign_id": campaign["id"]})
-        assignments_count = await db.assignments.count_documents({"campaign_id": campaign["id"]})
-        active_assignments_count = await db.assignments.count_documents({
-            "campaign_id": campaign["id"],
-            "status": {"$nin": ["completed", "cancelled"]}
-        })
-        
+    for campaign, brand in zip(campaigns, brands):
+        assignments = assignments_by_campaign.get(campaign["id"], {})
         enriched_campaigns.append({
             **campaign,
             "brand": brand,
             "statistics": {
-                "applications_count": applications_count,
-                "assignments_count": assignments_count,
-                "active_assignments_count": active_assignments_count
+                "applications_count": applications_by_campaign.get(campaign["id"], 0),
+                "assignments_count": assignments.get("count", 0),
+                "active_assignments_count": assignments.get("active", 0)
             }
         })
     
+    if cursor is not None:
+        return _cursor_response(enriched_campaigns, page_size, next_cursor, total)
     return {
         "data": enriched_campaigns,
         "page": page,
@@ -1154,13 +1511,14 @@ async def apply_to_campaign(application_data: Dict[str, Any], user: dict = Depen
     
     # Send notification email to brand
     campaign = await db.campaigns.find_one({"id": application_data["campaign_id"]})
+    await stats_rollups.application_created(campaign["brand_id"] if campaign else None, influencer["id"])
     if campaign:
         brand = await db.brands.find_one({"id": campaign["brand_id"]})
         brand_user = await db.users.find_one({"id": brand["user_id"]}) if brand else None
         influencer_user = await db.users.find_one({"id": user["id"]})
         
         if brand_user and influencer_user:
-            asyncio.create_task(email_service.send_new_application(
+            await email_service.send_new_application(
                 brand_user["email"],
                 brand.get("company_name", brand_user["email"].split('@')[0]),
                 campaign["title"],
@@ -1168,30 +1526,82 @@ async def apply_to_campaign(application_data: Dict[str, Any], user: dict = Depen
                 influencer.get("name", influencer_user["email"].split('@')[0]),
                 influencer_user["email"],
                 APP_URL
-            ))
+            )
     
     return {"id": application["id"], "message": "Application submitted"}
 
+# Sort key -> (MongoDB sort, platform metric aggregated per influencer for ranking)
+APPLICATION_SORTS = {
+    "newest": [("created_at", -1), ("id", -1)],
+    "oldest": [("created_at", 1), ("id", 1)],
+    # Total reach across all platforms
+    "followers": {"$sum": "$_platforms.followers_count"},
+    # Best engagement rate on any platform
+    "engagement": {"$max": "$_platforms.engagement_rate"},
+}
+
+async def _enrich_applications(applications: List[dict]):
+    """Attach each application's influencer with its platforms, using one $in query per collection"""
+    influencer_ids = list({a["influencer_id"] for a in applications})
+    influencers = await _find_by_ids(db.influencers, influencer_ids, {"_id": 0})
+    
+    platforms = {}
+    async for platform in db.influencer_platforms.find({"influencer_id": {"$in": influencer_ids}}, {"_id": 0}):
+        platforms.setdefault(platform["influencer_id"], []).append(platform)
+    
+    for app in applications:
+        influencer = influencers.get(app["influencer_id"])
+        if influencer:
+            influencer = {**influencer, "platforms": platforms.get(influencer["id"], [])[:100]}
+        app["influencer"] = influencer
+
 @api_router.get("/campaigns/{campaign_id}/applications")
 async def list_applications(
     campaign_id: str,
+    page: int = Query(1, ge=1),
+    page_size: int = Query(50, ge=1, le=200),
+    status: Optional[str] = None,
+    sort: str = Query("newest", regex="^(newest|oldest|followers|engagement)$"),
     user: dict = Depends(require_role([UserRole.BRAND, UserRole.ADMIN]))
 ):
-    applications = await db.applications.find({"campaign_id": campaign_id}, {"_id": 0}).to_list(1000)
+    """
+    Applications for a campaign with influencer profiles and platforms.
+    sort=followers/engagement ranks applicants by their platform stats server-side.
+    """
+    skip = (page - 1) * page_size
+    query = {"campaign_id": campaign_id}
+    if status:
+        query["status"] = status
     
-    # Enrich with influencer data and social platforms
-    for app in applications:
-        influencer = await db.influencers.find_one({"id": app["influencer_id"]}, {"_id": 0})
-        if influencer:
-            # Get social platforms for this influencer
-            platforms = await db.influencer_platforms.find(
-                {"influencer_id": influencer["id"]}, 
-                {"_id": 0}
-            ).to_list(100)
-            influencer["platforms"] = platforms
-        app["influencer"] = influencer
+    if sort in ("followers", "engagement"):
+        # Rank every applicant by platform metric in one pass, then keep the requested page
+        applications = await db.applications.aggregate([
+            {"$match": query},
+            {"$lookup": {
+                "from": "influencer_platforms",
+                "localField": "influencer_id",
+                "foreignField": "influencer_id",
+                "as": "_platforms"
+            }},
+            {"$addFields": {"_rank": APPLICATION_SORTS[sort]}},
+            {"$sort": {"_rank": -1, "created_at": -1, "id": -1}},
+            {"$skip": skip},
+            {"$limit": page_size},
+            {"$project": {"_id": 0, "_platforms": 0, "_rank": 0}}
+        ]).to_list(page_size)
+    else:
+        applications = await db.applications.find(query, {"_id": 0}).sort(APPLICATION_SORTS[sort]).skip(skip).limit(page_size).to_list(page_size)
+    total = await db.applications.count_documents(query)
+    
+    await _enrich_applications(applications)
     
-    return {"data": applications}
+    return {
+        "data": applications,
+        "page": page,
+        "page_size": page_size,
+        "total": total,
+        "sort": sort
+    }
 
 @api_router.put("/applications/{application_id}/status")
 async def update_application_status(
@@ -1229,24 +1639,29 @@ async def update_application_status(
         assign_doc['created_at'] = assign_doc['created_at'].isoformat()
         assign_doc['updated_at'] = assign_doc['updated_at'].isoformat()
         await db.assignments.insert_one(assign_doc)
+        await stats_rollups.assignment_created(
+            campaign["brand_id"] if campaign else None,
+            assign_doc["influencer_id"],
+            assign_doc["status"]
+        )
         
         # Send approval email to influencer
         if influencer_user and campaign:
-            asyncio.create_task(email_service.send_application_approved(
+            await email_service.send_application_approved(
                 influencer_user["email"],
                 influencer.get("name", influencer_user["email"].split('@')[0]),
                 campaign["title"],
                 APP_URL
-            ))
+            )
     elif status_data["status"] == ApplicationStatus.REJECTED.value:
         # Send rejection email to influencer
         if influencer_user and campaign:
-            asyncio.create_task(email_service.send_application_rejected(
+            await email_service.send_application_rejected(
                 influencer_user["email"],
                 influencer.get("name", influencer_user["email"].split('@')[0]),
                 campaign["title"],
                 APP_URL
-            ))
+            )
     
     await log_audit(user["id"], "update_status", "application", application_id, {"status": status_data["status"]})
     return {"message": "Application updated"}
@@ -1254,36 +1669,38 @@ async def update_application_status(
 # Assignments & Amazon Links
 @api_router.get("/assignments")
 async def list_assignments(
-    user: dict = Depends(get_current_user)
+    user: dict = Depends(get_current_user),
+    principal: dict = Depends(get_current_principal),
+    loader: DataLoader = Depends(get_loader)
 ):
     query = {}
     
     if user["role"] == "influencer":
-        influencer = await db.influencers.find_one({"user_id": user["id"]})
-        query["influencer_id"] = influencer["id"]
+        influencer_id = principal["influencer_id"]
+        query["influencer_id"] = influencer_id
     elif user["role"] == "brand":
-        brand = await db.brands.find_one({"user_id": user["id"]})
-        campaigns = await db.campaigns.find({"brand_id": brand["id"]}, {"_id": 0, "id": 1}).to_list(1000)
+        brand_id = principal["brand_id"]
+        campaigns = await db.campaigns.find({"brand_id": brand_id}, {"_id": 0, "id": 1}).to_list(1000)
         campaign_ids = [c["id"] for c in campaigns]
         query["campaign_id"] = {"$in": campaign_ids}
     
     assignments = await db.assignments.find(query, {"_id": 0}).to_list(1000)
     
     # Enrich
-    for assignment in assignments:
-        campaign = await db.campaigns.find_one({"id": assignment["campaign_id"]}, {"_id": 0})
+    campaigns = await loader.load_many("campaigns", [a["campaign_id"] for a in assignments])
+    for assignment, campaign in zip(assignments, campaigns):
         assignment["campaign"] = campaign
     
     return {"data": assignments}
 
 @api_router.get("/assignments/{assignment_id}/amazon-link")
-async def get_amazon_link(assignment_id: str, user: dict = Depends(require_role([UserRole.INFLUENCER]))):
+async def get_amazon_link(assignment_id: str, user: dict = Depends(require_role([UserRole.INFLUENCER])), principal: dict = Depends(get_current_principal)):
     assignment = await db.assignments.find_one({"id": assignment_id})
     if not assignment:
         raise HTTPException(status_code=404, detail="Assignment not found")
     
-    influencer = await db.influencers.find_one({"user_id": user["id"]})
-    if assignment["influencer_id"] != influencer["id"]:
+    influencer_id = principal["influencer_id"]
+    if assignment["influencer_id"] != influencer_id:
         raise HTTPException(status_code=403, detail="Not authorized")
     
     # Generate redirect URL with /api prefix for proper routing
@@ -1295,31 +1712,34 @@ async def get_amazon_link(assignment_id: str, user: dict = Depends(require_role(
 # Public redirect endpoint (with /api prefix for Kubernetes ingress)
 @app.get("/api/redirect/{token}")
 async def redirect_amazon(token: str, request: Request):
-    assignment = await db.assignments.find_one({"redirect_token": token})
-    if not assignment:
-        raise HTTPException(status_code=404, detail="Invalid link")
-    
-    # Log click
-    client_ip = request.client.host
-    user_agent = request.headers.get("user-agent", "")
-    
-    click_log = ClickLog(
-        assignment_id=assignment["id"],
-        ip_hash=hash_ip(client_ip),
-        user_agent=user_agent
-    )
-    
-    click_doc = click_log.model_dump()
-    click_doc['clicked_at'] = click_doc['clicked_at'].isoformat()
-    await db.amazon_click_logs.insert_one(click_doc)
+    target = redirect_cache.get(token)
+    if target is None:
+        assignment = await db.assignments.find_one(
+            {"redirect_token": token},
+            {"_id": 0, "id": 1, "campaign_id": 1, "amazon_attribution_url": 1}
+        )
+        if not assignment:
+            raise HTTPException(status_code=404, detail="Invalid link")
+        
+        # Get Amazon URL
+        amazon_url = assignment.get("amazon_attribution_url")
+        if not amazon_url:
+            campaign = await db.campaigns.find_one({"id": assignment["campaign_id"]}, {"_id": 0, "amazon_attribution_url": 1})
+            amazon_url = campaign["amazon_attribution_url"]
+        
+        target = {"assignment_id": assignment["id"], "campaign_id": assignment["campaign_id"], "url": amazon_url}
+        redirect_cache.set(token, target)
     
-    # Get Amazon URL
-    amazon_url = assignment.get("amazon_attribution_url")
-    if not amazon_url:
-        campaign = await db.campaigns.find_one({"id": assignment["campaign_id"]})
-        amazon_url = campaign["amazon_attribution_url"]
+    # Log click (written in the background by click_ingestor)
+    click_ingestor.record({
+        "id": str(uuid.uuid4()),
+        "assignment_id": target["assignment_id"],
+        "ip_hash": hash_ip(request.client.host),
+        "user_agent": request.headers.get("user-agent", ""),
+        "clicked_at": datetime.now(timezone.utc).isoformat()
+    })
     
-    return RedirectResponse(url=amazon_url, status_code=302)
+    return RedirectResponse(url=target["url"], status_code=302)
 
 # Purchase Proofs
 @api_router.post("/assignments/{assignment_id}/purchase-proof")
@@ -1391,14 +1811,14 @@ async def submit_purchase_proof(
         brand_user = await db.users.find_one({"id": brand["user_id"]}) if brand else None
         
         if brand_user:
-            asyncio.create_task(email_service.send_new_purchase_proof(
+            await email_service.send_new_purchase_proof(
                 brand_user["email"],
                 brand.get("company_name", brand_user["email"].split('@')[0]),
                 campaign["title"],
                 influencer.get("name", user["email"].split('@')[0]),
                 proof_data["order_id"],
                 APP_URL
-            ))
+            )
     
     return {"id": purchase_proof.id, "message": "Purchase proof submitted"}
 
@@ -1411,7 +1831,7 @@ async def get_assignment_purchase_proof(assignment_id: str, user: dict = Depends
     return proof
 
 @api_router.get("/purchase-proofs/{proof_id}")
-async def get_purchase_proof(proof_id: str, user: dict = Depends(get_current_user)):
+async def get_purchase_proof(proof_id: str, user: dict = Depends(get_current_user), principal: dict = Depends(get_current_principal)):
     proof = await db.purchase_proofs.find_one({"id": proof_id}, {"_id": 0})
     if not proof:
         raise HTTPException(status_code=404, detail="Purchase proof not found")
@@ -1419,8 +1839,8 @@ async def get_purchase_proof(proof_id: str, user: dict = Depends(get_current_use
     # Mask order_id for non-owners
     if user["role"] not in ["admin", "brand"]:
         assignment = await db.assignments.find_one({"id": proof["assignment_id"]})
-        influencer = await db.influencers.find_one({"user_id": user["id"]})
-        if not influencer or assignment["influencer_id"] != influencer["id"]:
+        influencer_id = principal["influencer_id"]
+        if not influencer_id or assignment["influencer_id"] != influencer_id:
             proof["order_id"] = "****" + proof["order_id"][-4:]
     
     return proof
@@ -1507,19 +1927,20 @@ async def submit_post(
                 payout_doc['created_at'] = payout_doc['created_at'].isoformat()
                 payout_doc['updated_at'] = payout_doc['updated_at'].isoformat()
                 await db.payouts.insert_one(payout_doc)
+                await stats_rollups.payout_created(payout_doc)
     
     # Send notification email to brand
     if campaign:
         brand_user = await db.users.find_one({"id": brand["user_id"]}) if brand else None
         
         if brand_user:
-            asyncio.create_task(email_service.send_new_post_submission(
+            await email_service.send_new_post_submission(
                 brand_user["email"],
                 brand.get("company_name", brand_user["email"].split('@')[0]),
                 campaign["title"],
                 influencer.get("name", user["email"].split('@')[0]),
                 APP_URL
-            ))
+            )
     
     return {"id": post_submission["id"], "message": "Post submitted for review"}
 
@@ -1608,20 +2029,21 @@ async def submit_product_review(
                 payout_doc['created_at'] = payout_doc['created_at'].isoformat()
                 payout_doc['updated_at'] = payout_doc['updated_at'].isoformat()
                 await db.payouts.insert_one(payout_doc)
+                await stats_rollups.payout_created(payout_doc)
     
     # Send notification email to brand
     if campaign:
         brand_user = await db.users.find_one({"id": brand["user_id"]}) if brand else None
         
         if brand_user:
-            asyncio.create_task(email_service.send_new_product_review(
+            await email_service.send_new_product_review(
                 brand_user["email"],
                 brand.get("company_name", brand_user["email"].split('@')[0]),
                 campaign["title"],
                 influencer.get("name", user["email"].split('@')[0]),
                 review_data.get("rating", 5),
                 APP_URL
-            ))
+            )
     
     return {"id": product_review["id"], "message": "Product review submitted for review"}
 
@@ -1648,7 +2070,8 @@ async def get_assignment_product_review(assignment_id: str, user: dict = Depends
 async def review_product_review(
     review_id: str,
     review_data: Dict[str, Any],
-    user: dict = Depends(require_role([UserRole.BRAND, UserRole.ADMIN]))
+    user: dict = Depends(require_role([UserRole.BRAND, UserRole.ADMIN])),
+    principal: dict = Depends(get_current_principal)
 ):
     review = await db.product_reviews.find_one({"id": review_id})
     if not review:
@@ -1660,8 +2083,8 @@ async def review_product_review(
     
     # For brands, verify they own the campaign
     if user["role"] == "brand":
-        brand = await db.brands.find_one({"user_id": user["id"]})
-        if campaign["brand_id"] != brand["id"]:
+        brand_id = principal["brand_id"]
+        if campaign["brand_id"] != brand_id:
             raise HTTPException(status_code=403, detail="Not your campaign")
     
     status = review_data.get("status")
@@ -1699,21 +2122,21 @@ async def review_product_review(
     # Send email notification to influencer
     if influencer_user and campaign:
         if status == "approved":
-            asyncio.create_task(email_service.send_review_approved(
+            await email_service.send_review_approved(
                 influencer_user["email"],
                 influencer.get("name", influencer_user["email"].split('@')[0]),
                 campaign["title"],
                 APP_URL
-            ))
+            )
         else:
-            asyncio.create_task(email_service.send_review_rejected(
+            await email_service.send_review_rejected(
                 influencer_user["email"],
                 influencer.get("name", influencer_user["email"].split('@')[0]),
                 campaign["title"],
                 assignment["id"],
                 review_data.get("notes", ""),
                 APP_URL
-            ))
+            )
     
     await log_audit(user["id"], "review", "product_review", review_id, {"status": status})
     
@@ -1723,7 +2146,8 @@ async def review_product_review(
 async def review_post_submission(
     submission_id: str,
     review_data: Dict[str, Any],
-    user: dict = Depends(require_role([UserRole.BRAND, UserRole.ADMIN]))
+    user: dict = Depends(require_role([UserRole.BRAND, UserRole.ADMIN])),
+    principal: dict = Depends(get_current_principal)
 ):
     submission = await db.post_submissions.find_one({"id": submission_id})
     if not submission:
@@ -1735,8 +2159,8 @@ async def review_post_submission(
     
     # For brands, verify they own the campaign
     if user["role"] == "brand":
-        brand = await db.brands.find_one({"user_id": user["id"]})
-        if campaign["brand_id"] != brand["id"]:
+        brand_id = principal["brand_id"]
+        if campaign["brand_id"] != brand_id:
             raise HTTPException(status_code=403, detail="Not your campaign")
     
     status = review_data.get("status")
@@ -1759,6 +2183,10 @@ async def review_post_submission(
         {"id": submission["assignment_id"]},
         {"$set": {"status": new_assignment_status, "updated_at": datetime.now(timezone.utc).isoformat()}}
     )
+    if assignment and campaign:
+        await stats_rollups.assignment_status_changed(
+            campaign["brand_id"], assignment["influencer_id"], assignment["status"], new_assignment_status
+        )
     
     # Send email notification to influencer
     influencer = await db.influencers.find_one({"id": submission["influencer_id"]})
@@ -1766,22 +2194,22 @@ async def review_post_submission(
     
     if influencer_user and campaign:
         if status == "approved":
-            asyncio.create_task(email_service.send_post_approved(
+            await email_service.send_post_approved(
                 influencer_user["email"],
                 influencer.get("name", influencer_user["email"].split('@')[0]),
                 campaign["title"],
                 assignment["id"],
                 APP_URL
-            ))
+            )
         else:
-            asyncio.create_task(email_service.send_post_rejected(
+            await email_service.send_post_rejected(
                 influencer_user["email"],
                 influencer.get("name", influencer_user["email"].split('@')[0]),
                 campaign["title"],
                 assignment["id"],
                 review_data.get("notes", ""),
                 APP_URL
-            ))
+            )
     
     await log_audit(user["id"], "review", "post_submission", submission_id, {"status": status})
     
@@ -1847,27 +2275,28 @@ async def review_purchase_proof(
                     payout_doc['created_at'] = payout_doc['created_at'].isoformat()
                     payout_doc['updated_at'] = payout_doc['updated_at'].isoformat()
                     await db.payouts.insert_one(payout_doc)
+                    await stats_rollups.payout_created(payout_doc)
         
         # Send approval email to influencer
         if influencer_user and campaign:
-            asyncio.create_task(email_service.send_purchase_proof_approved(
+            await email_service.send_purchase_proof_approved(
                 influencer_user["email"],
                 influencer.get("name", influencer_user["email"].split('@')[0]),
                 campaign["title"],
                 assignment["id"],
                 APP_URL
-            ))
+            )
     elif review_data["status"] == PurchaseProofStatus.REJECTED.value:
         # Send rejection email to influencer
         if influencer_user and campaign:
-            asyncio.create_task(email_service.send_purchase_proof_rejected(
+            await email_service.send_purchase_proof_rejected(
                 influencer_user["email"],
                 influencer.get("name", influencer_user["email"].split('@')[0]),
                 campaign["title"],
                 assignment["id"],
                 review_data.get("notes", ""),
                 APP_URL
-            ))
+            )
     
     await log_audit(user["id"], "review", "purchase_proof", proof_id, {"status": review_data["status"]})
     
@@ -1893,156 +2322,202 @@ async def get_verification_queue(
     return {"data": []}
 
 # Reports & CSV
-@api_router.get("/brand/reports")
-async def get_brand_reports(
-    status: str = Query("all"),
-    user: dict = Depends(require_role([UserRole.BRAND]))
-):
-    brand = await db.brands.find_one({"user_id": user["id"]})
-    if not brand:
-        raise HTTPException(status_code=404, detail="Brand profile not found")
-    
-    # Get all campaigns for this brand
-    campaigns = await db.campaigns.find({"brand_id": brand["id"]}, {"_id": 0}).to_list(1000)
-    campaign_ids = [c["id"] for c in campaigns]
-    
-    # Get assignments for these campaigns
+BRAND_REPORT_CONTENT_FEE = 10.00  # Base content fee
+BRAND_REPORT_ADDON_FEE = 5.00  # Fee per addon post
+BRAND_REPORT_SORT_FIELDS = {"created_at", "updated_at", "status"}
+
+def _brand_report_query(campaign_ids: List[str], status: str) -> Dict[str, Any]:
     query = {"campaign_id": {"$in": campaign_ids}}
     if status == "completed":
         query["status"] = AssignmentStatus.COMPLETED.value
     elif status == "pending":
         query["status"] = {"$ne": AssignmentStatus.COMPLETED.value}
+    return query
+
+async def _build_brand_report_rows(assignments: List[dict], campaign_titles: Dict[str, str]) -> List[dict]:
+    """
+    Enrich a page of assignments for brand reports.
+    Uses one $in query per related collection instead of one query per assignment.
+    """
+    assignment_ids = [a["id"] for a in assignments]
+    influencer_ids = list({a["influencer_id"] for a in assignments})
     
-    assignments = await db.assignments.find(query, {"_id": 0}).to_list(1000)
+    proofs_by_assignment = {}
+    async for proof in db.purchase_proofs.find(
+        {"assignment_id": {"$in": assignment_ids}, "status": PurchaseProofStatus.APPROVED.value},
+        {"_id": 0, "assignment_id": 1, "total": 1, "order_id": 1, "order_date": 1}
+    ):
+        proofs_by_assignment.setdefault(proof["assignment_id"], proof)
     
-    # Build detailed report
-    report_data = []
-    total_product_cost = 0
-    total_content_fees = 0
-    total_addon_fees = 0
+    influencer_names = {}
+    async for influencer in db.influencers.find({"id": {"$in": influencer_ids}}, {"_id": 0, "id": 1, "name": 1}):
+        influencer_names[influencer["id"]] = influencer.get("name")
+    
+    payout_status_by_assignment = {}
+    async for payout in db.payouts.find({"assignment_id": {"$in": assignment_ids}}, {"_id": 0, "assignment_id": 1, "status": 1}):
+        payout_status_by_assignment.setdefault(payout["assignment_id"], payout["status"])
     
+    rows = []
     for assignment in assignments:
-        # Get purchase proof to get product cost
-        purchase_proof = await db.purchase_proofs.find_one(
-            {"assignment_id": assignment["id"], "status": PurchaseProofStatus.APPROVED.value},
-            {"_id": 0}
-        )
-        
-        # Get influencer name
-        influencer = await db.influencers.find_one({"id": assignment["influencer_id"]}, {"_id": 0})
-        
-        # Get campaign title
-        campaign = await db.campaigns.find_one({"id": assignment["campaign_id"]}, {"_id": 0})
-        
-        # Get payout info
-        payout = await db.payouts.find_one({"assignment_id": assignment["id"]}, {"_id": 0})
+        purchase_proof = proofs_by_assignment.get(assignment["id"])
         
         # Calculate costs
         product_cost = purchase_proof["total"] if purchase_proof and purchase_proof.get("total") else 0
-        content_fee = 10.00  # Base content fee
+        content_fee = BRAND_REPORT_CONTENT_FEE
         addon_posts = 0  # Could be tracked via deliverables
-        addon_fee = addon_posts * 5.00
-        
-        total_payable = product_cost + content_fee + addon_fee
-        
-        total_product_cost += product_cost
-        total_content_fees += content_fee
-        total_addon_fees += addon_fee
+        addon_fee = addon_posts * BRAND_REPORT_ADDON_FEE
         
-        report_data.append({
+        rows.append({
             "id": assignment["id"],
-            "campaign_title": campaign["title"] if campaign else "Unknown",
-            "influencer_name": influencer["name"] if influencer else "Unknown",
+            "campaign_title": campaign_titles.get(assignment["campaign_id"]) or "Unknown",
+            "influencer_name": influencer_names.get(assignment["influencer_id"]) or "Unknown",
             "status": assignment["status"],
-            "payment_status": payout["status"] if payout else "pending",
+            "payment_status": payout_status_by_assignment.get(assignment["id"], "pending"),
             "product_cost": product_cost,
             "content_fee": content_fee,
             "addon_posts": addon_posts,
             "addon_fee": addon_fee,
-            "total_payable": total_payable,
+            "total_payable": product_cost + content_fee + addon_fee,
             "order_date": purchase_proof["order_date"] if purchase_proof else None,
             "order_id": purchase_proof["order_id"] if purchase_proof else None
         })
     
+    return rows
+
+@api_router.get("/brand/reports")
+async def get_brand_reports(
+    status: str = Query("all"),
+    page: int = Query(1, ge=1),
+    page_size: int = Query(100, ge=1, le=500),
+    sort_by: str = Query("created_at"),
+    sort_order: str = Query("desc", regex="^(asc|desc)$"),
+    user: dict = Depends(require_role([UserRole.BRAND])),
+    principal: dict = Depends(get_current_principal)
+):
+    brand_id = principal["brand_id"]
+    if not brand_id:
+        raise HTTPException(status_code=404, detail="Brand profile not found")
+    
+    if sort_by not in BRAND_REPORT_SORT_FIELDS:
+        raise HTTPException(status_code=400, detail=f"sort_by must be one of: {', '.join(sorted(BRAND_REPORT_SORT_FIELDS))}")
+    
+    # Get all campaigns for this brand
+    campaigns = await db.campaigns.find({"brand_id": brand_id}, {"_id": 0, "id": 1, "title": 1}).to_list(None)
+    campaign_titles = {c["id"]: c.get("title") for c in campaigns}
+    query = _brand_report_query(list(campaign_titles.keys()), status)
+    
+    # Summary over every matching assignment, computed in a single pipeline
+    summary_result = await db.assignments.aggregate([
+        {"$match": query},
+        {"$lookup": {
+            "from": "purchase_proofs",
+            "localField": "id",
+            "foreignField": "assignment_id",
+            "as": "proofs"
+        }},
+        {"$project": {
+            "approved_proofs": {"$filter": {
+                "input": "$proofs",
+                "as": "proof",
+                "cond": {"$eq": ["$$proof.status", PurchaseProofStatus.APPROVED.value]}
+            }}
+        }},
+        {"$group": {
+            "_id": None,
+            "count": {"$sum": 1},
+            "total_product_cost": {"$sum": {"$ifNull": [{"$arrayElemAt": ["$approved_proofs.total", 0]}, 0]}}
+        }}
+    ]).to_list(1)
+    
+    total = summary_result[0]["count"] if summary_result else 0
+    total_product_cost = summary_result[0]["total_product_cost"] if summary_result else 0
+    total_content_fees = total * BRAND_REPORT_CONTENT_FEE
+    total_addon_fees = 0
+    
+    # Current page of assignments
+    direction = 1 if sort_order == "asc" else -1
+    assignments = await db.assignments.find(query, {"_id": 0}).sort(
+        [(sort_by, direction), ("id", direction)]
+    ).skip((page - 1) * page_size).limit(page_size).to_list(page_size)
+    
+    report_data = await _build_brand_report_rows(assignments, campaign_titles)
+    
     return {
         "summary": {
-            "total_products": len(report_data),
+            "total_products": total,
             "total_product_cost": total_product_cost,
             "total_content_fees": total_content_fees,
             "total_addon_fees": total_addon_fees,
             "total_payable": total_product_cost + total_content_fees + total_addon_fees
         },
-        "assignments": report_data
+        "assignments": report_data,
+        "page": page,
+        "page_size": page_size,
+        "total": total
     }
 
+BRAND_REPORT_CSV_FIELDS = [
+    "Campaign", "Influencer", "Order ID", "Order Date", "Product Cost", "Content Fee",
+    "Addon Posts", "Addon Fee", "Total Payable", "Payment Status", "Status"
+]
+
+def _brand_report_csv_row(row: dict) -> dict:
+    return {
+        "Campaign": row["campaign_title"],
+        "Influencer": row["influencer_name"],
+        "Order ID": row["order_id"] or "",
+        "Order Date": row["order_date"] or "",
+        "Product Cost": f"${row['product_cost']:.2f}",
+        "Content Fee": f"${row['content_fee']:.2f}",
+        "Addon Posts": row["addon_posts"],
+        "Addon Fee": f"${row['addon_fee']:.2f}",
+        "Total Payable": f"${row['total_payable']:.2f}",
+        "Payment Status": row["payment_status"],
+        "Status": row["status"]
+    }
+
+async def _brand_report_csv_rows(query: Dict[str, Any], campaign_titles: Dict[str, str]):
+    """Stream brand report CSV rows, enriching assignments one cursor batch at a time"""
+    cursor = db.assignments.find(query, {"_id": 0}).sort("created_at", -1).batch_size(CSV_CURSOR_BATCH_SIZE)
+    batch = []
+    
+    async for assignment in cursor:
+        batch.append(assignment)
+        if len(batch) >= CSV_CURSOR_BATCH_SIZE:
+            for row in await _build_brand_report_rows(batch, campaign_titles):
+                yield _brand_report_csv_row(row)
+            batch = []
+    
+    if batch:
+        for row in await _build_brand_report_rows(batch, campaign_titles):
+            yield _brand_report_csv_row(row)
+
 @api_router.get("/brand/reports/export")
-async def export_brand_reports_csv(user: dict = Depends(require_role([UserRole.BRAND]))):
-    brand = await db.brands.find_one({"user_id": user["id"]})
-    if not brand:
+async def export_brand_reports_csv(request: Request, user: dict = Depends(require_role([UserRole.BRAND])), principal: dict = Depends(get_current_principal)):
+    brand_id = principal["brand_id"]
+    if not brand_id:
         raise HTTPException(status_code=404, detail="Brand profile not found")
     
-    # Get report data (reuse logic from above)
-    campaigns = await db.campaigns.find({"brand_id": brand["id"]}, {"_id": 0}).to_list(1000)
-    campaign_ids = [c["id"] for c in campaigns]
-    assignments = await db.assignments.find({"campaign_id": {"$in": campaign_ids}}, {"_id": 0}).to_list(1000)
+    campaigns = await db.campaigns.find({"brand_id": brand_id}, {"_id": 0, "id": 1, "title": 1}).to_list(None)
+    campaign_titles = {c["id"]: c.get("title") for c in campaigns}
+    query = _brand_report_query(list(campaign_titles.keys()), "all")
     
-    csv_data = []
-    for assignment in assignments:
-        purchase_proof = await db.purchase_proofs.find_one(
-            {"assignment_id": assignment["id"], "status": PurchaseProofStatus.APPROVED.value},
-            {"_id": 0}
-        )
-        influencer = await db.influencers.find_one({"id": assignment["influencer_id"]}, {"_id": 0})
-        campaign = await db.campaigns.find_one({"id": assignment["campaign_id"]}, {"_id": 0})
-        payout = await db.payouts.find_one({"assignment_id": assignment["id"]}, {"_id": 0})
-        
-        product_cost = purchase_proof["total"] if purchase_proof and purchase_proof.get("total") else 0
-        content_fee = 10.00
-        addon_posts = 0
-        addon_fee = addon_posts * 5.00
-        total_payable = product_cost + content_fee + addon_fee
-        
-        csv_data.append({
-            "Campaign": campaign["title"] if campaign else "Unknown",
-            "Influencer": influencer["name"] if influencer else "Unknown",
-            "Order ID": purchase_proof["order_id"] if purchase_proof else "",
-            "Order Date": purchase_proof["order_date"] if purchase_proof else "",
-            "Product Cost": f"${product_cost:.2f}",
-            "Content Fee": "$10.00",
-            "Addon Posts": addon_posts,
-            "Addon Fee": f"${addon_fee:.2f}",
-            "Total Payable": f"${total_payable:.2f}",
-            "Payment Status": payout["status"] if payout else "pending",
-            "Status": assignment["status"]
-        })
-    
-    output = io.StringIO()
-    if csv_data:
-        writer = csv.DictWriter(output, fieldnames=csv_data[0].keys())
-        writer.writeheader()
-        writer.writerows(csv_data)
-    
-    output.seek(0)
-    return StreamingResponse(
-        io.BytesIO(output.getvalue().encode()),
-        media_type="text/csv",
-        headers={"Content-Disposition": f"attachment; filename=campaign-reports-{datetime.now(timezone.utc).strftime('%Y-%m-%d')}.csv"}
+    return csv_streaming_response(
+        _brand_report_csv_rows(query, campaign_titles),
+        BRAND_REPORT_CSV_FIELDS,
+        f"campaign-reports-{datetime.now(timezone.utc).strftime('%Y-%m-%d')}.csv",
+        request
     )
 
 @api_router.get("/reports/clicks")
-async def export_clicks_csv(user: dict = Depends(require_role([UserRole.BRAND, UserRole.ADMIN]))):
-    clicks = await db.amazon_click_logs.find({}, {"_id": 0}).to_list(10000)
-    
-    output = io.StringIO()
-    writer = csv.DictWriter(output, fieldnames=["id", "assignment_id", "ip_hash", "user_agent", "clicked_at"])
-    writer.writeheader()
-    writer.writerows(clicks)
-    
-    output.seek(0)
-    return StreamingResponse(
-        io.BytesIO(output.getvalue().encode()),
-        media_type="text/csv",
-        headers={"Content-Disposition": "attachment; filename=clicks.csv"}
+async def export_clicks_csv(request: Request, user: dict = Depends(require_role([UserRole.BRAND, UserRole.ADMIN]))):
+    cursor = db.amazon_click_logs.find({}, {"_id": 0}).batch_size(CSV_CURSOR_BATCH_SIZE)
+    
+    return csv_streaming_response(
+        cursor,
+        ["id", "assignment_id", "ip_hash", "user_agent", "clicked_at"],
+        "clicks.csv",
+        request
     )
 
 # Admin - User Approval
@@ -2061,6 +2536,7 @@ async def approve_user(
         {"id": user_id},
         {"$set": {"status": UserStatus.ACTIVE.value, "updated_at": datetime.now(timezone.utc).isoformat()}}
     )
+    invalidate_principal(user_id)
     
     # Update profile status
     if target_user["role"] == "brand":
@@ -2080,21 +2556,132 @@ async def approve_user(
 
 # Admin Dashboard
 @api_router.get("/admin/dashboard")
-async def admin_dashboard(user: dict = Depends(require_role([UserRole.ADMIN]))):
-    total_users = await db.users.count_documents({"deleted_at": None})
-    pending_users = await db.users.count_documents({"status": UserStatus.PENDING.value, "deleted_at": None})
-    total_campaigns = await db.campaigns.count_documents({})
-    total_clicks = await db.amazon_click_logs.count_documents({})
-    pending_purchase_proofs = await db.purchase_proofs.count_documents({"status": PurchaseProofStatus.PENDING.value})
-    
+async def admin_dashboard(
+    refresh: bool = Query(False, description="Recompute the counters instead of serving the cached snapshot"),
+    user: dict = Depends(require_role([UserRole.ADMIN]))
+):
+    """Platform counters, refreshed in the background; `computed_at` says how fresh they are"""
+    return await dashboard_stats.get(force=refresh)
+
+@api_router.get("/admin/click-ingestion")
+async def admin_click_ingestion_stats(user: dict = Depends(require_role([UserRole.ADMIN]))):
+    """Queue depth, throughput and overflow counters for redirect click logging"""
+    return click_ingestor.stats()
+
+@api_router.get("/admin/dashboard-refresher")
+async def admin_dashboard_refresher_stats(user: dict = Depends(require_role([UserRole.ADMIN]))):
+    """Refresh timings and failures for the cached dashboard counters"""
+    return dashboard_stats.stats()
+
+@api_router.get("/admin/query-stats")
+async def admin_query_stats(
+    limit: int = Query(50, ge=1, le=500),
+    reset: bool = False,
+    user: dict = Depends(require_role([UserRole.ADMIN]))
+):
+    """MongoDB queries per route since startup (or the last reset), heaviest first"""
+    result = {
+        "budget": {"max_queries": query_budget.max_queries, "max_db_ms": query_budget.max_db_ms},
+        "commands": query_counter.stats(),
+        "routes": route_query_stats.stats(limit)
+    }
+    if reset:
+        route_query_stats.reset()
+    return result
+
+@api_router.get("/admin/cache-stats")
+async def admin_cache_stats(user: dict = Depends(require_role([UserRole.ADMIN]))):
+    """Hit/miss counters for in-process caches"""
     return {
-        "total_users": total_users,
-        "pending_users": pending_users,
-        "total_campaigns": total_campaigns,
-        "total_clicks": total_clicks,
-        "pending_purchase_proofs": pending_purchase_proofs
+        "redirect": redirect_cache.stats(),
+        "principal": principal_cache.stats(),
+        "email_settings": email_service.settings_cache_stats(),
+        "email_render": email_renderer.stats(),
+        "upload_hash": upload_hash_cache.stats()
     }
 
+@api_router.get("/admin/password-hasher")
+async def admin_password_hasher_stats(user: dict = Depends(require_role([UserRole.ADMIN]))):
+    """Queue depth and timings for the bcrypt worker pool"""
+    return password_hasher.stats()
+
+@api_router.get("/admin/email-outbox")
+async def admin_email_outbox_stats(user: dict = Depends(require_role([UserRole.ADMIN]))):
+    """Outbox counts by status and the most recent permanent failures"""
+    return await email_outbox.stats()
+
+@api_router.post("/admin/email-outbox/{email_id}/retry")
+async def admin_retry_outbox_email(email_id: str, user: dict = Depends(require_role([UserRole.ADMIN]))):
+    """Requeue a failed or skipped outbox email"""
+    result = await db.email_outbox.update_one(
+        {"id": email_id, "status": {"$in": [OutboxStatus.FAILED, OutboxStatus.SKIPPED]}},
+        {
+            "$set": {
+                "status": OutboxStatus.PENDING,
+                "attempts": 0,
+                "next_attempt_at": datetime.now(timezone.utc).isoformat(),
+                "updated_at": datetime.now(timezone.utc).isoformat()
+            },
+            # Back in the queue, so the TTL index mustn't remove it
+            "$unset": {"expires_at": ""}
+        }
+    )
+    if result.matched_count == 0:
+        raise HTTPException(status_code=404, detail="No failed or skipped email with that id")
+    
+    await log_audit(user["id"], "retry", "email_outbox", email_id)
+    return {"message": "Email requeued"}
+
+@api_router.get("/admin/indexes")
+async def admin_index_report(user: dict = Depends(require_role([UserRole.ADMIN]))):
+    """Report missing, unregistered and unused MongoDB indexes"""
+    return await index_report(db)
+
+@api_router.post("/admin/indexes/ensure")
+async def admin_ensure_indexes(user: dict = Depends(require_role([UserRole.ADMIN]))):
+    """Re-apply the index registry (e.g. after cleaning up duplicate data)"""
+    result = await ensure_indexes(db)
+    await log_audit(user["id"], "ensure", "indexes", "registry", {"failed": len(result["failed"])})
+    return result
+
+@api_router.get("/admin/image-variants")
+async def admin_image_variant_stats(user: dict = Depends(require_role([UserRole.ADMIN]))):
+    """Queue depth, throughput and failures for background image resizing"""
+    return image_variants.stats()
+
+@api_router.get("/admin/uploads/storage")
+async def admin_upload_storage(user: dict = Depends(require_role([UserRole.ADMIN]))):
+    """Indexed uploads vs distinct blobs, the bytes deduplication saves, and resumable upload sessions"""
+    return {**await upload_blobs.stats(), "resumable": resumable_uploads.stats()}
+
+@api_router.post("/admin/uploads/gc")
+async def admin_upload_gc(
+    dry_run: bool = True,
+    grace_hours: float = Query(24, ge=1),
+    user: dict = Depends(require_role([UserRole.ADMIN]))
+):
+    """Remove uploads no longer referenced by any proof, profile, campaign or landing content"""
+    result = await upload_blobs.gc(timedelta(hours=grace_hours), dry_run=dry_run)
+    if not dry_run:
+        await log_audit(user["id"], "gc", "uploads", "blobs", {
+            "orphaned_files": result["orphaned_files"],
+            "removed_blobs": result["removed_blobs"]
+        })
+    return result
+
+@api_router.post("/admin/stats-rollups/rebuild")
+async def admin_rebuild_stats_rollups(
+    rebuild_data: Optional[Dict[str, Any]] = None,
+    user: dict = Depends(require_role([UserRole.ADMIN]))
+):
+    """Recompute stats rollups from source data; pass brand_ids/influencer_ids to limit the rebuild"""
+    rebuild_data = rebuild_data or {}
+    brand_ids = rebuild_data.get("brand_ids")
+    influencer_ids = rebuild_data.get("influencer_ids")
+    result = await stats_rollups.rebuild(brand_ids, influencer_ids)
+    await log_audit(user["id"], "rebuild", "stats_rollups", "all" if brand_ids is None and influencer_ids is None else "partial", result)
+    return result
+
 # Email Settings
 @api_router.get("/admin/email-settings")
 async def get_email_settings(user: dict = Depends(require_role([UserRole.ADMIN]))):
@@ -2126,6 +2713,7 @@ async def update_email_settings(
         upsert=True
     )
     
+    email_service.invalidate_settings()
     await log_audit(user["id"], "update", "email_settings", "default")
     
     return {"message": "Email settings updated"}
@@ -2134,7 +2722,8 @@ async def update_email_settings(
 @api_router.post("/payouts")
 async def create_payout(
     payout_data: Dict[str, Any],
-    user: dict = Depends(require_role([UserRole.BRAND, UserRole.ADMIN]))
+    user: dict = Depends(require_role([UserRole.BRAND, UserRole.ADMIN])),
+    principal: dict = Depends(get_current_principal)
 ):
     # Get assignment details
     assignment = await db.assignments.find_one({"id": payout_data["assignment_id"]})
@@ -2144,8 +2733,8 @@ async def create_payout(
     # Get campaign to verify brand ownership
     campaign = await db.campaigns.find_one({"id": assignment["campaign_id"]})
     if user["role"] == "brand":
-        brand = await db.brands.find_one({"user_id": user["id"]})
-        if campaign["brand_id"] != brand["id"]:
+        brand_id = principal["brand_id"]
+        if campaign["brand_id"] != brand_id:
             raise HTTPException(status_code=403, detail="Not authorized")
     
     # Verify influencer has payment details
@@ -2174,77 +2763,107 @@ async def create_payout(
     payout_doc['updated_at'] = payout_doc['updated_at'].isoformat()
     
     await db.payouts.insert_one(payout_doc)
+    await stats_rollups.payout_created(payout_doc)
     await log_audit(user["id"], "create", "payout", payout.id, {"amount": payout.amount})
     
     return {"id": payout.id, "message": "Payout created"}
 
+async def _payout_list_totals(query: Dict[str, Any]):
+    """
+    Matching count plus pending/paid sums in a single $facet aggregation.
+    The sums ignore any status filter, as the summary always shows both figures.
+    """
+    base_query = {k: v for k, v in query.items() if k != "status"}
+    count_stage = [{"$match": {"status": query["status"]}}] if "status" in query else []
+    result = await db.payouts.aggregate([
+        {"$match": base_query},
+        {"$facet": {
+            "count": count_stage + [{"$count": "n"}],
+            "totals": [{"$group": {
+                "_id": None,
+                "total_pending": {"$sum": {"$cond": [{"$eq": ["$status", PayoutStatus.PENDING.value]}, "$amount", 0]}},
+                "total_paid": {"$sum": {"$cond": [{"$eq": ["$status", PayoutStatus.PAID.value]}, "$amount", 0]}}
+            }}]
+        }}
+    ]).to_list(1)
+    facet = result[0] if result else {"count": [], "totals": []}
+    total = facet["count"][0]["n"] if facet["count"] else 0
+    totals = facet["totals"][0] if facet["totals"] else {}
+    return total, {
+        "total_pending": totals.get("total_pending", 0),
+        "total_paid": totals.get("total_paid", 0)
+    }
+
 @api_router.get("/payouts")
 async def list_payouts(
     page: int = Query(1, ge=1),
     page_size: int = Query(20, ge=1, le=100),
     status: Optional[str] = None,
-    user: dict = Depends(get_current_user)
+    cursor: Optional[str] = CURSOR_QUERY,
+    include_total: bool = INCLUDE_TOTAL_QUERY,
+    user: dict = Depends(get_current_user),
+    principal: dict = Depends(get_current_principal)
 ):
     skip = (page - 1) * page_size
     query = {}
     
     if user["role"] == "influencer":
-        influencer = await db.influencers.find_one({"user_id": user["id"]})
-        query["influencer_id"] = influencer["id"]
+        influencer_id = principal["influencer_id"]
+        query["influencer_id"] = influencer_id
     elif user["role"] == "brand":
-        brand = await db.brands.find_one({"user_id": user["id"]})
-        query["brand_id"] = brand["id"]
+        brand_id = principal["brand_id"]
+        query["brand_id"] = brand_id
     
     if status:
         query["status"] = status
     
-    payouts = await db.payouts.find(query, {"_id": 0}).sort("created_at", -1).skip(skip).limit(page_size).to_list(page_size)
-    total = await db.payouts.count_documents(query)
+    next_cursor = None
+    if cursor is not None:
+        payouts, next_cursor, _ = await _keyset_listing(db.payouts, query, cursor, page_size, False)
+    else:
+        payouts = await db.payouts.find(query, {"_id": 0}).sort("created_at", -1).skip(skip).limit(page_size).to_list(page_size)
     
-    # Calculate totals for summary
-    total_pending = await db.payouts.aggregate([
-        {"$match": {**query, "status": "pending"}},
-        {"$group": {"_id": None, "total": {"$sum": "$amount"}}}
-    ]).to_list(1)
-    total_paid = await db.payouts.aggregate([
-        {"$match": {**query, "status": "paid"}},
-        {"$group": {"_id": None, "total": {"$sum": "$amount"}}}
-    ]).to_list(1)
+    # Count and summary totals (in cursor mode only when totals are requested)
+    total, summary = None, None
+    if cursor is None or include_total:
+        total, summary = await _payout_list_totals(query)
     
     # Enrich with assignment, campaign, and influencer data
+    assignments, campaigns, influencers = await asyncio.gather(
+        _find_by_ids(db.assignments, {p["assignment_id"] for p in payouts}, {"_id": 0}),
+        _find_by_ids(db.campaigns, {p["campaign_id"] for p in payouts}, {"_id": 0, "id": 1, "title": 1}),
+        _find_by_ids(db.influencers, {p["influencer_id"] for p in payouts}, {"_id": 0})
+    )
     for payout in payouts:
-        assignment = await db.assignments.find_one({"id": payout["assignment_id"]}, {"_id": 0})
-        campaign = await db.campaigns.find_one({"id": payout["campaign_id"]}, {"_id": 0, "title": 1})
-        influencer = await db.influencers.find_one({"id": payout["influencer_id"]}, {"_id": 0})
-        payout["assignment"] = assignment
-        payout["campaign"] = campaign
-        payout["influencer"] = influencer
+        campaign = campaigns.get(payout["campaign_id"])
+        payout["assignment"] = assignments.get(payout["assignment_id"])
+        payout["campaign"] = {k: v for k, v in campaign.items() if k != "id"} if campaign else None
+        payout["influencer"] = influencers.get(payout["influencer_id"])
     
+    if cursor is not None:
+        return _cursor_response(payouts, page_size, next_cursor, total, summary=summary)
     return {
         "data": payouts,
         "page": page,
         "page_size": page_size,
         "total": total,
-        "summary": {
-            "total_pending": total_pending[0]["total"] if total_pending else 0,
-            "total_paid": total_paid[0]["total"] if total_paid else 0
-        }
+        "summary": summary
     }
 
 @api_router.get("/payouts/{payout_id}")
-async def get_payout(payout_id: str, user: dict = Depends(get_current_user)):
+async def get_payout(payout_id: str, user: dict = Depends(get_current_user), principal: dict = Depends(get_current_principal)):
     payout = await db.payouts.find_one({"id": payout_id}, {"_id": 0})
     if not payout:
         raise HTTPException(status_code=404, detail="Payout not found")
     
     # Check authorization
     if user["role"] == "influencer":
-        influencer = await db.influencers.find_one({"user_id": user["id"]})
-        if payout["influencer_id"] != influencer["id"]:
+        influencer_id = principal["influencer_id"]
+        if payout["influencer_id"] != influencer_id:
             raise HTTPException(status_code=403, detail="Not authorized")
     elif user["role"] == "brand":
-        brand = await db.brands.find_one({"user_id": user["id"]})
-        if payout["brand_id"] != brand["id"]:
+        brand_id = principal["brand_id"]
+        if payout["brand_id"] != brand_id:
             raise HTTPException(status_code=403, detail="Not authorized")
     
     return payout
@@ -2271,10 +2890,13 @@ async def update_payout_status(
     if "notes" in status_data:
         update_data["notes"] = status_data["notes"]
     
-    await db.payouts.update_one(
+    # Returns the pre-update document, so concurrent updates each see the status they replaced
+    previous = await db.payouts.find_one_and_update(
         {"id": payout_id},
         {"$set": update_data}
     )
+    if previous:
+        await stats_rollups.payout_status_changed(previous, status_data["status"])
     
     await log_audit(user["id"], "update_status", "payout", payout_id, {"status": status_data["status"]})
     
@@ -2289,39 +2911,33 @@ async def get_influencer_payout_summary(user: dict = Depends(require_role([UserR
     if not influencer:
         raise HTTPException(status_code=404, detail="Influencer profile not found")
     
-    # Get pending payouts
+    # Totals come from the influencer rollup and cover every payout
+    rollup = await stats_rollups.get(RollupScope.INFLUENCER, influencer["id"])
+    pending_by_type = rollup["pending_by_type"]
+    
+    # Most recent pending payouts for the list
     pending_payouts = await db.payouts.find({
         "influencer_id": influencer["id"],
         "status": "pending"
-    }, {"_id": 0}).to_list(100)
-    
-    # Calculate totals
-    total_pending = sum(p.get("amount", 0) for p in pending_payouts)
-    
-    # Get paid payouts total
-    paid_result = await db.payouts.aggregate([
-        {"$match": {"influencer_id": influencer["id"], "status": "paid"}},
-        {"$group": {"_id": None, "total": {"$sum": "$amount"}}}
-    ]).to_list(1)
-    total_paid = paid_result[0]["total"] if paid_result else 0
-    
-    # Get breakdown by type
-    pending_reimbursements = sum(p.get("amount", 0) for p in pending_payouts if p.get("payout_type") == "reimbursement")
-    pending_commissions = sum(p.get("amount", 0) for p in pending_payouts if p.get("payout_type") in ["commission", "review_bonus"])
+    }, {"_id": 0}).sort("created_at", -1).to_list(100)
     
     # Enrich pending payouts with campaign info
+    campaign_ids = list({p["campaign_id"] for p in pending_payouts})
+    campaigns = {
+        c["id"]: {"title": c.get("title")}
+        for c in await db.campaigns.find({"id": {"$in": campaign_ids}}, {"_id": 0, "id": 1, "title": 1}).to_list(None)
+    }
     for payout in pending_payouts:
-        campaign = await db.campaigns.find_one({"id": payout["campaign_id"]}, {"_id": 0, "title": 1})
-        payout["campaign"] = campaign
+        payout["campaign"] = campaigns.get(payout["campaign_id"])
     
     return {
         "paypal_email": influencer.get("paypal_email"),
-        "total_pending": total_pending,
-        "total_paid": total_paid,
-        "pending_reimbursements": pending_reimbursements,
-        "pending_commissions": pending_commissions,
+        "total_pending": rollup["payouts_pending"],
+        "total_paid": rollup["payouts_paid"],
+        "pending_reimbursements": pending_by_type["reimbursement"],
+        "pending_commissions": pending_by_type["commission"] + pending_by_type["review_bonus"],
         "pending_payouts": pending_payouts,
-        "payout_count": len(pending_payouts)
+        "payout_count": rollup["payouts_pending_count"]
     }
 
 
@@ -2330,14 +2946,15 @@ async def get_influencer_payout_summary(user: dict = Depends(require_role([UserR
 async def update_campaign_landing_page(
     campaign_id: str,
     landing_data: Dict[str, Any],
-    user: dict = Depends(require_role([UserRole.BRAND]))
+    user: dict = Depends(require_role([UserRole.BRAND])),
+    principal: dict = Depends(get_current_principal)
 ):
     campaign = await db.campaigns.find_one({"id": campaign_id})
     if not campaign:
         raise HTTPException(status_code=404, detail="Campaign not found")
     
-    brand = await db.brands.find_one({"user_id": user["id"]})
-    if campaign["brand_id"] != brand["id"]:
+    brand_id = principal["brand_id"]
+    if campaign["brand_id"] != brand_id:
         raise HTTPException(status_code=403, detail="Not authorized")
     
     # Generate slug if not provided
@@ -2458,19 +3075,20 @@ async def get_admin_landing_content(user: dict = Depends(require_role([UserRole.
 @api_router.post("/influencer/payment-details")
 async def create_payment_details(
     payment_data: Dict[str, Any],
-    user: dict = Depends(require_role([UserRole.INFLUENCER]))
+    user: dict = Depends(require_role([UserRole.INFLUENCER])),
+    principal: dict = Depends(get_current_principal)
 ):
-    influencer = await db.influencers.find_one({"user_id": user["id"]})
-    if not influencer:
+    influencer_id = principal["influencer_id"]
+    if not influencer_id:
         raise HTTPException(status_code=404, detail="Influencer profile not found")
     
     # Check if payment details already exist
-    existing = await db.payment_details.find_one({"influencer_id": influencer["id"]})
+    existing = await db.payment_details.find_one({"influencer_id": influencer_id})
     if existing:
         raise HTTPException(status_code=400, detail="Payment details already exist. Use PUT to update.")
     
     payment_details = PaymentDetails(
-        influencer_id=influencer["id"],
+        influencer_id=influencer_id,
         account_holder_name=payment_data["account_holder_name"],
         account_number=payment_data["account_number"],
         routing_number=payment_data["routing_number"],
@@ -2492,13 +3110,14 @@ async def create_payment_details(
 @api_router.put("/influencer/payment-details")
 async def update_payment_details(
     payment_data: Dict[str, Any],
-    user: dict = Depends(require_role([UserRole.INFLUENCER]))
+    user: dict = Depends(require_role([UserRole.INFLUENCER])),
+    principal: dict = Depends(get_current_principal)
 ):
-    influencer = await db.influencers.find_one({"user_id": user["id"]})
-    if not influencer:
+    influencer_id = principal["influencer_id"]
+    if not influencer_id:
         raise HTTPException(status_code=404, detail="Influencer profile not found")
     
-    existing = await db.payment_details.find_one({"influencer_id": influencer["id"]})
+    existing = await db.payment_details.find_one({"influencer_id": influencer_id})
     
     update_data = {
         "account_holder_name": payment_data["account_holder_name"],
@@ -2514,7 +3133,7 @@ async def update_payment_details(
     if existing:
         # Update existing
         await db.payment_details.update_one(
-            {"influencer_id": influencer["id"]},
+            {"influencer_id": influencer_id},
             {"$set": update_data}
         )
         await log_audit(user["id"], "update", "payment_details", existing["id"])
@@ -2522,7 +3141,7 @@ async def update_payment_details(
     else:
         # Create new if doesn't exist
         payment_details = PaymentDetails(
-            influencer_id=influencer["id"],
+            influencer_id=influencer_id,
             **{k: v for k, v in update_data.items() if k != "updated_at"}
         )
         payment_doc = payment_details.model_dump()
@@ -2534,12 +3153,12 @@ async def update_payment_details(
         return {"message": "Payment details created successfully"}
 
 @api_router.get("/influencer/payment-details")
-async def get_payment_details(user: dict = Depends(require_role([UserRole.INFLUENCER]))):
-    influencer = await db.influencers.find_one({"user_id": user["id"]})
-    if not influencer:
+async def get_payment_details(user: dict = Depends(require_role([UserRole.INFLUENCER])), principal: dict = Depends(get_current_principal)):
+    influencer_id = principal["influencer_id"]
+    if not influencer_id:
         raise HTTPException(status_code=404, detail="Influencer profile not found")
     
-    payment_details = await db.payment_details.find_one({"influencer_id": influencer["id"]}, {"_id": 0})
+    payment_details = await db.payment_details.find_one({"influencer_id": influencer_id}, {"_id": 0})
     
     if not payment_details:
         return {"has_payment_details": False, "data": None}
@@ -2550,26 +3169,36 @@ async def get_payment_details(user: dict = Depends(require_role([UserRole.INFLUE
 async def get_transactions(
     page: int = Query(1, ge=1),
     page_size: int = Query(20, ge=1, le=100),
-    user: dict = Depends(require_role([UserRole.INFLUENCER]))
+    cursor: Optional[str] = CURSOR_QUERY,
+    include_total: bool = INCLUDE_TOTAL_QUERY,
+    user: dict = Depends(require_role([UserRole.INFLUENCER])),
+    principal: dict = Depends(get_current_principal),
+    loader: DataLoader = Depends(get_loader)
 ):
-    influencer = await db.influencers.find_one({"user_id": user["id"]})
-    if not influencer:
+    influencer_id = principal["influencer_id"]
+    if not influencer_id:
         raise HTTPException(status_code=404, detail="Influencer profile not found")
     
     skip = (page - 1) * page_size
     
     # Get all payouts for this influencer as transactions
-    payouts = await db.payouts.find(
-        {"influencer_id": influencer["id"]},
-        {"_id": 0}
-    ).sort("created_at", -1).skip(skip).limit(page_size).to_list(page_size)
-    
-    total = await db.payouts.count_documents({"influencer_id": influencer["id"]})
+    next_cursor = None
+    if cursor is not None:
+        payouts, next_cursor, total = await _keyset_listing(
+            db.payouts, {"influencer_id": influencer_id}, cursor, page_size, include_total
+        )
+    else:
+        payouts = await db.payouts.find(
+            {"influencer_id": influencer_id},
+            {"_id": 0}
+        ).sort("created_at", -1).skip(skip).limit(page_size).to_list(page_size)
+        
+        total = await db.payouts.count_documents({"influencer_id": influencer_id})
     
     # Transform payouts into transaction format
     transactions = []
-    for payout in payouts:
-        campaign = await db.campaigns.find_one({"id": payout["campaign_id"]}, {"_id": 0, "title": 1})
+    campaigns = await loader.load_many("campaigns", [p["campaign_id"] for p in payouts], fields=["title"])
+    for payout, campaign in zip(payouts, campaigns):
         transactions.append({
             "id": payout["id"],
             "amount": payout["amount"],
@@ -2582,6 +3211,8 @@ async def get_transactions(
             "campaign_title": campaign["title"] if campaign else "Unknown"
         })
     
+    if cursor is not None:
+        return _cursor_response(transactions, page_size, next_cursor, total)
     return {
         "data": transactions,
         "page": page,
@@ -2619,6 +3250,7 @@ async def update_user(
     update_data["updated_at"] = datetime.now(timezone.utc).isoformat()
     
     await db.users.update_one({"id": user_id}, {"$set": update_data})
+    invalidate_principal(user_id)
     await log_audit(user["id"], "update", "user", user_id, update_data)
     
     return {"message": "User updated successfully"}
@@ -2643,6 +3275,7 @@ async def update_user_status(
     }
     
     await db.users.update_one({"id": user_id}, {"$set": update_data})
+    invalidate_principal(user_id)
     await log_audit(user["id"], "update_status", "user", user_id, {"status": new_status})
     
     return {"message": f"User status updated to {new_status}"}
@@ -2661,118 +3294,152 @@ async def delete_user(user_id: str, user: dict = Depends(require_role([UserRole.
     }
     
     await db.users.update_one({"id": user_id}, {"$set": update_data})
+    invalidate_principal(user_id)
     await log_audit(user["id"], "delete", "user", user_id)
     
     return {"message": "User deleted successfully"}
 
 # Admin Reports endpoint
-@api_router.get("/admin/reports")
-async def get_admin_reports(user: dict = Depends(require_role([UserRole.ADMIN]))):
-    # Get all brands with their metrics
-    brands = await db.brands.find({}, {"_id": 0}).to_list(None)
+async def _user_emails(user_ids: List[str]) -> Dict[str, str]:
+    emails = {}
+    async for u in db.users.find({"id": {"$in": user_ids}}, {"_id": 0, "id": 1, "email": 1}):
+        emails[u["id"]] = u["email"]
+    return emails
+
+async def _admin_brand_report_rows(brands: List[dict]) -> List[dict]:
+    """Metrics for a page of brands, read from their stats rollups"""
+    emails, rollups = await asyncio.gather(
+        _user_emails([b["user_id"] for b in brands]),
+        stats_rollups.get_many(RollupScope.BRAND, [b["id"] for b in brands])
+    )
     
-    brand_reports = []
+    rows = []
     for brand in brands:
-        # Get brand user info
-        brand_user = await db.users.find_one({"id": brand["user_id"]}, {"_id": 0, "email": 1})
-        
-        # Count campaigns
-        total_campaigns = await db.campaigns.count_documents({"brand_id": brand["id"]})
-        
-        # Get all payouts for this brand
-        payouts = await db.payouts.find({"brand_id": brand["id"]}).to_list(None)
-        total_spent = sum(p["amount"] for p in payouts)
-        pending_payouts = sum(p["amount"] for p in payouts if p["status"] == "pending")
-        completed_payouts = sum(p["amount"] for p in payouts if p["status"] == "paid")
-        
-        # Count unique influencers working with this brand
-        assignments = await db.assignments.find({"campaign_id": {"$in": [c["id"] for c in await db.campaigns.find({"brand_id": brand["id"]}, {"_id": 0, "id": 1}).to_list(None)]}}).to_list(None)
-        unique_influencers = len(set(a["influencer_id"] for a in assignments))
-        
-        # Count applications
-        campaigns_ids = [c["id"] for c in await db.campaigns.find({"brand_id": brand["id"]}, {"_id": 0, "id": 1}).to_list(None)]
-        total_applications = await db.applications.count_documents({"campaign_id": {"$in": campaigns_ids}})
-        
-        # Count completed assignments
-        completed_assignments = await db.assignments.count_documents({
-            "campaign_id": {"$in": campaigns_ids},
-            "status": "completed"
-        })
-        
-        brand_reports.append({
+        rollup = rollups[brand["id"]]
+        rows.append({
             "brand_id": brand["id"],
             "company_name": brand["company_name"],
-            "email": brand_user["email"] if brand_user else "N/A",
+            "email": emails.get(brand["user_id"], "N/A"),
             "status": brand["status"],
-            "total_campaigns": total_campaigns,
-            "total_spent": total_spent,
-            "pending_payouts": pending_payouts,
-            "completed_payouts": completed_payouts,
-            "unique_influencers": unique_influencers,
-            "total_applications": total_applications,
-            "completed_assignments": completed_assignments,
+            "total_campaigns": rollup["campaigns"],
+            "total_spent": rollup["payouts_total"],
+            "pending_payouts": rollup["payouts_pending"],
+            "completed_payouts": rollup["payouts_paid"],
+            "unique_influencers": rollup["influencers"],
+            "total_applications": rollup["applications"],
+            "completed_assignments": rollup["assignments_completed"],
             "created_at": brand["created_at"]
         })
+    return rows
+
+async def _admin_influencer_report_rows(influencers: List[dict]) -> List[dict]:
+    """Metrics for a page of influencers: stats rollups plus one $in query per profile collection"""
+    influencer_ids = [i["id"] for i in influencers]
+    emails, rollups = await asyncio.gather(
+        _user_emails([i["user_id"] for i in influencers]),
+        stats_rollups.get_many(RollupScope.INFLUENCER, influencer_ids)
+    )
+    
+    with_payment_details = set()
+    async for pd in db.payment_details.find({"influencer_id": {"$in": influencer_ids}}, {"_id": 0, "influencer_id": 1}):
+        with_payment_details.add(pd["influencer_id"])
     
-    # Get all influencers with their earnings
-    influencers = await db.influencers.find({}, {"_id": 0}).to_list(None)
+    platforms = {}
+    async for p in db.influencer_platforms.find(
+        {"influencer_id": {"$in": influencer_ids}},
+        {"_id": 0, "influencer_id": 1, "platform": 1, "followers_count": 1}
+    ):
+        platforms.setdefault(p.pop("influencer_id"), []).append(p)
     
-    influencer_reports = []
+    rows = []
     for influencer in influencers:
-        # Get influencer user info
-        influencer_user = await db.users.find_one({"id": influencer["user_id"]}, {"_id": 0, "email": 1})
-        
-        # Get payment details status
-        payment_details = await db.payment_details.find_one({"influencer_id": influencer["id"]})
-        has_payment_details = payment_details is not None
-        
-        # Get all payouts
-        payouts = await db.payouts.find({"influencer_id": influencer["id"]}).to_list(None)
-        total_earnings = sum(p["amount"] for p in payouts)
-        pending_earnings = sum(p["amount"] for p in payouts if p["status"] == "pending")
-        paid_earnings = sum(p["amount"] for p in payouts if p["status"] == "paid")
-        
-        # Count assignments
-        total_assignments = await db.assignments.count_documents({"influencer_id": influencer["id"]})
-        completed_assignments = await db.assignments.count_documents({
-            "influencer_id": influencer["id"],
-            "status": "completed"
-        })
-        
-        # Count applications
-        total_applications = await db.applications.count_documents({"influencer_id": influencer["id"]})
-        
-        # Get platforms
-        platforms = await db.influencer_platforms.find({"influencer_id": influencer["id"]}, {"_id": 0, "platform": 1, "followers_count": 1}).to_list(None)
-        
-        influencer_reports.append({
+        rollup = rollups[influencer["id"]]
+        rows.append({
             "influencer_id": influencer["id"],
             "name": influencer["name"],
-            "email": influencer_user["email"] if influencer_user else "N/A",
+            "email": emails.get(influencer["user_id"], "N/A"),
             "status": influencer["status"],
             "profile_completed": influencer.get("profile_completed", False),
-            "has_payment_details": has_payment_details,
-            "total_earnings": total_earnings,
-            "pending_earnings": pending_earnings,
-            "paid_earnings": paid_earnings,
-            "total_assignments": total_assignments,
-            "completed_assignments": completed_assignments,
-            "total_applications": total_applications,
-            "platforms": platforms,
+            "has_payment_details": influencer["id"] in with_payment_details,
+            "total_earnings": rollup["payouts_total"],
+            "pending_earnings": rollup["payouts_pending"],
+            "paid_earnings": rollup["payouts_paid"],
+            "total_assignments": rollup["assignments"],
+            "completed_assignments": rollup["assignments_completed"],
+            "total_applications": rollup["applications"],
+            "platforms": platforms.get(influencer["id"], []),
             "created_at": influencer["created_at"]
         })
+    return rows
+
+@api_router.get("/admin/reports")
+async def get_admin_reports(
+    page: int = Query(1, ge=1),
+    page_size: int = Query(100, ge=1, le=500),
+    user: dict = Depends(require_role([UserRole.ADMIN]))
+):
+    """
+    Per-brand and per-influencer metrics, paginated (the same page/page_size applies to both lists).
+    Summary figures cover the whole platform, not just the current page.
+    """
+    skip = (page - 1) * page_size
+    brands_page, influencers_page, total_brands, total_influencers, platform = await asyncio.gather(
+        db.brands.find({}, {"_id": 0}).sort([("created_at", 1), ("id", 1)]).skip(skip).limit(page_size).to_list(page_size),
+        db.influencers.find({}, {"_id": 0}).sort([("created_at", 1), ("id", 1)]).skip(skip).limit(page_size).to_list(page_size),
+        db.brands.count_documents({}),
+        db.influencers.count_documents({}),
+        stats_rollups.get(RollupScope.PLATFORM, "all")
+    )
+    brand_reports, influencer_reports = await asyncio.gather(
+        _admin_brand_report_rows(brands_page),
+        _admin_influencer_report_rows(influencers_page)
+    )
+    
+    # Every payout carries both a brand_id and an influencer_id, so spending == earnings
+    total_payouts = platform["payouts_total"]
     
     return {
         "brands": brand_reports,
         "influencers": influencer_reports,
         "summary": {
-            "total_brands": len(brand_reports),
-            "total_influencers": len(influencer_reports),
-            "total_platform_spending": sum(b["total_spent"] for b in brand_reports),
-            "total_platform_earnings": sum(i["total_earnings"] for i in influencer_reports)
-        }
+            "total_brands": total_brands,
+            "total_influencers": total_influencers,
+            "total_platform_spending": total_payouts,
+            "total_platform_earnings": total_payouts
+        },
+        "page": page,
+        "page_size": page_size
     }
 
+ALLOWED_UPLOAD_EXTENSIONS = {
+    '.jpg', '.jpeg', '.png', '.gif', '.webp', '.svg',  # Images
+    '.mp4', '.mov', '.avi', '.webm', '.mkv',  # Videos
+    '.pdf', '.doc', '.docx', '.txt',  # Documents
+    '.zip', '.tar', '.gz'  # Archives
+}
+
+def upload_url(request: Request, filename: str) -> str:
+    """
+    Construct the URL dynamically based on request origin.
+    This makes it work in any environment (dev, staging, production)
+    """
+    origin = request.headers.get('origin', '')
+    host = request.headers.get('host', '')
+    
+    # Determine base URL from request
+    if origin:
+        base_url = origin
+    elif host:
+        # Determine protocol
+        forwarded_proto = request.headers.get('x-forwarded-proto', 'https')
+        base_url = f"{forwarded_proto}://{host}"
+    else:
+        # Fallback to environment variable
+        base_url = os.environ.get('REACT_APP_BACKEND_URL', 'http://localhost:8001')
+    
+    # Construct full URL using the /api/v1/files/ endpoint
+    return f"{base_url}/api/v1/files/{filename}"
+
 # File Upload Endpoint
 @api_router.post("/upload")
 async def upload_file(
@@ -2791,18 +3458,8 @@ async def upload_file(
         logger.error("Upload failed: No file provided")
         raise HTTPException(status_code=400, detail="No file provided")
     
-    # Validate file size (50MB limit)
-    MAX_FILE_SIZE = 50 * 1024 * 1024  # 50MB in bytes
-    content = await file.read()
-    if len(content) > MAX_FILE_SIZE:
-        logger.error(f"Upload failed: File too large ({len(content)} bytes)")
-        raise HTTPException(status_code=400, detail=f"File too large. Maximum size is 50MB")
-    
-    # Reset file pointer
-    await file.seek(0)
-    
     # Use fixed uploads directory
-    uploads_dir = Path("/app/backend/uploads")
+    uploads_dir = UPLOADS_DIR
     uploads_dir.mkdir(parents=True, exist_ok=True)
     
     # Set directory permissions (ignore errors in restrictive environments)
@@ -2814,30 +3471,17 @@ async def upload_file(
     # Generate unique filename with sanitization
     file_extension = Path(file.filename).suffix.lower()
     # Sanitize extension
-    allowed_extensions = {
-        '.jpg', '.jpeg', '.png', '.gif', '.webp', '.svg',  # Images
-        '.mp4', '.mov', '.avi', '.webm', '.mkv',  # Videos
-        '.pdf', '.doc', '.docx', '.txt',  # Documents
-        '.zip', '.tar', '.gz'  # Archives
-    }
-    
-    if file_extension not in allowed_extensions:
+    if file_extension not in ALLOWED_UPLOAD_EXTENSIONS:
         logger.warning(f"Potentially unsafe file extension: {file_extension}")
     
     unique_filename = f"{str(uuid.uuid4())}{file_extension}"
     file_path = uploads_dir / unique_filename
     
-    # Save file with comprehensive error handling
+    # Stream to disk in chunks (never the whole file in memory), failing fast when over the limit;
+    # content that's already stored is linked rather than written again
     try:
-        async with aiofiles.open(file_path, 'wb') as f:
-            content = await file.read()
-            await f.write(content)
-        
-        # Verify file was written
-        if not file_path.exists():
-            raise Exception("File was not created on disk")
-        
-        file_size = file_path.stat().st_size
+        stored = await upload_blobs.store(file, unique_filename, MAX_UPLOAD_BYTES, uploaded_by=user["id"])
+        file_size = stored.size
         if file_size == 0:
             raise Exception("File is empty after save")
         
@@ -2848,21 +3492,34 @@ async def upload_file(
             logger.warning(f"Could not set file permissions: {str(e)}")
         
         logger.info(f"File uploaded successfully: {unique_filename} ({file_size} bytes)")
+        uploads.inc(outcome="deduplicated" if stored.deduplicated else "stored")
+        # Resized copies for listing pages, rendered in the background
+        image_variants.submit(stored.sha256, unique_filename)
+        upload_bytes.inc(file_size)
+        if stored.deduplicated:
+            upload_deduplicated_bytes.inc(file_size)
         
+    except UploadTooLarge:
+        logger.error(f"Upload failed: File too large (over {MAX_UPLOAD_BYTES} bytes)")
+        uploads.inc(outcome="too_large")
+        raise HTTPException(status_code=413, detail=f"File too large. Maximum size is {MAX_UPLOAD_BYTES // (1024 * 1024)}MB")
     except PermissionError as e:
         logger.error(f"Permission denied when saving file: {str(e)}")
+        uploads.inc(outcome="error")
         raise HTTPException(
             status_code=500, 
             detail="Permission denied. Please contact administrator to fix upload directory permissions."
         )
     except OSError as e:
         logger.error(f"OS error when saving file: {str(e)}")
+        uploads.inc(outcome="error")
         raise HTTPException(
             status_code=500, 
             detail=f"Disk error: {str(e)}. Check disk space and permissions."
         )
     except Exception as e:
         logger.error(f"Unexpected error when saving file: {str(e)}")
+        uploads.inc(outcome="error")
         # Try to clean up partial file
         try:
             if file_path.exists():
@@ -2871,31 +3528,15 @@ async def upload_file(
             pass
         raise HTTPException(status_code=500, detail=f"Failed to save file: {str(e)}")
     
-    # Construct the URL dynamically based on request origin
-    # This makes it work in any environment (dev, staging, production)
-    origin = request.headers.get('origin', '')
-    host = request.headers.get('host', '')
-    
-    # Determine base URL from request
-    if origin:
-        base_url = origin
-    elif host:
-        # Determine protocol
-        forwarded_proto = request.headers.get('x-forwarded-proto', 'https')
-        base_url = f"{forwarded_proto}://{host}"
-    else:
-        # Fallback to environment variable
-        base_url = os.environ.get('REACT_APP_BACKEND_URL', 'http://localhost:8001')
-    
-    # Construct full URL using the /api/v1/files/ endpoint
-    file_url = f"{base_url}/api/v1/files/{unique_filename}"
+    file_url = upload_url(request, unique_filename)
     
     # Log audit
     try:
         await log_audit(user["id"], "upload", "file", unique_filename, {
             "original_name": file.filename,
             "size": file_size,
-            "extension": file_extension
+            "extension": file_extension,
+            "sha256": stored.sha256
         })
     except Exception as e:
         logger.warning(f"Failed to log audit: {str(e)}")
@@ -2909,66 +3550,262 @@ async def upload_file(
     }
 
 
+def resumable_upload_error(e: ResumableUploadError) -> HTTPException:
+    headers = {"Upload-Offset": str(e.offset)} if isinstance(e, OffsetMismatch) else None
+    return HTTPException(status_code=e.status_code, detail=str(e), headers=headers)
+
+@api_router.post("/uploads/resumable")
+async def create_resumable_upload(data: ResumableUploadCreate, user: dict = Depends(get_current_user)):
+    """
+    Start a resumable upload for files too large (or connections too flaky) for /upload.
+    PUT chunks of at most `chunk_size` bytes to /uploads/resumable/{upload_id}?offset=N
+    with an X-Chunk-SHA256 header, then POST /uploads/resumable/{upload_id}/complete.
+    """
+    if Path(data.filename).suffix.lower() not in ALLOWED_UPLOAD_EXTENSIONS:
+        logger.warning(f"Potentially unsafe file extension: {Path(data.filename).suffix.lower()}")
+    try:
+        state = await resumable_uploads.create(user["id"], data.filename, data.size, data.sha256)
+    except UploadTooLarge:
+        uploads.inc(outcome="too_large")
+        raise HTTPException(
+            status_code=413,
+            detail=f"File too large. Maximum size is {resumable_uploads.max_bytes // (1024 * 1024)}MB"
+        )
+    except ResumableUploadError as e:
+        raise resumable_upload_error(e)
+    return resumable_uploads.describe(state)
+
+@api_router.get("/uploads/resumable/{upload_id}")
+async def get_resumable_upload(upload_id: str, user: dict = Depends(get_current_user)):
+    """Where to resume: `offset` is how many bytes have been received"""
+    try:
+        state = await resumable_uploads.status(upload_id, user["id"])
+    except ResumableUploadError as e:
+        raise resumable_upload_error(e)
+    return resumable_uploads.describe(state)
+
+@api_router.put("/uploads/resumable/{upload_id}")
+async def put_resumable_upload_chunk(
+    upload_id: str,
+    request: Request,
+    offset: int = Query(..., ge=0),
+    chunk_sha256: str = Header(..., alias="X-Chunk-SHA256", pattern=SHA256_PATTERN.pattern),
+    user: dict = Depends(get_current_user)
+):
+    """Store one chunk (the raw request body) at `offset`; 409 with the current offset if it's not the next one"""
+    try:
+        state = await resumable_uploads.write_chunk(upload_id, user["id"], offset, chunk_sha256, request.stream())
+    except ResumableUploadError as e:
+        raise resumable_upload_error(e)
+    return resumable_uploads.describe(state)
+
+@api_router.post("/uploads/resumable/{upload_id}/complete")
+async def complete_resumable_upload(upload_id: str, request: Request, user: dict = Depends(get_current_user)):
+    """Publish a fully received upload; responds like /upload"""
+    try:
+        state, stored = await resumable_uploads.complete(upload_id, user["id"])
+    except ResumableUploadError as e:
+        raise resumable_upload_error(e)
+    
+    logger.info(f"Resumable upload completed: {stored.filename} ({stored.size} bytes)")
+    uploads.inc(outcome="deduplicated" if stored.deduplicated else "stored")
+    image_variants.submit(stored.sha256, stored.filename)
+    upload_bytes.inc(stored.size)
+    if stored.deduplicated:
+        upload_deduplicated_bytes.inc(stored.size)
+    
+    try:
+        await log_audit(user["id"], "upload", "file", stored.filename, {
+            "original_name": state["filename"],
+            "size": stored.size,
+            "extension": state["extension"],
+            "sha256": stored.sha256,
+            "resumable": True
+        })
+    except Exception as e:
+        logger.warning(f"Failed to log audit: {str(e)}")
+    
+    return {
+        "filename": stored.filename,
+        "original_filename": state["filename"],
+        "url": upload_url(request, stored.filename),
+        "size": stored.size,
+        "message": "File uploaded successfully"
+    }
+
+@api_router.delete("/uploads/resumable/{upload_id}")
+async def abort_resumable_upload(upload_id: str, user: dict = Depends(get_current_user)):
+    """Discard a resumable upload and the data received so far"""
+    try:
+        await resumable_uploads.abort(upload_id, user["id"])
+    except ResumableUploadError as e:
+        raise resumable_upload_error(e)
+    return {"message": "Upload aborted"}
+
+
+async def upload_hash(filename: str) -> Optional[str]:
+    """SHA-256 of an upload from the upload index, or None for files uploaded before it"""
+    sha256 = upload_hash_cache.get(filename)
+    if sha256 is None:
+        doc = await db.upload_files.find_one({"filename": filename}, {"_id": 0, "sha256": 1})
+        sha256 = doc["sha256"] if doc else ""
+        upload_hash_cache.set(filename, sha256)
+    return sha256 or None
+
 # Dynamic file serving endpoint - works across all environments
-@api_router.get("/files/{filename}")
-async def get_file(filename: str):
+@api_router.api_route("/files/{filename}", methods=["GET", "HEAD"])
+async def get_file(
+    filename: str,
+    request: Request,
+    w: Optional[int] = Query(None, ge=1, le=4096, description="Serve the nearest resized variant at least this wide")
+):
     """
     Serve uploaded files dynamically.
     This endpoint allows files to be accessed regardless of deployment environment.
+    Supports conditional requests (ETag / Last-Modified) and byte ranges for video seeking.
     """
     # Sanitize filename to prevent directory traversal
     safe_filename = Path(filename).name
     if safe_filename != filename or '..' in filename or '/' in filename:
         raise HTTPException(status_code=400, detail="Invalid filename")
     
-    uploads_dir = Path("/app/backend/uploads")
-    file_path = uploads_dir / safe_filename
-    
-    if not file_path.exists():
+    file_path = UPLOADS_DIR / safe_filename
+    # Dot-names are the blob store and in-progress uploads, not public files
+    if safe_filename.startswith('.') or not file_path.is_file():
         logger.warning(f"File not found: {safe_filename}")
         raise HTTPException(status_code=404, detail="File not found")
     
-    # Determine content type
-    extension = file_path.suffix.lower()
-    content_types = {
-        '.jpg': 'image/jpeg',
-        '.jpeg': 'image/jpeg',
-        '.png': 'image/png',
-        '.gif': 'image/gif',
-        '.webp': 'image/webp',
-        '.svg': 'image/svg+xml',
-        '.mp4': 'video/mp4',
-        '.mov': 'video/quicktime',
-        '.avi': 'video/x-msvideo',
-        '.webm': 'video/webm',
-        '.mkv': 'video/x-matroska',
-        '.pdf': 'application/pdf',
-        '.doc': 'application/msword',
-        '.docx': 'application/vnd.openxmlformats-officedocument.wordprocessingml.document',
-        '.txt': 'text/plain',
-        '.zip': 'application/zip',
-        '.tar': 'application/x-tar',
-        '.gz': 'application/gzip'
-    }
-    
-    content_type = content_types.get(extension, 'application/octet-stream')
-    
-    return FileResponse(
-        path=file_path,
-        media_type=content_type,
-        filename=safe_filename
+    # Uploads are never modified in place, so a UUID-named file can be cached forever
+    if UPLOAD_FILENAME_PATTERN.fullmatch(safe_filename):
+        cache_control = FILE_CACHE_CONTROL_IMMUTABLE
+    else:
+        cache_control = "public, no-cache"
+    
+    # Content hash as a strong ETag (shared by deduplicated copies), else size+mtime
+    sha256 = await upload_hash(safe_filename)
+    
+    if w is not None and sha256 and is_image(safe_filename):
+        variant = image_variants.best_variant(sha256, w)
+        if variant is not None:
+            variant_width, variant_path = variant
+            return file_response(
+                request.headers,
+                request.method,
+                variant_path,
+                f'"{sha256}-w{variant_width}"',
+                cache_control,
+                filename=f"{Path(safe_filename).stem}-w{variant_width}.webp"
+            )
+        if not image_variants.is_rendered(sha256):
+            # Not resized yet: don't let caches keep the original under this URL
+            cache_control = "public, no-cache"
+    
+    stat_result = file_path.stat()
+    etag = f'"{sha256}"' if sha256 else f'"{stat_result.st_size:x}-{stat_result.st_mtime_ns:x}"'
+    return file_response(
+        request.headers,
+        request.method,
+        file_path,
+        etag,
+        cache_control,
+        filename=safe_filename,
+        stat_result=stat_result
     )
 
-
 # Include router
 app.include_router(api_router)
 
 # Also keep static files mount as backup (for backwards compatibility)
 try:
-    app.mount("/api/uploads", StaticFiles(directory="/app/backend/uploads"), name="uploads")
+    app.mount("/api/uploads", StaticFiles(directory=UPLOADS_DIR), name="uploads")
 except Exception as e:
     logger.warning(f"Could not mount static files: {str(e)}")
 
+# Innermost, so oversized uploads still show up in the request metrics and get CORS headers
+app.add_middleware(
+    BodySizeLimit,
+    max_bytes=MAX_UPLOAD_BYTES + UPLOAD_BODY_OVERHEAD_BYTES,
+    path_prefixes=["/api/v1/upload"]
+)
+# Resumable upload chunks are capped by the chunk size instead
+app.add_middleware(
+    BodySizeLimit,
+    max_bytes=RESUMABLE_CHUNK_BYTES,
+    path_prefixes=["/api/v1/uploads/resumable"]
+)
+
+@app.middleware("http")
+async def request_query_metrics(request: Request, call_next):
+    """Per-request MongoDB command count, DB time and slowest command as headers, logs and route stats"""
+    token = begin_request()
+    started = time.perf_counter()
+    try:
+        response = await call_next(request)
+        total_ms = (time.perf_counter() - started) * 1000
+        queries = current_queries()
+        over = query_budget.exceeded(queries)
+
+        response.headers["X-Query-Count"] = str(queries.count)
+        response.headers["Server-Timing"] = queries.server_timing(total_ms)
+        if over:
+            response.headers["X-Query-Budget-Exceeded"] = ",".join(over)
+
+        # Template path (e.g. /api/v1/campaigns/{campaign_id}) so ids don't fan out the stats
+        route = request.scope.get("route")
+        route_key = f"{request.method} {route.path if route else request.url.path}"
+        if route is not None:
+            route_query_stats.record(route_key, queries, bool(over))
+
+        if REQUEST_METRICS_LOG == "all" or (over and REQUEST_METRICS_LOG == "budget"):
+            record = {
+                "event": "request_queries",
+                "route": route_key,
+                "path": request.url.path,
+                "status": response.status_code,
+                "duration_ms": round(total_ms, 2),
+                **queries.summary()
+            }
+            if over:
+                record["over_budget"] = over
+                logger.warning(json.dumps(record))
+            else:
+                logger.info(json.dumps(record))
+        return response
+    finally:
+        end_request(token)
+
+@app.middleware("http")
+async def http_metrics(request: Request, call_next):
+    """In-flight gauge and per-route latency histogram for /metrics"""
+    method = request.method
+    http_requests_in_flight.inc(method=method)
+    started = time.perf_counter()
+    status_code = 500
+    try:
+        response = await call_next(request)
+        status_code = response.status_code
+        return response
+    finally:
+        http_requests_in_flight.dec(method=method)
+        route = request.scope.get("route")
+        # Unmatched paths (scanners, typos) share one label instead of one series each
+        http_request_duration.observe(
+            time.perf_counter() - started,
+            method=method,
+            route=route.path if route else "unmatched",
+            status=str(status_code)
+        )
+
+@app.get("/metrics", include_in_schema=False)
+async def prometheus_metrics(request: Request):
+    """Prometheus text exposition of the metrics registry"""
+    if METRICS_TOKEN:
+        authorization = request.headers.get("authorization", "")
+        # Bytes, since compare_digest rejects non-ASCII str (a malformed header is a 401, not a 500)
+        if not hmac.compare_digest(authorization.encode(), f"Bearer {METRICS_TOKEN}".encode()):
+            raise HTTPException(status_code=401, detail="Invalid metrics token")
+    return Response(content=metrics.render(), media_type=METRICS_CONTENT_TYPE)
+
 app.add_middleware(
     CORSMiddleware,
     allow_credentials=True,
@@ -2985,4 +3822,12 @@ logger = logging.getLogger(__name__)
 
 @app.on_event("shutdown")
 async def shutdown_db_client():
+    await click_ingestor.stop()
+    await dashboard_stats.stop()
+    await event_loop_lag.stop()
+    await image_variants.stop()
+    await resumable_uploads.stop()
+    await email_outbox.stop()
+    password_hasher.shutdown()
+    await email_service.close()
     client.close()
\ No newline at end of file
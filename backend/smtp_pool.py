@@ -0,0 +1,161 @@
+"""
+Async SMTP connection pool for Influiv
+Keeps authenticated aiosmtplib connections open between messages so sending
+an email doesn't pay for connect + STARTTLS + AUTH every time, and never
+blocks the event loop
+"""
+
+import asyncio
+import time
+from typing import Any, Dict, List, Optional, Tuple
+import aiosmtplib
+import logging
+
+logger = logging.getLogger(__name__)
+
+# Errors after which a connection is discarded and the send retried on a fresh one
+RECONNECT_ERRORS = (
+    aiosmtplib.SMTPServerDisconnected,
+    aiosmtplib.SMTPConnectError,
+    aiosmtplib.SMTPTimeoutError,
+    ConnectionError,
+    OSError,
+)
+
+
+class _PooledConnection:
+    def __init__(self, smtp: aiosmtplib.SMTP):
+        self.smtp = smtp
+        self.last_used = time.monotonic()
+        self.messages_sent = 0
+
+
+class SMTPPool:
+    """
+    Pool of persistent SMTP connections for a single server/credential set.
+    At most `max_connections` are open at once; callers beyond that wait.
+    """
+
+    def __init__(
+        self,
+        host: str,
+        port: int,
+        username: Optional[str] = None,
+        password: Optional[str] = None,
+        max_connections: int = 4,
+        idle_timeout: float = 60.0,
+        max_messages_per_connection: int = 100,
+        timeout: float = 30.0
+    ):
+        self.host = host
+        self.port = port
+        self.username = username
+        self.password = password
+        self.max_connections = max_connections
+        self.idle_timeout = idle_timeout
+        self.max_messages_per_connection = max_messages_per_connection
+        self.timeout = timeout
+        self._idle: List[_PooledConnection] = []
+        self._slots = asyncio.Semaphore(max_connections)
+        self._closed = False
+
+        # Metrics
+        self.connections_opened = 0
+        self.reconnects = 0
+        self.sent = 0
+        self.failed = 0
+
+    @property
+    def config_key(self) -> Tuple:
+        return (self.host, self.port, self.username, self.password)
+
+    async def _connect(self) -> _PooledConnection:
+        smtp = aiosmtplib.SMTP(
+            hostname=self.host,
+            port=self.port,
+            use_tls=self.port == 465,
+            start_tls=self.port == 587,
+            timeout=self.timeout
+        )
+        await smtp.connect()
+        if self.username:
+            await smtp.login(self.username, self.password or "")
+        self.connections_opened += 1
+        return _PooledConnection(smtp)
+
+    @staticmethod
+    async def _discard(conn: _PooledConnection):
+        try:
+            if conn.smtp.is_connected:
+                await conn.smtp.quit()
+        except Exception:
+            conn.smtp.close()
+
+    def _is_reusable(self, conn: _PooledConnection) -> bool:
+        return (
+            conn.smtp.is_connected
+            and time.monotonic() - conn.last_used < self.idle_timeout
+            and conn.messages_sent < self.max_messages_per_connection
+        )
+
+    async def _checkout(self) -> _PooledConnection:
+        while self._idle:
+            conn = self._idle.pop()
+            if self._is_reusable(conn):
+                return conn
+            await self._discard(conn)
+        return await self._connect()
+
+    def _checkin(self, conn: _PooledConnection):
+        conn.last_used = time.monotonic()
+        if self._closed or not conn.smtp.is_connected:
+            conn.smtp.close()
+        else:
+            self._idle.append(conn)
+
+    async def send(self, sender: str, recipients: List[str], message: str):
+        """Send a raw message, retrying once on a fresh connection if the pooled one went stale"""
+        if self._closed:
+            raise RuntimeError("SMTP pool is closed")
+
+        async with self._slots:
+            conn = None
+            try:
+                conn = await self._checkout()
+                try:
+                    await conn.smtp.sendmail(sender, recipients, message)
+                except RECONNECT_ERRORS as e:
+                    logger.info(f"SMTP connection to {self.host} dropped ({str(e)}), reconnecting")
+                    conn.smtp.close()
+                    self.reconnects += 1
+                    conn = await self._connect()
+                    await conn.smtp.sendmail(sender, recipients, message)
+                conn.messages_sent += 1
+                self.sent += 1
+            except Exception:
+                self.failed += 1
+                if conn is not None:
+                    await self._discard(conn)
+                    conn = None
+                raise
+            finally:
+                if conn is not None:
+                    self._checkin(conn)
+
+    async def close(self):
+        self._closed = True
+        idle, self._idle = self._idle, []
+        for conn in idle:
+            await self._discard(conn)
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "host": self.host,
+            "port": self.port,
+            "max_connections": self.max_connections,
+            "idle_connections": len(self._idle),
+            "connections_opened": self.connections_opened,
+            "reconnects": self.reconnects,
+            "sent": self.sent,
+            "failed": self.failed
+        }
@@ -0,0 +1,450 @@
+"""
+Materialized stats rollups for Influiv
+Per-brand, per-influencer and platform-wide counters kept in the
+`stats_rollups` collection. Handlers bump them with $inc at the write points
+so reports and dashboards read one document per account instead of
+re-aggregating payouts/assignments/applications.
+
+Writes are not transactional with the source collections, so rollups can
+drift (crashes, manual DB edits). Repair with:
+    cd /app/backend && python -m stats_rollups [--brand ID ...] [--influencer ID ...]
+"""
+
+import argparse
+import asyncio
+import os
+from datetime import datetime, timezone
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+import logging
+
+from pymongo import ReplaceOne, UpdateOne
+from pymongo.errors import BulkWriteError, DuplicateKeyError
+
+logger = logging.getLogger(__name__)
+
+PAYOUT_TYPES = ("reimbursement", "commission", "review_bonus")
+DUPLICATE_KEY_ERROR = 11000
+REBUILD_CHUNK_SIZE = 500
+
+# Counter fields present on every brand/influencer/platform rollup
+COUNTER_FIELDS = (
+    "campaigns",
+    "applications",
+    "assignments",
+    "assignments_completed",
+    "influencers",
+    "payouts_count",
+    "payouts_total",
+    "payouts_pending",
+    "payouts_pending_count",
+    "payouts_paid",
+)
+
+
+class RollupScope:
+    BRAND = "brand"
+    INFLUENCER = "influencer"
+    PLATFORM = "platform"
+    # One marker per (brand, influencer) pair, used to count unique influencers per brand
+    BRAND_INFLUENCER = "brand_influencer"
+
+
+def rollup_id(scope: str, entity_id: str) -> str:
+    return f"{scope}:{entity_id}"
+
+
+def empty_rollup(scope: str, entity_id: str) -> Dict[str, Any]:
+    doc = {"id": rollup_id(scope, entity_id), "scope": scope, "entity_id": entity_id}
+    doc.update({field: 0 for field in COUNTER_FIELDS})
+    doc["pending_by_type"] = {payout_type: 0 for payout_type in PAYOUT_TYPES}
+    return doc
+
+
+def _payout_deltas(payout: Dict[str, Any], status: str, sign: int, count: bool) -> Dict[str, Any]:
+    """$inc deltas for adding (sign=1) or removing (sign=-1) a payout in the given status"""
+    amount = payout.get("amount", 0) * sign
+    deltas: Dict[str, Any] = {}
+    if count:
+        deltas["payouts_count"] = sign
+        deltas["payouts_total"] = amount
+    if status == "pending":
+        deltas["payouts_pending"] = amount
+        deltas["payouts_pending_count"] = sign
+        if payout.get("payout_type") in PAYOUT_TYPES:
+            deltas[f"pending_by_type.{payout['payout_type']}"] = amount
+    elif status == "paid":
+        deltas["payouts_paid"] = amount
+    return deltas
+
+
+def _merge(*deltas: Dict[str, Any]) -> Dict[str, Any]:
+    merged: Dict[str, Any] = {}
+    for delta in deltas:
+        for field, value in delta.items():
+            merged[field] = merged.get(field, 0) + value
+    return merged
+
+
+def _rollup_diff(before: Dict[str, Any], after: Dict[str, Any]) -> Dict[str, Any]:
+    """$inc deltas that turn `before` counters into `after` counters"""
+    deltas = {field: after[field] - before[field] for field in COUNTER_FIELDS}
+    for payout_type in PAYOUT_TYPES:
+        deltas[f"pending_by_type.{payout_type}"] = after["pending_by_type"][payout_type] - before["pending_by_type"][payout_type]
+    return deltas
+
+
+class StatsRollups:
+    """Incremental counters plus a from-scratch rebuild for drift repair"""
+
+    def __init__(self, db):
+        self.db = db
+        self.collection = db.stats_rollups
+
+    # ---------- incremental updates ----------
+
+    async def _inc(self, targets: Iterable[Tuple[str, str]], deltas: Dict[str, Any]):
+        """
+        Apply $inc to each (scope, entity_id) rollup, creating it if needed.
+        Failures are logged, not raised - the source write already succeeded and
+        a rebuild repairs any drift.
+        """
+        deltas = {field: value for field, value in deltas.items() if value}
+        if not deltas:
+            return
+        now = datetime.now(timezone.utc).isoformat()
+        for scope, entity_id in targets:
+            if not entity_id:
+                continue
+            update = {
+                "$inc": deltas,
+                "$set": {"updated_at": now},
+                "$setOnInsert": {"scope": scope, "entity_id": entity_id}
+            }
+            try:
+                try:
+                    await self.collection.update_one({"id": rollup_id(scope, entity_id)}, update, upsert=True)
+                except DuplicateKeyError:
+                    # Lost a concurrent upsert race; the document exists now
+                    await self.collection.update_one({"id": rollup_id(scope, entity_id)}, update)
+            except Exception as e:
+                logger.error(f"Failed to update {scope} rollup {entity_id}: {str(e)}")
+
+    @staticmethod
+    def _targets(brand_id: Optional[str], influencer_id: Optional[str]) -> List[Tuple[str, str]]:
+        return [
+            (RollupScope.BRAND, brand_id),
+            (RollupScope.INFLUENCER, influencer_id),
+            (RollupScope.PLATFORM, "all"),
+        ]
+
+    async def campaign_created(self, brand_id: str):
+        await self._inc(self._targets(brand_id, None), {"campaigns": 1})
+
+    async def application_created(self, brand_id: Optional[str], influencer_id: str):
+        await self._inc(self._targets(brand_id, influencer_id), {"applications": 1})
+
+    async def assignment_created(self, brand_id: Optional[str], influencer_id: str, status: str = ""):
+        deltas = {"assignments": 1, "assignments_completed": 1 if status == "completed" else 0}
+        await self._inc(self._targets(brand_id, influencer_id), deltas)
+        if not brand_id:
+            return
+
+        # First assignment between this brand and influencer -> one more unique influencer
+        try:
+            pair = await self.collection.find_one_and_update(
+                {"id": rollup_id(RollupScope.BRAND_INFLUENCER, f"{brand_id}:{influencer_id}")},
+                {
+                    "$inc": {"assignments": 1},
+                    "$setOnInsert": {
+                        "scope": RollupScope.BRAND_INFLUENCER,
+                        "entity_id": f"{brand_id}:{influencer_id}",
+                        "brand_id": brand_id
+                    }
+                },
+                upsert=True,
+                projection={"_id": 0, "assignments": 1}
+            )
+        except DuplicateKeyError:
+            # A concurrent assignment created the pair and counted the influencer
+            return
+        except Exception as e:
+            logger.error(f"Failed to update brand/influencer pair {brand_id}:{influencer_id}: {str(e)}")
+            return
+        # Without return_document the pre-update doc comes back: None means it was just created
+        if pair is None:
+            await self._inc([(RollupScope.BRAND, brand_id), (RollupScope.PLATFORM, "all")], {"influencers": 1})
+
+    async def campaign_deleted(self, brand_id: str, influencer_ids: Iterable[str]):
+        """
+        Recompute the accounts a deleted campaign counted towards.
+        Failures are logged, not raised - the delete already happened.
+        """
+        try:
+            await self.rebuild(brand_ids=[brand_id], influencer_ids=list(influencer_ids))
+        except Exception as e:
+            logger.error(f"Failed to rebuild rollups after deleting a campaign of brand {brand_id}: {str(e)}")
+
+    async def assignment_status_changed(self, brand_id: Optional[str], influencer_id: str, old_status: str, new_status: str):
+        was_completed = old_status == "completed"
+        is_completed = new_status == "completed"
+        if was_completed != is_completed:
+            await self._inc(self._targets(brand_id, influencer_id), {"assignments_completed": 1 if is_completed else -1})
+
+    async def payout_created(self, payout: Dict[str, Any]):
+        deltas = _payout_deltas(payout, payout.get("status", "pending"), 1, count=True)
+        await self._inc(self._targets(payout.get("brand_id"), payout.get("influencer_id")), deltas)
+
+    async def payout_status_changed(self, payout: Dict[str, Any], new_status: str):
+        old_status = payout.get("status", "pending")
+        if old_status == new_status:
+            return
+        deltas = _merge(
+            _payout_deltas(payout, old_status, -1, count=False),
+            _payout_deltas(payout, new_status, 1, count=False)
+        )
+        await self._inc(self._targets(payout.get("brand_id"), payout.get("influencer_id")), deltas)
+
+    # ---------- reads ----------
+
+    async def get_many(self, scope: str, entity_ids: List[str]) -> Dict[str, Dict[str, Any]]:
+        """Rollups for the given ids; ids without a rollup yet get an all-zero document"""
+        found = {}
+        async for doc in self.collection.find(
+            {"id": {"$in": [rollup_id(scope, entity_id) for entity_id in entity_ids]}},
+            {"_id": 0}
+        ):
+            found[doc["entity_id"]] = doc
+
+        rollups = {}
+        for entity_id in entity_ids:
+            doc = empty_rollup(scope, entity_id)
+            stored = found.get(entity_id, {})
+            doc.update({k: v for k, v in stored.items() if k != "pending_by_type"})
+            doc["pending_by_type"].update(stored.get("pending_by_type", {}))
+            rollups[entity_id] = doc
+        return rollups
+
+    async def get(self, scope: str, entity_id: str) -> Dict[str, Any]:
+        return (await self.get_many(scope, [entity_id]))[entity_id]
+
+    # ---------- rebuild ----------
+
+    def _payout_group(self, group_key: str) -> Dict[str, Any]:
+        def when(cond, value):
+            return {"$sum": {"$cond": [cond, value, 0]}}
+
+        is_pending = {"$eq": ["$status", "pending"]}
+        group = {
+            "_id": group_key,
+            "payouts_count": {"$sum": 1},
+            "payouts_total": {"$sum": "$amount"},
+            "payouts_pending": when(is_pending, "$amount"),
+            "payouts_pending_count": when(is_pending, 1),
+            "payouts_paid": when({"$eq": ["$status", "paid"]}, "$amount"),
+        }
+        for payout_type in PAYOUT_TYPES:
+            group[f"pending_{payout_type}"] = when(
+                {"$and": [is_pending, {"$eq": ["$payout_type", payout_type]}]}, "$amount"
+            )
+        return {"$group": group}
+
+    @staticmethod
+    def _apply_payout_row(doc: Dict[str, Any], row: Dict[str, Any]):
+        for field in ("payouts_count", "payouts_total", "payouts_pending", "payouts_pending_count", "payouts_paid"):
+            doc[field] += row[field]
+        for payout_type in PAYOUT_TYPES:
+            doc["pending_by_type"][payout_type] += row[f"pending_{payout_type}"]
+
+    async def _compute_brands(self, brand_ids: List[str]) -> Tuple[Dict[str, Dict[str, Any]], Dict[str, set]]:
+        docs = {brand_id: empty_rollup(RollupScope.BRAND, brand_id) for brand_id in brand_ids}
+        influencers_by_brand = {brand_id: set() for brand_id in brand_ids}
+
+        async for row in self.db.payouts.aggregate([
+            {"$match": {"brand_id": {"$in": brand_ids}}},
+            self._payout_group("$brand_id")
+        ]):
+            self._apply_payout_row(docs[row["_id"]], row)
+
+        brand_by_campaign = {}
+        async for campaign in self.db.campaigns.find({"brand_id": {"$in": brand_ids}}, {"_id": 0, "id": 1, "brand_id": 1}):
+            brand_by_campaign[campaign["id"]] = campaign["brand_id"]
+            docs[campaign["brand_id"]]["campaigns"] += 1
+        campaign_ids = list(brand_by_campaign.keys())
+
+        # Assignments/applications are keyed by campaign; fold the per-campaign groups into brands
+        async for row in self.db.assignments.aggregate([
+            {"$match": {"campaign_id": {"$in": campaign_ids}}},
+            {"$group": {
+                "_id": "$campaign_id",
+                "count": {"$sum": 1},
+                "completed": {"$sum": {"$cond": [{"$eq": ["$status", "completed"]}, 1, 0]}},
+                "influencer_ids": {"$addToSet": "$influencer_id"}
+            }}
+        ]):
+            brand_id = brand_by_campaign[row["_id"]]
+            docs[brand_id]["assignments"] += row["count"]
+            docs[brand_id]["assignments_completed"] += row["completed"]
+            influencers_by_brand[brand_id].update(row["influencer_ids"])
+
+        async for row in self.db.applications.aggregate([
+            {"$match": {"campaign_id": {"$in": campaign_ids}}},
+            {"$group": {"_id": "$campaign_id", "count": {"$sum": 1}}}
+        ]):
+            docs[brand_by_campaign[row["_id"]]]["applications"] += row["count"]
+
+        for brand_id, influencer_ids in influencers_by_brand.items():
+            docs[brand_id]["influencers"] = len(influencer_ids)
+        return docs, influencers_by_brand
+
+    async def _compute_influencers(self, influencer_ids: List[str]) -> Dict[str, Dict[str, Any]]:
+        docs = {influencer_id: empty_rollup(RollupScope.INFLUENCER, influencer_id) for influencer_id in influencer_ids}
+
+        async for row in self.db.payouts.aggregate([
+            {"$match": {"influencer_id": {"$in": influencer_ids}}},
+            self._payout_group("$influencer_id")
+        ]):
+            self._apply_payout_row(docs[row["_id"]], row)
+
+        async for row in self.db.assignments.aggregate([
+            {"$match": {"influencer_id": {"$in": influencer_ids}}},
+            {"$group": {
+                "_id": "$influencer_id",
+                "count": {"$sum": 1},
+                "completed": {"$sum": {"$cond": [{"$eq": ["$status", "completed"]}, 1, 0]}}
+            }}
+        ]):
+            docs[row["_id"]]["assignments"] = row["count"]
+            docs[row["_id"]]["assignments_completed"] = row["completed"]
+
+        async for row in self.db.applications.aggregate([
+            {"$match": {"influencer_id": {"$in": influencer_ids}}},
+            {"$group": {"_id": "$influencer_id", "count": {"$sum": 1}}}
+        ]):
+            docs[row["_id"]]["applications"] = row["count"]
+        return docs
+
+    async def _compute_platform(self) -> Dict[str, Any]:
+        doc = empty_rollup(RollupScope.PLATFORM, "all")
+        doc["campaigns"] = await self.db.campaigns.count_documents({})
+        doc["applications"] = await self.db.applications.count_documents({})
+        doc["assignments"] = await self.db.assignments.count_documents({})
+        doc["assignments_completed"] = await self.db.assignments.count_documents({"status": "completed"})
+        doc["influencers"] = await self.collection.count_documents({"scope": RollupScope.BRAND_INFLUENCER})
+        async for row in self.db.payouts.aggregate([self._payout_group(None)]):
+            self._apply_payout_row(doc, row)
+        return doc
+
+    async def _store(self, docs: Iterable[Dict[str, Any]]):
+        now = datetime.now(timezone.utc).isoformat()
+        requests = []
+        for doc in docs:
+            doc["updated_at"] = now
+            doc["rebuilt_at"] = now
+            requests.append(ReplaceOne({"id": doc["id"]}, doc, upsert=True))
+        if requests:
+            await self.collection.bulk_write(requests, ordered=False)
+
+    async def _store_pairs(self, influencers_by_brand: Dict[str, set]):
+        """
+        Make each brand's pair markers match `influencers_by_brand`. Upserts rather
+        than delete-and-insert, so a concurrent assignment_created (or another
+        worker rebuilding) creating the same pair doesn't fail the rebuild.
+        """
+        for brand_id, influencer_ids in influencers_by_brand.items():
+            entity_ids = [f"{brand_id}:{influencer_id}" for influencer_id in influencer_ids]
+            await self.collection.delete_many({
+                "scope": RollupScope.BRAND_INFLUENCER,
+                "brand_id": brand_id,
+                "entity_id": {"$nin": entity_ids}
+            })
+            if not entity_ids:
+                continue
+            requests = [
+                UpdateOne(
+                    {"id": rollup_id(RollupScope.BRAND_INFLUENCER, entity_id)},
+                    {"$setOnInsert": {"scope": RollupScope.BRAND_INFLUENCER, "entity_id": entity_id, "brand_id": brand_id}},
+                    upsert=True
+                )
+                for entity_id in entity_ids
+            ]
+            try:
+                await self.collection.bulk_write(requests, ordered=False)
+            except BulkWriteError as e:
+                # Duplicates are concurrent upserts of the same pair; it exists either way
+                errors = e.details.get("writeErrors", [])
+                if any(err.get("code") != DUPLICATE_KEY_ERROR for err in errors):
+                    raise
+
+    async def rebuild(self, brand_ids: Optional[List[str]] = None, influencer_ids: Optional[List[str]] = None) -> Dict[str, int]:
+        """
+        Recompute rollups from the source collections.
+        With no arguments every brand, influencer and the platform rollup are rebuilt.
+        Otherwise only the given accounts are; the platform rollup is shifted by the
+        change in those brands (every campaign/application/assignment/payout belongs
+        to exactly one brand).
+        Increments that land while an account is being recomputed may be overwritten,
+        so run full rebuilds during quiet periods.
+        """
+        full = brand_ids is None and influencer_ids is None
+        if full:
+            brand_ids = await self.db.brands.distinct("id")
+            influencer_ids = await self.db.influencers.distinct("id")
+        brand_ids = list(brand_ids or [])
+        influencer_ids = list(influencer_ids or [])
+
+        for start in range(0, len(brand_ids), REBUILD_CHUNK_SIZE):
+            chunk = brand_ids[start:start + REBUILD_CHUNK_SIZE]
+            before = {} if full else await self.get_many(RollupScope.BRAND, chunk)
+            docs, influencers_by_brand = await self._compute_brands(chunk)
+            await self._store_pairs(influencers_by_brand)
+            await self._store(docs.values())
+            if not full:
+                await self._inc([(RollupScope.PLATFORM, "all")], _merge(*(
+                    _rollup_diff(before[brand_id], doc) for brand_id, doc in docs.items()
+                )))
+
+        for start in range(0, len(influencer_ids), REBUILD_CHUNK_SIZE):
+            docs = await self._compute_influencers(influencer_ids[start:start + REBUILD_CHUNK_SIZE])
+            await self._store(docs.values())
+
+        if full:
+            await self._store([await self._compute_platform()])
+        logger.info(f"Rebuilt stats rollups for {len(brand_ids)} brands and {len(influencer_ids)} influencers")
+        return {"brands": len(brand_ids), "influencers": len(influencer_ids)}
+
+    async def ensure_built(self):
+        """Full rebuild if the platform rollup is missing (fresh deploy or emptied collection)"""
+        try:
+            if await self.collection.find_one({"id": rollup_id(RollupScope.PLATFORM, "all")}, {"_id": 1}) is None:
+                logger.info("No stats rollups found, building them from scratch")
+                await self.rebuild()
+        except Exception as e:
+            logger.error(f"Failed to build stats rollups: {str(e)}")
+
+
+async def _main():
+    from pathlib import Path
+    from dotenv import load_dotenv
+    from motor.motor_asyncio import AsyncIOMotorClient
+
+    parser = argparse.ArgumentParser(description="Rebuild stats_rollups from payouts/assignments/applications")
+    parser.add_argument("--brand", action="append", dest="brand_ids", help="rebuild only this brand id (repeatable)")
+    parser.add_argument("--influencer", action="append", dest="influencer_ids", help="rebuild only this influencer id (repeatable)")
+    args = parser.parse_args()
+
+    load_dotenv(Path(__file__).parent / '.env')
+    logging.basicConfig(
+        level=logging.INFO,
+        format='%(asctime)s - %(name)s - %(levelname)s - %(message)s'
+    )
+
+    client = AsyncIOMotorClient(os.environ['MONGO_URL'])
+    try:
+        result = await StatsRollups(client[os.environ['DB_NAME']]).rebuild(args.brand_ids, args.influencer_ids)
+        print(f"Rebuilt rollups: {result}")
+    finally:
+        client.close()
+
+
+if __name__ == "__main__":
+    asyncio.run(_main())
@@ -0,0 +1,291 @@
+"""
+Content-addressed upload storage for Influiv
+Every upload is stored once per distinct content, as uploads/.blobs/<aa>/<sha256>,
+and its public UUID filename is a hard link to that blob - so repeated
+screenshots cost no extra disk, and existing URLs, /files/{filename} and the
+/api/uploads static mount keep working unchanged.
+upload_files maps public filenames to blobs; upload_blobs counts references.
+`python -m upload_blobs migrate` indexes (and dedups) files uploaded before this,
+`python -m upload_blobs gc` removes uploads nothing points at any more.
+"""
+
+import argparse
+import asyncio
+import hashlib
+import os
+import re
+import shutil
+import uuid
+from datetime import datetime, timezone, timedelta
+from pathlib import Path
+from typing import Any, Dict, List, NamedTuple, Set
+from pymongo.errors import DuplicateKeyError
+import logging
+
+from upload_storage import stream_to_file, PARTIAL_SUFFIX
+
+logger = logging.getLogger(__name__)
+
+BLOB_DIR_NAME = ".blobs"
+# Derived files (e.g. resized image variants) per blob, removed along with it
+VARIANTS_DIR_NAME = ".variants"
+HASH_CHUNK_SIZE = 1024 * 1024
+
+# Public names are always "<uuid4><ext>" (see upload_file)
+UPLOAD_FILENAME_PATTERN = re.compile(
+    r"[0-9a-f]{8}-[0-9a-f]{4}-[0-9a-f]{4}-[0-9a-f]{4}-[0-9a-f]{12}\.[A-Za-z0-9]+"
+)
+
+# Collections whose documents hold upload URLs/filenames. Whole documents are
+# scanned, since campaign landing pages and landing content nest them in lists/HTML.
+REFERENCE_COLLECTIONS = (
+    "purchase_proofs",
+    "influencers",
+    "campaigns",
+    "landing_content",
+    "post_submissions",
+    "product_reviews",
+    "brands",
+)
+
+# An upload is only collectable once it's had time to be attached to whatever it was uploaded for
+DEFAULT_GC_GRACE = timedelta(hours=24)
+
+
+class StoredUpload(NamedTuple):
+    filename: str
+    size: int
+    sha256: str
+    deduplicated: bool
+
+
+def _link_or_copy(source: Path, target: Path):
+    """Hard link `target` to `source`, copying when the filesystem can't link"""
+    try:
+        os.link(source, target)
+    except OSError:
+        shutil.copyfile(source, target)
+
+
+def _sha256_file(path: Path) -> str:
+    digest = hashlib.sha256()
+    with open(path, 'rb') as f:
+        for chunk in iter(lambda: f.read(HASH_CHUNK_SIZE), b""):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+def referenced_filenames(value: Any, found: Set[str]):
+    """Collect upload filenames appearing anywhere in a (nested) document value"""
+    if isinstance(value, str):
+        found.update(UPLOAD_FILENAME_PATTERN.findall(value))
+    elif isinstance(value, dict):
+        for item in value.values():
+            referenced_filenames(item, found)
+    elif isinstance(value, (list, tuple)):
+        for item in value:
+            referenced_filenames(item, found)
+
+
+class UploadBlobStore:
+    """Stores uploads by content hash behind stable public filenames"""
+
+    def __init__(self, db, uploads_dir: Path):
+        self.db = db
+        self.uploads_dir = uploads_dir
+        self.blobs_dir = uploads_dir / BLOB_DIR_NAME
+
+    def blob_path(self, sha256: str) -> Path:
+        return self.blobs_dir / sha256[:2] / sha256
+
+    def variants_dir(self, sha256: str) -> Path:
+        return self.uploads_dir / VARIANTS_DIR_NAME / sha256[:2] / sha256
+
+    async def store(self, source, filename: str, max_bytes: int, uploaded_by: str = None) -> StoredUpload:
+        """
+        Stream `source` into the store and publish it as `filename`.
+        Content that's already stored is only linked, never written twice.
+        Raises UploadTooLarge (nothing kept) like stream_to_file.
+        """
+        self.blobs_dir.mkdir(parents=True, exist_ok=True)
+        staged = await stream_to_file(source, self.blobs_dir / f".{uuid.uuid4()}{PARTIAL_SUFFIX}", max_bytes)
+        return await self.store_staged(staged.path, staged.sha256, staged.size, filename, uploaded_by)
+
+    async def store_staged(self, path: Path, sha256: str, size: int, filename: str, uploaded_by: str = None) -> StoredUpload:
+        """
+        Publish a file already written (and hashed) on the uploads filesystem as
+        `filename`, without reading it again. `path` is moved or removed.
+        """
+        self.blobs_dir.mkdir(parents=True, exist_ok=True)
+        try:
+            deduplicated = await asyncio.to_thread(self._publish, path, sha256, filename)
+        finally:
+            path.unlink(missing_ok=True)
+
+        await self._index(filename, sha256, size, uploaded_by)
+        if deduplicated:
+            logger.info(f"Upload {filename} deduplicated against blob {sha256[:12]}")
+        return StoredUpload(filename, size, sha256, deduplicated)
+
+    def _publish(self, staged: Path, sha256: str, filename: str) -> bool:
+        """Move staged content into the blob store (unless present) and link the public name; True if deduplicated"""
+        blob = self.blob_path(sha256)
+        deduplicated = blob.exists()
+        if not deduplicated:
+            blob.parent.mkdir(exist_ok=True)
+            os.replace(staged, blob)
+        _link_or_copy(blob, self.uploads_dir / filename)
+        return deduplicated
+
+    async def _index(self, filename: str, sha256: str, size: int, uploaded_by: str = None):
+        now = datetime.now(timezone.utc).isoformat()
+        await self.db.upload_files.insert_one({
+            "filename": filename,
+            "sha256": sha256,
+            "size": size,
+            "uploaded_by": uploaded_by,
+            "created_at": now
+        })
+        await self.db.upload_blobs.update_one(
+            {"sha256": sha256},
+            {"$inc": {"refcount": 1}, "$setOnInsert": {"size": size, "created_at": now}},
+            upsert=True
+        )
+
+    async def migrate(self) -> Dict[str, int]:
+        """
+        Index files uploaded before the blob store existed, replacing duplicates
+        with hard links to one blob. Safe to re-run; indexed files are skipped.
+        """
+        indexed = {doc["filename"] async for doc in self.db.upload_files.find({}, {"_id": 0, "filename": 1})}
+        self.blobs_dir.mkdir(parents=True, exist_ok=True)
+        result = {"indexed": 0, "deduplicated": 0, "bytes_saved": 0}
+
+        for path in sorted(self.uploads_dir.iterdir()):
+            if path.name.startswith(".") or not path.is_file() or path.name in indexed:
+                continue
+            sha256 = await asyncio.to_thread(_sha256_file, path)
+            size = path.stat().st_size
+            deduplicated = await asyncio.to_thread(self._adopt, path, sha256)
+            try:
+                await self._index(path.name, sha256, size)
+            except DuplicateKeyError:
+                # Indexed concurrently by an upload or another migrate run
+                continue
+            result["indexed"] += 1
+            if deduplicated:
+                result["deduplicated"] += 1
+                result["bytes_saved"] += size
+
+        logger.info(f"Upload migration: {result}")
+        return result
+
+    def _adopt(self, path: Path, sha256: str) -> bool:
+        """Make an existing public file share the blob inode; True if it was a duplicate"""
+        blob = self.blob_path(sha256)
+        if not blob.exists():
+            blob.parent.mkdir(exist_ok=True)
+            _link_or_copy(path, blob)
+            return False
+        if os.path.samefile(path, blob):
+            return False
+        # Swap the duplicate for a link atomically, so the public name never disappears
+        temp = self.uploads_dir / f".{uuid.uuid4()}{PARTIAL_SUFFIX}"
+        _link_or_copy(blob, temp)
+        os.replace(temp, path)
+        return True
+
+    async def gc(self, grace: timedelta = DEFAULT_GC_GRACE, dry_run: bool = False) -> Dict[str, Any]:
+        """
+        Remove public files no document references (older than `grace`), then
+        blobs whose reference count dropped to zero. Unindexed files are left alone.
+        """
+        referenced: Set[str] = set()
+        for collection in REFERENCE_COLLECTIONS:
+            async for doc in self.db[collection].find({}, {"_id": 0}):
+                referenced_filenames(doc, referenced)
+
+        cutoff = (datetime.now(timezone.utc) - grace).isoformat()
+        orphans = [
+            doc async for doc in self.db.upload_files.find(
+                {"created_at": {"$lt": cutoff}}, {"_id": 0, "filename": 1, "sha256": 1, "size": 1}
+            )
+            if doc["filename"] not in referenced
+        ]
+        result: Dict[str, Any] = {
+            "referenced": len(referenced),
+            "orphaned_files": len(orphans),
+            "removed_blobs": 0,
+            "bytes_freed": 0,
+            "dry_run": dry_run
+        }
+        if dry_run:
+            result["orphans"] = [doc["filename"] for doc in orphans]
+            return result
+
+        for doc in orphans:
+            (self.uploads_dir / doc["filename"]).unlink(missing_ok=True)
+            deleted = await self.db.upload_files.delete_one({"filename": doc["filename"]})
+            if deleted.deleted_count:
+                await self.db.upload_blobs.update_one({"sha256": doc["sha256"]}, {"$inc": {"refcount": -1}})
+
+        async for blob in self.db.upload_blobs.find({"refcount": {"$lte": 0}}, {"_id": 0, "sha256": 1, "size": 1}):
+            # Conditional delete: an upload of the same content may have just re-referenced it
+            deleted = await self.db.upload_blobs.delete_one({"sha256": blob["sha256"], "refcount": {"$lte": 0}})
+            if deleted.deleted_count:
+                self.blob_path(blob["sha256"]).unlink(missing_ok=True)
+                shutil.rmtree(self.variants_dir(blob["sha256"]), ignore_errors=True)
+                result["removed_blobs"] += 1
+                result["bytes_freed"] += blob.get("size", 0)
+
+        logger.info(f"Upload GC: {result}")
+        return result
+
+    async def stats(self) -> Dict[str, Any]:
+        files = await self.db.upload_files.count_documents({})
+        totals = await self.db.upload_blobs.aggregate([
+            {"$group": {"_id": None, "blobs": {"$sum": 1}, "stored_bytes": {"$sum": "$size"},
+                        "logical_bytes": {"$sum": {"$multiply": ["$size", "$refcount"]}}}}
+        ]).to_list(1)
+        totals = totals[0] if totals else {"blobs": 0, "stored_bytes": 0, "logical_bytes": 0}
+        return {
+            "files": files,
+            "blobs": totals["blobs"],
+            "stored_bytes": totals["stored_bytes"],
+            "logical_bytes": totals["logical_bytes"]
+        }
+
+
+async def _main():
+    from dotenv import load_dotenv
+    from motor.motor_asyncio import AsyncIOMotorClient
+
+    parser = argparse.ArgumentParser(description="Maintain the content-addressed upload store")
+    parser.add_argument("command", choices=["migrate", "gc", "stats"])
+    parser.add_argument("--uploads-dir", default="/app/backend/uploads")
+    parser.add_argument("--grace-hours", type=float, default=DEFAULT_GC_GRACE.total_seconds() / 3600,
+                        help="gc: keep unreferenced uploads younger than this")
+    parser.add_argument("--dry-run", action="store_true", help="gc: list orphans without deleting")
+    args = parser.parse_args()
+
+    load_dotenv(Path(__file__).parent / '.env')
+    logging.basicConfig(
+        level=logging.INFO,
+        format='%(asctime)s - %(name)s - %(levelname)s - %(message)s'
+    )
+
+    client = AsyncIOMotorClient(os.environ['MONGO_URL'])
+    try:
+        store = UploadBlobStore(client[os.environ['DB_NAME']], Path(args.uploads_dir))
+        if args.command == "migrate":
+            print(await store.migrate())
+        elif args.command == "gc":
+            print(await store.gc(timedelta(hours=args.grace_hours), dry_run=args.dry_run))
+        else:
+            print(await store.stats())
+    finally:
+        client.close()
+
+
+if __name__ == "__main__":
+    asyncio.run(_main())
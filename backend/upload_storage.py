@@ -0,0 +1,154 @@
+"""
+Streaming upload storage for Influiv
+Copies an upload to disk in fixed-size chunks, enforcing the size limit and
+hashing as it goes, into a temp file that is atomically renamed into place -
+so an upload never sits in memory whole and a failed one never leaves a
+truncated file under its public name.
+"""
+
+import hashlib
+import json
+import os
+import time
+import uuid
+from pathlib import Path
+from typing import NamedTuple
+from starlette.exceptions import HTTPException
+import aiofiles
+import logging
+
+logger = logging.getLogger(__name__)
+
+UPLOAD_CHUNK_SIZE = 1024 * 1024
+PARTIAL_SUFFIX = ".part"
+
+
+class UploadTooLarge(Exception):
+    """The upload exceeded the size limit; nothing was kept on disk"""
+
+    def __init__(self, max_bytes: int):
+        super().__init__(f"Upload exceeds {max_bytes} bytes")
+        self.max_bytes = max_bytes
+
+
+class StoredFile(NamedTuple):
+    path: Path
+    size: int
+    sha256: str
+
+
+async def stream_to_file(
+    source,
+    destination: Path,
+    max_bytes: int,
+    chunk_size: int = UPLOAD_CHUNK_SIZE
+) -> StoredFile:
+    """
+    Copy `source` (anything with `async read(n)`, e.g. an UploadFile) to `destination`.
+    Raises UploadTooLarge as soon as more than `max_bytes` have been read.
+    """
+    temp_path = destination.parent / f".{uuid.uuid4()}{PARTIAL_SUFFIX}"
+    digest = hashlib.sha256()
+    size = 0
+    try:
+        async with aiofiles.open(temp_path, 'wb') as f:
+            while True:
+                chunk = await source.read(chunk_size)
+                if not chunk:
+                    break
+                size += len(chunk)
+                if size > max_bytes:
+                    raise UploadTooLarge(max_bytes)
+                digest.update(chunk)
+                await f.write(chunk)
+        os.replace(temp_path, destination)
+    except BaseException:
+        # Includes cancellation when the client goes away mid-upload
+        try:
+            temp_path.unlink()
+        except FileNotFoundError:
+            pass
+        raise
+    return StoredFile(destination, size, digest.hexdigest())
+
+
+def remove_partial_uploads(directory: Path, older_than: float = 3600) -> int:
+    """Delete temp files left behind by a crash mid-upload; returns how many were removed"""
+    cutoff = time.time() - older_than
+    removed = 0
+    for path in directory.glob(f".*{PARTIAL_SUFFIX}"):
+        try:
+            if path.stat().st_mtime < cutoff:
+                path.unlink()
+                removed += 1
+        except FileNotFoundError:
+            continue
+    if removed:
+        logger.info(f"Removed {removed} partial uploads from {directory}")
+    return removed
+
+
+class RequestBodyTooLarge(HTTPException):
+    """
+    Raised from the wrapped `receive` once the body passes the limit.
+    FastAPI re-raises HTTPExceptions from body parsing, so this becomes a normal 413 response.
+    """
+
+    def __init__(self):
+        super().__init__(status_code=413, detail="Request body too large")
+
+
+class BodySizeLimit:
+    """
+    ASGI middleware that rejects oversized request bodies on the given path prefixes
+    with 413 before they are parsed: up front from Content-Length, or once the
+    streamed body passes `max_bytes` when the length isn't declared.
+    Prefixes match whole path segments: "/upload" covers "/upload/x" but not "/uploads".
+    """
+
+    def __init__(self, app, max_bytes: int, path_prefixes=()):
+        self.app = app
+        self.max_bytes = max_bytes
+        self.path_prefixes = tuple(path_prefixes)
+
+    def _applies(self, scope) -> bool:
+        return (
+            scope["type"] == "http"
+            and scope.get("method") in ("POST", "PUT", "PATCH")
+            and any(
+                scope["path"] == prefix or scope["path"].startswith(prefix.rstrip("/") + "/")
+                for prefix in self.path_prefixes
+            )
+        )
+
+    async def __call__(self, scope, receive, send):
+        if not self._applies(scope):
+            await self.app(scope, receive, send)
+            return
+
+        declared = dict(scope.get("headers") or []).get(b"content-length")
+        if declared is not None and declared.isdigit() and int(declared) > self.max_bytes:
+            await self._reject(send)
+            return
+
+        received = 0
+
+        async def limited_receive():
+            nonlocal received
+            message = await receive()
+            if message["type"] == "http.request":
+                received += len(message.get("body", b""))
+                if received > self.max_bytes:
+                    raise RequestBodyTooLarge()
+            return message
+
+        await self.app(scope, limited_receive, send)
+
+    async def _reject(self, send):
+        body = json.dumps({"detail": "Request body too large"}).encode()
+        await send({
+            "type": "http.response.start",
+            "status": 413,
+            "headers": [(b"content-type", b"application/json"), (b"content-length", str(len(body)).encode())]
+        })
+        await send({"type": "http.response.body", "body": body})
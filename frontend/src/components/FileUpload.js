@@ -1,8 +1,11 @@
 import { useState, useRef, useEffect } from 'react';
 import { Upload, X, CheckCircle, AlertCircle, Loader } from 'lucide-react';
 import axios from 'axios';
+import { canUploadResumable, uploadResumable } from '../utils/resumableUpload';
 
 const API_BASE = process.env.REACT_APP_BACKEND_URL || '';
+// Larger files go up in resumable chunks instead of one request
+const RESUMABLE_THRESHOLD_BYTES = 20 * 1024 * 1024;
 
 const FileUpload = ({ 
   onUploadComplete, 
@@ -114,29 +117,36 @@ const FileUpload = ({
     setProgress(0);
 
     try {
-      const formData = new FormData();
-      formData.append('file', file);
+      let uploadResult;
+      if (file.size > RESUMABLE_THRESHOLD_BYTES && canUploadResumable()) {
+        console.log('Starting resumable upload:', file.name);
+        uploadResult = await uploadResumable(file, { onProgress: setProgress });
+      } else {
+        const formData = new FormData();
+        formData.append('file', file);
 
-      // Use the API_BASE which includes /api/v1
-      const uploadUrl = `${API_BASE}/api/v1/upload`;
-      console.log('Starting upload to:', uploadUrl);
+        // Use the API_BASE which includes /api/v1
+        const uploadUrl = `${API_BASE}/api/v1/upload`;
+        console.log('Starting upload to:', uploadUrl);
 
-      const response = await axios.post(uploadUrl, formData, {
-        withCredentials: true,
-        headers: {
-          'Content-Type': 'multipart/form-data',
-        },
-        onUploadProgress: (progressEvent) => {
-          const percentCompleted = Math.round((progressEvent.loaded * 100) / progressEvent.total);
-          setProgress(percentCompleted);
-          console.log('Upload progress:', percentCompleted + '%');
-        },
-      });
+        const response = await axios.post(uploadUrl, formData, {
+          withCredentials: true,
+          headers: {
+            'Content-Type': 'multipart/form-data',
+          },
+          onUploadProgress: (progressEvent) => {
+            const percentCompleted = Math.round((progressEvent.loaded * 100) / progressEvent.total);
+            setProgress(percentCompleted);
+            console.log('Upload progress:', percentCompleted + '%');
+          },
+        });
+        uploadResult = response.data;
+      }
 
-      console.log('Upload successful:', response.data);
+      console.log('Upload successful:', uploadResult);
       
       // The backend now returns a URL that uses /api/files/ endpoint
-      const fileUrl = response.data.url;
+      const fileUrl = uploadResult.url;
       setUploadedUrl(fileUrl);
       
       // Call the callback with the URL
@@ -2,6 +2,7 @@ import { useState, useEffect } from 'react';
 import { useParams, useNavigate } from 'react-router-dom';
 import axios from 'axios';
 import { toast } from 'sonner';
+import { getFileUrl } from '../utils/fileUrl';
 
 const API_BASE = process.env.REACT_APP_BACKEND_URL || import.meta.env.VITE_REACT_APP_BACKEND_URL;
 
@@ -166,7 +167,7 @@ export default function CampaignLandingPage() {
           </div>
           {campaign.landing_page_hero_image && (
             <Card className="overflow-hidden">
-              <img src={campaign.landing_page_hero_image} alt="Campaign hero" className="h-full w-full object-cover" />
+              <img src={getFileUrl(campaign.landing_page_hero_image, { width: 1280 })} alt="Campaign hero" className="h-full w-full object-cover" />
             </Card>
           )}
         </Section>
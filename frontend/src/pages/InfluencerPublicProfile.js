@@ -62,7 +62,7 @@ export default function InfluencerPublicProfile() {
           <div className="flex flex-col sm:flex-row items-center sm:items-start gap-6">
             {profile.avatar_url ? (
               <img
-                src={getFileUrl(profile.avatar_url)}
+                src={getFileUrl(profile.avatar_url, { width: 256 })}
                 alt={profile.name}
                 className="w-32 h-32 rounded-full object-cover border-4 border-[#CE3427]"
                 onError={(e) => { e.target.style.display = 'none'; }}
@@ -138,8 +138,9 @@ export default function InfluencerPublicProfile() {
                   className="group relative aspect-square rounded-lg overflow-hidden hover:shadow-lg transition-shadow"
                 >
                   <img
-                    src={getFileUrl(image)}
+                    src={getFileUrl(image, { width: 480 })}
                     alt={`Portfolio ${index + 1}`}
+                    loading="lazy"
                     className="w-full h-full object-cover group-hover:scale-105 transition-transform"
                     onError={(e) => { e.target.style.display = 'none'; }}
                   />
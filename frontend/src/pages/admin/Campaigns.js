@@ -13,6 +13,8 @@ export default function AdminCampaigns() {
   const { logout } = useAuth();
   const [campaigns, setCampaigns] = useState([]);
   const [loading, setLoading] = useState(true);
+  const [nextCursor, setNextCursor] = useState(null);
+  const [loadingMore, setLoadingMore] = useState(false);
   const [searchTerm, setSearchTerm] = useState('');
   const [statusFilter, setStatusFilter] = useState('');
   const [deleteModal, setDeleteModal] = useState({ open: false, campaign: null });
@@ -26,21 +28,40 @@ export default function AdminCampaigns() {
   });
   const [saving, setSaving] = useState(false);
 
+  const fetchPage = useCallback(async (cursor) => {
+    const params = new URLSearchParams();
+    if (statusFilter) params.append('status', statusFilter);
+    params.append('cursor', cursor);
+    
+    const response = await axios.get(`${API_BASE}/admin/campaigns?${params.toString()}`, {
+      withCredentials: true
+    });
+    setNextCursor(response.data.next_cursor || null);
+    return response.data.data || [];
+  }, [statusFilter]);
+
   const fetchCampaigns = useCallback(async () => {
     try {
-      const params = new URLSearchParams();
-      if (statusFilter) params.append('status', statusFilter);
-      
-      const response = await axios.get(`${API_BASE}/admin/campaigns?${params.toString()}`, {
-        withCredentials: true
-      });
-      setCampaigns(response.data.data || []);
+      setCampaigns(await fetchPage(''));
     } catch (error) {
       toast.error('Failed to load campaigns');
     } finally {
       setLoading(false);
     }
-  }, [statusFilter]);
+  }, [fetchPage]);
+
+  const loadMore = async () => {
+    if (!nextCursor) return;
+    setLoadingMore(true);
+    try {
+      const more = await fetchPage(nextCursor);
+      setCampaigns(prev => [...prev, ...more]);
+    } catch (error) {
+      toast.error('Failed to load more campaigns');
+    } finally {
+      setLoadingMore(false);
+    }
+  };
 
   useEffect(() => {
     fetchCampaigns();
@@ -334,6 +355,18 @@ export default function AdminCampaigns() {
                     ))}
                   </tbody>
                 </table>
+                {nextCursor && (
+                  <div className="flex justify-center p-4 border-t border-gray-100">
+                    <button
+                      data-testid="load-more-campaigns-btn"
+                      onClick={loadMore}
+                      disabled={loadingMore}
+                      className="btn-secondary text-sm"
+                    >
+                      {loadingMore ? 'Loading...' : 'Load more'}
+                    </button>
+                  </div>
+                )}
               </div>
             )}
           </div>
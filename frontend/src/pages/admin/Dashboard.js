@@ -2,7 +2,7 @@ import { useState, useEffect } from 'react';
 import axios from 'axios';
 import { useAuth } from '../../contexts/AuthContext';
 import { useNavigate } from 'react-router-dom';
-import { Users, ShoppingBag, MousePointerClick, FileCheck } from 'lucide-react';
+import { Users, ShoppingBag, MousePointerClick, FileCheck, RefreshCw } from 'lucide-react';
 import { toast } from 'sonner';
 import AdminSidebar from '../../components/AdminSidebar';
 
@@ -11,6 +11,7 @@ const API_BASE = `${process.env.REACT_APP_BACKEND_URL}/api/v1`;
 export default function AdminDashboard() {
   const [stats, setStats] = useState(null);
   const [loading, setLoading] = useState(true);
+  const [refreshing, setRefreshing] = useState(false);
   const { logout } = useAuth();
   const navigate = useNavigate();
 
@@ -18,9 +19,10 @@ export default function AdminDashboard() {
     fetchDashboard();
   }, []);
 
-  const fetchDashboard = async () => {
+  const fetchDashboard = async (refresh = false) => {
     try {
       const response = await axios.get(`${API_BASE}/admin/dashboard`, {
+        params: refresh ? { refresh: true } : {},
         withCredentials: true
       });
       setStats(response.data);
@@ -31,6 +33,12 @@ export default function AdminDashboard() {
     }
   };
 
+  const handleRefresh = async () => {
+    setRefreshing(true);
+    await fetchDashboard(true);
+    setRefreshing(false);
+  };
+
   const handleLogout = async () => {
     await logout();
     navigate('/login');
@@ -50,9 +58,27 @@ export default function AdminDashboard() {
       
       <div className="flex-1">
         {/* Header */}
-        <header className="bg-white border-b border-gray-200 px-8 py-6">
-          <h1 className="text-3xl font-bold text-[#0B1220]">Dashboard</h1>
-          <p className="text-gray-600 mt-1">Platform Overview & Analytics</p>
+        <header className="bg-white border-b border-gray-200 px-8 py-6 flex items-start justify-between">
+          <div>
+            <h1 className="text-3xl font-bold text-[#0B1220]">Dashboard</h1>
+            <p className="text-gray-600 mt-1">Platform Overview & Analytics</p>
+          </div>
+          <div className="flex items-center gap-3">
+            {stats?.computed_at && (
+              <span className="text-sm text-gray-500" data-testid="stats-computed-at">
+                Updated {new Date(stats.computed_at).toLocaleTimeString()}
+              </span>
+            )}
+            <button
+              data-testid="refresh-stats-btn"
+              onClick={handleRefresh}
+              disabled={refreshing}
+              className="btn-secondary flex items-center gap-2"
+            >
+              <RefreshCw className={`w-4 h-4 ${refreshing ? 'animate-spin' : ''}`} />
+              Refresh
+            </button>
+          </div>
         </header>
 
         {/* Content */}
@@ -4,10 +4,13 @@ import AdminSidebar from '../../components/AdminSidebar';
 import { useAuth } from '../../contexts/AuthContext';
 import { BarChart3, TrendingUp, Users, DollarSign, Building2, UserCheck } from 'lucide-react';
 
+const PAGE_SIZE = 100;
+
 const AdminReports = () => {
   const navigate = useNavigate();
   const { logout } = useAuth();
   const [loading, setLoading] = useState(true);
+  const [page, setPage] = useState(1);
   const [reports, setReports] = useState({
     brands: [],
     influencers: [],
@@ -21,12 +24,12 @@ const AdminReports = () => {
 
   useEffect(() => {
     fetchReports();
-  }, []);
+  }, [page]);
 
   const fetchReports = async () => {
     try {
       const backendUrl = process.env.REACT_APP_BACKEND_URL || import.meta.env.VITE_REACT_APP_BACKEND_URL;
-      const response = await fetch(`${backendUrl}/api/v1/admin/reports`, {
+      const response = await fetch(`${backendUrl}/api/v1/admin/reports?page=${page}&page_size=${PAGE_SIZE}`, {
         credentials: 'include'
       });
 
@@ -43,6 +46,11 @@ const AdminReports = () => {
     }
   };
 
+  const totalPages = Math.max(
+    1,
+    Math.ceil(Math.max(reports.summary.total_brands, reports.summary.total_influencers) / PAGE_SIZE)
+  );
+
   if (loading) {
     return (
       <div className="flex min-h-screen">
@@ -257,6 +265,29 @@ const AdminReports = () => {
               </div>
             )}
           </div>
+
+          {/* Pagination */}
+          {totalPages > 1 && (
+            <div className="flex items-center justify-between">
+              <button
+                onClick={() => setPage(page - 1)}
+                className="px-4 py-2 border border-gray-200 rounded-xl font-semibold text-gray-700 hover:bg-gray-50 transition-colors disabled:opacity-50"
+                disabled={page <= 1}
+              >
+                Previous
+              </button>
+              <span className="text-sm text-gray-600">
+                Page {page} of {totalPages}
+              </span>
+              <button
+                onClick={() => setPage(page + 1)}
+                className="px-4 py-2 border border-gray-200 rounded-xl font-semibold text-gray-700 hover:bg-gray-50 transition-colors disabled:opacity-50"
+                disabled={page >= totalPages}
+              >
+                Next
+              </button>
+            </div>
+          )}
         </div>
       </div>
     </div>
@@ -5,26 +5,34 @@ import { ArrowLeft, Check, X, User } from 'lucide-react';
 import { toast } from 'sonner';
 
 const API_BASE = `${process.env.REACT_APP_BACKEND_URL}/api/v1`;
+const PAGE_SIZE = 50;
 
 export default function ApplicationsBoard() {
   const { id } = useParams();
   const [applications, setApplications] = useState([]);
   const [campaign, setCampaign] = useState(null);
   const [loading, setLoading] = useState(true);
+  const [page, setPage] = useState(1);
+  const [total, setTotal] = useState(0);
+  const [sort, setSort] = useState('newest');
   const navigate = useNavigate();
 
   useEffect(() => {
     fetchData();
-  }, [id]);
+  }, [id, page, sort]);
 
   const fetchData = async () => {
     try {
       const [campaignRes, appsRes] = await Promise.all([
         axios.get(`${API_BASE}/campaigns/${id}`, { withCredentials: true }),
-        axios.get(`${API_BASE}/campaigns/${id}/applications`, { withCredentials: true })
+        axios.get(`${API_BASE}/campaigns/${id}/applications`, {
+          params: { page, page_size: PAGE_SIZE, sort },
+          withCredentials: true
+        })
       ]);
       setCampaign(campaignRes.data);
       setApplications(appsRes.data.data || []);
+      setTotal(appsRes.data.total || 0);
     } catch (error) {
       toast.error('Failed to load applications');
     } finally {
@@ -46,6 +54,8 @@ export default function ApplicationsBoard() {
     }
   };
 
+  const totalPages = Math.max(1, Math.ceil(total / PAGE_SIZE));
+
   return (
     <div className="min-h-screen bg-[#F8FAFC]">
       {/* Header */}
@@ -59,7 +69,20 @@ export default function ApplicationsBoard() {
             <ArrowLeft className="w-5 h-5" />
             Back to Campaigns
           </button>
-          <h1 className="text-3xl font-bold text-[#0B1220]">{campaign?.title || 'Campaign'} - Applications</h1>
+          <div className="flex items-center justify-between gap-4 flex-wrap">
+            <h1 className="text-3xl font-bold text-[#0B1220]">{campaign?.title || 'Campaign'} - Applications</h1>
+            <select
+              data-testid="applications-sort"
+              value={sort}
+              onChange={(e) => { setSort(e.target.value); setPage(1); }}
+              className="pl-4 pr-10 py-2 border border-gray-200 rounded-xl focus:ring-2 focus:ring-[#CE3427] focus:border-transparent bg-white min-w-[180px]"
+            >
+              <option value="newest">Newest first</option>
+              <option value="oldest">Oldest first</option>
+              <option value="followers">Most followers</option>
+              <option value="engagement">Highest engagement</option>
+            </select>
+          </div>
         </div>
       </header>
 
@@ -180,6 +203,29 @@ export default function ApplicationsBoard() {
             ))}
           </div>
         )}
+
+        {/* Pagination */}
+        {totalPages > 1 && (
+          <div className="flex items-center justify-between mt-6">
+            <button
+              onClick={() => setPage(page - 1)}
+              className="px-4 py-2 border border-gray-200 rounded-xl font-semibold text-gray-700 hover:bg-gray-50 transition-colors disabled:opacity-50"
+              disabled={page <= 1}
+            >
+              Previous
+            </button>
+            <span className="text-sm text-gray-600">
+              Page {page} of {totalPages}
+            </span>
+            <button
+              onClick={() => setPage(page + 1)}
+              className="px-4 py-2 border border-gray-200 rounded-xl font-semibold text-gray-700 hover:bg-gray-50 transition-colors disabled:opacity-50"
+              disabled={page >= totalPages}
+            >
+              Next
+            </button>
+          </div>
+        )}
       </div>
     </div>
   );
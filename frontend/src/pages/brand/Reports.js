@@ -7,21 +7,23 @@ import { toast } from 'sonner';
 import BrandSidebar from '../../components/BrandSidebar';
 
 const API_BASE = `${process.env.REACT_APP_BACKEND_URL}/api/v1`;
+const PAGE_SIZE = 100;
 
 export default function BrandReports() {
   const [reports, setReports] = useState(null);
   const [loading, setLoading] = useState(true);
   const [filter, setFilter] = useState('all');
+  const [page, setPage] = useState(1);
   const { logout } = useAuth();
   const navigate = useNavigate();
 
   useEffect(() => {
     fetchReports();
-  }, [filter]);
+  }, [filter, page]);
 
   const fetchReports = async () => {
     try {
-      const response = await axios.get(`${API_BASE}/brand/reports?status=${filter}`, {
+      const response = await axios.get(`${API_BASE}/brand/reports?status=${filter}&page=${page}&page_size=${PAGE_SIZE}`, {
         withCredentials: true
       });
       setReports(response.data);
@@ -53,6 +55,13 @@ export default function BrandReports() {
     }
   };
 
+  const changeFilter = (value) => {
+    setFilter(value);
+    setPage(1);
+  };
+
+  const totalPages = Math.max(1, Math.ceil((reports?.total || 0) / PAGE_SIZE));
+
   const handleLogout = async () => {
     await logout();
     navigate('/login');
@@ -94,7 +103,7 @@ export default function BrandReports() {
         <div className="p-8">
           <div className="flex gap-3 mb-8">
             <button
-              onClick={() => setFilter('all')}
+              onClick={() => changeFilter('all')}
               className={`px-6 py-3 rounded-xl font-semibold transition-all ${
                 filter === 'all'
                   ? 'bg-[#CE3427] text-white shadow-lg'
@@ -104,7 +113,7 @@ export default function BrandReports() {
               All Assignments
             </button>
             <button
-              onClick={() => setFilter('completed')}
+              onClick={() => changeFilter('completed')}
               className={`px-6 py-3 rounded-xl font-semibold transition-all ${
                 filter === 'completed'
                   ? 'bg-[#CE3427] text-white shadow-lg'
@@ -114,7 +123,7 @@ export default function BrandReports() {
               Completed
             </button>
             <button
-              onClick={() => setFilter('pending')}
+              onClick={() => changeFilter('pending')}
               className={`px-6 py-3 rounded-xl font-semibold transition-all ${
                 filter === 'pending'
                   ? 'bg-[#CE3427] text-white shadow-lg'
@@ -254,6 +263,29 @@ export default function BrandReports() {
                 </table>
               </div>
             )}
+
+            {/* Pagination */}
+            {totalPages > 1 && (
+              <div className="flex items-center justify-between mt-6">
+                <button
+                  onClick={() => setPage(page - 1)}
+                  className="px-4 py-2 border border-gray-200 rounded-xl font-semibold text-gray-700 hover:bg-gray-50 transition-colors disabled:opacity-50"
+                  disabled={page <= 1}
+                >
+                  Previous
+                </button>
+                <span className="text-sm text-gray-600">
+                  Page {page} of {totalPages}
+                </span>
+                <button
+                  onClick={() => setPage(page + 1)}
+                  className="px-4 py-2 border border-gray-200 rounded-xl font-semibold text-gray-700 hover:bg-gray-50 transition-colors disabled:opacity-50"
+                  disabled={page >= totalPages}
+                >
+                  Next
+                </button>
+              </div>
+            )}
           </div>
         </div>
       </div>
@@ -503,6 +503,7 @@ export default function InfluencerProfileSetup() {
             <FileUpload
               onUploadComplete={handleVideoUpload}
               accept="video/*"
+              maxSize={1024}
               label="Upload Portfolio Video"
             />
           </div>
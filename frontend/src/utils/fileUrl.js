@@ -8,18 +8,33 @@
  * import { getFileUrl, isValidFileUrl } from '../utils/fileUrl';
  * 
  * const imageUrl = getFileUrl(storedFilename);
+ * const thumbnailUrl = getFileUrl(storedFilename, { width: 480 });
  */
 
 const API_BASE = process.env.REACT_APP_BACKEND_URL || '';
 
+// File routes on our backend: /api/files/ and the versioned /api/v1/files/
+const FILE_ROUTE_PATTERN = /\/api\/(v1\/)?files\//;
+
 /**
  * Convert a stored filename or URL to a full accessible URL
  * Works in any environment by constructing URLs dynamically
  * 
  * @param {string} fileReference - Can be a filename, relative path, or full URL
+ * @param {Object} [options]
+ * @param {number} [options.width] - Display width in pixels; images are served
+ *   as the smallest resized WebP at least this wide (the original if none is)
  * @returns {string|null} - Full URL to access the file, or null if invalid
  */
-export const getFileUrl = (fileReference) => {
+export const getFileUrl = (fileReference, { width } = {}) => {
+  const url = resolveFileUrl(fileReference);
+  if (url && width && FILE_ROUTE_PATTERN.test(url) && isImageUrl(url) && !url.includes('?')) {
+    return `${url}?w=${Math.ceil(width)}`;
+  }
+  return url;
+};
+
+const resolveFileUrl = (fileReference) => {
   if (!fileReference) return null;
   
   // If it's already a full URL, return as is
@@ -0,0 +1,23 @@
+import { getFileUrl } from './fileUrl';
+
+describe('getFileUrl with a width', () => {
+  const stored = 'https://app.influiv.com/api/v1/files/0f8b6a2e-3c1d-4e5f-9a7b-1c2d3e4f5a6b.jpg';
+
+  it('requests a resized variant for stored upload URLs', () => {
+    expect(getFileUrl(stored, { width: 479.5 })).toBe(`${stored}?w=480`);
+  });
+
+  it('requests a resized variant for bare filenames and legacy paths', () => {
+    expect(getFileUrl('photo.png', { width: 160 })).toBe('/api/files/photo.png?w=160');
+    expect(getFileUrl('/api/uploads/photo.png', { width: 160 })).toBe('/api/files/photo.png?w=160');
+  });
+
+  it('leaves other URLs alone', () => {
+    expect(getFileUrl(stored)).toBe(stored);
+    expect(getFileUrl('https://app.influiv.com/api/v1/files/clip.mp4', { width: 480 }))
+      .toBe('https://app.influiv.com/api/v1/files/clip.mp4');
+    expect(getFileUrl('https://cdn.example.com/photo.jpg', { width: 480 }))
+      .toBe('https://cdn.example.com/photo.jpg');
+    expect(getFileUrl(`${stored}?w=160`, { width: 480 })).toBe(`${stored}?w=160`);
+  });
+});
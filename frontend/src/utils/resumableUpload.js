@@ -0,0 +1,104 @@
+/**
+ * Resumable Upload Utility
+ *
+ * Sends large files (e.g. portfolio videos) to /api/v1/uploads/resumable in
+ * chunks, each with its SHA-256, so a dropped connection only retries the
+ * chunk in flight instead of restarting the whole upload.
+ *
+ * Usage:
+ * import { uploadResumable } from '../utils/resumableUpload';
+ *
+ * const { url } = await uploadResumable(file, { onProgress: setProgress });
+ */
+
+import axios from 'axios';
+
+const API_BASE = process.env.REACT_APP_BACKEND_URL || '';
+const MAX_RETRIES = 5;
+
+/**
+ * Whether this browser can hash chunks (Web Crypto needs a secure context)
+ */
+export const canUploadResumable = () => Boolean(window.crypto?.subtle);
+
+const sha256Hex = async (blob) => {
+  const digest = await window.crypto.subtle.digest('SHA-256', await blob.arrayBuffer());
+  return Array.from(new Uint8Array(digest))
+    .map(byte => byte.toString(16).padStart(2, '0'))
+    .join('');
+};
+
+const sleep = (ms) => new Promise(resolve => setTimeout(resolve, ms));
+
+/**
+ * Upload a file in chunks, retrying failed chunks with backoff
+ *
+ * @param {File} file - File to upload
+ * @param {Object} [options]
+ * @param {function} [options.onProgress] - Called with the percentage uploaded
+ * @returns {Promise<Object>} - Same response as /api/v1/upload ({ filename, url, size, ... })
+ */
+export const uploadResumable = async (file, { onProgress } = {}) => {
+  const sessionsUrl = `${API_BASE}/api/v1/uploads/resumable`;
+  const { data: session } = await axios.post(
+    sessionsUrl,
+    { filename: file.name, size: file.size },
+    { withCredentials: true }
+  );
+  const uploadUrl = `${sessionsUrl}/${session.upload_id}`;
+
+  let offset = session.offset;
+  let failures = 0;
+  let needsSync = false;
+
+  while (offset < file.size) {
+    try {
+      if (needsSync) {
+        // Ask the server how much it actually has before resending
+        const { data } = await axios.get(uploadUrl, { withCredentials: true });
+        offset = data.offset;
+        needsSync = false;
+        if (offset >= file.size) break;
+      }
+
+      const chunkStart = offset;
+      const chunk = file.slice(chunkStart, chunkStart + session.chunk_size);
+      const { data } = await axios.put(uploadUrl, chunk, {
+        withCredentials: true,
+        params: { offset: chunkStart },
+        headers: {
+          'Content-Type': 'application/octet-stream',
+          'X-Chunk-SHA256': await sha256Hex(chunk),
+        },
+        onUploadProgress: (progressEvent) => {
+          if (onProgress) {
+            onProgress(Math.round(((chunkStart + progressEvent.loaded) * 100) / file.size));
+          }
+        },
+      });
+      offset = data.offset;
+      failures = 0;
+    } catch (err) {
+      const status = err.response?.status;
+      // Network errors, server errors, offset conflicts and corrupted chunks are worth retrying
+      const retryable = !status || status >= 500 || status === 409 || status === 422;
+      failures += 1;
+      if (!retryable || failures > MAX_RETRIES) {
+        throw err;
+      }
+      console.warn(`Chunk upload failed (attempt ${failures}), resuming:`, err.message);
+      needsSync = true;
+      if (status !== 409) {
+        await sleep(1000 * 2 ** (failures - 1));
+      }
+    }
+  }
+
+  const { data } = await axios.post(`${uploadUrl}/complete`, null, { withCredentials: true });
+  return data;
+};
+
+export default {
+  canUploadResumable,
+  uploadResumable
+};
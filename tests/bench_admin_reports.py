@@ -0,0 +1,214 @@
+"""
+Benchmark: GET /admin/reports at scale
+
+Seeds a throwaway database with N influencers (and proportional brands,
+campaigns, applications, assignments, payouts and platforms), then times:
+- rebuild: a full stats_rollups rebuild (seeding bypasses the write hooks)
+- legacy:  the previous per-brand / per-influencer query loop
+- page:    get_admin_reports for a single page
+- all:     get_admin_reports walking every page
+and checks the aggregated figures match the legacy loop.
+
+Needs a real MongoDB. Run:
+    MONGO_URL=mongodb://localhost:27017 python tests/bench_admin_reports.py [--influencers 10000]
+"""
+
+import argparse
+import asyncio
+import os
+import random
+import sys
+import time
+import uuid
+from datetime import datetime, timezone, timedelta
+
+sys.path.insert(0, '/app/backend')
+
+
+def _ts(i):
+    return (datetime(2025, 1, 1, tzinfo=timezone.utc) + timedelta(minutes=i)).isoformat()
+
+
+async def seed(db, influencers: int, brands: int, seed_value: int = 42):
+    rng = random.Random(seed_value)
+    users, brand_docs, influencer_docs = [], [], []
+    campaigns, applications, assignments, payouts, platforms, payment_details = [], [], [], [], [], []
+
+    for i in range(brands):
+        user_id = str(uuid.uuid4())
+        users.append({"id": user_id, "email": f"brand{i}@bench.test", "role": "brand", "status": "active", "deleted_at": None, "created_at": _ts(i)})
+        brand = {"id": str(uuid.uuid4()), "user_id": user_id, "company_name": f"Brand {i}", "status": "approved", "created_at": _ts(i)}
+        brand_docs.append(brand)
+        for c in range(3):
+            campaigns.append({"id": str(uuid.uuid4()), "brand_id": brand["id"], "title": f"Campaign {i}-{c}", "status": "live", "created_at": _ts(i)})
+
+    for i in range(influencers):
+        user_id = str(uuid.uuid4())
+        users.append({"id": user_id, "email": f"creator{i}@bench.test", "role": "influencer", "status": "active", "deleted_at": None, "created_at": _ts(i)})
+        influencer = {"id": str(uuid.uuid4()), "user_id": user_id, "name": f"Creator {i}", "status": "approved", "profile_completed": i % 3 != 0, "created_at": _ts(i)}
+        influencer_docs.append(influencer)
+
+        if i % 2 == 0:
+            payment_details.append({"id": str(uuid.uuid4()), "influencer_id": influencer["id"], "paypal_email": f"creator{i}@bench.test"})
+        for platform in rng.sample(["instagram", "tiktok", "youtube"], rng.randint(1, 2)):
+            platforms.append({"id": str(uuid.uuid4()), "influencer_id": influencer["id"], "platform": platform, "followers_count": rng.randint(100, 500000)})
+
+        for campaign in rng.sample(campaigns, 3):
+            applications.append({"id": str(uuid.uuid4()), "campaign_id": campaign["id"], "influencer_id": influencer["id"], "status": "approved", "created_at": _ts(i)})
+        for campaign in rng.sample(campaigns, 2):
+            assignment = {
+                "id": str(uuid.uuid4()),
+                "campaign_id": campaign["id"],
+                "influencer_id": influencer["id"],
+                "status": rng.choice(["purchase_required", "posting", "completed"]),
+                "redirect_token": uuid.uuid4().hex,
+                "created_at": _ts(i)
+            }
+            assignments.append(assignment)
+            payouts.append({
+                "id": str(uuid.uuid4()),
+                "assignment_id": assignment["id"],
+                "influencer_id": influencer["id"],
+                "brand_id": campaign["brand_id"],
+                "campaign_id": campaign["id"],
+                "amount": round(rng.uniform(5, 200), 2),
+                "status": rng.choice(["pending", "paid", "processing"]),
+                "created_at": _ts(i)
+            })
+
+    for name, docs in [
+        ("users", users), ("brands", brand_docs), ("influencers", influencer_docs), ("campaigns", campaigns),
+        ("applications", applications), ("assignments", assignments), ("payouts", payouts),
+        ("influencer_platforms", platforms), ("payment_details", payment_details)
+    ]:
+        for start in range(0, len(docs), 5000):
+            await db[name].insert_many(docs[start:start + 5000])
+    return {"brands": len(brand_docs), "influencers": len(influencer_docs), "payouts": len(payouts)}
+
+
+async def legacy_reports(db):
+    """The pre-aggregation implementation, kept verbatim for comparison"""
+    brands = await db.brands.find({}, {"_id": 0}).to_list(None)
+    brand_reports = []
+    for brand in brands:
+        brand_user = await db.users.find_one({"id": brand["user_id"]}, {"_id": 0, "email": 1})
+        total_campaigns = await db.campaigns.count_documents({"brand_id": brand["id"]})
+        payouts = await db.payouts.find({"brand_id": brand["id"]}).to_list(None)
+        total_spent = sum(p["amount"] for p in payouts)
+        assignments = await db.assignments.find({"campaign_id": {"$in": [c["id"] for c in await db.campaigns.find({"brand_id": brand["id"]}, {"_id": 0, "id": 1}).to_list(None)]}}).to_list(None)
+        unique_influencers = len(set(a["influencer_id"] for a in assignments))
+        campaigns_ids = [c["id"] for c in await db.campaigns.find({"brand_id": brand["id"]}, {"_id": 0, "id": 1}).to_list(None)]
+        total_applications = await db.applications.count_documents({"campaign_id": {"$in": campaigns_ids}})
+        completed_assignments = await db.assignments.count_documents({"campaign_id": {"$in": campaigns_ids}, "status": "completed"})
+        brand_reports.append({
+            "brand_id": brand["id"],
+            "email": brand_user["email"] if brand_user else "N/A",
+            "total_campaigns": total_campaigns,
+            "total_spent": total_spent,
+            "unique_influencers": unique_influencers,
+            "total_applications": total_applications,
+            "completed_assignments": completed_assignments
+        })
+
+    influencers = await db.influencers.find({}, {"_id": 0}).to_list(None)
+    influencer_reports = []
+    for influencer in influencers:
+        influencer_user = await db.users.find_one({"id": influencer["user_id"]}, {"_id": 0, "email": 1})
+        payment_details = await db.payment_details.find_one({"influencer_id": influencer["id"]})
+        payouts = await db.payouts.find({"influencer_id": influencer["id"]}).to_list(None)
+        total_assignments = await db.assignments.count_documents({"influencer_id": influencer["id"]})
+        completed_assignments = await db.assignments.count_documents({"influencer_id": influencer["id"], "status": "completed"})
+        total_applications = await db.applications.count_documents({"influencer_id": influencer["id"]})
+        platforms = await db.influencer_platforms.find({"influencer_id": influencer["id"]}, {"_id": 0, "platform": 1, "followers_count": 1}).to_list(None)
+        influencer_reports.append({
+            "influencer_id": influencer["id"],
+            "email": influencer_user["email"] if influencer_user else "N/A",
+            "has_payment_details": payment_details is not None,
+            "total_earnings": sum(p["amount"] for p in payouts),
+            "total_assignments": total_assignments,
+            "completed_assignments": completed_assignments,
+            "total_applications": total_applications,
+            "platforms": len(platforms)
+        })
+    return brand_reports, influencer_reports
+
+
+def _compare(legacy_rows, new_rows, key, fields):
+    new_by_id = {row[key]: row for row in new_rows}
+    mismatches = 0
+    for row in legacy_rows:
+        other = new_by_id.get(row[key])
+        if other is None:
+            mismatches += 1
+            continue
+        for field in fields:
+            expected, actual = row[field], other[field]
+            if field == "platforms":
+                actual = len(actual)
+            if isinstance(expected, float) and abs(expected - actual) < 0.01:
+                continue
+            if expected != actual:
+                mismatches += 1
+                break
+    return mismatches
+
+
+async def main(args):
+    os.environ.setdefault("MONGO_URL", args.mongo_url)
+    os.environ["DB_NAME"] = args.db_name
+    import server
+
+    db = server.db
+    await server.client.drop_database(args.db_name)
+    started = time.perf_counter()
+    counts = await seed(db, args.influencers, args.brands)
+    print(f"seeded {counts} in {time.perf_counter() - started:.1f}s")
+    from db_indexes import ensure_indexes
+    await ensure_indexes(db)
+
+    started = time.perf_counter()
+    await server.stats_rollups.rebuild()
+    print(f"rebuild   stats rollups   {time.perf_counter() - started:8.3f}s")
+
+    admin = {"id": "bench-admin", "role": "admin"}
+    try:
+        started = time.perf_counter()
+        first = await server.get_admin_reports(page=1, page_size=args.page_size, user=admin)
+        print(f"page      page_size={args.page_size:<5} {time.perf_counter() - started:8.3f}s")
+
+        started = time.perf_counter()
+        brands, influencers, page = [], [], 1
+        while True:
+            result = await server.get_admin_reports(page=page, page_size=500, user=admin)
+            brands += result["brands"]
+            influencers += result["influencers"]
+            if not result["brands"] and not result["influencers"]:
+                break
+            page += 1
+        print(f"all       pages={page - 1:<9} {time.perf_counter() - started:8.3f}s")
+
+        if args.skip_legacy:
+            return
+        started = time.perf_counter()
+        legacy_brands, legacy_influencers = await legacy_reports(db)
+        print(f"legacy    full scan       {time.perf_counter() - started:8.3f}s")
+
+        mismatches = _compare(legacy_brands, brands, "brand_id", ["email", "total_campaigns", "total_spent", "unique_influencers", "total_applications", "completed_assignments"])
+        mismatches += _compare(legacy_influencers, influencers, "influencer_id", ["email", "has_payment_details", "total_earnings", "total_assignments", "completed_assignments", "total_applications", "platforms"])
+        print(f"rows compared: {len(legacy_brands) + len(legacy_influencers)}, mismatches: {mismatches}")
+        assert first["summary"]["total_influencers"] == len(legacy_influencers)
+    finally:
+        if not args.keep:
+            await server.client.drop_database(args.db_name)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--influencers", type=int, default=10000)
+    parser.add_argument("--brands", type=int, default=500)
+    parser.add_argument("--page-size", type=int, default=100)
+    parser.add_argument("--mongo-url", default="mongodb://localhost:27017")
+    parser.add_argument("--db-name", default="influiv_bench_admin_reports")
+    parser.add_argument("--skip-legacy", action="store_true", help="don't run the slow per-account loop")
+    parser.add_argument("--keep", action="store_true", help="keep the seeded database afterwards")
+    asyncio.run(main(parser.parse_args()))
@@ -0,0 +1,86 @@
+"""
+Benchmark: email render throughput for every template
+
+Builds a complete message for each template in EMAIL_TEMPLATES with:
+- legacy:   str.format + MIMEMultipart/MIMEText + as_string() (previous behaviour)
+- compiled: precompiled templates + light MIME writer, render cache disabled
+- cached:   compiled with the render cache (e.g. one notification fanned out to many admins)
+
+Run: python tests/bench_email_render.py [--iterations 2000]
+"""
+
+import argparse
+import sys
+import time
+from email.mime.multipart import MIMEMultipart
+from email.mime.text import MIMEText
+from string import Formatter
+
+sys.path.insert(0, '/app/backend')
+
+from email_service import EMAIL_TEMPLATES
+from email_render import EmailRenderer
+
+FROM_NAME = "Influiv"
+FROM_EMAIL = "no-reply@influiv.com"
+TO_EMAIL = "someone@example.com"
+
+
+def sample_data(template):
+    fields = {
+        field
+        for key in ("subject", "html")
+        for _, field, _, _ in Formatter().parse(template[key])
+        if field is not None
+    }
+    return {field: f"sample-{field}" for field in fields}
+
+
+def legacy_message(name, data):
+    template = EMAIL_TEMPLATES[name]
+    msg = MIMEMultipart("alternative")
+    msg["Subject"] = template["subject"].format(**data)
+    msg["From"] = f"{FROM_NAME} <{FROM_EMAIL}>"
+    msg["To"] = TO_EMAIL
+    msg.attach(MIMEText(template["html"].format(**data), "html"))
+    return msg.as_string()
+
+
+def compiled_message(renderer, name, data):
+    return renderer.render(name, data).to_message(FROM_NAME, FROM_EMAIL, TO_EMAIL)
+
+
+def bench(label, build, iterations):
+    per_template = []
+    for name, template in EMAIL_TEMPLATES.items():
+        data = sample_data(template)
+        build(name, data)  # warm up
+        started = time.perf_counter()
+        for _ in range(iterations):
+            build(name, data)
+        per_template.append(time.perf_counter() - started)
+
+    total = sum(per_template)
+    messages = iterations * len(EMAIL_TEMPLATES)
+    print(
+        f"{label:<9} templates={len(EMAIL_TEMPLATES)}  messages={messages:<7} "
+        f"{messages / total:10.0f} msg/s  {total / messages * 1e6:8.1f} us/msg"
+    )
+    return total
+
+
+def main(iterations):
+    uncached = EmailRenderer(EMAIL_TEMPLATES, cache_size=0)
+    cached = EmailRenderer(EMAIL_TEMPLATES)
+
+    legacy = bench("legacy", legacy_message, iterations)
+    compiled = bench("compiled", lambda name, data: compiled_message(uncached, name, data), iterations)
+    fanout = bench("cached", lambda name, data: compiled_message(cached, name, data), iterations)
+    print(f"speedup: compiled {legacy / compiled:.1f}x, cached {legacy / fanout:.1f}x")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--iterations", type=int, default=2000)
+    args = parser.parse_args()
+    main(args.iterations)
@@ -0,0 +1,83 @@
+"""
+Benchmark: event loop responsiveness during concurrent logins
+
+Simulates a burst of bcrypt verifications (what /auth/login does) while a
+lightweight "other endpoint" coroutine keeps doing tiny units of async work,
+and reports that coroutine's latency percentiles for:
+- inline: pwd_context.verify called on the event loop (previous behaviour)
+- pool:   PasswordHasher running bcrypt in its thread pool
+
+Run: python tests/bench_password_hashing.py [--logins 32] [--workers 4]
+"""
+
+import argparse
+import asyncio
+import statistics
+import sys
+import time
+
+sys.path.insert(0, '/app/backend')
+
+from passlib.context import CryptContext
+from password_hasher import PasswordHasher
+
+pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto")
+
+
+def percentile(values, pct):
+    ordered = sorted(values)
+    index = min(len(ordered) - 1, int(round(pct / 100 * (len(ordered) - 1))))
+    return ordered[index]
+
+
+async def other_endpoint(stop: asyncio.Event, latencies: list):
+    """Stand-in for a cheap request (e.g. the redirect): ~1ms of awaited work"""
+    while not stop.is_set():
+        started = time.perf_counter()
+        await asyncio.sleep(0.001)
+        latencies.append((time.perf_counter() - started) * 1000)
+
+
+async def run_scenario(name: str, login, logins: int):
+    stop = asyncio.Event()
+    latencies = []
+    probe = asyncio.create_task(other_endpoint(stop, latencies))
+    await asyncio.sleep(0.05)  # warm up the probe
+
+    started = time.perf_counter()
+    await asyncio.gather(*(login() for _ in range(logins)))
+    elapsed = time.perf_counter() - started
+
+    stop.set()
+    await probe
+
+    print(
+        f"{name:<8} logins={logins:<4} wall={elapsed:6.2f}s  "
+        f"other p50={statistics.median(latencies):7.2f}ms  "
+        f"p99={percentile(latencies, 99):8.2f}ms  max={max(latencies):8.2f}ms"
+    )
+
+
+async def main(logins: int, workers: int):
+    hashed = pwd_context.hash("Brand@123")
+    hasher = PasswordHasher(pwd_context, max_workers=workers, max_pending=logins)
+
+    async def inline_login():
+        await asyncio.sleep(0)
+        return pwd_context.verify("Brand@123", hashed)
+
+    async def pooled_login():
+        return await hasher.verify("Brand@123", hashed)
+
+    await run_scenario("inline", inline_login, logins)
+    await run_scenario("pool", pooled_login, logins)
+    print(f"pool stats: {hasher.stats()}")
+    hasher.shutdown()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--logins", type=int, default=32)
+    parser.add_argument("--workers", type=int, default=4)
+    args = parser.parse_args()
+    asyncio.run(main(args.logins, args.workers))
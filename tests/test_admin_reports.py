@@ -0,0 +1,72 @@
+"""
+Test suite for admin platform reports
+Tests:
+- GET /api/v1/admin/reports - shape, pagination and platform-wide summary
+- access control (admin only)
+"""
+
+import pytest
+import requests
+import os
+
+BASE_URL = os.environ.get('REACT_APP_BACKEND_URL', '').rstrip('/')
+
+ADMIN_EMAIL = "admin@example.com"
+ADMIN_PASSWORD = "Admin@123"
+BRAND_EMAIL = "brand@example.com"
+BRAND_PASSWORD = "Brand@123"
+
+
+@pytest.fixture
+def admin_session():
+    session = requests.Session()
+    response = session.post(f"{BASE_URL}/api/v1/auth/login", json={
+        "email": ADMIN_EMAIL,
+        "password": ADMIN_PASSWORD
+    })
+    assert response.status_code == 200, f"Admin login failed: {response.text}"
+    return session
+
+
+class TestAdminReports:
+    """GET /api/v1/admin/reports"""
+
+    def test_report_shape(self, admin_session):
+        response = admin_session.get(f"{BASE_URL}/api/v1/admin/reports")
+        assert response.status_code == 200
+        data = response.json()
+        assert data["page"] == 1
+        assert data["page_size"] == 100
+        for key in ["total_brands", "total_influencers", "total_platform_spending", "total_platform_earnings"]:
+            assert key in data["summary"]
+
+        for brand in data["brands"]:
+            for key in ["brand_id", "company_name", "email", "total_campaigns", "total_spent",
+                        "pending_payouts", "completed_payouts", "unique_influencers",
+                        "total_applications", "completed_assignments"]:
+                assert key in brand
+        for influencer in data["influencers"]:
+            for key in ["influencer_id", "name", "email", "has_payment_details", "total_earnings",
+                        "pending_earnings", "paid_earnings", "total_assignments", "platforms"]:
+                assert key in influencer
+        print(f"✓ {data['summary']['total_brands']} brands, {data['summary']['total_influencers']} influencers")
+
+    def test_pagination(self, admin_session):
+        first = admin_session.get(f"{BASE_URL}/api/v1/admin/reports", params={"page": 1, "page_size": 1}).json()
+        assert len(first["brands"]) <= 1
+        assert len(first["influencers"]) <= 1
+
+        if first["summary"]["total_influencers"] > 1:
+            second = admin_session.get(f"{BASE_URL}/api/v1/admin/reports", params={"page": 2, "page_size": 1}).json()
+            assert second["influencers"][0]["influencer_id"] != first["influencers"][0]["influencer_id"]
+            assert second["summary"] == first["summary"], "Summary should cover the whole platform on every page"
+
+    def test_page_size_limit(self, admin_session):
+        response = admin_session.get(f"{BASE_URL}/api/v1/admin/reports", params={"page_size": 1000})
+        assert response.status_code == 422
+
+    def test_brand_cannot_view(self):
+        session = requests.Session()
+        session.post(f"{BASE_URL}/api/v1/auth/login", json={"email": BRAND_EMAIL, "password": BRAND_PASSWORD})
+        response = session.get(f"{BASE_URL}/api/v1/admin/reports")
+        assert response.status_code == 403
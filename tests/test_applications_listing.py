@@ -0,0 +1,75 @@
+"""
+Test suite for the campaign applications listing
+Tests:
+- GET /api/v1/campaigns/{id}/applications pagination and enrichment
+- sort=followers / sort=engagement rank applicants by platform stats
+"""
+
+import pytest
+import requests
+import os
+
+BASE_URL = os.environ.get('REACT_APP_BACKEND_URL', '').rstrip('/')
+
+BRAND_EMAIL = "brand@example.com"
+BRAND_PASSWORD = "Brand@123"
+
+
+@pytest.fixture
+def brand_session():
+    session = requests.Session()
+    response = session.post(f"{BASE_URL}/api/v1/auth/login", json={
+        "email": BRAND_EMAIL,
+        "password": BRAND_PASSWORD
+    })
+    assert response.status_code == 200, f"Brand login failed: {response.text}"
+    return session
+
+
+@pytest.fixture
+def campaign_id(brand_session):
+    campaigns = brand_session.get(f"{BASE_URL}/api/v1/campaigns", params={"page_size": 100}).json()["data"]
+    if not campaigns:
+        pytest.skip("Brand has no campaigns")
+    return campaigns[0]["id"]
+
+
+class TestApplicationsListing:
+    """GET /api/v1/campaigns/{campaign_id}/applications"""
+
+    def test_shape_and_pagination(self, brand_session, campaign_id):
+        response = brand_session.get(f"{BASE_URL}/api/v1/campaigns/{campaign_id}/applications", params={"page_size": 1})
+        assert response.status_code == 200
+        data = response.json()
+        assert data["page"] == 1 and data["page_size"] == 1 and data["sort"] == "newest"
+        assert len(data["data"]) <= 1
+        for app in data["data"]:
+            if app["influencer"]:
+                assert isinstance(app["influencer"]["platforms"], list)
+        print(f"✓ {data['total']} applications")
+
+    def test_sort_by_followers(self, brand_session, campaign_id):
+        data = brand_session.get(
+            f"{BASE_URL}/api/v1/campaigns/{campaign_id}/applications",
+            params={"sort": "followers", "page_size": 200}
+        ).json()
+        reach = [
+            sum(p.get("followers_count") or 0 for p in (app["influencer"] or {}).get("platforms", []))
+            for app in data["data"]
+        ]
+        assert reach == sorted(reach, reverse=True)
+
+    def test_sort_by_engagement(self, brand_session, campaign_id):
+        data = brand_session.get(
+            f"{BASE_URL}/api/v1/campaigns/{campaign_id}/applications",
+            params={"sort": "engagement", "page_size": 200}
+        ).json()
+        best = [
+            max([p.get("engagement_rate") or 0 for p in (app["influencer"] or {}).get("platforms", [])] or [0])
+            for app in data["data"]
+        ]
+        assert best == sorted(best, reverse=True)
+
+    def test_invalid_sort(self, brand_session, campaign_id):
+        response = brand_session.get(f"{BASE_URL}/api/v1/campaigns/{campaign_id}/applications", params={"sort": "random"})
+        assert response.status_code == 422
@@ -0,0 +1,131 @@
+"""
+Test suite for in-process caches
+Tests:
+- TTLCache expiry, LRU eviction, invalidation and counters
+- GET /api/v1/admin/cache-stats (admin only)
+- principal cache serves repeat requests and is invalidated on user deletion
+"""
+
+import pytest
+import requests
+import os
+import sys
+import time
+import uuid
+
+BASE_URL = os.environ.get('REACT_APP_BACKEND_URL', '').rstrip('/')
+
+ADMIN_EMAIL = "admin@example.com"
+ADMIN_PASSWORD = "Admin@123"
+
+
+class TestTTLCache:
+    """Tests for backend/cache.py"""
+
+    def test_hit_and_miss_counters(self):
+        sys.path.insert(0, '/app/backend')
+        from cache import TTLCache
+
+        cache = TTLCache(maxsize=10, ttl=60)
+        assert cache.get("token") is None
+        cache.set("token", {"url": "https://amazon.com/dp/X"})
+        assert cache.get("token") == {"url": "https://amazon.com/dp/X"}
+        stats = cache.stats()
+        assert stats["hits"] == 1
+        assert stats["misses"] == 1
+        assert stats["hit_ratio"] == 0.5
+
+    def test_entries_expire(self):
+        sys.path.insert(0, '/app/backend')
+        from cache import TTLCache
+
+        cache = TTLCache(maxsize=10, ttl=0.05)
+        cache.set("token", "value")
+        time.sleep(0.1)
+        assert cache.get("token") is None
+        assert len(cache) == 0
+
+    def test_lru_eviction(self):
+        sys.path.insert(0, '/app/backend')
+        from cache import TTLCache
+
+        cache = TTLCache(maxsize=2, ttl=60)
+        cache.set("a", 1)
+        cache.set("b", 2)
+        cache.get("a")  # "b" is now least recently used
+        cache.set("c", 3)
+        assert cache.get("b") is None
+        assert cache.get("a") == 1
+        assert cache.stats()["evictions"] == 1
+
+    def test_invalidate_where(self):
+        sys.path.insert(0, '/app/backend')
+        from cache import TTLCache
+
+        cache = TTLCache()
+        cache.set("t1", {"campaign_id": "c1"})
+        cache.set("t2", {"campaign_id": "c1"})
+        cache.set("t3", {"campaign_id": "c2"})
+        assert cache.invalidate_where(lambda key, value: value["campaign_id"] == "c1") == 2
+        assert cache.get("t3") == {"campaign_id": "c2"}
+        assert len(cache) == 1
+
+
+class TestCacheStatsEndpoint:
+    """Tests for GET /api/v1/admin/cache-stats"""
+
+    def test_requires_auth(self):
+        response = requests.get(f"{BASE_URL}/api/v1/admin/cache-stats")
+        assert response.status_code == 401
+
+    def test_redirect_cache_stats(self):
+        session = requests.Session()
+        login = session.post(f"{BASE_URL}/api/v1/auth/login", json={"email": ADMIN_EMAIL, "password": ADMIN_PASSWORD})
+        assert login.status_code == 200
+
+        response = session.get(f"{BASE_URL}/api/v1/admin/cache-stats")
+        assert response.status_code == 200
+        data = response.json()
+        assert "redirect" in data
+        assert "hits" in data["redirect"]
+        assert "misses" in data["redirect"]
+
+
+class TestPrincipalCache:
+    """Authenticated requests resolve the user + profile id from the principal cache"""
+
+    def _admin_session(self):
+        session = requests.Session()
+        login = session.post(f"{BASE_URL}/api/v1/auth/login", json={"email": ADMIN_EMAIL, "password": ADMIN_PASSWORD})
+        assert login.status_code == 200
+        return session
+
+    def test_repeat_requests_hit_cache(self):
+        admin = self._admin_session()
+        before = admin.get(f"{BASE_URL}/api/v1/admin/cache-stats").json()["principal"]["hits"]
+        for _ in range(3):
+            assert admin.get(f"{BASE_URL}/api/v1/auth/me").status_code == 200
+        after = admin.get(f"{BASE_URL}/api/v1/admin/cache-stats").json()["principal"]["hits"]
+        assert after - before >= 3
+        print(f"✓ Principal cache hits: {before} -> {after}")
+
+    def test_deleted_user_rejected_immediately(self):
+        email = f"TEST_principal_{uuid.uuid4().hex[:8]}@example.com"
+        password = "Brand@123"
+        brand = requests.Session()
+        register = brand.post(f"{BASE_URL}/api/v1/auth/register", json={
+            "email": email,
+            "password": password,
+            "role": "brand"
+        })
+        assert register.status_code == 200, register.text
+        user_id = register.json()["user"]["id"]
+
+        login = brand.post(f"{BASE_URL}/api/v1/auth/login", json={"email": email, "password": password})
+        assert login.status_code == 200
+        assert brand.get(f"{BASE_URL}/api/v1/campaigns").status_code == 200  # principal now cached
+
+        admin = self._admin_session()
+        assert admin.delete(f"{BASE_URL}/api/v1/admin/users/{user_id}").status_code == 200
+        assert brand.get(f"{BASE_URL}/api/v1/campaigns").status_code == 401
+        print("✓ Deleted user's cached principal invalidated")
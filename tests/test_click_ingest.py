@@ -0,0 +1,134 @@
+"""
+Test suite for write-behind click ingestion
+Tests:
+- ClickIngestor batching, flush-on-stop, overflow and flush-error accounting
+- GET /api/redirect/{token} still redirects, GET /api/v1/admin/click-ingestion stats
+"""
+
+import pytest
+import requests
+import os
+import sys
+import asyncio
+
+BASE_URL = os.environ.get('REACT_APP_BACKEND_URL', '').rstrip('/')
+
+ADMIN_EMAIL = "admin@example.com"
+ADMIN_PASSWORD = "Admin@123"
+
+
+class FakeInsertResult:
+    def __init__(self, docs):
+        self.inserted_ids = [d["id"] for d in docs]
+
+
+class FakeCollection:
+    """Records insert_many batches instead of talking to MongoDB"""
+
+    def __init__(self):
+        self.batches = []
+
+    async def insert_many(self, docs, ordered=True):
+        assert ordered is False, "Clicks must be written with ordered=False"
+        self.batches.append(list(docs))
+        return FakeInsertResult(docs)
+
+
+class TestClickIngestorModule:
+    """Tests for backend/click_ingest.py"""
+
+    def test_batches_by_size(self):
+        sys.path.insert(0, '/app/backend')
+        from click_ingest import ClickIngestor
+
+        async def run():
+            collection = FakeCollection()
+            ingestor = ClickIngestor(collection, batch_size=10, flush_interval=5)
+            ingestor.start()
+            for i in range(25):
+                ingestor.record({"id": str(i)})
+            await asyncio.sleep(0.05)
+            # Two full batches flushed without waiting for the interval
+            assert [len(b) for b in collection.batches] == [10, 10]
+            await ingestor.stop()
+            return collection, ingestor
+
+        collection, ingestor = asyncio.run(run())
+        assert sum(len(b) for b in collection.batches) == 25, "stop() must flush the remainder"
+        assert ingestor.stats()["inserted"] == 25
+        print(f"✓ Batches written: {[len(b) for b in collection.batches]}")
+
+    def test_flushes_on_interval(self):
+        sys.path.insert(0, '/app/backend')
+        from click_ingest import ClickIngestor
+
+        async def run():
+            collection = FakeCollection()
+            ingestor = ClickIngestor(collection, batch_size=500, flush_interval=0.05)
+            ingestor.start()
+            ingestor.record({"id": "only"})
+            await asyncio.sleep(0.2)
+            flushed = list(collection.batches)
+            await ingestor.stop()
+            return flushed
+
+        assert asyncio.run(run()) == [[{"id": "only"}]]
+
+    def test_overflow_is_counted(self):
+        sys.path.insert(0, '/app/backend')
+        from click_ingest import ClickIngestor
+
+        async def run():
+            ingestor = ClickIngestor(FakeCollection(), max_queue_size=3)
+            results = [ingestor.record({"id": str(i)}) for i in range(5)]
+            return results, ingestor.stats()
+
+        results, stats = asyncio.run(run())
+        assert results == [True, True, True, False, False]
+        assert stats["dropped"] == 2
+        assert stats["queue_depth"] == 3
+
+    def test_unexpected_flush_error_keeps_ingesting(self):
+        sys.path.insert(0, '/app/backend')
+        from click_ingest import ClickIngestor
+
+        class FlakyCollection(FakeCollection):
+            async def insert_many(self, docs, ordered=True):
+                if any(d["id"] == "bad" for d in docs):
+                    raise ValueError("cannot encode object")
+                return await super().insert_many(docs, ordered)
+
+        async def run():
+            collection = FlakyCollection()
+            ingestor = ClickIngestor(collection, batch_size=1, flush_interval=5)
+            ingestor.start()
+            ingestor.record({"id": "bad"})
+            await asyncio.sleep(0.05)
+            ingestor.record({"id": "good"})
+            await asyncio.sleep(0.05)
+            await ingestor.stop()
+            return collection, ingestor.stats()
+
+        collection, stats = asyncio.run(run())
+        assert collection.batches == [[{"id": "good"}]]
+        assert stats["failed"] == 1
+        assert stats["inserted"] == 1
+
+
+class TestClickIngestionEndpoints:
+    """Integration tests for redirect logging"""
+
+    def test_invalid_token_404(self):
+        response = requests.get(f"{BASE_URL}/api/redirect/does-not-exist", allow_redirects=False)
+        assert response.status_code == 404
+
+    def test_admin_stats(self):
+        session = requests.Session()
+        login = session.post(f"{BASE_URL}/api/v1/auth/login", json={"email": ADMIN_EMAIL, "password": ADMIN_PASSWORD})
+        assert login.status_code == 200
+
+        response = session.get(f"{BASE_URL}/api/v1/admin/click-ingestion")
+        assert response.status_code == 200
+        data = response.json()
+        for key in ("queue_depth", "enqueued", "inserted", "dropped", "failed", "batches"):
+            assert key in data
@@ -0,0 +1,129 @@
+"""
+Test suite for cached admin dashboard counters
+Tests:
+- DashboardStats serves a cached snapshot and recomputes when forced or stale
+- concurrent refreshes share one computation
+- GET /api/v1/admin/dashboard returns computed_at and honours ?refresh=true
+"""
+
+import pytest
+import requests
+import os
+import sys
+import asyncio
+from datetime import datetime, timezone, timedelta
+
+sys.path.insert(0, '/app/backend')
+
+BASE_URL = os.environ.get('REACT_APP_BACKEND_URL', '').rstrip('/')
+
+ADMIN_EMAIL = "admin@example.com"
+ADMIN_PASSWORD = "Admin@123"
+BRAND_EMAIL = "brand@example.com"
+BRAND_PASSWORD = "Brand@123"
+
+
+class FakeCountCollection:
+    def __init__(self, count):
+        self.count = count
+        self.calls = 0
+
+    async def count_documents(self, query):
+        self.calls += 1
+        await asyncio.sleep(0)
+        return self.count
+
+    async def estimated_document_count(self):
+        self.calls += 1
+        await asyncio.sleep(0)
+        return self.count
+
+
+class FakeDB:
+    def __init__(self):
+        self.users = FakeCountCollection(10)
+        self.campaigns = FakeCountCollection(3)
+        self.amazon_click_logs = FakeCountCollection(1000)
+        self.purchase_proofs = FakeCountCollection(2)
+
+
+class TestDashboardStatsModule:
+    """Tests for backend/dashboard_stats.py"""
+
+    def test_snapshot_is_cached(self):
+        from dashboard_stats import DashboardStats
+        db = FakeDB()
+        stats = DashboardStats(db, refresh_interval=60)
+
+        async def scenario():
+            first = await stats.get()
+            db.amazon_click_logs.count = 2000
+            second = await stats.get()
+            forced = await stats.get(force=True)
+            return first, second, forced
+
+        first, second, forced = asyncio.run(scenario())
+        assert first["total_clicks"] == 1000
+        assert second["total_clicks"] == 1000, "Cached snapshot should be served"
+        assert forced["total_clicks"] == 2000
+        assert first["computed_at"]
+        assert stats.stats()["refreshes"] == 2
+        print("✓ Dashboard counters cached until forced")
+
+    def test_stale_snapshot_recomputed(self):
+        from dashboard_stats import DashboardStats
+        stats = DashboardStats(FakeDB(), refresh_interval=60)
+
+        async def scenario():
+            await stats.get()
+            stats._snapshot["computed_at"] = (datetime.now(timezone.utc) - timedelta(minutes=10)).isoformat()
+            return await stats.get()
+
+        snapshot = asyncio.run(scenario())
+        assert datetime.fromisoformat(snapshot["computed_at"]) > datetime.now(timezone.utc) - timedelta(minutes=1)
+        assert stats.stats()["refreshes"] == 2
+
+    def test_concurrent_refreshes_share_computation(self):
+        from dashboard_stats import DashboardStats
+        db = FakeDB()
+        stats = DashboardStats(db, refresh_interval=60)
+
+        async def scenario():
+            return await asyncio.gather(*(stats.get(force=True) for _ in range(5)))
+
+        results = asyncio.run(scenario())
+        assert all(r == results[0] for r in results)
+        assert stats.stats()["refreshes"] == 1
+        assert db.amazon_click_logs.calls == 1
+
+
+class TestAdminDashboardEndpoint:
+    """GET /api/v1/admin/dashboard"""
+
+    @pytest.fixture
+    def admin_session(self):
+        session = requests.Session()
+        response = session.post(f"{BASE_URL}/api/v1/auth/login", json={
+            "email": ADMIN_EMAIL,
+            "password": ADMIN_PASSWORD
+        })
+        assert response.status_code == 200, f"Admin login failed: {response.text}"
+        return session
+
+    def test_dashboard_has_computed_at(self, admin_session):
+        response = admin_session.get(f"{BASE_URL}/api/v1/admin/dashboard")
+        assert response.status_code == 200
+        data = response.json()
+        for key in ["total_users", "pending_users", "total_campaigns", "total_clicks", "pending_purchase_proofs", "computed_at"]:
+            assert key in data
+
+    def test_force_refresh(self, admin_session):
+        cached = admin_session.get(f"{BASE_URL}/api/v1/admin/dashboard").json()
+        refreshed = admin_session.get(f"{BASE_URL}/api/v1/admin/dashboard", params={"refresh": "true"}).json()
+        assert refreshed["computed_at"] >= cached["computed_at"]
+
+    def test_brand_cannot_view(self):
+        session = requests.Session()
+        session.post(f"{BASE_URL}/api/v1/auth/login", json={"email": BRAND_EMAIL, "password": BRAND_PASSWORD})
+        response = session.get(f"{BASE_URL}/api/v1/admin/dashboard")
+        assert response.status_code == 403
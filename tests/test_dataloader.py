@@ -0,0 +1,116 @@
+"""
+Test suite for the request-scoped DataLoader
+Tests:
+- concurrent loads coalesce into one $in query per collection
+- results are memoized per loader and copied per caller
+- field projections, missing documents and failed batches
+"""
+
+import pytest
+import sys
+import asyncio
+
+sys.path.insert(0, '/app/backend')
+
+
+class FakeCursor:
+    def __init__(self, docs):
+        self.docs = docs
+
+    async def to_list(self, length):
+        await asyncio.sleep(0)
+        return self.docs
+
+
+class FakeCollection:
+    def __init__(self, docs, fail=False):
+        self.docs = docs
+        self.fail = fail
+        self.queries = []
+
+    def find(self, query, projection):
+        self.queries.append(query)
+        if self.fail:
+            raise RuntimeError("boom")
+        (field, cond), = query.items()
+        matched = [d for d in self.docs if d.get(field) in cond["$in"]]
+        if len(projection) > 1:
+            matched = [{k: v for k, v in d.items() if k in projection} for d in matched]
+        return FakeCursor(matched)
+
+
+def _db():
+    # DataLoader only uses db[collection_name]
+    return dict(
+        campaigns=FakeCollection([
+            {"id": "c1", "title": "Summer", "brand_id": "b1"},
+            {"id": "c2", "title": "Winter", "brand_id": "b1"},
+        ]),
+        brands=FakeCollection([{"id": "b1", "company_name": "Acme"}])
+    )
+
+
+class TestDataLoaderModule:
+    """Tests for backend/dataloader.py"""
+
+    def test_concurrent_loads_are_batched(self):
+        from dataloader import DataLoader
+        db = _db()
+        loader = DataLoader(db)
+
+        async def scenario():
+            return await asyncio.gather(
+                loader.load("campaigns", "c1"),
+                loader.load("campaigns", "c2"),
+                loader.load("campaigns", "c1"),
+                loader.load("brands", "b1"),
+                loader.load("campaigns", "missing")
+            )
+
+        c1, c2, c1_again, brand, missing = asyncio.run(scenario())
+        assert c1["title"] == "Summer" and c2["title"] == "Winter"
+        assert c1_again == c1 and c1_again is not c1
+        assert brand["company_name"] == "Acme"
+        assert missing is None
+        assert len(db["campaigns"].queries) == 1
+        assert set(db["campaigns"].queries[0]["id"]["$in"]) == {"c1", "c2", "missing"}
+        assert len(db["brands"].queries) == 1
+        assert loader.stats() == {"loads": 5, "hits": 1, "batches": 2}
+        print("✓ 5 loads served by 2 queries")
+
+    def test_memoized_across_ticks(self):
+        from dataloader import DataLoader
+        db = _db()
+        loader = DataLoader(db)
+
+        async def scenario():
+            first = await loader.load("campaigns", "c1")
+            first["enriched"] = True
+            return await loader.load("campaigns", "c1")
+
+        second = asyncio.run(scenario())
+        assert "enriched" not in second, "Callers get copies, not the memoized document"
+        assert len(db["campaigns"].queries) == 1
+
+    def test_fields_projection(self):
+        from dataloader import DataLoader
+        loader = DataLoader(_db())
+
+        async def scenario():
+            return await loader.load_many("campaigns", ["c1", "c2"], fields=["title"])
+
+        assert asyncio.run(scenario()) == [{"title": "Summer"}, {"title": "Winter"}]
+
+    def test_failed_batch_can_retry(self):
+        from dataloader import DataLoader
+        db = _db()
+        db["campaigns"].fail = True
+        loader = DataLoader(db)
+
+        async def scenario():
+            with pytest.raises(RuntimeError):
+                await loader.load("campaigns", "c1")
+            db["campaigns"].fail = False
+            return await loader.load("campaigns", "c1")
+
+        assert asyncio.run(scenario())["title"] == "Summer"
@@ -0,0 +1,83 @@
+"""
+Test suite for the MongoDB index registry
+Tests:
+- db_indexes module registry covers the hot lookup paths
+- GET /api/v1/admin/indexes - index report (admin only)
+- POST /api/v1/admin/indexes/ensure - re-apply registry (admin only)
+"""
+
+import pytest
+import requests
+import os
+import sys
+
+BASE_URL = os.environ.get('REACT_APP_BACKEND_URL', '').rstrip('/')
+
+ADMIN_EMAIL = "admin@example.com"
+ADMIN_PASSWORD = "Admin@123"
+BRAND_EMAIL = "brand@example.com"
+BRAND_PASSWORD = "Brand@123"
+
+
+def _index_keys(collection):
+    sys.path.insert(0, '/app/backend')
+    from db_indexes import INDEX_REGISTRY
+    return [list(index.document["key"].keys()) for index in INDEX_REGISTRY[collection]]
+
+
+class TestIndexRegistry:
+    """Verify the registry declares the indexes server.py lookups rely on"""
+
+    def test_every_entity_collection_has_unique_id(self):
+        sys.path.insert(0, '/app/backend')
+        from db_indexes import INDEX_REGISTRY
+
+        for collection, indexes in INDEX_REGISTRY.items():
+            if collection in ("click_logs", "password_resets"):
+                continue
+            # Keyed by a unique natural key instead of an id: filename / content hash
+            if collection in ("upload_files", "upload_blobs"):
+                continue
+            unique_keys = [list(i.document["key"].keys()) for i in indexes if i.document.get("unique")]
+            assert ["id"] in unique_keys, f"{collection} is missing a unique id index"
+        print("✓ All entity collections have a unique id index")
+
+    def test_hot_path_indexes_declared(self):
+        assert ["redirect_token"] in _index_keys("assignments")
+        assert ["email", "deleted_at"] in _index_keys("users")
+        assert ["public_profile_slug"] in _index_keys("influencers")
+        assert ["landing_page_slug"] in _index_keys("campaigns")
+        assert ["campaign_id", "status"] in _index_keys("applications")
+        assert ["influencer_id", "status", "created_at"] in _index_keys("payouts")
+        print("✓ Hot path indexes declared")
+
+
+class TestIndexReportEndpoint:
+    """Tests for GET /api/v1/admin/indexes"""
+
+    def test_requires_auth(self):
+        response = requests.get(f"{BASE_URL}/api/v1/admin/indexes")
+        assert response.status_code == 401
+
+    def test_requires_admin(self):
+        session = requests.Session()
+        login = session.post(f"{BASE_URL}/api/v1/auth/login", json={"email": BRAND_EMAIL, "password": BRAND_PASSWORD})
+        assert login.status_code == 200
+        response = session.get(f"{BASE_URL}/api/v1/admin/indexes")
+        assert response.status_code == 403
+
+    def test_report_after_startup(self):
+        session = requests.Session()
+        login = session.post(f"{BASE_URL}/api/v1/auth/login", json={"email": ADMIN_EMAIL, "password": ADMIN_PASSWORD})
+        assert login.status_code == 200
+
+        response = session.get(f"{BASE_URL}/api/v1/admin/indexes")
+        assert response.status_code == 200
+        data = response.json()
+        assert "collections" in data
+        assert "total_missing" in data
+        assert "total_unused" in data
+
+        assignments = next(c for c in data["collections"] if c["collection"] == "assignments")
+        assert "redirect_token_1" not in assignments["missing"], "Startup should have created redirect_token index"
+        print(f"✓ Index report: {data['total_missing']} missing, {data['total_unused']} unused")
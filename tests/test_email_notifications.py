@@ -497,7 +497,8 @@ class TestEmailIntegrationInServer:
             content = f.read()
         
         assert 'from email_service import EmailService' in content
-        assert 'email_service = EmailService(db)' in content
+        # Constructed with the db plus SMTP pool / settings cache options
+        assert 'email_service = EmailService(\n    db,' in content
         print("✓ EmailService imported and initialized in server.py")
     
     def test_registration_endpoint_sends_emails(self):
@@ -551,15 +552,17 @@ class TestEmailIntegrationInServer:
         print("✓ Product review endpoints send notification emails")
     
     def test_emails_sent_asynchronously(self):
-        """Verify emails are sent asynchronously using asyncio.create_task"""
+        """Verify emails are queued in the outbox instead of sent inline"""
         with open('/app/backend/server.py', 'r') as f:
             content = f.read()
         
-        # Count asyncio.create_task calls for email sending
+        # send_* only enqueues once the outbox is attached, so awaiting it is cheap
         import re
-        async_email_calls = re.findall(r'asyncio\.create_task\(email_service\.send_', content)
-        assert len(async_email_calls) >= 10, f"Expected at least 10 async email calls, found {len(async_email_calls)}"
-        print(f"✓ Found {len(async_email_calls)} asynchronous email sending calls")
+        assert 'email_service.outbox = email_outbox' in content, "EmailService should be wired to the outbox"
+        assert not re.findall(r'asyncio\.create_task\(email_service\.send_', content), "Fire-and-forget email tasks should go through the outbox"
+        queued_email_calls = re.findall(r'await email_service\.send_', content)
+        assert len(queued_email_calls) >= 10, f"Expected at least 10 queued email calls, found {len(queued_email_calls)}"
+        print(f"✓ Found {len(queued_email_calls)} outbox email sending calls")
 
 
 if __name__ == "__main__":
@@ -0,0 +1,270 @@
+"""
+Test suite for the durable email outbox
+Tests:
+- EmailOutbox enqueue/claim/deliver lifecycle
+- retry with exponential backoff, permanent failure after max_attempts
+- expired leases are reclaimed, unconfigured SMTP is skipped
+- GET /api/v1/admin/email-outbox stats (admin only)
+"""
+
+import pytest
+import requests
+import os
+import sys
+import asyncio
+from datetime import datetime, timezone, timedelta
+
+BASE_URL = os.environ.get('REACT_APP_BACKEND_URL', '').rstrip('/')
+
+ADMIN_EMAIL = "admin@example.com"
+ADMIN_PASSWORD = "Admin@123"
+BRAND_EMAIL = "brand@example.com"
+BRAND_PASSWORD = "Brand@123"
+
+
+def _matches(doc, query):
+    for key, cond in query.items():
+        if key == "$or":
+            if not any(_matches(doc, sub) for sub in cond):
+                return False
+        elif isinstance(cond, dict) and "$lte" in cond:
+            if doc.get(key) is None or doc[key] > cond["$lte"]:
+                return False
+        elif doc.get(key) != cond:
+            return False
+    return True
+
+
+class FakeOutboxCollection:
+    """In-memory stand-in supporting the queries EmailOutbox issues"""
+
+    def __init__(self):
+        self.docs = []
+
+    async def insert_one(self, doc):
+        self.docs.append(dict(doc))
+
+    async def find_one_and_update(self, query, update, projection=None, sort=None, return_document=None):
+        candidates = [d for d in self.docs if _matches(d, query)]
+        if sort:
+            field, _ = sort[0]
+            candidates.sort(key=lambda d: d.get(field) or "")
+        if not candidates:
+            return None
+        doc = candidates[0]
+        doc.update(update.get("$set", {}))
+        for field, amount in update.get("$inc", {}).items():
+            doc[field] = doc.get(field, 0) + amount
+        return dict(doc)
+
+    async def update_one(self, query, update):
+        for doc in self.docs:
+            if _matches(doc, query):
+                doc.update(update["$set"])
+                for field in update.get("$unset", {}):
+                    doc.pop(field, None)
+                return
+
+    def by_id(self, email_id):
+        return next(d for d in self.docs if d["id"] == email_id)
+
+
+class FakeDB:
+    def __init__(self):
+        self.email_outbox = FakeOutboxCollection()
+
+
+class FakeEmailService:
+    def __init__(self, fail_times=0, error=None):
+        self.fail_times = fail_times
+        self.error = error
+        self.delivered = []
+
+    async def deliver(self, to_email, template_name, template_data):
+        if self.error is not None:
+            raise self.error
+        if self.fail_times > 0:
+            self.fail_times -= 1
+            raise ConnectionError("SMTP server unavailable")
+        self.delivered.append((to_email, template_name, template_data))
+
+
+def _outbox(service, **kwargs):
+    sys.path.insert(0, '/app/backend')
+    from email_outbox import EmailOutbox
+    return EmailOutbox(FakeDB(), service, **kwargs)
+
+
+class TestEmailOutboxModule:
+    """Tests for backend/email_outbox.py"""
+
+    def test_enqueue_then_deliver(self):
+        service = FakeEmailService()
+        outbox = _outbox(service)
+
+        async def run():
+            email_id = await outbox.enqueue("creator@influiv.test", "influencer_welcome", {"name": "Creator"})
+            assert outbox.db.email_outbox.by_id(email_id)["status"] == "pending"
+            handled = await outbox.run_once()
+            return email_id, handled
+
+        email_id, handled = asyncio.run(run())
+        doc = outbox.db.email_outbox.by_id(email_id)
+        assert handled == 1
+        assert doc["status"] == "sent"
+        assert doc["attempts"] == 1
+        assert doc["locked_by"] is None
+        assert service.delivered == [("creator@influiv.test", "influencer_welcome", {"name": "Creator"})]
+        # Sent: template data dropped, expiry set for the TTL index
+        assert "template_data" not in doc
+        assert doc["expires_at"] > datetime.now(timezone.utc) + timedelta(days=6)
+        print("✓ Enqueued email delivered by the worker")
+
+    def test_transient_failure_backs_off_then_fails_permanently(self):
+        service = FakeEmailService(fail_times=10)
+        outbox = _outbox(service, max_attempts=3, base_backoff=30)
+
+        async def attempt(email_id):
+            # Make the message due again regardless of its backoff
+            outbox.db.email_outbox.by_id(email_id)["next_attempt_at"] = datetime.now(timezone.utc).isoformat()
+            await outbox.run_once()
+            return dict(outbox.db.email_outbox.by_id(email_id))
+
+        async def run():
+            email_id = await outbox.enqueue("brand@influiv.test", "brand_welcome", {"name": "Brand"})
+            return [await attempt(email_id) for _ in range(3)]
+
+        first, second, third = asyncio.run(run())
+        assert first["status"] == "pending" and first["attempts"] == 1
+        assert "SMTP server unavailable" in first["last_error"]
+        assert outbox.backoff_seconds(1) == 30 and outbox.backoff_seconds(2) == 60
+        assert datetime.fromisoformat(first["next_attempt_at"]) > datetime.now(timezone.utc) + timedelta(seconds=20)
+        assert second["status"] == "pending" and second["attempts"] == 2
+        assert third["status"] == "failed" and third["attempts"] == 3
+        # Retries keep no expiry; the final failure keeps its data (for admin retry) until it expires
+        assert "expires_at" not in second
+        assert "expires_at" in third and third["template_data"] == {"name": "Brand"}
+        assert service.delivered == []
+
+    def test_not_due_messages_are_not_claimed(self):
+        outbox = _outbox(FakeEmailService(fail_times=1))
+
+        async def run():
+            await outbox.enqueue("a@influiv.test", "brand_welcome", {"name": "A"})
+            await outbox.run_once()  # fails, backs off
+            return await outbox.run_once()
+
+        assert asyncio.run(run()) == 0
+
+    def test_expired_lease_is_reclaimed(self):
+        service = FakeEmailService()
+        outbox = _outbox(service)
+
+        async def run():
+            email_id = await outbox.enqueue("a@influiv.test", "brand_welcome", {"name": "A"})
+            doc = outbox.db.email_outbox.by_id(email_id)
+            # Simulate a worker that claimed the message and crashed
+            doc.update({
+                "status": "sending",
+                "locked_by": "dead-worker",
+                "locked_until": (datetime.now(timezone.utc) - timedelta(seconds=1)).isoformat(),
+                "attempts": 1
+            })
+            await outbox.run_once()
+            return outbox.db.email_outbox.by_id(email_id)
+
+        doc = asyncio.run(run())
+        assert doc["status"] == "sent"
+        assert doc["attempts"] == 2
+        assert len(service.delivered) == 1
+
+    def test_unconfigured_smtp_is_skipped(self):
+        sys.path.insert(0, '/app/backend')
+        from email_service import EmailNotConfigured
+        outbox = _outbox(FakeEmailService(error=EmailNotConfigured("SMTP not configured")))
+
+        async def run():
+            email_id = await outbox.enqueue("a@influiv.test", "brand_welcome", {"name": "A"})
+            await outbox.run_once()
+            return outbox.db.email_outbox.by_id(email_id)
+
+        assert asyncio.run(run())["status"] == "skipped"
+
+    def test_worker_wakes_on_enqueue(self):
+        service = FakeEmailService()
+        outbox = _outbox(service, poll_interval=30)
+
+        async def run():
+            outbox.start()
+            await asyncio.sleep(0.01)
+            await outbox.enqueue("a@influiv.test", "brand_welcome", {"name": "A"})
+            for _ in range(50):
+                if service.delivered:
+                    break
+                await asyncio.sleep(0.01)
+            await outbox.stop()
+
+        asyncio.run(run())
+        assert len(service.delivered) == 1, "Enqueue should wake the worker before poll_interval elapses"
+
+
+class TestEmailServiceOutboxHook:
+    """EmailService.send_* enqueue instead of sending when an outbox is attached"""
+
+    def test_send_email_enqueues(self):
+        sys.path.insert(0, '/app/backend')
+        from email_service import EmailService
+
+        class RecordingOutbox:
+            def __init__(self):
+                self.queued = []
+
+            async def enqueue(self, to_email, template_name, template_data):
+                self.queued.append((to_email, template_name, template_data))
+                return "queued-id"
+
+        service = EmailService(db=None)
+        service.outbox = RecordingOutbox()
+        result = asyncio.run(service.send_brand_welcome("brand@influiv.test", "Brand Co"))
+        assert result is True
+        assert service.outbox.queued[0][0] == "brand@influiv.test"
+        assert service.outbox.queued[0][1] == "brand_welcome"
+
+
+@pytest.fixture
+def admin_session():
+    session = requests.Session()
+    response = session.post(f"{BASE_URL}/api/v1/auth/login", json={
+        "email": ADMIN_EMAIL,
+        "password": ADMIN_PASSWORD
+    })
+    assert response.status_code == 200, f"Admin login failed: {response.text}"
+    return session
+
+
+@pytest.fixture
+def brand_session():
+    session = requests.Session()
+    response = session.post(f"{BASE_URL}/api/v1/auth/login", json={
+        "email": BRAND_EMAIL,
+        "password": BRAND_PASSWORD
+    })
+    assert response.status_code == 200, f"Brand login failed: {response.text}"
+    return session
+
+
+class TestEmailOutboxEndpoint:
+    """GET /api/v1/admin/email-outbox"""
+
+    def test_admin_can_view_outbox_stats(self, admin_session):
+        response = admin_session.get(f"{BASE_URL}/api/v1/admin/email-outbox")
+        assert response.status_code == 200
+        data = response.json()
+        assert "counts" in data
+        assert "recent_failures" in data
+        assert data["worker_running"] is True
+        print(f"✓ Outbox counts: {data['counts']}")
+
+    def test_brand_cannot_view_outbox_stats(self, brand_session):
+        response = brand_session.get(f"{BASE_URL}/api/v1/admin/email-outbox")
+        assert response.status_code == 403
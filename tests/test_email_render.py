@@ -0,0 +1,105 @@
+"""
+Test suite for precompiled email rendering
+Tests:
+- every template compiles and renders exactly like str.format
+- plain-text alternative is generated from the HTML
+- messages parse as multipart/alternative with both parts
+- rendered bodies are cached per template + data
+- template data and recipients can't inject headers
+"""
+
+import pytest
+import sys
+import email
+from string import Formatter
+
+sys.path.insert(0, '/app/backend')
+
+
+def _sample_data(template):
+    fields = {
+        field
+        for key in ("subject", "html")
+        for _, field, _, _ in Formatter().parse(template[key])
+        if field is not None
+    }
+    return {field: f"sample-{field}" for field in fields}
+
+
+class TestEmailRenderModule:
+    """Tests for backend/email_render.py"""
+
+    def test_compiled_output_matches_format(self):
+        from email_service import EMAIL_TEMPLATES, email_renderer
+        for name, template in EMAIL_TEMPLATES.items():
+            data = _sample_data(template)
+            rendered = email_renderer.render(name, data)
+            assert rendered.subject == template["subject"].format(**data), name
+            assert rendered.html == template["html"].format(**data), name
+        print(f"✓ {len(EMAIL_TEMPLATES)} templates render identically to str.format")
+
+    def test_missing_field_raises_key_error(self):
+        from email_render import CompiledTemplate
+        with pytest.raises(KeyError):
+            CompiledTemplate("Hi {name}, {missing}").render({"name": "x"})
+
+    def test_rejects_unsupported_placeholders(self):
+        from email_render import CompiledTemplate
+        with pytest.raises(ValueError):
+            CompiledTemplate("{amount:.2f}")
+        assert CompiledTemplate("{{literal}} {name}").render({"name": "x"}) == "{literal} x"
+
+    def test_plain_text_alternative(self):
+        from email_service import email_renderer
+        rendered = email_renderer.render("password_reset", {"name": "Jo", "reset_url": "https://influiv.com/reset?t=abc"})
+        assert "<" not in rendered.text
+        assert "Hi Jo," in rendered.text
+        assert "Reset Password (https://influiv.com/reset?t=abc)" in rendered.text
+
+        rendered = email_renderer.render("application_approved", {"influencer_name": "Jo", "campaign_title": "Summer"})
+        assert "1. Use the Amazon link provided to purchase the product" in rendered.text
+        assert "View Assignment (https://influiv.com/influencer/assignments)" in rendered.text
+
+    def test_message_is_multipart_alternative(self):
+        from email_service import email_renderer
+        rendered = email_renderer.render("brand_welcome", {"name": "Zoë"})
+        message = email.message_from_string(rendered.to_message("Influiv Téam", "no-reply@influiv.com", "brand@influiv.test"))
+
+        assert message.get_content_type() == "multipart/alternative"
+        assert message["To"] == "brand@influiv.test"
+        assert str(email.header.make_header(email.header.decode_header(message["From"]))) == "Influiv Téam <no-reply@influiv.com>"
+        text_part, html_part = message.get_payload()
+        assert text_part.get_content_type() == "text/plain"
+        assert html_part.get_content_type() == "text/html"
+        assert html_part.get_payload(decode=True).decode("utf-8") == rendered.html
+        assert "Zoë" in text_part.get_payload(decode=True).decode("utf-8")
+
+    def test_render_cache(self):
+        from email_service import EMAIL_TEMPLATES
+        from email_render import EmailRenderer
+        renderer = EmailRenderer(EMAIL_TEMPLATES)
+        data = {"name": "Admin", "email": "new@influiv.test", "role": "brand", "registered_at": "now"}
+
+        first = renderer.render("admin_new_user", data)
+        second = renderer.render("admin_new_user", dict(data, app_url="ignored"))
+        third = renderer.render("admin_new_user", dict(data, name="Other"))
+
+        assert second is first, "Unused keys should not affect the cache key"
+        assert third is not first
+        assert renderer.stats()["hits"] == 1
+
+    def test_no_header_injection(self):
+        from email_service import email_renderer
+        from email_render import InvalidEmailHeader
+        from email_service import EMAIL_TEMPLATES
+        data = _sample_data(EMAIL_TEMPLATES["new_application"])
+        data["campaign_title"] = "Promo\nBcc: attacker@evil.com"
+        rendered = email_renderer.render("new_application", data)
+        assert "\n" not in rendered.subject
+        message = email.message_from_string(rendered.to_message("Influiv", "no-reply@influiv.com", "brand@influiv.test"))
+        assert message["Bcc"] is None
+        assert "Bcc: attacker@evil.com" in message["Subject"]
+
+        for from_name, to_email in [("Influiv\r\nBcc: x@evil.com", "a@b.test"), ("Influiv", "a@b.test\nBcc: x@evil.com")]:
+            with pytest.raises(InvalidEmailHeader):
+                rendered.to_message(from_name, "no-reply@influiv.com", to_email)
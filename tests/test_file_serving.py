@@ -0,0 +1,155 @@
+"""
+Test suite for conditional and byte-range file responses
+Tests:
+- Range header parsing (open, suffix, clamped, multi-range, unsatisfiable)
+- If-None-Match / If-Modified-Since revalidation
+- 200 / 206 / 304 / 416 responses, If-Range and HEAD
+- GET /api/v1/files/{filename} ETag, Cache-Control and Range on a real upload
+"""
+
+import pytest
+import requests
+import os
+import sys
+from email.utils import formatdate
+
+sys.path.insert(0, '/app/backend')
+
+BASE_URL = os.environ.get('REACT_APP_BACKEND_URL', '').rstrip('/')
+
+ADMIN_EMAIL = "admin@example.com"
+ADMIN_PASSWORD = "Admin@123"
+
+ETAG = '"abc123"'
+
+
+class TestRangeParsing:
+    """Tests for backend/file_serving.py"""
+
+    def test_parse_range(self):
+        from file_serving import parse_range
+        assert parse_range("bytes=0-99", 1000) == (0, 99)
+        assert parse_range("bytes=900-", 1000) == (900, 999)
+        assert parse_range("bytes=-100", 1000) == (900, 999)
+        assert parse_range("bytes=-5000", 1000) == (0, 999)
+        assert parse_range("bytes=990-5000", 1000) == (990, 999)
+
+    def test_ignored_ranges(self):
+        from file_serving import parse_range
+        for header in ["items=0-1", "bytes=0-1,5-6", "bytes=5-1", "bytes=a-b", "bytes=5"]:
+            assert parse_range(header, 1000) is None, header
+
+    def test_unsatisfiable(self):
+        from file_serving import parse_range, RangeNotSatisfiable
+        for header in ["bytes=1000-", "bytes=2000-3000", "bytes=-0"]:
+            with pytest.raises(RangeNotSatisfiable):
+                parse_range(header, 1000)
+
+    def test_not_modified(self):
+        from file_serving import is_not_modified
+        mtime = 1_700_000_000.5
+        assert is_not_modified({"if-none-match": ETAG}, ETAG, mtime)
+        assert is_not_modified({"if-none-match": f'"other", W/{ETAG}'}, ETAG, mtime)
+        assert is_not_modified({"if-none-match": "*"}, ETAG, mtime)
+        assert not is_not_modified({"if-none-match": '"other"'}, ETAG, mtime)
+        assert is_not_modified({"if-modified-since": formatdate(mtime, usegmt=True)}, ETAG, mtime)
+        assert not is_not_modified({"if-modified-since": formatdate(mtime - 60, usegmt=True)}, ETAG, mtime)
+        assert not is_not_modified({"if-modified-since": "garbage"}, ETAG, mtime)
+        # If-None-Match takes precedence
+        assert not is_not_modified(
+            {"if-none-match": '"other"', "if-modified-since": formatdate(mtime, usegmt=True)}, ETAG, mtime
+        )
+
+
+@pytest.fixture
+def client(tmp_path):
+    from fastapi import FastAPI, Request
+    from starlette.testclient import TestClient
+    from file_serving import file_response
+
+    data = bytes(range(256)) * 40
+    (tmp_path / "clip.mp4").write_bytes(data)
+    app = FastAPI()
+
+    @app.api_route("/files/{name}", methods=["GET", "HEAD"])
+    async def serve(name: str, request: Request):
+        return file_response(request.headers, request.method, tmp_path / name, ETAG, "public, max-age=60")
+
+    return TestClient(app), data
+
+
+class TestFileResponse:
+    """file_response status codes and headers"""
+
+    def test_full(self, client):
+        client, data = client
+        response = client.get("/files/clip.mp4")
+        assert response.status_code == 200
+        assert response.content == data
+        assert response.headers["etag"] == ETAG
+        assert response.headers["accept-ranges"] == "bytes"
+        assert response.headers["cache-control"] == "public, max-age=60"
+        assert response.headers["content-type"] == "video/mp4"
+
+    def test_not_modified(self, client):
+        client, _ = client
+        response = client.get("/files/clip.mp4", headers={"If-None-Match": ETAG})
+        assert response.status_code == 304
+        assert response.content == b""
+        assert response.headers["etag"] == ETAG
+
+    def test_partial(self, client):
+        client, data = client
+        response = client.get("/files/clip.mp4", headers={"Range": "bytes=100-199"})
+        assert response.status_code == 206
+        assert response.content == data[100:200]
+        assert response.headers["content-range"] == f"bytes 100-199/{len(data)}"
+        assert response.headers["content-length"] == "100"
+
+    def test_unsatisfiable(self, client):
+        client, data = client
+        response = client.get("/files/clip.mp4", headers={"Range": f"bytes={len(data)}-"})
+        assert response.status_code == 416
+        assert response.headers["content-range"] == f"bytes */{len(data)}"
+
+    def test_if_range(self, client):
+        client, data = client
+        stale = client.get("/files/clip.mp4", headers={"Range": "bytes=0-9", "If-Range": '"stale"'})
+        assert stale.status_code == 200 and stale.content == data
+        fresh = client.get("/files/clip.mp4", headers={"Range": "bytes=0-9", "If-Range": ETAG})
+        assert fresh.status_code == 206 and fresh.content == data[:10]
+
+    def test_head(self, client):
+        client, data = client
+        response = client.head("/files/clip.mp4", headers={"Range": "bytes=0-9"})
+        assert response.status_code == 206
+        assert response.headers["content-length"] == "10"
+        assert response.content == b""
+
+
+class TestFilesEndpoint:
+    """GET /api/v1/files/{filename}"""
+
+    def test_conditional_and_range(self):
+        session = requests.Session()
+        response = session.post(f"{BASE_URL}/api/v1/auth/login", json={
+            "email": ADMIN_EMAIL,
+            "password": ADMIN_PASSWORD
+        })
+        assert response.status_code == 200
+        data = os.urandom(200_000)
+        filename = session.post(
+            f"{BASE_URL}/api/v1/upload", files={"file": ("clip.mp4", data, "video/mp4")}
+        ).json()["filename"]
+        url = f"{BASE_URL}/api/v1/files/{filename}"
+
+        response = requests.get(url)
+        assert response.status_code == 200
+        assert "immutable" in response.headers["cache-control"]
+        etag = response.headers["etag"]
+
+        assert requests.get(url, headers={"If-None-Match": etag}).status_code == 304
+        partial = requests.get(url, headers={"Range": "bytes=1000-1999"})
+        assert partial.status_code == 206
+        assert partial.content == data[1000:2000]
+        print(f"✓ {filename} served with ETag {etag}")
@@ -0,0 +1,155 @@
+"""
+Test suite for responsive image variants
+Tests:
+- render_variants writes WebP copies narrower than the source, never upscaling
+- EXIF orientation is applied before resizing
+- best_variant picks the narrowest rendered variant at least the requested width
+- GET /api/v1/files/{filename}?w= serves a variant once rendered
+"""
+
+import pytest
+import requests
+import os
+import io
+import sys
+import time
+
+sys.path.insert(0, '/app/backend')
+
+BASE_URL = os.environ.get('REACT_APP_BACKEND_URL', '').rstrip('/')
+
+ADMIN_EMAIL = "admin@example.com"
+ADMIN_PASSWORD = "Admin@123"
+
+SHA = "ab" + "0" * 62
+
+
+def _jpeg(width, height, **save_args):
+    from PIL import Image
+    buffer = io.BytesIO()
+    Image.new("RGB", (width, height), (200, 40, 40)).save(buffer, "JPEG", **save_args)
+    return buffer.getvalue()
+
+
+class TestRenderVariants:
+    """Tests for backend/image_variants.py"""
+
+    def test_renders_narrower_widths_only(self, tmp_path):
+        from PIL import Image
+        from image_variants import render_variants
+        source = tmp_path / "photo.jpg"
+        source.write_bytes(_jpeg(1000, 500))
+
+        result = render_variants(str(source), str(tmp_path / "out"), (160, 480, 1280))
+        assert result == {"width": 1000, "height": 500, "variants": [160, 480]}
+        assert sorted(p.name for p in (tmp_path / "out").iterdir()) == [".rendered", "160.webp", "480.webp"]
+        with Image.open(tmp_path / "out" / "480.webp") as variant:
+            assert variant.format == "WEBP"
+            assert variant.size == (480, 240)
+
+    def test_small_image_renders_nothing(self, tmp_path):
+        from PIL import Image
+        from image_variants import render_variants
+        source = tmp_path / "icon.png"
+        Image.new("RGBA", (100, 100)).save(source)
+
+        result = render_variants(str(source), str(tmp_path / "out"), (160, 480))
+        assert result["variants"] == []
+        assert [p.name for p in (tmp_path / "out").iterdir()] == [".rendered"]
+
+    def test_exif_rotation(self, tmp_path):
+        from PIL import Image
+        from image_variants import render_variants
+        exif = Image.Exif()
+        exif[0x0112] = 6  # Orientation: rotate 90 degrees
+        source = tmp_path / "portrait.jpg"
+        source.write_bytes(_jpeg(800, 400, exif=exif.tobytes()))
+
+        render_variants(str(source), str(tmp_path / "out"), (160,))
+        with Image.open(tmp_path / "out" / "160.webp") as variant:
+            assert variant.size == (160, 320)
+
+    def test_exif_rotation_never_upscales(self, tmp_path):
+        from PIL import Image
+        from image_variants import render_variants
+        exif = Image.Exif()
+        exif[0x0112] = 6
+        source = tmp_path / "portrait.jpg"
+        # 1000px wide once rotated, so 1280 is wider than the displayed image
+        source.write_bytes(_jpeg(1300, 1000, exif=exif.tobytes()))
+
+        result = render_variants(str(source), str(tmp_path / "out"), (160, 480, 1280))
+        assert result == {"width": 1000, "height": 1300, "variants": [160, 480]}
+        with Image.open(tmp_path / "out" / "480.webp") as variant:
+            assert variant.size == (480, 624)
+
+
+class TestBestVariant:
+    """ImageVariantPipeline.best_variant"""
+
+    @pytest.fixture
+    def pipeline(self, tmp_path):
+        from upload_blobs import UploadBlobStore
+        from image_variants import ImageVariantPipeline, RENDERED_MARKER
+        store = UploadBlobStore(None, tmp_path)
+        directory = store.variants_dir(SHA)
+        directory.mkdir(parents=True)
+        for width in (160, 480):
+            (directory / f"{width}.webp").write_bytes(b"webp")
+        (directory / RENDERED_MARKER).touch()
+        return ImageVariantPipeline(None, store, widths=(160, 480, 1280))
+
+    def test_picks_narrowest_sufficient_width(self, pipeline):
+        assert pipeline.best_variant(SHA, 100)[0] == 160
+        assert pipeline.best_variant(SHA, 160)[0] == 160
+        assert pipeline.best_variant(SHA, 300)[0] == 480
+        # 1280 wasn't rendered (source narrower), so the original is the best fit
+        assert pipeline.best_variant(SHA, 600) is None
+        assert pipeline.is_rendered(SHA)
+
+    def test_unrendered(self, pipeline):
+        assert pipeline.best_variant("cd" + "0" * 62, 100) is None
+        assert not pipeline.is_rendered("cd" + "0" * 62)
+
+    def test_in_progress_render_is_not_rendered(self, pipeline):
+        # Directory and first variant exist, but the render hasn't finished
+        other = "ef" + "0" * 62
+        directory = pipeline.blob_store.variants_dir(other)
+        directory.mkdir(parents=True)
+        (directory / "160.webp").write_bytes(b"webp")
+        assert not pipeline.is_rendered(other)
+
+    def test_submit_ignores_non_images(self, pipeline):
+        assert pipeline.submit(SHA, "clip.mp4") is False
+        assert pipeline.stats()["submitted"] == 0
+
+
+class TestFilesEndpointWidth:
+    """GET /api/v1/files/{filename}?w="""
+
+    def test_variant_served_after_upload(self):
+        session = requests.Session()
+        response = session.post(f"{BASE_URL}/api/v1/auth/login", json={
+            "email": ADMIN_EMAIL,
+            "password": ADMIN_PASSWORD
+        })
+        assert response.status_code == 200
+        # Random noise so the upload isn't deduplicated against an earlier run
+        from PIL import Image
+        buffer = io.BytesIO()
+        Image.frombytes("RGB", (1200, 600), os.urandom(1200 * 600 * 3)).save(buffer, "JPEG")
+        filename = session.post(
+            f"{BASE_URL}/api/v1/upload", files={"file": ("photo.jpg", buffer.getvalue(), "image/jpeg")}
+        ).json()["filename"]
+        url = f"{BASE_URL}/api/v1/files/{filename}?w=480"
+
+        for _ in range(50):
+            response = requests.get(url)
+            if response.headers["content-type"] == "image/webp":
+                break
+            assert response.headers["content-type"] == "image/jpeg"
+            time.sleep(0.2)
+        assert response.status_code == 200
+        assert response.headers["content-type"] == "image/webp"
+        assert response.headers["etag"].endswith('-w480"')
+        print(f"✓ {filename} served at 480px ({len(response.content)} bytes)")
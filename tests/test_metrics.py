@@ -0,0 +1,120 @@
+"""
+Test suite for Prometheus metrics
+Tests:
+- counter/gauge/histogram rendering in the text exposition format
+- collectors from existing stats() dicts, and a failing collector
+- event loop lag sampling
+- GET /metrics exposes HTTP, click, email and event loop series
+"""
+
+import pytest
+import requests
+import os
+import sys
+import asyncio
+import time
+
+sys.path.insert(0, '/app/backend')
+
+BASE_URL = os.environ.get('REACT_APP_BACKEND_URL', '').rstrip('/')
+
+
+class TestMetricsModule:
+    """Tests for backend/metrics.py"""
+
+    def test_render(self):
+        from metrics import MetricsRegistry
+        registry = MetricsRegistry()
+        requests_total = registry.counter("app_requests_total", "Requests", ["route"])
+        in_flight = registry.gauge("app_in_flight", "In flight")
+        latency = registry.histogram("app_latency_seconds", "Latency", ["route"], buckets=(0.1, 1.0))
+
+        requests_total.inc(route='/a"b')
+        requests_total.inc(2, route='/a"b')
+        in_flight.inc()
+        in_flight.inc()
+        in_flight.dec()
+        latency.observe(0.05, route="/a")
+        latency.observe(0.1, route="/a")
+        latency.observe(3, route="/a")
+
+        text = registry.render()
+        assert "# TYPE app_requests_total counter" in text
+        assert 'app_requests_total{route="/a\\"b"} 3' in text
+        assert "app_in_flight 1" in text
+        assert "# TYPE app_latency_seconds histogram" in text
+        assert 'app_latency_seconds_bucket{route="/a",le="0.1"} 2' in text
+        assert 'app_latency_seconds_bucket{route="/a",le="1"} 2' in text
+        assert 'app_latency_seconds_bucket{route="/a",le="+Inf"} 3' in text
+        assert 'app_latency_seconds_sum{route="/a"} 3.15' in text
+        assert 'app_latency_seconds_count{route="/a"} 3' in text
+        assert text.endswith("\n")
+
+    def test_label_mismatch_and_duplicates(self):
+        from metrics import MetricsRegistry
+        registry = MetricsRegistry()
+        counter = registry.counter("app_total", "Total", ["outcome"])
+        with pytest.raises(ValueError):
+            counter.inc()
+        with pytest.raises(ValueError):
+            registry.gauge("app_total", "Again")
+
+    def test_collectors(self):
+        from metrics import MetricsRegistry, stats_collector
+        registry = MetricsRegistry()
+        registry.register_collector(stats_collector(
+            "clicks", lambda: {"total": 9, "enqueued": 7, "queue_depth": 2, "last_flush_at": None},
+            counters={"total": "Seen", "enqueued": "Queued"},
+            gauges={"queue_depth": "Depth", "last_flush_at": "Unset values are skipped"}
+        ))
+
+        def broken():
+            raise RuntimeError("boom")
+
+        registry.register_collector(broken)
+        text = registry.render()
+        assert "# TYPE clicks_enqueued_total counter\nclicks_enqueued_total 7" in text
+        assert "clicks_total 9" in text and "clicks_total_total" not in text
+        assert "clicks_queue_depth 2" in text
+        assert "last_flush_at" not in text
+
+    def test_event_loop_lag(self):
+        from metrics import MetricsRegistry, EventLoopLagMonitor
+        registry = MetricsRegistry()
+        histogram = registry.histogram("lag_seconds", "Lag")
+        gauge = registry.gauge("lag_last_seconds", "Last lag")
+        monitor = EventLoopLagMonitor(histogram, gauge, interval=0.01)
+
+        async def scenario():
+            monitor.start()
+            await asyncio.sleep(0.02)
+            time.sleep(0.1)  # Block the loop
+            await asyncio.sleep(0.03)
+            await monitor.stop()
+
+        asyncio.run(scenario())
+        assert histogram.count() >= 2
+        assert "lag_seconds_count" in registry.render()
+
+
+class TestMetricsEndpoint:
+    """GET /metrics"""
+
+    def test_scrape(self):
+        requests.get(f"{BASE_URL}/api/v1/auth/me")
+        response = requests.get(f"{BASE_URL}/metrics")
+        if response.status_code == 404:
+            pytest.skip("/metrics is not routed to the backend")
+        assert response.status_code == 200
+        assert response.headers["content-type"].startswith("text/plain")
+        text = response.text
+        for name in [
+            "influiv_http_request_duration_seconds_bucket",
+            "influiv_http_requests_in_flight",
+            "influiv_redirect_clicks_enqueued_total",
+            "influiv_emails_sent_total",
+            "influiv_email_outbox_in_process",
+            "influiv_event_loop_lag_seconds_count"
+        ]:
+            assert name in text, f"{name} missing from /metrics"
+        print(f"✓ /metrics exposes {text.count('# TYPE')} metric families")
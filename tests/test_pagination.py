@@ -0,0 +1,142 @@
+"""
+Test suite for keyset (cursor) pagination
+Tests:
+- cursor encode/decode round trip, malformed cursors rejected
+- keyset_query resumes strictly after the cursor, ties broken by id
+- GET /api/v1/campaigns, /admin/campaigns, /payouts, /influencer/transactions in cursor mode
+"""
+
+import pytest
+import requests
+import os
+import sys
+
+sys.path.insert(0, '/app/backend')
+
+BASE_URL = os.environ.get('REACT_APP_BACKEND_URL', '').rstrip('/')
+
+ADMIN_EMAIL = "admin@example.com"
+ADMIN_PASSWORD = "Admin@123"
+INFLUENCER_EMAIL = "influencer@example.com"
+INFLUENCER_PASSWORD = "Influencer@123"
+
+
+def _sort_key(doc):
+    return (doc["created_at"], doc["id"])
+
+
+def _matches_after(doc, after):
+    """Evaluate the $or produced by keyset_query against a plain dict"""
+    for branch in after["$or"]:
+        created_at = branch["created_at"]
+        if isinstance(created_at, dict):
+            if doc["created_at"] < created_at["$lt"]:
+                return True
+        elif doc["created_at"] == created_at and doc["id"] < branch["id"]["$lt"]:
+            return True
+    return False
+
+
+class TestPaginationModule:
+    """Tests for backend/pagination.py"""
+
+    def test_cursor_round_trip(self):
+        from pagination import encode_cursor, decode_cursor
+        cursor = encode_cursor({"created_at": "2025-01-01T00:00:00+00:00", "id": "abc"})
+        assert "=" not in cursor and "/" not in cursor
+        assert decode_cursor(cursor) == ("2025-01-01T00:00:00+00:00", "abc")
+
+    def test_invalid_cursor(self):
+        from pagination import decode_cursor, InvalidCursor
+        for bad in ["not-a-cursor", "e30", "WzEsMl0"]:  # garbage, {}, [1,2]
+            with pytest.raises(InvalidCursor):
+                decode_cursor(bad)
+
+    def test_keyset_query_walks_every_document_once(self):
+        from pagination import encode_cursor, keyset_query
+        docs = [
+            {"created_at": f"2025-01-0{day}", "id": f"{day}-{n}"}
+            for day in range(1, 4) for n in range(3)
+        ]
+        ordered = sorted(docs, key=_sort_key, reverse=True)
+
+        seen, cursor = [], None
+        while True:
+            query = keyset_query({}, cursor)
+            remaining = [d for d in ordered if not cursor or _matches_after(d, query)]
+            page = remaining[:4]
+            seen += page
+            if len(remaining) <= 4:
+                break
+            cursor = encode_cursor(page[-1])
+        assert seen == ordered
+        print(f"✓ {len(docs)} documents walked in {len(docs) // 4 + 1} pages without gaps or repeats")
+
+    def test_keyset_query_keeps_filter(self):
+        from pagination import encode_cursor, keyset_query
+        assert keyset_query({"status": "live"}, None) == {"status": "live"}
+        query = keyset_query({"status": "live"}, encode_cursor({"created_at": "t", "id": "x"}))
+        assert query["$and"][0] == {"status": "live"}
+
+
+class TestCursorEndpoints:
+    """Cursor mode on listing endpoints"""
+
+    @pytest.fixture
+    def admin_session(self):
+        session = requests.Session()
+        response = session.post(f"{BASE_URL}/api/v1/auth/login", json={
+            "email": ADMIN_EMAIL,
+            "password": ADMIN_PASSWORD
+        })
+        assert response.status_code == 200, f"Admin login failed: {response.text}"
+        return session
+
+    @pytest.fixture
+    def influencer_session(self):
+        session = requests.Session()
+        response = session.post(f"{BASE_URL}/api/v1/auth/login", json={
+            "email": INFLUENCER_EMAIL,
+            "password": INFLUENCER_PASSWORD
+        })
+        assert response.status_code == 200, f"Influencer login failed: {response.text}"
+        return session
+
+    def _walk(self, session, path, page_size=2):
+        ids, cursor = [], ""
+        while True:
+            response = session.get(f"{BASE_URL}{path}", params={"cursor": cursor, "page_size": page_size})
+            assert response.status_code == 200, response.text
+            data = response.json()
+            assert len(data["data"]) <= page_size
+            ids += [item["id"] for item in data["data"]]
+            if not data["next_cursor"]:
+                return ids
+            cursor = data["next_cursor"]
+
+    def test_admin_campaigns_cursor_walk(self, admin_session):
+        ids = self._walk(admin_session, "/api/v1/admin/campaigns")
+        assert len(ids) == len(set(ids)), "Cursor pages should not repeat items"
+
+        total = admin_session.get(f"{BASE_URL}/api/v1/admin/campaigns", params={"cursor": "", "include_total": "true"}).json()["total"]
+        assert total == len(ids)
+        print(f"✓ Walked {len(ids)} campaigns with cursors")
+
+    def test_payouts_cursor_walk(self, admin_session):
+        ids = self._walk(admin_session, "/api/v1/payouts")
+        assert len(ids) == len(set(ids))
+
+        first = admin_session.get(f"{BASE_URL}/api/v1/payouts", params={"cursor": ""}).json()
+        assert first["total"] is None and first["summary"] is None, "Totals are only computed on request"
+
+    def test_transactions_cursor_walk(self, influencer_session):
+        ids = self._walk(influencer_session, "/api/v1/influencer/transactions")
+        assert len(ids) == len(set(ids))
+
+    def test_page_mode_unchanged(self, admin_session):
+        data = admin_session.get(f"{BASE_URL}/api/v1/campaigns", params={"page": 1, "page_size": 5}).json()
+        assert data["page"] == 1 and "total" in data and "next_cursor" not in data
+
+    def test_invalid_cursor_rejected(self, admin_session):
+        response = admin_session.get(f"{BASE_URL}/api/v1/campaigns", params={"cursor": "garbage"})
+        assert response.status_code == 400
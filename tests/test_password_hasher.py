@@ -0,0 +1,129 @@
+"""
+Test suite for the bcrypt worker pool
+Tests:
+- PasswordHasher hash/verify round trip
+- concurrent calls are capped at max_workers
+- calls beyond max_pending are rejected with PasswordHasherBusy
+- GET /api/v1/admin/password-hasher - pool stats (admin only)
+"""
+
+import pytest
+import requests
+import os
+import sys
+import asyncio
+import threading
+import time
+
+sys.path.insert(0, '/app/backend')
+
+BASE_URL = os.environ.get('REACT_APP_BACKEND_URL', '').rstrip('/')
+
+ADMIN_EMAIL = "admin@example.com"
+ADMIN_PASSWORD = "Admin@123"
+
+
+class SlowContext:
+    """Stands in for CryptContext; records how many calls run at once"""
+
+    def __init__(self, delay=0.05):
+        self.delay = delay
+        self.release = threading.Event()
+        self.release.set()
+        self.running = 0
+        self.peak = 0
+        self._lock = threading.Lock()
+
+    def hash(self, password):
+        with self._lock:
+            self.running += 1
+            self.peak = max(self.peak, self.running)
+        self.release.wait()
+        time.sleep(self.delay)
+        with self._lock:
+            self.running -= 1
+        return f"hashed:{password}"
+
+
+class TestPasswordHasherModule:
+    """Tests for backend/password_hasher.py"""
+
+    def test_round_trip(self):
+        from passlib.context import CryptContext
+        from password_hasher import PasswordHasher
+        hasher = PasswordHasher(CryptContext(schemes=["bcrypt"], deprecated="auto", bcrypt__rounds=4), max_workers=2)
+
+        async def scenario():
+            hashed = await hasher.hash("Secret@123")
+            return hashed, await hasher.verify("Secret@123", hashed), await hasher.verify("wrong", hashed)
+
+        try:
+            hashed, ok, wrong = asyncio.run(scenario())
+        finally:
+            hasher.shutdown()
+        assert hashed != "Secret@123"
+        assert ok is True
+        assert wrong is False
+        assert hasher.stats()["completed"] == 3
+
+    def test_concurrency_capped_at_max_workers(self):
+        from password_hasher import PasswordHasher
+        context = SlowContext()
+        hasher = PasswordHasher(context, max_workers=2, max_pending=100)
+
+        async def scenario():
+            return await asyncio.gather(*(hasher.hash(str(i)) for i in range(8)))
+
+        try:
+            results = asyncio.run(scenario())
+        finally:
+            hasher.shutdown()
+        assert results == [f"hashed:{i}" for i in range(8)]
+        assert context.peak == 2
+        assert hasher.stats()["in_flight"] == 0
+
+    def test_overflow_rejected(self):
+        from password_hasher import PasswordHasher, PasswordHasherBusy
+        context = SlowContext(delay=0)
+        context.release.clear()
+        hasher = PasswordHasher(context, max_workers=1, max_pending=1)
+
+        async def scenario():
+            running = asyncio.create_task(hasher.hash("a"))
+            await asyncio.sleep(0.01)
+            waiting = asyncio.create_task(hasher.hash("b"))
+            await asyncio.sleep(0.01)
+            with pytest.raises(PasswordHasherBusy):
+                await hasher.hash("c")
+            context.release.set()
+            return await running, await waiting
+
+        try:
+            results = asyncio.run(scenario())
+        finally:
+            hasher.shutdown()
+        assert results == ("hashed:a", "hashed:b")
+        stats = hasher.stats()
+        assert stats["rejected"] == 1
+        assert stats["completed"] == 2
+        assert stats["queue_depth"] == 0
+
+
+class TestPasswordHasherEndpoint:
+    """Tests for GET /api/v1/admin/password-hasher"""
+
+    def test_requires_auth(self):
+        response = requests.get(f"{BASE_URL}/api/v1/admin/password-hasher")
+        assert response.status_code == 401
+
+    def test_stats(self):
+        session = requests.Session()
+        login = session.post(f"{BASE_URL}/api/v1/auth/login", json={"email": ADMIN_EMAIL, "password": ADMIN_PASSWORD})
+        assert login.status_code == 200
+
+        response = session.get(f"{BASE_URL}/api/v1/admin/password-hasher")
+        assert response.status_code == 200
+        data = response.json()
+        assert data["completed"] >= 1
+        assert "rejected" in data
+        print(f"✓ Password hasher: {data}")
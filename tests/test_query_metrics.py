@@ -0,0 +1,160 @@
+"""
+Test suite for per-request MongoDB query metrics
+Tests:
+- QueryCounter attributes commands to the active request, across executor threads
+- DB time and slowest command from succeeded/failed events
+- Server-Timing header value, query budget and per-route stats
+- X-Query-Count / Server-Timing headers and GET /api/v1/admin/query-stats
+"""
+
+import pytest
+import requests
+import os
+import sys
+import contextvars
+import threading
+from types import SimpleNamespace
+
+sys.path.insert(0, '/app/backend')
+
+BASE_URL = os.environ.get('REACT_APP_BACKEND_URL', '').rstrip('/')
+
+ADMIN_EMAIL = "admin@example.com"
+ADMIN_PASSWORD = "Admin@123"
+
+
+def _event(command_name, command, request_id=1, duration_micros=0):
+    return SimpleNamespace(
+        command_name=command_name,
+        command=command,
+        connection_id=("localhost", 27017),
+        request_id=request_id,
+        duration_micros=duration_micros
+    )
+
+
+class TestQueryCounterModule:
+    """Tests for backend/query_metrics.py"""
+
+    def test_counts_active_request_only(self):
+        from query_metrics import QueryCounter, begin_request, end_request, current_queries
+        counter = QueryCounter()
+        counter.started(_event("find", {"find": "campaigns"}))
+
+        token = begin_request()
+        try:
+            counter.started(_event("find", {"find": "campaigns"}, request_id=2))
+            counter.started(_event("getMore", {"getMore": 123, "collection": "campaigns"}, request_id=3))
+            counter.started(_event("hello", {"hello": 1}, request_id=4))
+            queries = current_queries()
+            assert queries.count == 2
+            assert queries.top() == {"campaigns.find": 1, "campaigns.getMore": 1}
+        finally:
+            end_request(token)
+
+        assert current_queries() is None
+        assert counter.stats() == {"total": 3, "outside_requests": 1}
+
+    def test_attribution_in_executor_thread(self):
+        # Motor runs pymongo (and its listeners) on a thread with a copy of the caller's context
+        from query_metrics import QueryCounter, begin_request, end_request, current_queries
+        counter = QueryCounter()
+        token = begin_request()
+        try:
+            context = contextvars.copy_context()
+
+            def run_command():
+                counter.started(_event("aggregate", {"aggregate": "payouts"}))
+                counter.succeeded(_event("aggregate", {}, duration_micros=2500))
+
+            thread = threading.Thread(target=context.run, args=(run_command,))
+            thread.start()
+            thread.join()
+            assert current_queries().count == 1
+            assert current_queries().db_ms == 2.5
+        finally:
+            end_request(token)
+
+    def test_db_time_and_slowest(self):
+        from query_metrics import QueryCounter, begin_request, end_request, current_queries
+        counter = QueryCounter()
+        token = begin_request()
+        try:
+            counter.started(_event("find", {"find": "campaigns"}, request_id=1))
+            counter.started(_event("aggregate", {"aggregate": "payouts"}, request_id=2))
+            counter.succeeded(_event("aggregate", {}, request_id=2, duration_micros=12000))
+            counter.failed(_event("find", {}, request_id=1, duration_micros=3000))
+            # Finish events for commands started outside this request are ignored
+            counter.succeeded(_event("find", {}, request_id=99, duration_micros=50000))
+            queries = current_queries()
+        finally:
+            end_request(token)
+
+        summary = queries.summary()
+        assert summary["db_queries"] == 2 and summary["db_failed"] == 1
+        assert summary["db_ms"] == 15.0
+        assert summary["db_slowest"] == "payouts.aggregate" and summary["db_slowest_ms"] == 12.0
+        assert queries.server_timing(40) == (
+            'db;dur=15.0;desc="2 queries", db-slowest;dur=12.0;desc="payouts.aggregate", app;dur=40.0'
+        )
+
+    def test_budget(self):
+        from query_metrics import QueryBudget, RequestQueries
+        queries = RequestQueries()
+        for i in range(3):
+            queries.started("find", "campaigns", (None, i))
+            queries.finished((None, i), 4000)
+
+        assert QueryBudget(max_queries=5).exceeded(queries) == []
+        assert QueryBudget(max_queries=2).exceeded(queries) == ["queries"]
+        assert QueryBudget(max_queries=2, max_db_ms=10).exceeded(queries) == ["queries", "db_ms"]
+        assert QueryBudget(max_queries=0, max_db_ms=0).exceeded(queries) == []
+
+    def test_route_stats(self):
+        from query_metrics import RouteQueryStats, RequestQueries
+        stats = RouteQueryStats(max_routes=2)
+        light, heavy = RequestQueries(), RequestQueries()
+        light.started("find", "users", (None, 1))
+        for i in range(10):
+            heavy.started("find", "campaigns", (None, i))
+
+        stats.record("GET /api/v1/auth/me", light, False)
+        stats.record("GET /api/v1/payouts", heavy, True)
+        stats.record("GET /api/v1/payouts", light, False)
+        stats.record("GET /api/v1/other", heavy, False)
+
+        rows = stats.stats()
+        assert [row["route"] for row in rows] == ["GET /api/v1/payouts", "GET /api/v1/auth/me"]
+        assert rows[0]["requests"] == 2 and rows[0]["avg_queries"] == 5.5
+        assert rows[0]["max_queries"] == 10 and rows[0]["over_budget"] == 1
+
+
+@pytest.fixture
+def admin_session():
+    session = requests.Session()
+    response = session.post(f"{BASE_URL}/api/v1/auth/login", json={
+        "email": ADMIN_EMAIL,
+        "password": ADMIN_PASSWORD
+    })
+    assert response.status_code == 200, f"Admin login failed: {response.text}"
+    return session
+
+
+class TestQueryMetricsEndpoints:
+    """Response headers and GET /api/v1/admin/query-stats"""
+
+    def test_headers_present(self, admin_session):
+        response = admin_session.get(f"{BASE_URL}/api/v1/admin/campaigns")
+        assert response.status_code == 200
+        assert int(response.headers["X-Query-Count"]) >= 1
+        assert response.headers["Server-Timing"].startswith("db;dur=")
+        print(f"✓ Server-Timing: {response.headers['Server-Timing']}")
+
+    def test_query_stats(self, admin_session):
+        admin_session.get(f"{BASE_URL}/api/v1/admin/campaigns")
+        response = admin_session.get(f"{BASE_URL}/api/v1/admin/query-stats")
+        assert response.status_code == 200
+        data = response.json()
+        assert "max_queries" in data["budget"]
+        routes = {row["route"]: row for row in data["routes"]}
+        assert routes["GET /api/v1/admin/campaigns"]["requests"] >= 1
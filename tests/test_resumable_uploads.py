@@ -0,0 +1,278 @@
+"""
+Test suite for resumable chunked uploads
+Tests:
+- chunks are appended at the current offset; out-of-order chunks get 409 with the offset
+- a chunk with the wrong checksum (or too long) is rolled back
+- a session resumes after a restart, rebuilding the running hash from disk
+- completing publishes through the blob store with the whole-file hash
+- sessions are private to their user, and idle ones (or orphaned data files) expire
+- POST/PUT/GET /api/v1/uploads/resumable round trip
+"""
+
+import pytest
+import requests
+import os
+import sys
+import asyncio
+import hashlib
+from datetime import timedelta
+
+sys.path.insert(0, '/app/backend')
+
+BASE_URL = os.environ.get('REACT_APP_BACKEND_URL', '').rstrip('/')
+
+ADMIN_EMAIL = "admin@example.com"
+ADMIN_PASSWORD = "Admin@123"
+
+CHUNK = 1024
+USER = "user-1"
+
+
+def _sha256(data):
+    return hashlib.sha256(data).hexdigest()
+
+
+async def _body(data, piece=300):
+    for start in range(0, len(data), piece):
+        yield data[start:start + piece]
+
+
+class FakeBlobStore:
+    """Records what store_staged was given, like UploadBlobStore without the index"""
+
+    def __init__(self, uploads_dir):
+        self.uploads_dir = uploads_dir
+        self.published = []
+
+    async def store_staged(self, path, sha256, size, filename, uploaded_by=None):
+        from upload_blobs import StoredUpload
+        os.replace(path, self.uploads_dir / filename)
+        self.published.append((filename, sha256, size, uploaded_by))
+        return StoredUpload(filename, size, sha256, False)
+
+
+@pytest.fixture
+def manager(tmp_path):
+    from resumable_uploads import ResumableUploads
+    return ResumableUploads(tmp_path, FakeBlobStore(tmp_path), max_bytes=10 * CHUNK, chunk_size=CHUNK)
+
+
+def _run(coro):
+    return asyncio.run(coro)
+
+
+class TestResumableUploadsModule:
+    """Tests for backend/resumable_uploads.py"""
+
+    def test_round_trip(self, manager, tmp_path):
+        data = os.urandom(2 * CHUNK + 10)
+
+        async def scenario():
+            state = await manager.create(USER, "Clip.MP4", len(data), _sha256(data))
+            for offset in range(0, len(data), CHUNK):
+                chunk = data[offset:offset + CHUNK]
+                state = await manager.write_chunk(state["id"], USER, offset, _sha256(chunk), _body(chunk))
+            return await manager.complete(state["id"], USER)
+
+        state, stored = _run(scenario())
+        assert state["offset"] == len(data)
+        assert stored.filename.endswith(".mp4")
+        assert stored.sha256 == _sha256(data)
+        assert (tmp_path / stored.filename).read_bytes() == data
+        assert manager.blob_store.published == [(stored.filename, _sha256(data), len(data), USER)]
+        assert list(manager.directory.iterdir()) == []
+        assert manager.stats()["rehashed"] == 0
+
+    def test_offset_mismatch(self, manager):
+        from resumable_uploads import OffsetMismatch
+        chunk = os.urandom(CHUNK)
+
+        async def scenario():
+            state = await manager.create(USER, "a.mp4", 3 * CHUNK)
+            await manager.write_chunk(state["id"], USER, 0, _sha256(chunk), _body(chunk))
+            # Retried after the response was lost
+            await manager.write_chunk(state["id"], USER, 0, _sha256(chunk), _body(chunk))
+
+        with pytest.raises(OffsetMismatch) as excinfo:
+            _run(scenario())
+        assert excinfo.value.offset == CHUNK
+
+    def test_bad_chunks_are_rolled_back(self, manager):
+        from resumable_uploads import ChecksumMismatch, ChunkTooLarge
+        first, second = os.urandom(CHUNK), os.urandom(CHUNK)
+
+        async def scenario():
+            state = await manager.create(USER, "a.mp4", 3 * CHUNK)
+            upload_id = state["id"]
+            await manager.write_chunk(upload_id, USER, 0, _sha256(first), _body(first))
+            with pytest.raises(ChecksumMismatch):
+                await manager.write_chunk(upload_id, USER, CHUNK, _sha256(b"other"), _body(second))
+            with pytest.raises(ChunkTooLarge):
+                await manager.write_chunk(upload_id, USER, CHUNK, _sha256(second + b"x"), _body(second + b"x"))
+            return upload_id
+
+        upload_id = _run(scenario())
+        assert manager._data_path(upload_id).read_bytes() == first
+        assert manager._load(upload_id, USER)["offset"] == CHUNK
+        assert manager.stats()["checksum_failures"] == 1
+
+    def test_resume_after_restart(self, manager, tmp_path):
+        from resumable_uploads import ResumableUploads
+        data = os.urandom(2 * CHUNK)
+
+        async def scenario():
+            state = await manager.create(USER, "a.mov", len(data))
+            await manager.write_chunk(state["id"], USER, 0, _sha256(data[:CHUNK]), _body(data[:CHUNK]))
+            restarted = ResumableUploads(tmp_path, manager.blob_store, max_bytes=10 * CHUNK, chunk_size=CHUNK)
+            status = await restarted.status(state["id"], USER)
+            await restarted.write_chunk(state["id"], USER, status["offset"], _sha256(data[CHUNK:]), _body(data[CHUNK:]))
+            _, stored = await restarted.complete(state["id"], USER)
+            return restarted, stored
+
+        restarted, stored = _run(scenario())
+        assert stored.sha256 == _sha256(data)
+        assert restarted.stats()["rehashed"] == 1
+
+    def test_whole_file_checksum(self, manager):
+        from resumable_uploads import ChecksumMismatch, UploadSessionNotFound
+        data = b"hello"
+
+        async def scenario():
+            state = await manager.create(USER, "a.txt", len(data), _sha256(b"something else"))
+            await manager.write_chunk(state["id"], USER, 0, _sha256(data), _body(data))
+            with pytest.raises(ChecksumMismatch):
+                await manager.complete(state["id"], USER)
+            with pytest.raises(UploadSessionNotFound):
+                await manager.status(state["id"], USER)
+
+        _run(scenario())
+        assert manager.blob_store.published == []
+
+    def test_incomplete_and_too_large(self, manager):
+        from resumable_uploads import UploadIncomplete
+        from upload_storage import UploadTooLarge
+
+        async def scenario():
+            with pytest.raises(UploadTooLarge):
+                await manager.create(USER, "a.mp4", 10 * CHUNK + 1)
+            state = await manager.create(USER, "a.mp4", CHUNK)
+            with pytest.raises(UploadIncomplete):
+                await manager.complete(state["id"], USER)
+
+        _run(scenario())
+
+    def test_sessions_are_per_user(self, manager):
+        from resumable_uploads import UploadSessionNotFound
+
+        async def scenario():
+            state = await manager.create(USER, "a.mp4", CHUNK)
+            for upload_id, user_id in [(state["id"], "user-2"), ("../../etc/passwd", USER)]:
+                with pytest.raises(UploadSessionNotFound):
+                    await manager.status(upload_id, user_id)
+
+        _run(scenario())
+
+    def test_rejected_ids_leave_no_locks(self, manager):
+        from resumable_uploads import UploadSessionNotFound
+
+        async def scenario():
+            state = await manager.create(USER, "a.mp4", CHUNK)
+            for upload_id, user_id in [(state["id"], "user-2"), ("f" * 32, USER), ("../x", USER)]:
+                with pytest.raises(UploadSessionNotFound):
+                    await manager.write_chunk(upload_id, user_id, 0, _sha256(b"x"), _body(b"x"))
+                with pytest.raises(UploadSessionNotFound):
+                    await manager.complete(upload_id, user_id)
+                with pytest.raises(UploadSessionNotFound):
+                    await manager.abort(upload_id, user_id)
+            await manager.abort(state["id"], USER)
+
+        _run(scenario())
+        assert manager._locks == {}
+
+    def test_expire_removes_orphaned_data(self, manager):
+        async def scenario():
+            manager.directory.mkdir(parents=True)
+            # A crash between writing the data file and the state file
+            orphan = manager._data_path("a" * 32)
+            orphan.touch()
+            assert await manager.expire() == 0
+            assert orphan.exists(), "a fresh data file may belong to a create in progress"
+            manager.ttl = timedelta(seconds=-1)
+            await manager.expire()
+            return orphan
+
+        orphan = _run(scenario())
+        assert not orphan.exists()
+
+    def test_expire(self, manager):
+        async def scenario():
+            await manager.create(USER, "a.mp4", CHUNK)
+            assert await manager.expire() == 0
+            manager.ttl = timedelta(seconds=-1)
+            return await manager.expire()
+
+        assert _run(scenario()) == 1
+        assert list(manager.directory.iterdir()) == []
+
+    def test_expire_skips_session_taking_a_chunk(self, manager):
+        chunk = os.urandom(CHUNK)
+
+        async def slow_body():
+            await asyncio.sleep(0.05)
+            yield chunk
+
+        async def scenario():
+            state = await manager.create(USER, "a.mp4", CHUNK)
+            manager.ttl = timedelta(seconds=-1)
+            write = asyncio.create_task(manager.write_chunk(state["id"], USER, 0, _sha256(chunk), slow_body()))
+            await asyncio.sleep(0.01)
+            expired = await manager.expire()
+            return expired, await write
+
+        expired, state = _run(scenario())
+        assert expired == 0
+        assert state["offset"] == CHUNK
+
+
+class TestResumableUploadEndpoints:
+    """POST/PUT/GET /api/v1/uploads/resumable"""
+
+    def test_chunked_upload(self):
+        session = requests.Session()
+        response = session.post(f"{BASE_URL}/api/v1/auth/login", json={
+            "email": ADMIN_EMAIL,
+            "password": ADMIN_PASSWORD
+        })
+        assert response.status_code == 200
+        data = os.urandom(3 * 1024 * 1024 + 100)
+
+        response = session.post(f"{BASE_URL}/api/v1/uploads/resumable", json={
+            "filename": "portfolio.mp4",
+            "size": len(data),
+            "sha256": _sha256(data)
+        })
+        assert response.status_code == 200
+        upload = response.json()
+        url = f"{BASE_URL}/api/v1/uploads/resumable/{upload['upload_id']}"
+        chunk_size = min(upload["chunk_size"], 1024 * 1024)
+
+        for offset in range(0, len(data), chunk_size):
+            chunk = data[offset:offset + chunk_size]
+            response = session.put(url, params={"offset": offset}, data=chunk, headers={
+                "Content-Type": "application/octet-stream",
+                "X-Chunk-SHA256": _sha256(chunk)
+            })
+            assert response.status_code == 200, response.text
+            assert response.json()["offset"] == offset + len(chunk)
+
+        # A resent chunk is refused with the current offset
+        response = session.put(url, params={"offset": 0}, data=data[:10], headers={"X-Chunk-SHA256": _sha256(data[:10])})
+        assert response.status_code == 409
+        assert response.headers["upload-offset"] == str(len(data))
+
+        response = session.post(f"{url}/complete")
+        assert response.status_code == 200
+        filename = response.json()["filename"]
+        assert requests.get(f"{BASE_URL}/api/v1/files/{filename}").content == data
+        assert session.get(url).status_code == 404
+        print(f"✓ {filename} uploaded in {len(data) // chunk_size + 1} chunks")
@@ -0,0 +1,230 @@
+"""
+Test suite for the async SMTP connection pool
+Runs SMTPPool and EmailService against a local aiosmtpd sink:
+- persistent authenticated connections reused across messages
+- max_connections respected under concurrent sends
+- reconnect after the server drops the connection
+- SMTP settings cached between messages and invalidated on update
+"""
+
+import pytest
+import os
+import sys
+import socket
+import asyncio
+
+from aiosmtpd.controller import Controller
+from aiosmtpd.smtp import AuthResult
+
+SMTP_USER = "mailer@influiv.test"
+SMTP_PASSWORD = "secret"
+
+
+class SinkHandler:
+    def __init__(self):
+        self.messages = []
+        self.sessions = set()
+        self.auth_count = 0
+
+    async def handle_DATA(self, server, session, envelope):
+        self.sessions.add(id(session))
+        self.messages.append(envelope)
+        return "250 OK"
+
+
+def _authenticator(handler):
+    def authenticate(server, session, envelope, mechanism, auth_data):
+        ok = auth_data.login == SMTP_USER.encode() and auth_data.password == SMTP_PASSWORD.encode()
+        if ok:
+            handler.auth_count += 1
+        return AuthResult(success=ok)
+    return authenticate
+
+
+def _free_port():
+    with socket.socket() as s:
+        s.bind(("127.0.0.1", 0))
+        return s.getsockname()[1]
+
+
+def _start_sink(handler, port):
+    controller = Controller(
+        handler,
+        hostname="127.0.0.1",
+        port=port,
+        authenticator=_authenticator(handler),
+        auth_require_tls=False
+    )
+    controller.start()
+    return controller
+
+
+@pytest.fixture
+def smtp_sink():
+    handler = SinkHandler()
+    controllers = [_start_sink(handler, _free_port())]
+    yield controllers, handler
+    controllers[-1].stop()
+
+
+def _message(n):
+    return f"Subject: test {n}\r\n\r\nbody {n}\r\n"
+
+
+class TestSMTPPool:
+    """Tests for backend/smtp_pool.py"""
+
+    def test_reuses_authenticated_connection(self, smtp_sink):
+        sys.path.insert(0, '/app/backend')
+        from smtp_pool import SMTPPool
+        controllers, handler = smtp_sink
+        controller = controllers[-1]
+
+        async def run():
+            pool = SMTPPool("127.0.0.1", controller.port, SMTP_USER, SMTP_PASSWORD, max_connections=2)
+            for n in range(5):
+                await pool.send(SMTP_USER, ["to@influiv.test"], _message(n))
+            stats = pool.stats()
+            await pool.close()
+            return stats
+
+        stats = asyncio.run(run())
+        assert len(handler.messages) == 5
+        assert stats["connections_opened"] == 1, "Sequential sends should share one connection"
+        assert handler.auth_count == 1, "Login should happen once per connection, not per message"
+        print(f"✓ 5 messages over {stats['connections_opened']} connection")
+
+    def test_concurrent_sends_respect_max_connections(self, smtp_sink):
+        sys.path.insert(0, '/app/backend')
+        from smtp_pool import SMTPPool
+        controllers, handler = smtp_sink
+        controller = controllers[-1]
+
+        async def run():
+            pool = SMTPPool("127.0.0.1", controller.port, SMTP_USER, SMTP_PASSWORD, max_connections=3)
+            await asyncio.gather(*(
+                pool.send(SMTP_USER, [f"to{n}@influiv.test"], _message(n)) for n in range(30)
+            ))
+            stats = pool.stats()
+            await pool.close()
+            return stats
+
+        stats = asyncio.run(run())
+        assert len(handler.messages) == 30
+        assert stats["connections_opened"] <= 3
+        assert stats["sent"] == 30
+
+    def test_reconnects_after_server_restart(self, smtp_sink):
+        sys.path.insert(0, '/app/backend')
+        from smtp_pool import SMTPPool
+        controllers, handler = smtp_sink
+        controller = controllers[-1]
+
+        async def run():
+            pool = SMTPPool("127.0.0.1", controller.port, SMTP_USER, SMTP_PASSWORD, max_connections=1)
+            await pool.send(SMTP_USER, ["to@influiv.test"], _message(1))
+            # Drop every open connection server-side and come back on the same port
+            controller.stop()
+            controllers.append(_start_sink(handler, controller.port))
+            await pool.send(SMTP_USER, ["to@influiv.test"], _message(2))
+            stats = pool.stats()
+            await pool.close()
+            return stats
+
+        stats = asyncio.run(run())
+        assert len(handler.messages) == 2
+        assert stats["connections_opened"] == 2
+        assert stats["failed"] == 0
+
+
+class FakeSettingsCollection:
+    def __init__(self, settings):
+        self.settings = settings
+        self.reads = 0
+
+    async def find_one(self, query, projection=None):
+        self.reads += 1
+        return dict(self.settings) if self.settings else None
+
+
+class FakeDB:
+    def __init__(self, settings):
+        self.email_settings = FakeSettingsCollection(settings)
+
+
+class TestEmailServiceWithPool:
+    """EmailService.send_email delivers through the pool"""
+
+    def test_send_templated_email(self, smtp_sink):
+        sys.path.insert(0, '/app/backend')
+        from email_service import EmailService
+        controllers, handler = smtp_sink
+        controller = controllers[-1]
+
+        db = FakeDB({
+            "id": "default",
+            "smtp_host": "127.0.0.1",
+            "smtp_port": controller.port,
+            "smtp_user": SMTP_USER,
+            "smtp_password": SMTP_PASSWORD,
+            "from_email": SMTP_USER,
+            "from_name": "Influiv"
+        })
+
+        async def run():
+            service = EmailService(db, max_connections=2)
+            results = await asyncio.gather(*(
+                service.send_influencer_welcome(f"creator{n}@influiv.test", f"Creator {n}") for n in range(4)
+            ))
+            stats = service.pool_stats()
+            await service.close()
+            return results, stats
+
+        results, stats = asyncio.run(run())
+        assert all(results)
+        assert len(handler.messages) == 4
+        assert "Welcome to Influiv!" in handler.messages[0].content.decode()
+        assert stats["connections_opened"] <= 2
+
+    def test_settings_read_once_per_burst(self, smtp_sink):
+        sys.path.insert(0, '/app/backend')
+        from email_service import EmailService
+        controllers, handler = smtp_sink
+        controller = controllers[-1]
+
+        db = FakeDB({
+            "id": "default",
+            "smtp_host": "127.0.0.1",
+            "smtp_port": controller.port,
+            "smtp_user": SMTP_USER,
+            "smtp_password": SMTP_PASSWORD
+        })
+
+        async def run():
+            service = EmailService(db, max_connections=2, settings_ttl=60)
+            for n in range(10):
+                await service.send_brand_welcome(f"brand{n}@influiv.test", f"Brand {n}")
+            reads_after_burst = db.email_settings.reads
+            service.invalidate_settings()
+            await service.send_brand_welcome("brand@influiv.test", "Brand")
+            await service.close()
+            return reads_after_burst, service.settings_cache_stats()
+
+        reads_after_burst, stats = asyncio.run(run())
+        assert len(handler.messages) == 11
+        assert reads_after_burst == 1, "A burst of emails should read email_settings once"
+        assert db.email_settings.reads == 2, "invalidate_settings should force a re-read"
+        assert stats["hits"] == 9
+        print(f"✓ 11 emails, {db.email_settings.reads} settings reads")
+
+    def test_unconfigured_settings_are_cached(self):
+        sys.path.insert(0, '/app/backend')
+        from email_service import EmailService
+        db = FakeDB(None)
+
+        async def run():
+            service = EmailService(db, settings_ttl=60)
+            return [await service.send_brand_welcome("brand@influiv.test", "Brand") for _ in range(3)]
+
+        assert asyncio.run(run()) == [False, False, False]
+        assert db.email_settings.reads == 1
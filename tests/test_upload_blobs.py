@@ -0,0 +1,215 @@
+"""
+Test suite for content-addressed upload storage
+Tests:
+- identical uploads share one blob (hard-linked public names) and one refcount entry
+- migrate indexes and dedups files uploaded before the blob store
+- gc removes unreferenced uploads past the grace period, then unreferenced blobs
+- upload filenames are found nested anywhere in referencing documents
+- GET /api/v1/admin/uploads/storage and dry-run POST /api/v1/admin/uploads/gc
+"""
+
+import pytest
+import requests
+import os
+import sys
+import asyncio
+from datetime import datetime, timezone, timedelta
+
+sys.path.insert(0, '/app/backend')
+
+BASE_URL = os.environ.get('REACT_APP_BACKEND_URL', '').rstrip('/')
+
+ADMIN_EMAIL = "admin@example.com"
+ADMIN_PASSWORD = "Admin@123"
+
+NAME_A = "11111111-1111-4111-8111-111111111111.png"
+NAME_B = "22222222-2222-4222-8222-222222222222.png"
+NAME_C = "33333333-3333-4333-8333-333333333333.mp4"
+
+
+def _matches(doc, query):
+    for key, cond in query.items():
+        value = doc.get(key)
+        if isinstance(cond, dict):
+            if "$lt" in cond and not (value is not None and value < cond["$lt"]):
+                return False
+            if "$lte" in cond and not (value is not None and value <= cond["$lte"]):
+                return False
+        elif value != cond:
+            return False
+    return True
+
+
+class FakeCursor:
+    def __init__(self, docs):
+        self.docs = docs
+
+    def __aiter__(self):
+        return self._iterate()
+
+    async def _iterate(self):
+        for doc in self.docs:
+            yield dict(doc)
+
+
+class FakeCollection:
+    """In-memory stand-in supporting the queries UploadBlobStore issues"""
+
+    def __init__(self, docs=None, unique=None):
+        self.docs = list(docs or [])
+        self.unique = unique
+
+    def find(self, query, projection=None):
+        return FakeCursor([d for d in self.docs if _matches(d, query)])
+
+    async def insert_one(self, doc):
+        from pymongo.errors import DuplicateKeyError
+        if self.unique and any(d[self.unique] == doc[self.unique] for d in self.docs):
+            raise DuplicateKeyError("duplicate")
+        self.docs.append(dict(doc))
+
+    async def update_one(self, query, update, upsert=False):
+        doc = next((d for d in self.docs if _matches(d, query)), None)
+        if doc is None:
+            if not upsert:
+                return
+            doc = dict(query, **update.get("$setOnInsert", {}))
+            self.docs.append(doc)
+        for field, amount in update.get("$inc", {}).items():
+            doc[field] = doc.get(field, 0) + amount
+
+    async def delete_one(self, query):
+        for doc in self.docs:
+            if _matches(doc, query):
+                self.docs.remove(doc)
+                return type("Result", (), {"deleted_count": 1})
+        return type("Result", (), {"deleted_count": 0})
+
+    def by(self, field, value):
+        return next((d for d in self.docs if d[field] == value), None)
+
+
+class FakeDB(dict):
+    def __init__(self, **collections):
+        super().__init__(collections)
+        self.setdefault("upload_files", FakeCollection(unique="filename"))
+        self.setdefault("upload_blobs", FakeCollection(unique="sha256"))
+
+    def __getitem__(self, name):
+        return self.setdefault(name, FakeCollection())
+
+    def __getattr__(self, name):
+        return self[name]
+
+
+class FakeUpload:
+    def __init__(self, data):
+        self.data = data
+        self.offset = 0
+
+    async def read(self, size):
+        chunk = self.data[self.offset:self.offset + size]
+        self.offset += len(chunk)
+        return chunk
+
+
+class TestUploadBlobStoreModule:
+    """Tests for backend/upload_blobs.py"""
+
+    def test_identical_uploads_share_a_blob(self, tmp_path):
+        from upload_blobs import UploadBlobStore
+        db = FakeDB()
+        store = UploadBlobStore(db, tmp_path)
+        data = os.urandom(5000)
+
+        async def scenario():
+            first = await store.store(FakeUpload(data), NAME_A, max_bytes=10_000)
+            second = await store.store(FakeUpload(data), NAME_B, max_bytes=10_000)
+            return first, second
+
+        first, second = asyncio.run(scenario())
+        assert not first.deduplicated and second.deduplicated
+        assert first.sha256 == second.sha256
+        assert (tmp_path / NAME_B).read_bytes() == data
+        assert os.path.samefile(tmp_path / NAME_A, tmp_path / NAME_B)
+        assert os.path.samefile(tmp_path / NAME_A, store.blob_path(first.sha256))
+        assert db.upload_blobs.by("sha256", first.sha256)["refcount"] == 2
+        assert len(db.upload_files.docs) == 2
+        # No staging files left behind
+        assert [p.name for p in store.blobs_dir.iterdir()] == [first.sha256[:2]]
+
+    def test_migrate_dedups_existing_files(self, tmp_path):
+        from upload_blobs import UploadBlobStore
+        (tmp_path / NAME_A).write_bytes(b"same")
+        (tmp_path / NAME_B).write_bytes(b"same")
+        (tmp_path / NAME_C).write_bytes(b"other")
+        db = FakeDB()
+        store = UploadBlobStore(db, tmp_path)
+
+        result = asyncio.run(store.migrate())
+        assert result == {"indexed": 3, "deduplicated": 1, "bytes_saved": 4}
+        assert os.path.samefile(tmp_path / NAME_A, tmp_path / NAME_B)
+        assert (tmp_path / NAME_B).read_bytes() == b"same"
+        assert len(db.upload_blobs.docs) == 2
+        assert asyncio.run(store.migrate())["indexed"] == 0
+
+    def test_gc(self, tmp_path):
+        from upload_blobs import UploadBlobStore
+        old = (datetime.now(timezone.utc) - timedelta(days=2)).isoformat()
+        db = FakeDB(influencers=FakeCollection([
+            {"id": "i1", "portfolio_images": [f"https://example.com/api/v1/files/{NAME_A}"]}
+        ]))
+        store = UploadBlobStore(db, tmp_path)
+
+        async def scenario():
+            for name, data in [(NAME_A, b"kept"), (NAME_B, b"kept"), (NAME_C, b"orphan")]:
+                await store.store(FakeUpload(data), name, max_bytes=100)
+            # NAME_B was uploaded just now, so it's still within the grace period
+            for name in (NAME_A, NAME_C):
+                db.upload_files.by("filename", name)["created_at"] = old
+            dry = await store.gc(timedelta(hours=24), dry_run=True)
+            real = await store.gc(timedelta(hours=24))
+            return dry, real
+
+        dry, real = asyncio.run(scenario())
+        assert dry["orphans"] == [NAME_C]
+        assert real["orphaned_files"] == 1 and real["removed_blobs"] == 1 and real["bytes_freed"] == 6
+        assert sorted(p.name for p in tmp_path.iterdir()) == [".blobs", NAME_A, NAME_B]
+        assert [d["refcount"] for d in db.upload_blobs.docs] == [2]
+
+    def test_referenced_filenames(self):
+        from upload_blobs import referenced_filenames
+        found = set()
+        referenced_filenames({
+            "landing_page_content": f'<img src="/api/v1/files/{NAME_A}">',
+            "landing_page_testimonials": [{"avatar": NAME_B}],
+            "title": "no files here"
+        }, found)
+        assert found == {NAME_A, NAME_B}
+
+
+@pytest.fixture
+def admin_session():
+    session = requests.Session()
+    response = session.post(f"{BASE_URL}/api/v1/auth/login", json={
+        "email": ADMIN_EMAIL,
+        "password": ADMIN_PASSWORD
+    })
+    assert response.status_code == 200, f"Admin login failed: {response.text}"
+    return session
+
+
+class TestUploadStorageEndpoints:
+    """Admin upload storage endpoints"""
+
+    def test_storage_stats(self, admin_session):
+        response = admin_session.get(f"{BASE_URL}/api/v1/admin/uploads/storage")
+        assert response.status_code == 200
+        data = response.json()
+        assert data["stored_bytes"] <= data["logical_bytes"]
+        print(f"✓ {data['files']} files in {data['blobs']} blobs")
+
+    def test_gc_defaults_to_dry_run(self, admin_session):
+        response = admin_session.post(f"{BASE_URL}/api/v1/admin/uploads/gc")
+        assert response.status_code == 200
+        assert response.json()["dry_run"] is True
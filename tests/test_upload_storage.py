@@ -0,0 +1,149 @@
+"""
+Test suite for streaming upload storage
+Tests:
+- stream_to_file copies in chunks, hashes, and renames into place
+- oversize uploads fail fast and leave no file (final or temp) behind
+- stale partial uploads are cleaned up
+- BodySizeLimit rejects oversized bodies by Content-Length and while streaming
+- POST /api/v1/upload round trip
+"""
+
+import pytest
+import requests
+import os
+import sys
+import asyncio
+import hashlib
+import time
+
+sys.path.insert(0, '/app/backend')
+
+BASE_URL = os.environ.get('REACT_APP_BACKEND_URL', '').rstrip('/')
+
+ADMIN_EMAIL = "admin@example.com"
+ADMIN_PASSWORD = "Admin@123"
+
+
+class FakeUpload:
+    """Stands in for UploadFile: async read(n) over bytes, recording chunk sizes"""
+
+    def __init__(self, data):
+        self.data = data
+        self.offset = 0
+        self.reads = []
+
+    async def read(self, size):
+        self.reads.append(size)
+        chunk = self.data[self.offset:self.offset + size]
+        self.offset += len(chunk)
+        return chunk
+
+
+class TestStreamToFile:
+    """Tests for backend/upload_storage.py"""
+
+    def test_copies_and_hashes(self, tmp_path):
+        from upload_storage import stream_to_file
+        data = os.urandom(10_000)
+        source = FakeUpload(data)
+        stored = asyncio.run(stream_to_file(source, tmp_path / "a.bin", max_bytes=20_000, chunk_size=4096))
+
+        assert (tmp_path / "a.bin").read_bytes() == data
+        assert stored.size == 10_000
+        assert stored.sha256 == hashlib.sha256(data).hexdigest()
+        assert set(source.reads) == {4096}, "Reads are bounded by the chunk size"
+        assert [p.name for p in tmp_path.iterdir()] == ["a.bin"]
+
+    def test_oversize_stops_early(self, tmp_path):
+        from upload_storage import stream_to_file, UploadTooLarge
+        source = FakeUpload(os.urandom(100_000))
+        with pytest.raises(UploadTooLarge):
+            asyncio.run(stream_to_file(source, tmp_path / "big.bin", max_bytes=10_000, chunk_size=4096))
+
+        assert source.offset < 20_000, "Stopped reading soon after the limit"
+        assert list(tmp_path.iterdir()) == []
+
+    def test_exact_limit_allowed(self, tmp_path):
+        from upload_storage import stream_to_file
+        stored = asyncio.run(stream_to_file(FakeUpload(b"x" * 8192), tmp_path / "a.bin", max_bytes=8192, chunk_size=4096))
+        assert stored.size == 8192
+
+    def test_remove_partial_uploads(self, tmp_path):
+        from upload_storage import remove_partial_uploads
+        stale = tmp_path / ".stale.part"
+        fresh = tmp_path / ".fresh.part"
+        kept = tmp_path / "kept.png"
+        for path in (stale, fresh, kept):
+            path.write_bytes(b"x")
+        old = time.time() - 7200
+        os.utime(stale, (old, old))
+        os.utime(kept, (old, old))
+
+        assert remove_partial_uploads(tmp_path, older_than=3600) == 1
+        assert sorted(p.name for p in tmp_path.iterdir()) == [".fresh.part", "kept.png"]
+
+
+class TestBodySizeLimit:
+    """BodySizeLimit ASGI middleware"""
+
+    def _app(self):
+        from fastapi import FastAPI, Request
+        from upload_storage import BodySizeLimit
+        app = FastAPI()
+
+        @app.post("/upload")
+        async def upload(request: Request):
+            return {"size": len(await request.body())}
+
+        @app.post("/other")
+        async def other(request: Request):
+            return {"size": len(await request.body())}
+
+        @app.put("/uploads/{upload_id}")
+        async def chunk(upload_id: str, request: Request):
+            return {"size": len(await request.body())}
+
+        app.add_middleware(BodySizeLimit, max_bytes=1000, path_prefixes=["/upload"])
+        return app
+
+    def test_declared_length(self):
+        from starlette.testclient import TestClient
+        response = TestClient(self._app()).post("/upload", content=b"x" * 5000)
+        assert response.status_code == 413
+
+    def test_streamed_body(self):
+        # A generator body is sent chunked, without Content-Length
+        from starlette.testclient import TestClient
+        response = TestClient(self._app()).post("/upload", content=iter([b"x" * 600, b"x" * 600]))
+        assert response.status_code == 413
+        assert response.json()["detail"] == "Request body too large"
+
+    def test_under_limit_and_other_paths(self):
+        from starlette.testclient import TestClient
+        client = TestClient(self._app())
+        assert client.post("/upload", content=iter([b"x" * 600])).json() == {"size": 600}
+        assert client.post("/other", content=iter([b"x" * 600, b"x" * 600])).json() == {"size": 1200}
+        # "/upload" doesn't cover "/uploads/..." (resumable chunks have their own limit)
+        assert client.put("/uploads/abc", content=b"x" * 5000).json() == {"size": 5000}
+
+
+class TestUploadEndpoint:
+    """POST /api/v1/upload"""
+
+    def test_upload_round_trip(self):
+        session = requests.Session()
+        response = session.post(f"{BASE_URL}/api/v1/auth/login", json={
+            "email": ADMIN_EMAIL,
+            "password": ADMIN_PASSWORD
+        })
+        assert response.status_code == 200
+        data = os.urandom(300_000)
+        response = session.post(f"{BASE_URL}/api/v1/upload", files={"file": ("clip.mp4", data, "video/mp4")})
+        assert response.status_code == 200
+        uploaded = response.json()
+        assert uploaded["size"] == len(data)
+
+        response = session.get(f"{BASE_URL}/api/v1/files/{uploaded['filename']}")
+        assert response.status_code == 200
+        assert response.content == data
+        print(f"✓ Uploaded and read back {uploaded['filename']}")